@@ -0,0 +1,64 @@
+"""Benchmark jira-helper audit over a tree of generated repositories.
+
+Builds many small repositories and one large one with ``git fast-import``, then
+times the audit with the largest repository scheduled first (as the command
+does) and with it scheduled last, where it becomes the straggler of the pool.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_audit.py [--repos N] [--commits N] [--jobs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from pre_commit_jira_helper.audit import audit_repositories, discover_repositories
+
+
+def make_repo(path: Path, commits: int) -> None:
+    """Create a packed repository with a linear history of empty commits."""
+    subprocess.run(["git", "init", "-q", "--bare", "-b", "main", str(path)], check=True)
+    stream = io.BytesIO()
+    for i in range(commits):
+        message = (f"Change {i}" if i % 100 == 0 else f"ABC-{i}: Change {i}").encode() + b"\n"
+        stream.write(b"commit refs/heads/main\n")
+        stream.write(b"committer Bench <bench@example.com> %d +0000\n" % (1_600_000_000 + i))
+        stream.write(b"data %d\n%s\n" % (len(message), message))
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=path, input=stream.getvalue(), check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repos", type=int, default=40, help="Small repositories to generate")
+    parser.add_argument("--commits", type=int, default=2_000, help="Commits per small repository")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args()
+
+    large = args.commits * args.repos // max(1, args.jobs)
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        for i in range(args.repos):
+            make_repo(root / f"small-{i:03}.git", args.commits)
+        make_repo(root / "large.git", large)
+
+        repositories = list(discover_repositories(root))
+        # Same repositories with the large one last and no sizes to reorder them by
+        largest_last = [(path, 0) for path, _ in sorted(repositories, key=lambda r: r[1])]
+
+        print(f"repos: {args.repos} x {args.commits} commits + 1 x {large}, jobs: {args.jobs}")
+        for label, order in (("largest first", repositories), ("largest last", largest_last)):
+            start = time.perf_counter()
+            results = list(audit_repositories(order, jobs=args.jobs))
+            elapsed = time.perf_counter() - start
+            assert len(results) == args.repos + 1
+            print(f"{label:<14} {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark check-jira-issues on a large generated history.
+
+Builds a scratch repository with ``git fast-import`` (one in every 100 commits
+lacks an issue) and times ``check-jira-issues`` over the whole range, next to a
+bare ``git log`` of the same messages for reference.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_check_jira_issues.py [--commits N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from pre_commit_jira_helper.cli.check import main as check_main
+
+
+def make_history(repo: Path, commits: int) -> None:
+    """Create a linear history of empty commits on main."""
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    stream = io.BytesIO()
+    for i in range(commits):
+        subject = f"Change {i}" if i % 100 == 0 else f"ABC-{i}: Change {i}"
+        message = f"{subject}\n\nLonger description of change {i}.\n".encode()
+        stream.write(b"commit refs/heads/main\n")
+        stream.write(b"committer Bench <bench@example.com> %d +0000\n" % (1_600_000_000 + i))
+        stream.write(b"data %d\n%s\n" % (len(message), message))
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=repo, input=stream.getvalue(), check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=50_000, help="Commits to generate")
+    args = parser.parse_args()
+
+    saved_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as directory:
+        repo = Path(directory)
+        make_history(repo, args.commits)
+        os.chdir(repo)
+        try:
+            start = time.perf_counter()
+            subprocess.run(
+                ["git", "log", "-z", "--format=%H%n%B", "main"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            log_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with (
+                contextlib.redirect_stdout(io.StringIO()),
+                contextlib.redirect_stderr(io.StringIO()),
+            ):
+                exit_code = check_main(["main"])
+            check_time = time.perf_counter() - start
+        finally:
+            os.chdir(saved_cwd)
+
+    assert exit_code == 1
+    print(f"commits:           {args.commits}")
+    print(f"git log alone:     {log_time:.2f} s")
+    print(f"check-jira-issues: {check_time:.2f} s ({args.commits / check_time:,.0f} commits/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark issue extraction against large allowed-prefix lists.
+
+Compares the precompiled ``IssueMatcher`` used by ``JiraIssuePrependHook`` with
+the previous implementation (``re.findall`` on the raw pattern plus a linear scan
+of the prefix list).
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_extract_jira_issues.py [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import timeit
+
+from pre_commit_jira_helper.matcher import DEFAULT_ISSUE_PATTERN, IssueMatcher
+
+BRANCH = "feature/ABC-123-DEF-456-XYZ-789-add-new-feature"
+MESSAGE = "Implement feature ABC-123\n\nAlso touches QQQ-1, ZZZ-2 and P9-3.\n" * 20
+
+
+def legacy_extract(pattern: str, allowed_prefixes: list[str], content: str) -> list[str]:
+    """The extraction logic before IssueMatcher, minus debug logging."""
+    matches = re.findall(pattern, content)
+    return [issue for issue in matches if issue.split("-")[0] in allowed_prefixes]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=2000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'prefixes':>9} {'input':>8} {'legacy us':>10} {'matcher us':>11} {'speedup':>8}")
+    for count in (10, 1_000, 10_000):
+        # Put the real prefixes at the end of the list, the worst case for a linear scan
+        prefixes = [f"P{i}X" for i in range(count - 3)] + ["ABC", "DEF", "XYZ"]
+        matcher = IssueMatcher(DEFAULT_ISSUE_PATTERN, prefixes)
+
+        for label, content in (("branch", BRANCH), ("message", MESSAGE)):
+            assert matcher.findall(content) == legacy_extract(
+                DEFAULT_ISSUE_PATTERN, prefixes, content
+            )
+            legacy = min(
+                timeit.repeat(
+                    lambda c=content, p=prefixes: legacy_extract(DEFAULT_ISSUE_PATTERN, p, c),
+                    number=args.runs,
+                    repeat=3,
+                )
+            )
+            new = min(
+                timeit.repeat(lambda c=content, m=matcher: m.findall(c), number=args.runs, repeat=3)
+            )
+            print(
+                f"{count:>9} {label:>8} {legacy / args.runs * 1e6:>10.2f} "
+                f"{new / args.runs * 1e6:>11.2f} {legacy / new:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
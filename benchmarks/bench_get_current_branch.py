@@ -0,0 +1,45 @@
+"""Benchmark branch resolution: in-process HEAD read vs ``git symbolic-ref``.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_get_current_branch.py [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import tempfile
+import timeit
+
+from pre_commit_jira_helper.git import GitOperations
+from pre_commit_jira_helper.utils import run_command
+
+
+def subprocess_branch() -> str | None:
+    """Resolve the branch the way the hook did before, by forking git."""
+    success, stdout, _ = run_command(["git", "symbolic-ref", "--short", "HEAD"])
+    return stdout if success and stdout else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="Calls per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        subprocess.run(["git", "init", "-q", "-b", "feature/ABC-123-bench", repo], check=True)
+        os.chdir(repo)
+
+        assert GitOperations.get_current_branch() == subprocess_branch()
+
+        for name, func in (
+            ("git symbolic-ref", subprocess_branch),
+            ("in-process HEAD read", GitOperations.get_current_branch),
+        ):
+            best = min(timeit.repeat(func, number=args.runs, repeat=5)) / args.runs
+            print(f"{name:<22} {best * 1e6:10.1f} us/commit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark answering several git queries concurrently.
+
+Times a hook that needs the commit hash, repository root and staged files,
+asking ``GitOperations`` for them one after another and all at once with
+``GitOperations.gather()``.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_git_gather.py [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import tempfile
+import timeit
+from pathlib import Path
+
+from pre_commit_jira_helper.git import GitOperations
+
+QUERIES = ("commit_hash", "repo_root", "staged_files")
+
+
+def sequential() -> dict[str, object]:
+    """Run the queries one after another."""
+    return {name: getattr(GitOperations, f"get_{name}")() for name in QUERIES}
+
+
+def concurrent() -> dict[str, object]:
+    """Run the queries at the same time."""
+    return GitOperations.gather(*QUERIES)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50, help="Hook runs per measurement")
+    args = parser.parse_args()
+
+    saved_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as repo:
+        subprocess.run(["git", "init", "-q", repo], check=True)
+        subprocess.run(
+            ["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.com"]
+            + ["commit", "-q", "--allow-empty", "-m", "ABC-1: Initial commit"],
+            cwd=repo,
+            check=True,
+        )
+        for i in range(100):
+            (Path(repo) / f"file{i}.txt").write_text(f"{i}\n")
+        subprocess.run(["git", "add", "."], cwd=repo, check=True)
+        os.chdir(repo)
+        try:
+            assert sequential() == concurrent()
+            one_by_one = min(timeit.repeat(sequential, number=args.runs, repeat=3))
+            gathered = min(timeit.repeat(concurrent, number=args.runs, repeat=3))
+        finally:
+            os.chdir(saved_cwd)
+
+    print(f"CPUs:                   {os.cpu_count()}")
+    print(f"one query at a time:    {one_by_one / args.runs * 1e3:8.2f} ms")
+    print(f"gathered:               {gathered / args.runs * 1e3:8.2f} ms")
+    print(f"speedup:                {one_by_one / gathered:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
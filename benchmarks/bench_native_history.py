@@ -0,0 +1,80 @@
+"""Benchmark reading commit messages without git against git log.
+
+Builds a scratch repository with ``git fast-import`` and times
+``iter_commit_messages()`` through ``git log`` and with ``native=True``, both
+for the whole history and for a short range such as a pull request's.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_native_history.py [--commits N] [--range N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import subprocess
+import tempfile
+import timeit
+from pathlib import Path
+
+from pre_commit_jira_helper.history import iter_commit_messages
+
+
+def make_history(repo: Path, commits: int) -> None:
+    """Create a linear history of empty commits on main."""
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    stream = io.BytesIO()
+    for i in range(commits):
+        subject = f"Change {i}" if i % 100 == 0 else f"ABC-{i}: Change {i}"
+        message = f"{subject}\n\nLonger description of change {i}.\n".encode()
+        stream.write(b"commit refs/heads/main\n")
+        stream.write(b"committer Bench <bench@example.com> %d +0000\n" % (1_600_000_000 + i))
+        stream.write(b"data %d\n%s\n" % (len(message), message))
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=repo, input=stream.getvalue(), check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=100_000, help="Commits to generate")
+    parser.add_argument("--range", type=int, default=20, help="Commits in the short range")
+    args = parser.parse_args()
+
+    saved_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as directory:
+        repo = Path(directory)
+        make_history(repo, args.commits)
+        os.chdir(repo)
+        try:
+            start = subprocess.run(
+                ["git", "rev-parse", f"main~{args.range}"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            scenarios = {
+                f"{args.commits} commits": (["main"], 1),
+                f"{args.range} commits": ([f"{start}..main"], 50),
+            }
+            print(f"{'history':>16} {'git log ms':>11} {'native ms':>10} {'speedup':>8}")
+            for label, (revisions, number) in scenarios.items():
+                timings = {}
+                results = {}
+                for native in (False, True):
+
+                    def scan(native=native, revisions=revisions):
+                        return list(iter_commit_messages(revisions, native=native))
+
+                    results[native] = scan()
+                    timings[native] = min(timeit.repeat(scan, number=number, repeat=3)) / number
+                assert results[True] == results[False]
+                print(
+                    f"{label:>16} {timings[False] * 1e3:>11.1f} {timings[True] * 1e3:>10.1f} "
+                    f"{timings[False] / timings[True]:>7.2f}x"
+                )
+        finally:
+            os.chdir(saved_cwd)
+
+
+if __name__ == "__main__":
+    main()
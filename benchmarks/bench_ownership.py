@@ -0,0 +1,75 @@
+"""Benchmark matching staged files against a path-to-project owners file.
+
+Generates an owners file with N rules and times compiling it, loading the
+compiled trie from its marshal cache, and finding the projects owning M staged
+files, with a fresh and a warm directory memo. The time of a bare loop over
+the paths is printed for scale.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_ownership.py [--rules N] [--files M] [--directories D]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+from pre_commit_jira_helper import ownership
+from pre_commit_jira_helper.ownership import ProjectMap, compile_rules, load_project_map
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=5000, help="Rules in the owners file")
+    parser.add_argument("--files", type=int, default=10_000, help="Staged files")
+    parser.add_argument(
+        "--directories", type=int, default=200, help="Directories the staged files are in"
+    )
+    args = parser.parse_args()
+
+    content = "".join(
+        f"services/team{i % 50}/service{i}/** P{i % 400}\n" for i in range(args.rules)
+    )
+    per_directory = max(args.files // args.directories, 1)
+    paths = sorted(
+        f"services/team{d % 50}/service{d * 7 % args.rules}/src/file{i}.py"
+        for d in range(args.directories)
+        for i in range(per_directory)
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        owners = Path(directory) / "OWNERS"
+        owners.write_text(content)
+        load_project_map(owners, Path(directory))
+
+        def load():
+            ownership._loaded.clear()
+            return load_project_map(owners, Path(directory))
+
+        timings = {
+            "compile": min(timeit.repeat(lambda: compile_rules(content), number=10, repeat=3)) / 10,
+            "load cached trie": min(timeit.repeat(load, number=10, repeat=3)) / 10,
+        }
+
+    trie = compile_rules(content)
+    timings["lookup, fresh memo"] = (
+        min(timeit.repeat(lambda: ProjectMap(trie).projects(paths), number=20, repeat=3)) / 20
+    )
+    warm = ProjectMap(trie)
+    warm.projects(paths)
+    timings["lookup, warm memo"] = (
+        min(timeit.repeat(lambda: warm.projects(paths), number=20, repeat=3)) / 20
+    )
+    timings["bare loop over paths"] = (
+        min(timeit.repeat(lambda: [None for _ in paths], number=20, repeat=3)) / 20
+    )
+
+    print(f"{args.rules} rules, {len(paths)} staged files in {args.directories} directories")
+    for label, seconds in timings.items():
+        print(f"{label:<22} {seconds * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the protection against issue patterns that backtrack catastrophically.
+
+Times the startup analysis of a custom pattern, matching a commit message with
+the default pattern and with a safe custom pattern (guarded: under a time
+limit), and a risky pattern on text that almost matches, run
+directly and through IssueMatcher, which falls back to the default pattern.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_pattern_guard.py [--capitals N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+import timeit
+
+from pre_commit_jira_helper.backtracking import find_backtracking_risk
+from pre_commit_jira_helper.matcher import IssueMatcher
+
+SAFE_PATTERN = r"\b([A-Z]{2,10}-\d+)\b"
+RISKY_PATTERN = r"([A-Z]+)+-\d+"
+MESSAGE = "ABC-12: Round totals\n\n" + "Explain the rounding change in detail.\n" * 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--capitals", type=int, default=22, help="Capitals before the risky pattern fails"
+    )
+    args = parser.parse_args()
+
+    def per_call(function, number: int = 1000) -> float:
+        return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+    default, safe = IssueMatcher(), IssueMatcher(SAFE_PATTERN)
+    timings = {
+        "analysing a pattern": per_call(lambda: find_backtracking_risk(SAFE_PATTERN)),
+        "default pattern": per_call(lambda: default.findall(MESSAGE)),
+        "safe custom pattern": per_call(lambda: safe.findall(MESSAGE)),
+    }
+    for label, seconds in timings.items():
+        print(f"{label:<24}{seconds * 1e6:9.1f} us")
+
+    text = "A" * args.capitals + "!"
+    start = time.perf_counter()
+    re.findall(RISKY_PATTERN, text)
+    direct = time.perf_counter() - start
+    start = time.perf_counter()
+    IssueMatcher(RISKY_PATTERN).findall(text)
+    guarded = time.perf_counter() - start
+    print(f"risky pattern on {len(text)} characters:")
+    print(f"  re.findall            {direct * 1e3:9.1f} ms (doubles with each capital)")
+    print(f"  IssueMatcher          {guarded * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark the pre-receive check of a large push.
+
+Builds a bare repository with ``git fast-import`` holding one commit on main and
+a number of branches (one in every 100 commits lacks an issue), then deletes the
+branches so their commits look like the objects of an incoming push, and times
+the check with one worker and with one worker per CPU.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_pre_receive.py [--commits N] [--refs K]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from pre_commit_jira_helper.receive import RefUpdate, check_push
+
+ZERO = "0" * 40
+
+
+def make_push(repo: Path, commits: int, refs: int) -> list[RefUpdate]:
+    """Create unreferenced branches and return the updates that would push them."""
+    subprocess.run(["git", "init", "-q", "--bare", "-b", "main", str(repo)], check=True)
+    stream = io.BytesIO()
+    mark = 0
+
+    def commit(ref: str, message: bytes, parent: int | None) -> int:
+        nonlocal mark
+        mark += 1
+        stream.write(b"commit %s\nmark :%d\n" % (ref.encode(), mark))
+        stream.write(b"committer Bench <bench@example.com> %d +0000\n" % (1_600_000_000 + mark))
+        stream.write(b"data %d\n%s\n" % (len(message), message))
+        if parent is not None:
+            stream.write(b"from :%d\n" % parent)
+        return mark
+
+    root = commit("refs/heads/main", b"ABC-0: Initial commit\n", None)
+    for k in range(refs):
+        parent = root
+        for i in range(commits // refs):
+            subject = f"Change {k}.{i}" if i % 100 == 0 else f"ABC-{i + 1}: Change {k}.{i}"
+            message = f"{subject}\n\nLonger description of change {i}.\n".encode()
+            parent = commit(f"refs/heads/branch-{k}", message, parent)
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=repo, input=stream.getvalue(), check=True)
+
+    updates = []
+    for k in range(refs):
+        ref = f"refs/heads/branch-{k}"
+        tip = subprocess.run(
+            ["git", "rev-parse", ref], cwd=repo, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        subprocess.run(["git", "update-ref", "-d", ref], cwd=repo, check=True)
+        updates.append(RefUpdate(ZERO, tip, ref))
+    return updates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=40_000, help="Commits to push")
+    parser.add_argument("--refs", type=int, default=8, help="Branches to spread them over")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    saved_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as directory:
+        repo = Path(directory)
+        updates = make_push(repo, args.commits, args.refs)
+        os.chdir(repo)
+        try:
+            print(f"commits: {args.commits}, refs: {args.refs}, cpus: {cpus}")
+            for jobs in sorted({1, cpus}):
+                start = time.perf_counter()
+                report = check_push(updates, jobs=jobs, timeout=600)
+                elapsed = time.perf_counter() - start
+                assert not report.timed_out
+                assert sum(r.commits for r in report.refs) == args.commits // args.refs * args.refs
+                print(f"jobs={jobs:<3} {elapsed:.2f} s ({len(report.offenders)} offenders)")
+        finally:
+            os.chdir(saved_cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Benchmark reading and rewriting verbose (``git commit -v``) commit messages.
+
+Compares the scissors-aware ``CommitMessageHook`` reader and tail-preserving
+writer with the previous implementation (read every line, drop ``#`` lines,
+write the message back). Each measurement runs in a fresh interpreter so peak
+RSS is per case; the Python heap peak comes from tracemalloc.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_read_commit_message.py [--sizes MB ...]
+
+The 1 GB case needs several GB of free memory for the legacy reader, so it is
+only run when requested, e.g. ``--sizes 1 100 1024``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pre_commit_jira_helper.base import CommitMessageHook
+
+MESSAGE = b"Add the thing\n\nLonger description of the thing.\n"
+HEADER = (
+    b"# Please enter the commit message for your changes. Lines starting\n"
+    b"# with '#' will be ignored, and an empty message aborts the commit.\n"
+    b"# ------------------------ >8 ------------------------\n"
+    b"# Do not modify or remove the line above.\n"
+    b"# Everything below it will be ignored.\n"
+    b"diff --git a/data.csv b/data.csv\n"
+)
+DIFF_LINE = b"+2024-01-01,ABC-123,some,column,values,that,look,like,data,0.123456789\n"
+
+
+class _Hook(CommitMessageHook):
+    def should_run(self, **_kwargs):
+        return True
+
+    def process(self, **_kwargs):
+        return True
+
+
+def legacy_read(path: Path) -> str:
+    """The reader before scissors support, minus logging."""
+    lines = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if not line.startswith("#"):
+                lines.append(line)
+    return "".join(lines)
+
+
+def make_message_file(path: Path, size: int) -> None:
+    """Write a verbose commit message file of roughly ``size`` bytes."""
+    block = DIFF_LINE * (1 << 14)
+    with path.open("wb") as f:
+        f.write(MESSAGE + HEADER)
+        written = len(MESSAGE) + len(HEADER)
+        while written < size:
+            chunk = block[: size - written]
+            f.write(chunk)
+            written += len(chunk)
+
+
+def measure(implementation: str, path: Path) -> dict:
+    """Read and rewrite one message file, returning time and memory figures."""
+    hook = _Hook()
+    tracemalloc.start()
+    start = time.perf_counter()
+    if implementation == "legacy":
+        message = legacy_read(path)
+        read_done = time.perf_counter()
+        path.write_text("ABC-1: " + message, encoding="utf-8")
+    else:
+        message = hook.read_commit_message(path)
+        read_done = time.perf_counter()
+        hook.write_commit_message(path, "ABC-1: " + message)
+    end = time.perf_counter()
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "read_ms": (read_done - start) * 1e3,
+        "write_ms": (end - read_done) * 1e3,
+        "heap_mb": heap_peak / 2**20,
+        # ru_maxrss is in KiB on Linux
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10,
+    }
+
+
+def run_case(implementation: str, size: int, directory: Path) -> dict:
+    """Measure one implementation on a fresh file in a child interpreter."""
+    path = directory / "COMMIT_EDITMSG"
+    make_message_file(path, size)
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", implementation, str(path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100], help="Sizes in MB")
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure[0], Path(args.measure[1]))))
+        return
+
+    print(
+        f"{'size':>7} {'impl':>7} {'read ms':>9} {'write ms':>9} {'heap MB':>8} {'max RSS MB':>11}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in args.sizes:
+            for implementation in ("legacy", "new"):
+                r = run_case(implementation, size_mb << 20, Path(directory))
+                print(
+                    f"{size_mb:>5}MB {implementation:>7} {r['read_ms']:>9.1f} "
+                    f"{r['write_ms']:>9.1f} {r['heap_mb']:>8.1f} {r['rss_mb']:>11.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark scanning for keys of the default pattern against the regex engine.
+
+Times re.findall() with DEFAULT_ISSUE_PATTERN and scan_issue_keys() on
+generated commit message text of several sizes, and on text with a key on
+every line, the worst case for the scan. Both must find the same keys.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_scan_keys.py [--megabytes N ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import timeit
+
+from pre_commit_jira_helper.matcher import DEFAULT_ISSUE_PATTERN, scan_issue_keys
+
+MESSAGE = (
+    "ABC-12: Round totals in the ledger\n\n"
+    "Keep the rounding mode of the ledger when totals are re-computed in bulk.\n"
+    + "Explain the change to the ledger in more Detail, with a few more words.\n" * 4
+    + "\n"
+)
+DENSE_LINE = "Keep the rounding mode of the ledger when totals change, see ABC-12\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--megabytes", type=float, nargs="+", default=[0.001, 1, 16], help="Text sizes"
+    )
+    args = parser.parse_args()
+
+    regex = re.compile(DEFAULT_ISSUE_PATTERN)
+    print(f"{'text':<24} {'re.findall':>12} {'scan':>12} {'speedup':>8}")
+    cases = [(f"messages, {size:g} MB", MESSAGE, size) for size in args.megabytes]
+    cases.append(("key on every line, 1 MB", DENSE_LINE, 1))
+    for label, unit, size in cases:
+        content = unit * max(1, round(size * 1e6 / len(unit)))
+        assert scan_issue_keys(content) == regex.findall(content)
+        number = max(1, round(1e5 / len(content)))
+        timings = [
+            min(timeit.repeat(run, number=number, repeat=3)) / number
+            for run in (
+                lambda content=content: regex.findall(content),
+                lambda content=content: scan_issue_keys(content),
+            )
+        ]
+        print(
+            f"{label:<24} {timings[0] * 1e3:9.3f} ms {timings[1] * 1e3:9.3f} ms "
+            f"{timings[0] / timings[1]:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
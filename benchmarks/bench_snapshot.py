@@ -0,0 +1,71 @@
+"""Benchmark checking issue keys against a snapshot from jira-helper sync.
+
+Writes a snapshot of P projects with N issues each and times mapping it and
+looking up the keys of one commit, next to reading the whole snapshot into
+memory as a parse-on-every-commit design would have to.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_snapshot.py [--projects P] [--issues N] [--keys K]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+from pre_commit_jira_helper.snapshot import Snapshot, write_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=500, help="Projects in the snapshot")
+    parser.add_argument("--issues", type=int, default=20_000, help="Issues per project")
+    parser.add_argument("--keys", type=int, default=3, help="Keys looked up per commit")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Random bits: about half of the numbers were deleted or moved to other projects
+    bitmap = bytearray(rng.getrandbits(8) | 0x01 for _ in range(args.issues // 8 + 1))
+    bitmaps = {f"P{i:04d}": bytearray(bitmap) for i in range(args.projects)}
+    keys = [
+        f"P{rng.randrange(args.projects):04d}-{rng.randrange(1, args.issues)}"
+        for _ in range(args.keys)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "jira.snapshot"
+        write_time = min(
+            timeit.repeat(lambda: write_snapshot(path, bitmaps, 0), number=1, repeat=3)
+        )
+
+        def mapped():
+            snapshot = Snapshot(path)
+            found = [snapshot.lookup(key) for key in keys]
+            snapshot.close()
+            return found
+
+        def parsed():
+            snapshot = Snapshot(path)
+            found = snapshot.bitmaps()
+            snapshot.close()
+            return found
+
+        timings = {
+            "map and look up": min(timeit.repeat(mapped, number=100, repeat=3)) / 100,
+            "read everything": min(timeit.repeat(parsed, number=5, repeat=3)) / 5,
+        }
+        size = path.stat().st_size
+
+    print(
+        f"{args.projects} projects x {args.issues} issues: {size / 1e6:.1f} MB, "
+        f"written in {write_time * 1e3:.0f} ms"
+    )
+    for label, seconds in timings.items():
+        print(f"{label:<16} {seconds * 1e3:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
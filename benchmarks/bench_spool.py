@@ -0,0 +1,99 @@
+"""Benchmark spooling Jira comments against posting them during the commit.
+
+Times what a post-commit hook adds to ``git commit`` when it posts a comment to
+Jira directly and when it only appends the comment to the spool, against a
+local stand-in for Jira that answers after a configurable delay. Then times a
+flush delivering N spooled comments over a pooled connection.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_spool.py [--latency MS] [--comments N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pre_commit_jira_helper.spool import Spool, _deliver, flush_spool, record_id
+from pre_commit_jira_helper.validation import JiraClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Without this, kept-alive responses wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.server.latency)
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+def make_record(site: str, number: int) -> dict:
+    commit = f"{number:040x}"
+    return {
+        "id": record_id(site, "ABC-1", commit),
+        "site": site,
+        "issue": "ABC-1",
+        "commit": commit,
+        "repository": "shop",
+        "subject": "ABC-1: Round totals",
+        "created": 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=150, help="Jira response time in ms")
+    parser.add_argument("--comments", type=int, default=50, help="Comments flushed")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.latency = args.latency / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    site = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        spool = Spool(directory)
+        timings = {"post during commit": [], "append to spool": []}
+        for number in range(20):
+            start = time.perf_counter()
+            # A fresh process per commit: no pooled connection to reuse
+            JiraClient.close_all()
+            _deliver(JiraClient(site), make_record(site, number), 10)
+            timings["post during commit"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            spool.append([make_record(site, number)])
+            timings["append to spool"].append(time.perf_counter() - start)
+        flush_spool(spool)
+
+        spool.append(make_record(site, number) for number in range(args.comments))
+        start = time.perf_counter()
+        flush_spool(spool)
+        flushed = time.perf_counter() - start
+
+    print(f"Jira answering in {args.latency:g} ms; median time added to a commit:")
+    for label, samples in timings.items():
+        print(f"  {label:<20} {statistics.median(samples) * 1e3:8.2f} ms")
+    print(
+        f"Flushing {args.comments} comments: {flushed:.2f} s "
+        f"({flushed / args.comments * 1e3:.1f} ms per comment)"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
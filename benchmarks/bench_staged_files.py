@@ -0,0 +1,83 @@
+"""Benchmark listing the staged files of a very large vendoring commit.
+
+Stages N files with ``git update-index`` and compares ``get_staged_files()``,
+which builds the whole list, with streaming ``iter_staged_files()`` and its
+status mode. Times are measured without tracing; the Python heap peak comes
+from a second, traced run.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_staged_files.py [--files N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pre_commit_jira_helper.git import GitOperations
+
+
+def stage_files(repo: str, files: int) -> None:
+    """Stage ``files`` paths, all pointing at one blob."""
+    subprocess.run(["git", "init", "-q", repo], check=True)
+    blob = (
+        subprocess.run(
+            ["git", "hash-object", "-w", "--stdin"],
+            cwd=repo,
+            input=b"vendored\n",
+            capture_output=True,
+            check=True,
+        )
+        .stdout.decode()
+        .strip()
+    )
+    entries = "".join(
+        f"100644 {blob}\tvendor/package{i // 1000}/src/module_{i}.py\n" for i in range(files)
+    )
+    subprocess.run(
+        ["git", "update-index", "--index-info"], cwd=repo, input=entries.encode(), check=True
+    )
+
+
+def measure(label: str, count) -> None:
+    """Print the time and heap peak of one way of counting the staged files."""
+    start = time.perf_counter()
+    files = count()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    count()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<26} {files:>9} files {elapsed * 1e3:9.1f} ms {peak / 2**20:9.1f} MB peak")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=500_000, help="Files to stage")
+    args = parser.parse_args()
+
+    saved_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as repo:
+        stage_files(repo, args.files)
+        os.chdir(repo)
+        try:
+            measure("get_staged_files", lambda: len(GitOperations.get_staged_files()))
+            measure(
+                "iter_staged_files",
+                lambda: sum(1 for _ in GitOperations.iter_staged_files()),
+            )
+            measure(
+                "iter_staged_files(status)",
+                lambda: sum(1 for _ in GitOperations.iter_staged_files(status=True)),
+            )
+        finally:
+            os.chdir(saved_cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark memory use of run_command against stream_command.
+
+Runs a command printing a ``git diff --cached --name-only`` sized listing of
+paths and counts them, once through ``run_command()`` (which keeps the whole
+output, then a stripped copy, then the split list) and once through
+``stream_command()``. Times are measured without tracing; the Python heap peak
+comes from a second, traced run.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_stream_command.py [--paths N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from pre_commit_jira_helper.utils import run_command, stream_command
+
+SCRIPT = """
+import sys
+write = sys.stdout.write
+for i in range({paths}):
+    write(f"vendor/package{{i // 1000}}/module{{i % 1000}}/src/generated_file_{{i}}.py\\n")
+"""
+
+
+def measure(label: str, count) -> None:
+    """Print the time and heap peak of one way of counting the paths."""
+    start = time.perf_counter()
+    paths = count()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    count()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<16} {paths:>9} paths {elapsed * 1e3:9.1f} ms {peak / 2**20:9.1f} MB peak")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=300_000, help="Paths listed")
+    args = parser.parse_args()
+    command = [sys.executable, "-c", SCRIPT.format(paths=args.paths)]
+
+    def buffered() -> int:
+        _, stdout, _ = run_command(command)
+        return len(stdout.split("\n"))
+
+    def streamed() -> int:
+        return sum(1 for _ in stream_command(command))
+
+    measure("run_command", buffered)
+    measure("stream_command", streamed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark finding the keys of several issue trackers in one scan.
+
+Times TrackerMatcher, which compiles the tracker patterns into one
+alternation, against one IssueMatcher per tracker, each rescanning the text,
+as running a hook copy per tracker does, for 1 to 8 trackers over a commit
+message of N lines.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_trackers.py [--lines N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from pre_commit_jira_helper.matcher import IssueMatcher, Tracker, TrackerMatcher
+
+TRACKERS = [
+    Tracker("jira"),
+    Tracker("github", r"#\d+"),
+    Tracker("change", r"\bCHG\d{7}\b"),
+    Tracker("incident", r"\bINC\d{7}\b"),
+    Tracker("problem", r"\bPRB\d{7}\b"),
+    Tracker("request", r"\bRITM\d{7}\b"),
+    Tracker("gitlab", r"!\d+"),
+    Tracker("support", r"\bSR\d{6}\b"),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="Lines in the commit message")
+    args = parser.parse_args()
+
+    line = "Keep the rounding mode of the ledger when totals are recomputed in bulk.\n"
+    refs = "Refs ABC-12, #34, CHG0012345, INC0054321\n"
+    message = "".join(refs if number % 50 == 0 else line for number in range(args.lines))
+
+    print(f"{len(message) / 1e3:.0f} kB message; time per message:")
+    print(f"{'trackers':>8} {'one scan':>12} {'scan each':>12}")
+    for count in (1, 2, 4, 8):
+        trackers = TRACKERS[:count]
+        combined = TrackerMatcher(trackers)
+        separate = [IssueMatcher(tracker.pattern) for tracker in trackers]
+
+        def one_scan(combined=combined):
+            return combined.findall(message)
+
+        def scan_each(separate=separate):
+            return [issue for matcher in separate for issue in matcher.findall(message)]
+
+        timings = [min(timeit.repeat(run, number=5, repeat=3)) / 5 for run in (one_scan, scan_each)]
+        print(f"{count:>8} {timings[0] * 1e3:9.2f} ms {timings[1] * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
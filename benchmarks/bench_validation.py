@@ -0,0 +1,91 @@
+"""Benchmark checking issue keys against a local stand-in for Jira.
+
+Times ``IssueValidator.find_missing()`` for a commit with three issue keys:
+answered from the SQLite cache, asked over a new connection, and asked over a
+kept-alive one. The stand-in answers instantly, so the network times are a
+lower bound; against a real Jira the handshakes saved by keep-alive are larger.
+
+Usage (from the repository root, with the package installed):
+    python benchmarks/bench_validation.py [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import tempfile
+import threading
+import timeit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from pre_commit_jira_helper.validation import IssueCache, IssueValidator, JiraClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Report every searched key as existing."""
+
+    protocol_version = "HTTP/1.1"
+    # Send the headers and the body without waiting for an ACK in between
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        keys = body["jql"][len("key in (") : -1].split(", ")
+        payload = json.dumps({"issues": [{"key": key} for key in keys]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="Validations per measurement")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    numbers = itertools.count()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = IssueCache(Path(directory) / "issues.sqlite3")
+        validator = IssueValidator(url, budget=5, cache=cache)
+
+        def fresh_keys():
+            return [f"ABC-{next(numbers)}" for _ in range(3)]
+
+        def new_connection():
+            JiraClient.close_all()
+            validator.find_missing(fresh_keys())
+
+        def kept_alive():
+            validator.find_missing(fresh_keys())
+
+        cached_keys = fresh_keys()
+        validator.find_missing(cached_keys)
+
+        def cached():
+            validator.find_missing(cached_keys)
+
+        for label, scenario in [
+            ("cached", cached),
+            ("new connection", new_connection),
+            ("kept-alive connection", kept_alive),
+        ]:
+            seconds = min(timeit.repeat(scenario, number=args.runs, repeat=3)) / args.runs
+            print(f"{label:<22} {seconds * 1e3:8.2f} ms")
+        cache.close()
+
+    JiraClient.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
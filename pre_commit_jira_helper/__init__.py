@@ -1,12 +1,24 @@
 """Pre-commit hook to prepend a Jira issue to a commit message."""
 
-import importlib.metadata
-
 from pre_commit_jira_helper.logger import get_logger, logger, setup_logging
 
-try:
-    __version__ = importlib.metadata.version("pre-commit-jira-helper")
-except importlib.metadata.PackageNotFoundError:
-    __version__ = "0.0.0+unknown"
-
 __all__ = ["__version__", "logger", "get_logger", "setup_logging"]
+
+
+def __getattr__(name: str):
+    """Resolve ``__version__`` on first use.
+
+    Reading package metadata pulls in ``importlib.metadata`` and its dependencies,
+    which would otherwise dominate the startup time of every hook run.
+    """
+    if name == "__version__":
+        import importlib.metadata
+
+        try:
+            version = importlib.metadata.version("pre-commit-jira-helper")
+        except importlib.metadata.PackageNotFoundError:
+            version = "0.0.0+unknown"
+        globals()["__version__"] = version
+        return version
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
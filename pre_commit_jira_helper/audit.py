@@ -0,0 +1,177 @@
+"""Audit Jira issue coverage across many repositories in parallel."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from pre_commit_jira_helper.git import GitOperations
+from pre_commit_jira_helper.history import HistoryError, iter_commit_messages
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.matcher import IssueMatcher
+from pre_commit_jira_helper.utils import CommandError, run_command, stream_command
+
+logger = get_logger("audit")
+
+# Matcher and options of the current worker process, set by _init_worker()
+_worker_matcher: IssueMatcher | None = None
+_worker_revisions: list[str] = []
+_worker_skip_merges = False
+_worker_native = False
+
+
+@dataclass
+class RepoAudit:
+    """Issue coverage of one repository."""
+
+    repository: str
+    size: int = 0
+    commits: int = 0
+    missing: int = 0
+    error: str | None = None
+
+
+def repository_size(git_dir: Path) -> int:
+    """Estimate the size of a repository from its pack files.
+
+    Args:
+        git_dir: Git directory of the repository.
+
+    Returns:
+        Total size of the pack files in bytes (0 if there are none).
+    """
+    # Linked worktrees keep their objects in the main repository
+    common_dir = GitOperations.get_common_dir(git_dir)
+    try:
+        with os.scandir(common_dir / "objects" / "pack") as entries:
+            return sum(e.stat().st_size for e in entries if e.name.endswith(".pack"))
+    except OSError:
+        return 0
+
+
+def discover_repositories(root: str | Path) -> Iterator[tuple[Path, int]]:
+    """Find the git repositories under a directory.
+
+    Repositories are not searched for nested repositories, and symbolic links
+    to directories are not followed.
+
+    Args:
+        root: Directory to search.
+
+    Yields:
+        Tuples of (repository path, estimated size in bytes).
+    """
+    pending = [Path(root)]
+    while pending:
+        path = pending.pop()
+        git_dir = GitOperations.get_git_dir(path, discover=False)
+        if git_dir is not None:
+            yield path, repository_size(git_dir)
+            continue
+        try:
+            with os.scandir(path) as entries:
+                pending.extend(Path(e.path) for e in entries if e.is_dir(follow_symlinks=False))
+        except OSError as e:
+            logger.debug(f"Skipping {path}: {e}")
+
+
+def _init_worker(
+    pattern: str | None,
+    prefixes: list[str] | None,
+    all_refs: bool,
+    skip_merges: bool,
+    native: bool,
+) -> None:
+    """Build the matcher once per worker process."""
+    global _worker_matcher, _worker_revisions, _worker_skip_merges, _worker_native
+    # Ctrl-C is handled by the parent, which stops the whole pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_matcher = IssueMatcher(pattern, prefixes)
+    _worker_revisions = ["--all"] if all_refs else ["HEAD"]
+    _worker_skip_merges = skip_merges
+    _worker_native = native
+
+
+def _audit_repository(repository: tuple[Path, int]) -> RepoAudit:
+    """Count the commits of one repository that lack an issue (runs in a worker)."""
+    path, size = repository
+    result = RepoAudit(str(path), size)
+    try:
+        for _, message in iter_commit_messages(
+            _worker_revisions, skip_merges=_worker_skip_merges, cwd=path, native=_worker_native
+        ):
+            result.commits += 1
+            if _worker_matcher.search(message) is None:
+                result.missing += 1
+    except HistoryError as e:
+        if _worker_revisions == ["HEAD"] and _is_unborn(path):
+            logger.debug(f"No commits yet in {path}")
+        else:
+            result.error = str(e)
+    return result
+
+
+def _is_unborn(path: Path) -> bool:
+    """Check whether HEAD of a repository is a branch without commits yet."""
+    success, ref, _ = run_command(["git", "-C", str(path), "symbolic-ref", "-q", "HEAD"])
+    if not success:
+        return False
+    try:
+        list(stream_command(["git", "-C", str(path), "show-ref", "--verify", "--quiet", ref]))
+    except CommandError as e:
+        # 1 means the ref does not exist; broken refs fail with other codes
+        return e.returncode == 1
+    return False
+
+
+def audit_repositories(
+    repositories: Iterable[tuple[Path, int]],
+    pattern: str | None = None,
+    prefixes: list[str] | None = None,
+    all_refs: bool = False,
+    skip_merges: bool = False,
+    native: bool = False,
+    jobs: int | None = None,
+) -> Iterator[RepoAudit]:
+    """Scan the history of many repositories in a pool of worker processes.
+
+    The largest repositories are scheduled first, so a big one started last
+    does not keep the pool waiting. Results are yielded as soon as each
+    repository is done; closing the generator early stops the workers.
+
+    Args:
+        repositories: Tuples of (path, estimated size), as found by
+            discover_repositories().
+        pattern: Issue pattern (default: DEFAULT_ISSUE_PATTERN).
+        prefixes: Allowed project prefixes, or None to accept any.
+        all_refs: Scan the commits of every ref instead of HEAD only.
+        skip_merges: Do not count merge commits.
+        native: Read object databases in-process where possible, instead of
+            running git log (see iter_commit_messages()).
+        jobs: Worker processes (default: the number of CPUs).
+
+    Yields:
+        One RepoAudit per repository, in completion order.
+    """
+    ordered = sorted(repositories, key=lambda repository: repository[1], reverse=True)
+    if not ordered:
+        return
+
+    processes = max(1, min(jobs or os.cpu_count() or 1, len(ordered)))
+    logger.debug(f"Auditing {len(ordered)} repositories with {processes} worker(s)")
+
+    pool = multiprocessing.Pool(
+        processes,
+        initializer=_init_worker,
+        initargs=(pattern, prefixes, all_refs, skip_merges, native),
+    )
+    try:
+        yield from pool.imap_unordered(_audit_repository, ordered)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,274 @@
+"""Static detection of regex shapes prone to catastrophic backtracking.
+
+Python's regex engine backtracks, so a pattern in which a repeated part can
+match the same text in several ways takes exponential (or high polynomial)
+time on text that almost matches, e.g. ``([A-Z]+)+-\\d+`` on a long run of
+capitals. find_backtracking_risk() parses a pattern and looks, inside every
+repetition, for:
+
+* a repeated item that can consume what follows it, including the start of
+  the next repetition, as in ``(a+)+``, ``(\\w+\\s?)*`` or ``(.*a){20}``;
+* a repeated group that can match the empty string, as in ``(a*)*``;
+* alternatives that can match the same text, as in ``(a|aa)*`` or ``(a|a)+``.
+
+Characters are modelled by a small sample alphabet (ASCII and a few others),
+so the check is fast and cannot miss these shapes for ASCII text, but may
+occasionally flag a harmless pattern.
+"""
+
+from __future__ import annotations
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants
+    import sre_parse
+
+# Sample characters standing for the whole of Unicode
+_ALPHABET = [chr(code) for code in range(128)] + [
+    "\u00e9",
+    "\u00a0",
+    "\u03a9",
+    "\u4e2d",
+    "\u2028",
+    "\U0001f600",
+]
+_ALL = (1 << len(_ALPHABET)) - 1
+
+_CATEGORIES = {
+    "DIGIT": str.isdecimal,
+    "SPACE": str.isspace,
+    "WORD": lambda char: char.isalnum() or char == "_",
+    "LINEBREAK": lambda char: char in "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029",
+}
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_ZERO_WIDTH = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+# Neither can be re-entered by backtracking (Python 3.11+)
+_NO_BACKTRACK = tuple(
+    getattr(sre_constants, name)
+    for name in ("POSSESSIVE_REPEAT", "ATOMIC_GROUP")
+    if hasattr(sre_constants, name)
+)
+
+
+def _mask(predicate) -> int:
+    """Get the sample characters matching a predicate, as a bit mask."""
+    return sum(1 << i for i, char in enumerate(_ALPHABET) if predicate(char))
+
+
+def _category(name: str) -> int:
+    """Get the mask of a class such as ``CATEGORY_NOT_DIGIT`` or ``CATEGORY_UNI_WORD``."""
+    base = name.replace("CATEGORY_", "").replace("UNI_", "").replace("LOC_", "")
+    negate = base.startswith("NOT_")
+    mask = _mask(_CATEGORIES[base.replace("NOT_", "")])
+    return _ALL ^ mask if negate else mask
+
+
+class _Analyzer:
+    """Walk a parsed pattern, computing character masks of its parts."""
+
+    def __init__(self, ignore_case: bool):
+        self.ignore_case = ignore_case
+
+    def char(self, code: int) -> int:
+        char = chr(code)
+        if self.ignore_case:
+            return _mask(lambda c: c.lower() == char.lower())
+        return _mask(lambda c: c == char)
+
+    def chars(self, op, av) -> int | None:
+        """Get the mask of a single-character item, or None for other items."""
+        if op is sre_constants.LITERAL:
+            return self.char(av)
+        if op is sre_constants.NOT_LITERAL:
+            return _ALL ^ self.char(av)
+        if op is sre_constants.ANY:
+            return _ALL
+        if op is sre_constants.IN:
+            mask, negate = 0, False
+            for item_op, item_av in av:
+                if item_op is sre_constants.NEGATE:
+                    negate = True
+                elif item_op is sre_constants.LITERAL:
+                    mask |= self.char(item_av)
+                elif item_op is sre_constants.RANGE:
+                    low, high = item_av
+                    mask |= _mask(lambda c, low=low, high=high: low <= ord(c) <= high)
+                    if self.ignore_case:
+                        mask |= _mask(
+                            lambda c, low=low, high=high: low <= ord(c.swapcase()) <= high
+                        )
+                elif item_op is sre_constants.CATEGORY:
+                    mask |= _category(str(item_av))
+                else:
+                    mask = _ALL
+            return _ALL ^ mask if negate else mask
+        return None
+
+    def nullable(self, items) -> bool:
+        """Check whether a sequence can match the empty string."""
+        return all(self.item_nullable(op, av) for op, av in items)
+
+    def item_nullable(self, op, av) -> bool:
+        if self.chars(op, av) is not None:
+            return False
+        if op in _ZERO_WIDTH:
+            return True
+        if op is sre_constants.SUBPATTERN:
+            return self.nullable(av[-1])
+        if op is sre_constants.BRANCH:
+            return any(self.nullable(branch) for branch in av[1])
+        if op in _REPEATS or op in _NO_BACKTRACK[:1]:
+            return av[0] == 0 or self.nullable(av[2])
+        if _NO_BACKTRACK and op is _NO_BACKTRACK[-1]:
+            return self.nullable(av)
+        if op is sre_constants.GROUPREF_EXISTS:
+            return self.nullable(av[1]) or av[2] is None or self.nullable(av[2])
+        # Back references may match nothing
+        return True
+
+    def first(self, items) -> int:
+        """Get the characters a match of a sequence can start with."""
+        mask = 0
+        for op, av in items:
+            mask |= self.item_first(op, av)
+            if not self.item_nullable(op, av):
+                break
+        return mask
+
+    def item_first(self, op, av) -> int:
+        chars = self.chars(op, av)
+        if chars is not None:
+            return chars
+        if op in _ZERO_WIDTH:
+            return 0
+        if op is sre_constants.SUBPATTERN:
+            return self.first(av[-1])
+        if op is sre_constants.BRANCH:
+            mask = 0
+            for branch in av[1]:
+                mask |= self.first(branch)
+            return mask
+        if op in _REPEATS or op in _NO_BACKTRACK[:1]:
+            return self.first(av[2])
+        if _NO_BACKTRACK and op is _NO_BACKTRACK[-1]:
+            return self.first(av)
+        if op is sre_constants.GROUPREF_EXISTS:
+            return self.first(av[1]) | (self.first(av[2]) if av[2] is not None else 0)
+        return _ALL
+
+    def fixed(self, items) -> list[int] | None:
+        """Get the per-position masks of a sequence of single characters, if it is one."""
+        masks = []
+        for op, av in items:
+            if op is sre_constants.SUBPATTERN:
+                inner = self.fixed(av[-1])
+                if inner is None:
+                    return None
+                masks.extend(inner)
+                continue
+            chars = self.chars(op, av)
+            if chars is None:
+                return None
+            masks.append(chars)
+        return masks
+
+    def ambiguous_branches(self, branches, follow: int) -> bool:
+        """Check whether two alternatives can match the same text.
+
+        Args:
+            branches: Parsed alternatives.
+            follow: Characters that may follow the alternation.
+
+        Returns:
+            Whether the alternatives may overlap.
+        """
+        starts = [
+            self.first(branch) | (follow if self.nullable(branch) else 0) for branch in branches
+        ]
+        for i, left in enumerate(branches):
+            for j in range(i + 1, len(branches)):
+                right = branches[j]
+                if not starts[i] & starts[j]:
+                    continue
+                short, long = sorted(
+                    (self.fixed(left), self.fixed(right)), key=lambda m: len(m or ())
+                )
+                if short is None or long is None or not short:
+                    # Not plain character sequences: assume the overlap is ambiguous
+                    return True
+                # Equal texts, or the longer one spelled by repeating the shorter one
+                if len(long) % len(short) == 0 and all(
+                    long[j] & short[j % len(short)] for j in range(len(long))
+                ):
+                    return True
+        return False
+
+    def risk(self, items, loop_follow: int | None = None) -> str | None:
+        """Find a risky shape in a sequence.
+
+        Args:
+            items: Parsed sequence.
+            loop_follow: Inside a repetition, the characters that may follow the
+                sequence; None outside of any repetition.
+
+        Returns:
+            A description of the first risky shape, or None.
+        """
+        items = list(items)
+        for index, (op, av) in enumerate(items):
+            follow = None
+            if loop_follow is not None:
+                rest = items[index + 1 :]
+                follow = self.first(rest) | (loop_follow if self.nullable(rest) else 0)
+
+            if op in _REPEATS and av[1] > 1:
+                body = av[2]
+                body_first = self.first(body)
+                if self.nullable(body) and any(o in _REPEATS for o, _ in body):
+                    return "a repeated group that can match the empty string"
+                if follow is not None and body_first & follow:
+                    return "a repeated item that can also match what follows it"
+                found = self.risk(body, body_first | (follow or 0))
+            elif op in _REPEATS:
+                found = self.risk(av[2], follow)
+            elif op is sre_constants.SUBPATTERN:
+                found = self.risk(av[-1], follow)
+            elif op is sre_constants.BRANCH:
+                if follow is not None and self.ambiguous_branches(av[1], follow):
+                    return "alternatives that can match the same text inside a repetition"
+                found = next(
+                    (r for branch in av[1] if (r := self.risk(branch, follow)) is not None), None
+                )
+            elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                found = self.risk(av[1])
+            elif op is sre_constants.GROUPREF_EXISTS:
+                found = self.risk(av[1], follow) or (
+                    self.risk(av[2], follow) if av[2] is not None else None
+                )
+            else:
+                # Single characters, anchors, back references and parts that
+                # never backtrack
+                found = None
+            if found:
+                return found
+        return None
+
+
+def find_backtracking_risk(pattern: str) -> str | None:
+    """Check a pattern for shapes prone to catastrophic backtracking.
+
+    Args:
+        pattern: Regular expression.
+
+    Returns:
+        A description of the risky shape, or None if none was found.
+
+    Raises:
+        re.error: If the pattern is invalid.
+    """
+    parsed = sre_parse.parse(pattern)
+    analyzer = _Analyzer(bool(parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE))
+    return analyzer.risk(parsed)
@@ -3,23 +3,104 @@
 from __future__ import annotations
 
 import abc
+import os
+from collections.abc import Callable, Collection, Sequence
 from pathlib import Path
 
+from pre_commit_jira_helper import trace
+from pre_commit_jira_helper.git import GitOperations, RepoState
 from pre_commit_jira_helper.logger import get_logger
 
 logger = get_logger("base")
 
+# Cut line that ``git commit -v`` writes above the diff, after the comment string.
+# Git discards it and everything below before the message is used.
+SCISSORS_LINE = b" ------------------------ >8 ------------------------\n"
+
+# Comment characters git picks from when core.commentChar is "auto"
+_AUTO_COMMENT_CHARS = b"#;@!$%^&|:"
+
+# Cleanup modes in which git keeps comment lines in the message
+_KEEP_COMMENTS_CLEANUP = ("verbatim", "whitespace", "scissors")
+
+# Files at least this large are scanned through mmap instead of being read
+_MMAP_THRESHOLD = 1 << 20
+
+_CHUNK_SIZE = 1 << 20
+
+
+def find_scissors(data, comment: bytes | None, start: int = 0) -> tuple[int, bytes | None]:
+    """Locate git's scissors line in a commit message file.
+
+    Args:
+        data: Contents of the file (bytes, bytearray or mmap).
+        comment: The comment string, or None to accept any of the characters git
+                 chooses from with ``core.commentChar=auto``.
+        start: Offset to start searching from.
+
+    Returns:
+        Tuple of (offset of the scissors line or -1, comment string it uses).
+    """
+    pos = data.find(SCISSORS_LINE, start + len(comment or b"#"))
+    while pos != -1:
+        if comment is None:
+            line_start = pos - 1
+            found = data[line_start:pos]
+            valid = found[0] in _AUTO_COMMENT_CHARS
+        else:
+            line_start = pos - len(comment)
+            found = comment
+            valid = data[line_start:pos] == comment
+        if valid and (line_start == 0 or data[line_start - 1] == 0x0A):
+            return line_start, found
+        pos = data.find(SCISSORS_LINE, pos + 1)
+    return -1, comment
+
+
+def _read_head(path: Path, comment: bytes | None) -> tuple[bytes, int, bytes | None]:
+    """Read a commit message file up to its scissors line.
+
+    Large files are mapped rather than read, so only the part above the scissors
+    line is copied into memory.
+
+    Returns:
+        Tuple of (bytes above the scissors line, its offset or -1, comment string).
+    """
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            import mmap
+
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    offset, comment = find_scissors(mapped, comment)
+                    return (mapped[:offset] if offset >= 0 else mapped[:]), offset, comment
+            except (OSError, ValueError):
+                logger.debug("Cannot map commit message file, reading it in chunks")
+
+        head = bytearray()
+        overlap = len(SCISSORS_LINE) + len(comment or b"#") + 1
+        while chunk := f.read(_CHUNK_SIZE):
+            start = max(0, len(head) - overlap)
+            head += chunk
+            offset, found = find_scissors(head, comment, start)
+            if offset >= 0:
+                return bytes(head[:offset]), offset, found
+        return bytes(head), -1, comment
+
 
 class BaseHook(abc.ABC):
     """Abstract base class for pre-commit hooks."""
 
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, skip_during: Collection[str] | None = None):
         """Initialize the hook.
 
         Args:
             debug: Enable debug logging.
+            skip_during: Operations (see REPO_OPERATIONS) during which the hook
+                         does nothing, e.g. ``["rebase", "merge"]``.
         """
         self.debug = debug
+        self.skip_during = frozenset(skip_during or ())
         if debug:
             self._setup_logging()
 
@@ -29,6 +110,31 @@ class BaseHook(abc.ABC):
 
         enable_debug_logging()
 
+    def get_repo_state(self) -> RepoState:
+        """Get the operation in progress in the current repository.
+
+        Hooks can use this to behave differently during a rebase, merge,
+        cherry-pick or revert; it only checks a few files in the git dir.
+
+        Returns:
+            The repository state.
+        """
+        return GitOperations.get_repo_state()
+
+    def is_skipped(self) -> bool:
+        """Check whether the operation in progress is one the hook skips.
+
+        Returns:
+            True if the hook was configured to skip the current operation.
+        """
+        if not self.skip_during:
+            return False
+        operation = self.get_repo_state().operation
+        if operation in self.skip_during:
+            logger.debug(f"{self.__class__.__name__} skipping: {operation} in progress")
+            return True
+        return False
+
     @abc.abstractmethod
     def should_run(self, **kwargs) -> bool:
         """Check if the hook should run.
@@ -53,12 +159,19 @@ class BaseHook(abc.ABC):
         Returns:
             Exit code (0 for success, non-zero for failure).
         """
+        trace.record_startup()
         try:
-            if not self.should_run(**kwargs):
+            if self.is_skipped():
+                return 0
+
+            with trace.span("should_run"):
+                should_run = self.should_run(**kwargs)
+            if not should_run:
                 logger.debug(f"{self.__class__.__name__} skipping: conditions not met")
                 return 0
 
-            success = self.process(**kwargs)
+            with trace.span("process"):
+                success = self.process(**kwargs)
             return 0 if success else 1
 
         except Exception as e:
@@ -67,45 +180,166 @@ class BaseHook(abc.ABC):
                 logger.exception("Full traceback:")
             return 1
 
+        finally:
+            trace.flush(self.__class__.__name__)
+
 
 class CommitMessageHook(BaseHook):
     """Base class for commit message hooks."""
 
+    # Message read and written instead of the file while transform_message runs
+    _message_buffer: str | None = None
+
+    # (path, stat, offset) of the scissors line found by the last read
+    _message_tail: tuple[Path, os.stat_result, int] | None = None
+
+    def transform_message(self, message: str, commit_msg_filepath: Path | str) -> tuple[str, bool]:
+        """Apply the hook to a message in memory.
+
+        Runs should_run() and process() as usual, but read_commit_message() and
+        write_commit_message() operate on ``message`` instead of the file, so
+        hooks can be chained without touching the file in between.
+
+        Args:
+            message: The commit message to transform.
+            commit_msg_filepath: Path to the commit message file (not read or written).
+
+        Returns:
+            Tuple of (transformed message, or ``message`` itself if the hook
+            skipped; result of process(), True if the hook skipped).
+        """
+        self._message_buffer = message
+        try:
+            success = True
+            if not self.is_skipped() and self.should_run(commit_msg_filepath=commit_msg_filepath):
+                success = self.process(commit_msg_filepath=commit_msg_filepath)
+            return self._message_buffer, success
+        finally:
+            self._message_buffer = None
+
+    def get_comment_settings(self) -> tuple[str | None, bool]:
+        """Get how git treats comment lines in the commit message.
+
+        Returns:
+            Tuple of (comment string or None for ``core.commentChar=auto``, whether
+            comment lines are kept by ``commit.cleanup``).
+        """
+        config = GitOperations.get_config(["core.commentChar", "commit.cleanup"])
+        comment = config.get("core.commentchar") or "#"
+        cleanup = config.get("commit.cleanup", "default").lower()
+        return (None if comment == "auto" else comment), cleanup in _KEEP_COMMENTS_CLEANUP
+
     def read_commit_message(self, filepath: Path | str) -> str:
         """Read commit message from file.
 
+        Reading stops at the scissors line written by ``git commit -v``, so the
+        diff below it is never loaded; write_commit_message() carries it over.
+
         Args:
             filepath: Path to the commit message file.
 
         Returns:
-            The commit message without comment lines.
+            The commit message without comment lines (unless commit.cleanup keeps
+            them) and without the scissors line and what follows it.
         """
+        if self._message_buffer is not None:
+            return self._message_buffer
+
         path = Path(filepath)
         if not path.exists():
             logger.error(f"Commit message file not found: {path}")
             return ""
 
-        lines = []
-        with path.open(encoding="utf-8") as f:
-            for line in f:
-                if not line.startswith("#"):
-                    lines.append(line)
+        comment, keep_comments = self.get_comment_settings()
+        with trace.span("read"):
+            stat = path.stat()
+            head, offset, comment_bytes = _read_head(path, comment and comment.encode("utf-8"))
+        self._message_tail = (path, stat, offset) if offset >= 0 else None
+
+        message = head.decode("utf-8")
+        if "\r" in message:
+            message = message.replace("\r\n", "\n").replace("\r", "\n")
+        if not keep_comments:
+            prefix = comment_bytes.decode("utf-8") if comment_bytes else "#"
+            message = "".join(
+                line for line in message.splitlines(keepends=True) if not line.startswith(prefix)
+            )
 
-        message = "".join(lines)
         logger.debug(f"Read commit message ({len(message)} chars)")
         return message
 
     def write_commit_message(self, filepath: Path | str, message: str) -> None:
         """Write commit message to file.
 
+        If the file was read with a scissors line, the line and everything after
+        it are copied over byte for byte.
+
         Args:
             filepath: Path to the commit message file.
             message: The commit message to write.
         """
+        if self._message_buffer is not None:
+            self._message_buffer = message
+            return
+
         path = Path(filepath)
-        path.write_text(message, encoding="utf-8")
+        tail, self._message_tail = self._message_tail, None
+        with trace.span("write"):
+            if tail is not None and tail[0] == path and self._is_unchanged(path, tail[1]):
+                self._write_with_tail(path, message, tail[2])
+            else:
+                path.write_text(message, encoding="utf-8")
         logger.debug(f"Wrote commit message to {path}")
 
+    @staticmethod
+    def _is_unchanged(path: Path, stat: os.stat_result) -> bool:
+        """Check that a file was not replaced or modified since it was read."""
+        try:
+            current = path.stat()
+        except OSError:
+            return False
+        return (current.st_ino, current.st_size, current.st_mtime_ns) == (
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+
+    @staticmethod
+    def _write_with_tail(path: Path, message: str, offset: int) -> None:
+        """Replace the part of a file above offset with a new message.
+
+        The new file is assembled next to the old one and renamed over it; the
+        tail is copied in the kernel where possible.
+        """
+        data = message.encode("utf-8")
+        if data and not data.endswith(b"\n"):
+            # Git only recognizes the scissors line at the start of a line
+            data += b"\n"
+
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with path.open("rb") as src, temp.open("wb") as dst:
+                dst.write(data)
+                dst.flush()
+                remaining = os.fstat(src.fileno()).st_size - offset
+                position = offset
+                if hasattr(os, "sendfile"):
+                    while remaining > 0:
+                        sent = os.sendfile(dst.fileno(), src.fileno(), position, remaining)
+                        if sent == 0:
+                            break
+                        position += sent
+                        remaining -= sent
+                src.seek(position)
+                while remaining > 0 and (chunk := src.read(min(remaining, _CHUNK_SIZE))):
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+            temp.chmod(path.stat().st_mode & 0o7777)
+            temp.replace(path)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+
     def is_merge_commit(self, message: str) -> bool:
         """Check if the message is for a merge commit.
 
@@ -116,3 +350,76 @@ class CommitMessageHook(BaseHook):
             True if this is a merge commit, False otherwise.
         """
         return message.startswith("Merge ")
+
+
+class CommitMessageHookChain(CommitMessageHook):
+    """Run several commit message hooks over a single read and write of the file.
+
+    The message is read once, passed through each hook's transform_message() in
+    order, and written back only if the final text differs. The chain stops at
+    the first hook whose process() fails, without writing the file.
+    """
+
+    def __init__(
+        self,
+        hooks: Sequence[CommitMessageHook | Callable[[], CommitMessageHook]],
+        debug: bool = False,
+        skip_during: Collection[str] | None = None,
+    ):
+        """Initialize the chain.
+
+        Args:
+            hooks: Hooks to run in order. Callables are treated as factories and
+                   only called when the chain first runs.
+            debug: Enable debug logging.
+            skip_during: Operations during which the whole chain does nothing.
+        """
+        super().__init__(debug=debug, skip_during=skip_during)
+        self._hook_specs = list(hooks)
+        self._hooks: list[CommitMessageHook] | None = None
+
+    @property
+    def hooks(self) -> list[CommitMessageHook]:
+        """The chained hooks, created on first access."""
+        if self._hooks is None:
+            self._hooks = [
+                spec if isinstance(spec, CommitMessageHook) else spec() for spec in self._hook_specs
+            ]
+        return self._hooks
+
+    def should_run(self, commit_msg_filepath: Path | str) -> bool:
+        """Check if the chain should run.
+
+        Args:
+            commit_msg_filepath: Path to the commit message file.
+
+        Returns:
+            True if there is a message to pass through the hooks.
+        """
+        self.commit_msg = self.read_commit_message(commit_msg_filepath)
+        if not self.commit_msg:
+            logger.debug("Empty commit message, skipping")
+            return False
+        return bool(self._hook_specs)
+
+    def process(self, commit_msg_filepath: Path | str) -> bool:
+        """Pass the message through every hook and write it if it changed.
+
+        Args:
+            commit_msg_filepath: Path to the commit message file.
+
+        Returns:
+            True if processing was successful, False if a hook failed.
+        """
+        message = self.commit_msg
+        for hook in self.hooks:
+            message, success = hook.transform_message(message, commit_msg_filepath)
+            if not success:
+                logger.error(f"{hook.__class__.__name__} failed, commit message left unchanged")
+                return False
+
+        if message != self.commit_msg:
+            self.write_commit_message(commit_msg_filepath, message)
+        else:
+            logger.debug("Commit message unchanged by hook chain")
+        return True
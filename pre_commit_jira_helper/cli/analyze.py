@@ -0,0 +1,71 @@
+"""CLI module for summarizing hook trace files."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the analyze subcommand.
+
+    Args:
+        subparsers: Subparsers of the jira-helper parser.
+    """
+    parser = subparsers.add_parser(
+        "analyze",
+        help="Summarize per-phase timings recorded with --trace",
+        description=(
+            "Read JSON lines written by hook runs with --trace (or "
+            "$PRE_COMMIT_JIRA_HELPER_TRACE) and print p50/p95/p99 durations per phase."
+        ),
+    )
+    parser.add_argument("files", nargs="+", help="Trace files to read ('-' for stdin)")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    parser.set_defaults(handler=run)
+
+
+def _read_lines(files: list[str]):
+    """Yield lines from every trace file in turn."""
+    for name in files:
+        if name == "-":
+            yield from sys.stdin
+            continue
+        with Path(name).open(encoding="utf-8") as f:
+            yield from f
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the analyze subcommand.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    from pre_commit_jira_helper.trace import summarize
+
+    try:
+        summary = summarize(_read_lines(args.files))
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    if not summary:
+        print("No trace records found")
+        return 1
+
+    print(f"{'phase':<14} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for phase, stats in sorted(summary.items(), key=lambda item: -item[1]["p50"]):
+        print(
+            f"{phase:<14} {stats['count']:>7} {stats['p50']:>9.3f} {stats['p95']:>9.3f} "
+            f"{stats['p99']:>9.3f} {stats['max']:>9.3f}"
+        )
+    return 0
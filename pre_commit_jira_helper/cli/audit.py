@@ -0,0 +1,128 @@
+"""CLI module for auditing Jira issue coverage across many repositories."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+
+from pre_commit_jira_helper.cli.base import add_issue_arguments, parse_prefixes
+
+FIELDS = ("repository", "size", "commits", "missing", "error")
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the audit subcommand.
+
+    Args:
+        subparsers: Subparsers of the jira-helper parser.
+    """
+    parser = subparsers.add_parser(
+        "audit",
+        help="Report Jira issue coverage of every git repository under a directory",
+        description=(
+            "Find the git repositories under a directory and count, for each one, the "
+            "commits whose message mentions no Jira issue. Repositories are scanned in "
+            "parallel, largest first, and each result is written as soon as it is ready."
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Audit every clone under /srv/git into a CSV file:
+    jira-helper audit /srv/git --output coverage.csv
+
+  Scan all refs with 4 workers and stream JSON lines:
+    jira-helper audit --all --jobs 4 --format jsonl /srv/git
+        """,
+    )
+    parser.add_argument("root", help="Directory to search for repositories")
+    parser.add_argument(
+        "--format",
+        choices=("csv", "jsonl"),
+        default="csv",
+        help="Output format (default: csv)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=argparse.FileType("w", encoding="utf-8"),
+        default=sys.stdout,
+        help="File to write the results to (default: stdout)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--all",
+        dest="all_refs",
+        action="store_true",
+        help="Scan the commits of every ref instead of HEAD only",
+    )
+    parser.add_argument("--skip-merges", action="store_true", help="Do not count merge commits")
+    parser.add_argument(
+        "--native",
+        action="store_true",
+        help="Read object databases directly instead of running git log "
+        "(git log is still used for repositories that need it)",
+    )
+    add_issue_arguments(parser, separator=False)
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the audit subcommand.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code (0 for success, 1 if a repository could not be scanned).
+    """
+    from pre_commit_jira_helper.audit import audit_repositories, discover_repositories
+
+    output = args.output
+    writer = csv.DictWriter(output, FIELDS, lineterminator="\n") if args.format == "csv" else None
+    if writer:
+        writer.writeheader()
+
+    repositories = commits = missing = failed = 0
+    results = audit_repositories(
+        discover_repositories(args.root),
+        pattern=args.pattern,
+        prefixes=parse_prefixes(args.prefixes),
+        all_refs=args.all_refs,
+        skip_merges=args.skip_merges,
+        native=args.native,
+        jobs=args.jobs,
+    )
+    try:
+        for result in results:
+            row = {field: getattr(result, field) for field in FIELDS}
+            if writer:
+                writer.writerow(row)
+            else:
+                output.write(json.dumps(row) + "\n")
+            # Results written so far survive an interrupted audit
+            output.flush()
+            repositories += 1
+            commits += result.commits
+            missing += result.missing
+            failed += result.error is not None
+    except KeyboardInterrupt:
+        results.close()
+        print(f"Interrupted after {repositories} repositories", file=sys.stderr)
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(
+        f"{repositories} repositories: {missing} of {commits} commits have no Jira issue"
+        + (f", {failed} could not be scanned" if failed else ""),
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
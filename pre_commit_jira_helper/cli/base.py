@@ -5,6 +5,29 @@ from __future__ import annotations
 import argparse
 
 
+def parse_operations(value: str) -> list[str]:
+    """Parse a comma-separated list of repository operations.
+
+    Args:
+        value: Command line value, e.g. "rebase,merge".
+
+    Returns:
+        The operation names.
+
+    Raises:
+        argparse.ArgumentTypeError: If an operation is not recognized.
+    """
+    from pre_commit_jira_helper.git import REPO_OPERATIONS
+
+    operations = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in operations if item not in REPO_OPERATIONS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown operation(s) {', '.join(unknown)}; choose from {', '.join(REPO_OPERATIONS)}"
+        )
+    return operations
+
+
 def add_common_arguments(parser: argparse.ArgumentParser) -> None:
     """Add common arguments to any hook CLI parser.
 
@@ -21,6 +44,67 @@ def add_common_arguments(parser: argparse.ArgumentParser) -> None:
         action="store_true",
         help="Enable debug logging",
     )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="FILE",
+        help=(
+            "Append per-phase timings as JSON lines to FILE "
+            "(default: $PRE_COMMIT_JIRA_HELPER_TRACE if set)"
+        ),
+    )
+    parser.add_argument(
+        "--skip-during",
+        type=parse_operations,
+        metavar="OPS",
+        help=(
+            "Comma-separated operations during which the hook does nothing: "
+            "rebase, am, merge, cherry-pick, revert"
+        ),
+    )
+
+
+def add_issue_arguments(parser: argparse.ArgumentParser, separator: bool = True) -> None:
+    """Add the issue extraction arguments shared by Jira commands.
+
+    Args:
+        parser: ArgumentParser instance to add arguments to.
+        separator: Also add --separator, for commands that write messages.
+    """
+    parser.add_argument(
+        "--pattern",
+        type=str,
+        help="Custom regex pattern for issue extraction (default: [A-Z][A-Z0-9_]*-\\d+)",
+    )
+    if separator:
+        parser.add_argument(
+            "--separator",
+            type=str,
+            default=": ",
+            help="Separator between issue(s) and message (default: ': ')",
+        )
+    parser.add_argument(
+        "--prefixes",
+        type=str,
+        help=(
+            "Comma-separated list of allowed Jira project prefixes (e.g., 'ABC,DEF,XYZ'). "
+            "If not provided, ALL issues matching the pattern will be extracted."
+        ),
+    )
+
+
+def parse_prefixes(value: str | None) -> list[str] | None:
+    """Parse the value of --prefixes.
+
+    Args:
+        value: Comma-separated project prefixes, or None.
+
+    Returns:
+        Upper-cased prefixes, or None if no value was given.
+    """
+    if not value:
+        return None
+    return [prefix.strip().upper() for prefix in value.split(",")]
 
 
 def create_parser(
@@ -0,0 +1,128 @@
+"""CLI module for running several commit message hooks in one process."""
+
+from __future__ import annotations
+
+import importlib
+import shlex
+from collections.abc import Callable, Sequence
+
+from pre_commit_jira_helper import trace
+from pre_commit_jira_helper.cli.base import create_parser
+
+# Built-in hooks by entry point name, mapped to their CLI module
+BUILTIN_HOOKS = {
+    "prepend-jira-issue": "pre_commit_jira_helper.cli.jira",
+    "example-prefix-hook": "pre_commit_jira_helper.cli.example",
+}
+
+
+def hook_factory(spec: str, commit_msg_filepath: str, debug: bool = False) -> Callable:
+    """Turn a hook specification into a factory that creates the hook on demand.
+
+    A specification is either a built-in hook name followed by that hook's own
+    command line options (``"prepend-jira-issue --prefixes ABC"``), or a
+    ``module:Class`` reference to a CommitMessageHook subclass followed by
+    ``key=value`` keyword arguments (``"my_pkg.hooks:TicketHook strict=yes"``).
+
+    Args:
+        spec: The hook specification.
+        commit_msg_filepath: Path to the commit message file.
+        debug: Enable debug logging in the created hook.
+
+    Returns:
+        A callable returning the configured hook. Nothing is imported until it is called.
+
+    Raises:
+        ValueError: If the specification is malformed.
+    """
+    tokens = shlex.split(spec)
+    if not tokens:
+        raise ValueError("Empty hook specification")
+    name, options = tokens[0], tokens[1:]
+
+    if name in BUILTIN_HOOKS:
+
+        def create_builtin():
+            module = importlib.import_module(BUILTIN_HOOKS[name])
+            extra = ["--debug"] if debug else []
+            args = module.build_parser().parse_args([*options, *extra, commit_msg_filepath])
+            return module.create_hook(args)
+
+        return create_builtin
+
+    module_name, _, class_name = name.partition(":")
+    if not module_name or not class_name:
+        raise ValueError(
+            f"Unknown hook '{name}': use one of {sorted(BUILTIN_HOOKS)} or module:Class"
+        )
+    kwargs = {}
+    for option in options:
+        key, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value for {name}, got '{option}'")
+        kwargs[key] = value
+
+    def create_custom():
+        hook_class = getattr(importlib.import_module(module_name), class_name)
+        return hook_class(debug=debug, **kwargs)
+
+    return create_custom
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the hook chain CLI.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    parser = create_parser(
+        prog="run-commit-msg-hooks",
+        description="Run several commit message hooks with a single read and write of the file",
+        epilog="""
+Examples:
+  Prepend the branch issue, then add a prefix:
+    run-commit-msg-hooks COMMIT_MSG_FILE \\
+      --hook "prepend-jira-issue --prefixes ABC,DEF" \\
+      --hook "example-prefix-hook --prefix [WIP]"
+
+  Include your own CommitMessageHook subclass:
+    run-commit-msg-hooks COMMIT_MSG_FILE --hook "prepend-jira-issue" \\
+      --hook "my_company.hooks:TicketHook strict=yes"
+
+Notes:
+  - Hooks run in the order given, each seeing the previous hook's output
+  - The file is only written if the final message differs
+  - Hooks are imported only when the chain runs
+        """,
+    )
+    parser.add_argument(
+        "--hook",
+        dest="hooks",
+        action="append",
+        default=[],
+        metavar="SPEC",
+        help="Hook to run: a built-in hook name with its options, or module:Class [key=value]",
+    )
+
+    args = parser.parse_args(argv)
+    if args.trace:
+        trace.enable_tracing(args.trace)
+
+    try:
+        factories = [
+            hook_factory(spec, args.commit_msg_filepath, debug=args.debug) for spec in args.hooks
+        ]
+    except ValueError as e:
+        parser.error(str(e))
+
+    from pre_commit_jira_helper.base import CommitMessageHookChain
+
+    chain = CommitMessageHookChain(factories, debug=args.debug, skip_during=args.skip_during)
+    return chain.run(commit_msg_filepath=args.commit_msg_filepath)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""CLI module for checking that commits in a revision range carry Jira issues."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Sequence
+
+from pre_commit_jira_helper.cli.base import add_issue_arguments, parse_prefixes
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the check CLI.
+
+    Returns:
+        Configured ArgumentParser instance.
+    """
+    parser = argparse.ArgumentParser(
+        prog="check-jira-issues",
+        description="Check that every commit in a revision range mentions a Jira issue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Check the commits of a pull request in CI:
+    check-jira-issues origin/main..HEAD
+
+  Only accept some projects and report offenders as JSON lines:
+    check-jira-issues --prefixes ABC,DEF --json origin/main..HEAD
+
+Notes:
+  - The history is read with a single git log; nothing is modified
+  - Exit code 0: every commit has an issue, 1: some do not, 2: git failed
+  - Offending commits are printed one per line, a summary goes to stderr
+        """,
+    )
+    parser.add_argument(
+        "revisions",
+        nargs="+",
+        help="Revision range to check, as accepted by git log (e.g. main..HEAD)",
+    )
+    parser.add_argument("--skip-merges", action="store_true", help="Do not check merge commits")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print offending commits as JSON lines with 'commit' and 'subject'",
+    )
+    parser.add_argument(
+        "--native",
+        action="store_true",
+        help="Read the object database directly instead of running git log "
+        "(git log is still used when the repository or revisions need it)",
+    )
+    add_issue_arguments(parser, separator=False)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the check CLI.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 if every commit has an issue).
+    """
+    args = build_parser().parse_args(argv)
+
+    from pre_commit_jira_helper.history import HistoryError, iter_commit_messages
+    from pre_commit_jira_helper.matcher import IssueMatcher
+
+    matcher = IssueMatcher(args.pattern, parse_prefixes(args.prefixes))
+    checked = missing = 0
+    try:
+        for commit, message in iter_commit_messages(
+            args.revisions, skip_merges=args.skip_merges, native=args.native
+        ):
+            checked += 1
+            if matcher.search(message):
+                continue
+            missing += 1
+            subject = message.split("\n", 1)[0]
+            if args.json:
+                print(json.dumps({"commit": commit, "subject": subject}))
+            else:
+                print(f"{commit} {subject}")
+    except HistoryError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    print(f"{missing} of {checked} commits have no Jira issue", file=sys.stderr)
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""Thin client that forwards prepend-jira-issue runs to the hook daemon.
+
+This module is imported on every commit when the client is used, so it only
+depends on the standard library modules needed to talk to the socket (no
+pathlib). The hook itself is imported only when the daemon cannot be reached.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import stat
+import sys
+from collections.abc import Sequence
+
+# Environment variables understood by the client and the daemon
+SOCKET_ENV = "PRE_COMMIT_JIRA_HELPER_SOCKET"
+TIMEOUT_ENV = "PRE_COMMIT_JIRA_HELPER_DAEMON_TIMEOUT"
+
+DEFAULT_TIMEOUT = 5.0
+
+# The only parts of the client's environment a hook run depends on
+_FORWARDED_ENV = ("HOME", "PATH", "LANG", "TZ", "XDG_CACHE_HOME", "XDG_CONFIG_HOME")
+_FORWARDED_PREFIXES = ("GIT_", "LC_", "PRE_COMMIT_JIRA_HELPER_")
+# Only needed to check issues with --jira-url
+_CREDENTIAL_ENV = ("JIRA_API_TOKEN", "JIRA_USER_EMAIL")
+
+
+def default_socket_path() -> str:
+    """Get the per-user socket path of the hook daemon.
+
+    Returns:
+        The socket path, overridable with $PRE_COMMIT_JIRA_HELPER_SOCKET.
+    """
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "pre-commit-jira-helper.sock")  # noqa: PTH118
+
+    tmp_dir = os.environ.get("TMPDIR", "/tmp")
+    user_dir = f"pre-commit-jira-helper-{os.getuid()}"
+    return os.path.join(tmp_dir, user_dir, "daemon.sock")  # noqa: PTH118
+
+
+def check_private_directory(directory: str) -> None:
+    """Check that only the current user can use a directory.
+
+    A socket in a directory another user controls may be served by that user,
+    who would then receive the environment of every hook run.
+
+    Args:
+        directory: The directory holding the daemon socket.
+
+    Raises:
+        OSError: If the directory is missing, a symlink, owned by another user,
+            or not of mode 0700.
+    """
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise OSError(f"{directory} is not a directory")
+    if info.st_uid != os.getuid():
+        raise OSError(f"{directory} is owned by another user")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        raise OSError(f"{directory} has mode {stat.S_IMODE(info.st_mode):o}, not 700")
+
+
+def forwarded_env(argv: Sequence[str]) -> dict[str, str]:
+    """Get the environment variables a hook run needs.
+
+    Args:
+        argv: Command line arguments of the hook.
+
+    Returns:
+        The variables to send to the daemon.
+    """
+    names = list(_FORWARDED_ENV)
+    # argparse also accepts abbreviations of --jira-url, the only option starting with --j
+    if any(arg.startswith("--j") for arg in argv):
+        names.extend(_CREDENTIAL_ENV)
+    return {
+        name: value
+        for name, value in os.environ.items()
+        if name in names or name.startswith(_FORWARDED_PREFIXES)
+    }
+
+
+def send_request(
+    payload: dict,
+    socket_path: str | None = None,
+    timeout: float | None = None,
+) -> dict | None:
+    """Send one request to the daemon and wait for its response.
+
+    Args:
+        payload: JSON-serializable request.
+        socket_path: Daemon socket (default: default_socket_path()).
+        timeout: Seconds to wait for the connection, and then for the response.
+
+    Returns:
+        The decoded response, ``{"error": ...}`` if the daemon took the request
+        but gave no answer, or None if no daemon could be reached (in which case
+        the request was never sent).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    if timeout is None:
+        try:
+            timeout = float(os.environ.get(TIMEOUT_ENV, DEFAULT_TIMEOUT))
+        except ValueError:
+            timeout = DEFAULT_TIMEOUT
+
+    path = socket_path or default_socket_path()
+    try:
+        check_private_directory(os.path.dirname(path) or ".")  # noqa: PTH120
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except OSError:
+        return None
+
+    with sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            return None
+
+        # The daemon may act on the request from now on, so a failure is an
+        # error rather than a reason to run the request somewhere else
+        try:
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return json.loads(b"".join(chunks))
+        except (OSError, ValueError) as e:
+            return {"error": f"no answer from the daemon on {path}: {e}"}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the daemon client.
+
+    Accepts the same arguments as prepend-jira-issue and falls back to running
+    the hook in-process if the daemon cannot be reached. Once the daemon has the
+    request, the hook is never run a second time, as both runs could write the
+    commit message.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+
+    cwd = os.getcwd()  # noqa: PTH109
+    response = send_request({"argv": args, "cwd": cwd, "env": forwarded_env(args)})
+    if response is None:
+        from pre_commit_jira_helper.cli.jira import main as run_in_process
+
+        return run_in_process(args)
+    if "exit_code" not in response:
+        sys.stderr.write(f"[ERROR] prepend-jira-issue-client: {response.get('error')}\n")
+        return 1
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response["exit_code"])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""CLI module for managing the hook daemon."""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+
+from pre_commit_jira_helper.cli.client import default_socket_path, send_request
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the daemon subcommand.
+
+    Args:
+        subparsers: Subparsers of the jira-helper parser.
+    """
+    parser = subparsers.add_parser(
+        "daemon",
+        help="Manage the prepend-jira-issue daemon",
+        description=(
+            "Keep prepend-jira-issue warm in a long-lived process. Point the "
+            "prepend-jira-issue-client hook at it to skip interpreter startup on each commit."
+        ),
+    )
+    parser.add_argument("action", choices=["start", "stop", "status"], help="Action to perform")
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Socket path (default: per-user path, or $PRE_COMMIT_JIRA_HELPER_SOCKET)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=600.0,
+        help="Exit after this many seconds without requests (default: 600)",
+    )
+    parser.add_argument(
+        "--detach",
+        action="store_true",
+        help="Start the daemon in the background and return once it is ready",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the daemon subcommand.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    socket_path = args.socket or default_socket_path()
+
+    if args.action == "status":
+        status = send_request({"command": "ping"}, socket_path, timeout=1.0)
+        if status is None:
+            print(f"Daemon not running ({socket_path})")
+            return 1
+        if "error" in status:
+            print(f"Daemon not answering: {status['error']}")
+            return 1
+        print(
+            f"Daemon running on {socket_path}: pid {status['pid']}, "
+            f"up {status['uptime']:.0f}s, {status['requests']} requests"
+        )
+        return 0
+
+    if args.action == "stop":
+        if send_request({"command": "stop"}, socket_path, timeout=1.0) is None:
+            print(f"Daemon not running ({socket_path})")
+            return 1
+        return 0
+
+    if args.detach:
+        return _start_detached(socket_path, args.idle_timeout)
+
+    from pre_commit_jira_helper.daemon import serve
+    from pre_commit_jira_helper.logger import setup_logging
+
+    setup_logging()
+    return serve(socket_path, args.idle_timeout)
+
+
+def _start_detached(socket_path: str, idle_timeout: float, wait: float = 5.0) -> int:
+    """Start the daemon in a new session and wait until it answers."""
+    subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pre_commit_jira_helper.cli.helper",
+            "daemon",
+            "start",
+            "--socket",
+            socket_path,
+            "--idle-timeout",
+            str(idle_timeout),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if send_request({"command": "ping"}, socket_path, timeout=0.5) is not None:
+            return 0
+        time.sleep(0.05)
+
+    print(f"Daemon did not start on {socket_path}", file=sys.stderr)
+    return 1
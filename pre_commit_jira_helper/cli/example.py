@@ -2,20 +2,19 @@
 
 from __future__ import annotations
 
+import argparse
 from collections.abc import Sequence
 
+from pre_commit_jira_helper import trace
 from pre_commit_jira_helper.cli.base import create_parser
 from pre_commit_jira_helper.hooks.example import ExamplePrefixHook
 
 
-def main(argv: Sequence[str] | None = None) -> int:
-    """Main entry point for the example hook CLI.
-
-    Args:
-        argv: Command line arguments.
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the example hook CLI.
 
     Returns:
-        Exit code (0 for success).
+        Configured ArgumentParser instance.
     """
     parser = create_parser(
         prog="example-prefix-hook",
@@ -42,14 +41,41 @@ Notes:
         help="Custom prefix to add (default: '[COMMIT]')",
     )
 
-    args = parser.parse_args(argv)
+    return parser
 
-    # Create and run the hook
-    hook = ExamplePrefixHook(
+
+def create_hook(args: argparse.Namespace) -> ExamplePrefixHook:
+    """Create the hook from parsed command line arguments.
+
+    Args:
+        args: Arguments parsed by the parser from build_parser().
+
+    Returns:
+        Configured ExamplePrefixHook instance.
+    """
+    return ExamplePrefixHook(
         debug=args.debug,
         prefix=args.prefix,
+        skip_during=args.skip_during,
     )
 
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the example hook CLI.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        trace.enable_tracing(args.trace)
+
+    # Create and run the hook
+    hook = create_hook(args)
+
     return hook.run(commit_msg_filepath=args.commit_msg_filepath)
 
 
@@ -0,0 +1,97 @@
+"""CLI module for delivering the spooled Jira comments."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the flush subcommand.
+
+    Args:
+        subparsers: Subparsers of the jira-helper parser.
+    """
+    parser = subparsers.add_parser(
+        "flush",
+        help="Post the Jira comments spooled by spool-jira-comment",
+        description=(
+            "Deliver the comments spooled by the spool-jira-comment post-commit hook. "
+            "Comments that fail because Jira cannot be reached are retried with "
+            "exponential backoff, comments Jira rejects are dropped, and the spool is "
+            "compacted when done. Only one flush runs at a time. Credentials are read "
+            "from $JIRA_API_TOKEN and $JIRA_USER_EMAIL."
+        ),
+    )
+    parser.add_argument(
+        "--spool",
+        type=str,
+        metavar="DIR",
+        default=None,
+        help="Spool directory (default: ~/.cache/pre-commit-jira-helper/spool)",
+    )
+    parser.add_argument(
+        "--linger",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Keep running this long to retry failed comments (default: 0, a single pass)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Comments whose progress is saved together (default: 50)",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=8,
+        help="Attempts before a comment is dropped (default: 8)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="Seconds to wait for each response (default: 10)",
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the flush subcommand.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code (0 for success, 1 if the spool could not be flushed).
+    """
+    from pre_commit_jira_helper.spool import Spool, flush_spool
+    from pre_commit_jira_helper.validation import JiraError, env_credentials
+
+    if args.debug:
+        from pre_commit_jira_helper.logger import enable_debug_logging
+
+        enable_debug_logging()
+
+    try:
+        result = flush_spool(
+            Spool(args.spool),
+            batch_size=args.batch_size,
+            max_attempts=args.max_attempts,
+            timeout=args.timeout,
+            linger=args.linger,
+            **env_credentials(),
+        )
+    except (JiraError, OSError) as e:
+        print(f"Cannot flush the spool: {e}", file=sys.stderr)
+        return 1
+
+    if result is None:
+        print("Another flush is running", file=sys.stderr)
+        return 0
+    delivered, dropped, pending = result
+    print(f"{delivered} delivered, {dropped} dropped, {pending} pending", file=sys.stderr)
+    return 0
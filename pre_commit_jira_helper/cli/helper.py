@@ -0,0 +1,43 @@
+"""CLI module for the jira-helper maintenance command."""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+
+from pre_commit_jira_helper.cli import analyze, audit, daemon, flush, rewrite, sync
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands registered.
+
+    Returns:
+        Configured ArgumentParser instance.
+    """
+    parser = argparse.ArgumentParser(
+        prog="jira-helper",
+        description="Maintenance commands for pre-commit-jira-helper",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for module in (analyze, audit, daemon, flush, rewrite, sync):
+        module.register(subparsers)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the jira-helper CLI.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,20 +2,84 @@
 
 from __future__ import annotations
 
+import argparse
 from collections.abc import Sequence
 
-from pre_commit_jira_helper.cli.base import create_parser
-from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+from pre_commit_jira_helper import trace
+from pre_commit_jira_helper.cli.base import add_issue_arguments, create_parser, parse_prefixes
 
+# Avoids importing typing at startup; type checkers treat the name specially
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+    from pre_commit_jira_helper.matcher import Tracker
 
-def main(argv: Sequence[str] | None = None) -> int:
-    """Main entry point for the Jira hook CLI.
+
+def parse_tracker_setting(value: str) -> tuple[str, str]:
+    """Parse a NAME=VALUE tracker setting.
 
     Args:
-        argv: Command line arguments.
+        value: Command line value, e.g. "github=org/repo{key}".
 
     Returns:
-        Exit code (0 for success).
+        The tracker name and the value.
+
+    Raises:
+        argparse.ArgumentTypeError: If there is no name.
+    """
+    name, equals, setting = value.partition("=")
+    if not equals or not name.strip():
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {value!r}")
+    return name.strip(), setting
+
+
+def parse_tracker_pattern(value: str) -> tuple[str, str]:
+    """Parse the value of --tracker.
+
+    Args:
+        value: Command line value, e.g. "github=#\\d+".
+
+    Returns:
+        The tracker name and pattern.
+
+    Raises:
+        argparse.ArgumentTypeError: If there is no name or the pattern is invalid.
+    """
+    import re
+
+    name, pattern = parse_tracker_setting(value)
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"invalid pattern for {name}: {e}") from None
+    return name, pattern
+
+
+def parse_tracker_format(value: str) -> tuple[str, str]:
+    """Parse the value of --tracker-format.
+
+    Args:
+        value: Command line value, e.g. "github=org/repo{key}".
+
+    Returns:
+        The tracker name and template.
+
+    Raises:
+        argparse.ArgumentTypeError: If there is no name or the template is invalid.
+    """
+    name, template = parse_tracker_setting(value)
+    try:
+        template.format(key="")
+    except (KeyError, IndexError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"invalid format for {name}: {e!r}") from None
+    return name, template
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the Jira hook CLI.
+
+    Returns:
+        Configured ArgumentParser instance.
     """
     parser = create_parser(
         prog="prepend-jira-issue",
@@ -30,9 +94,18 @@ Examples:
     On branch 'feature/ABC-123-XYZ-999-test' with --prefixes ABC,DEF -> 'ABC-123: commit message'
     prepend-jira-issue --prefixes ABC,DEF COMMIT_MSG_FILE
 
+  Use the project owning the staged files on branches without an issue:
+    With 'services/billing/** BILL' in OWNERS -> 'BILL: commit message'
+    prepend-jira-issue --owners OWNERS COMMIT_MSG_FILE
+
   With custom pattern and separator:
     prepend-jira-issue --pattern "[A-Z]{3,}-\\d+" --separator ": " COMMIT_MSG_FILE
 
+  Also take GitHub issues and ServiceNow changes, in the same scan:
+    On branch 'fix/ABC-1-gh-12' -> 'ABC-1, org/repo#12: commit message'
+    prepend-jira-issue --tracker "github=gh-(\\d+)" --tracker-format "github=org/repo#{key}" \\
+      --tracker "servicenow=CHG\\d{7}" COMMIT_MSG_FILE
+
 Notes:
   - Default pattern: [A-Z][A-Z0-9_]*-\\d+ (PROJECT-NUMBER format, matches Atlassian's pattern)
   - Without --prefixes: Extracts ALL issues matching the pattern
@@ -43,41 +116,167 @@ Notes:
     )
 
     # Add Jira-specific arguments
+    add_issue_arguments(parser)
     parser.add_argument(
-        "--pattern",
+        "--owners",
         type=str,
-        help="Custom regex pattern for issue extraction (default: [A-Z][A-Z0-9_]*-\\d+)",
+        metavar="FILE",
+        help="File mapping paths to owning Jira projects, one '<path> <PROJECT>' rule per line",
     )
     parser.add_argument(
-        "--separator",
+        "--owners-mode",
+        choices=("infer", "restrict"),
+        default="infer",
+        help=(
+            "infer: prepend the owning projects' keys when the branch names no issue; "
+            "restrict: only keep branch issues of the owning projects (default: infer)"
+        ),
+    )
+    parser.add_argument(
+        "--jira-url",
         type=str,
-        default=": ",
-        help="Separator between issue(s) and message (default: ': ')",
+        metavar="URL",
+        help=(
+            "Only prepend issues that exist in this Jira site; credentials are read from "
+            "$JIRA_API_TOKEN and $JIRA_USER_EMAIL"
+        ),
+    )
+    parser.add_argument(
+        "--validation-budget",
+        type=float,
+        metavar="SECONDS",
+        help="Time allowed for asking Jira before only cached answers are used (default: 0.5)",
     )
     parser.add_argument(
-        "--prefixes",
+        "--snapshot",
         type=str,
+        metavar="FILE",
+        help=(
+            "Check issues against this snapshot from 'jira-helper sync' without network "
+            "calls (default: the synced snapshot of --jira-url, if any)"
+        ),
+    )
+
+    parser.add_argument(
+        "--tracker",
+        type=parse_tracker_pattern,
+        action="append",
+        metavar="NAME=PATTERN",
         help=(
-            "Comma-separated list of allowed Jira project prefixes (e.g., 'ABC,DEF,XYZ'). "
-            "If not provided, ALL issues matching the pattern will be extracted."
+            "Also take keys of another issue tracker matching PATTERN (repeatable); "
+            "Jira keys are found with --pattern as tracker 'jira'"
         ),
     )
+    parser.add_argument(
+        "--tracker-prefixes",
+        type=parse_tracker_setting,
+        action="append",
+        metavar="NAME=PREFIXES",
+        help="Comma-separated allowed key prefixes of a tracker (repeatable)",
+    )
+    parser.add_argument(
+        "--tracker-format",
+        type=parse_tracker_format,
+        action="append",
+        metavar="NAME=TEMPLATE",
+        help="How keys of a tracker are written, with {key} for the matched key (repeatable)",
+    )
+
+    return parser
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse and check the command line of the Jira hook.
+
+    Args:
+        argv: Command line arguments.
 
+    Returns:
+        The parsed arguments.
+    """
+    parser = build_parser()
     args = parser.parse_args(argv)
+    # "jira" is DEFAULT_TRACKER, named here to keep the matcher out of --help
+    names = {"jira", *(name for name, _ in args.tracker or ())}
+    for option in ("tracker_prefixes", "tracker_format"):
+        for name, _ in getattr(args, option) or ():
+            if name not in names:
+                parser.error(f"--{option.replace('_', '-')}: unknown tracker {name!r}")
+    return args
 
-    # Parse prefixes if provided
-    allowed_prefixes = None
-    if args.prefixes:
-        allowed_prefixes = [prefix.strip().upper() for prefix in args.prefixes.split(",")]
 
-    # Create and run the hook
-    hook = JiraIssuePrependHook(
+def build_trackers(args: argparse.Namespace) -> list[Tracker] | None:
+    """Build the issue trackers from parsed command line arguments.
+
+    Args:
+        args: Arguments parsed by parse_args().
+
+    Returns:
+        The Jira tracker followed by those given with --tracker, or None if
+        there are none.
+    """
+    if not getattr(args, "tracker", None):
+        return None
+
+    from pre_commit_jira_helper.matcher import DEFAULT_TRACKER, Tracker
+
+    trackers = {DEFAULT_TRACKER: Tracker(DEFAULT_TRACKER, args.pattern)}
+    for name, pattern in args.tracker:
+        trackers[name] = Tracker(name, pattern)
+    trackers[DEFAULT_TRACKER].prefixes = frozenset(parse_prefixes(args.prefixes) or ()) or None
+    # Settings of unknown trackers are rejected by parse_args()
+    for name, prefixes in args.tracker_prefixes or ():
+        if name in trackers:
+            trackers[name].prefixes = frozenset(parse_prefixes(prefixes) or ()) or None
+    for name, template in args.tracker_format or ():
+        if name in trackers:
+            trackers[name].template = template
+    return list(trackers.values())
+
+
+def create_hook(args: argparse.Namespace) -> JiraIssuePrependHook:
+    """Create the hook from parsed command line arguments.
+
+    Args:
+        args: Arguments parsed by the parser from build_parser().
+
+    Returns:
+        Configured JiraIssuePrependHook instance.
+    """
+    # Imported here so that argument errors and --help do not load the hook
+    from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+
+    return JiraIssuePrependHook(
         debug=args.debug,
         issue_pattern=args.pattern,
         separator=args.separator,
-        allowed_prefixes=allowed_prefixes,
+        allowed_prefixes=parse_prefixes(args.prefixes),
+        skip_during=getattr(args, "skip_during", None),
+        owners_file=getattr(args, "owners", None),
+        owners_mode=getattr(args, "owners_mode", "infer"),
+        jira_url=getattr(args, "jira_url", None),
+        validation_budget=getattr(args, "validation_budget", None),
+        snapshot_file=getattr(args, "snapshot", None),
+        trackers=build_trackers(args),
     )
 
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the Jira hook CLI.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    args = parse_args(argv)
+    if args.trace:
+        trace.enable_tracing(args.trace)
+
+    # Create and run the hook
+    hook = create_hook(args)
+
     return hook.run(commit_msg_filepath=args.commit_msg_filepath)
 
 
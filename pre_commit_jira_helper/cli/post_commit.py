@@ -0,0 +1,121 @@
+"""CLI module for the post-commit hook that spools Jira comments."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections.abc import Sequence
+
+from pre_commit_jira_helper.cli.base import add_issue_arguments, parse_prefixes
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the post-commit hook.
+
+    Returns:
+        Configured ArgumentParser instance.
+    """
+    parser = argparse.ArgumentParser(
+        prog="spool-jira-comment",
+        description=(
+            "Comment on the Jira issues of the new commit, without waiting for Jira: "
+            "the comments are spooled locally and posted in the background"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Link each commit to the issues its message mentions:
+    spool-jira-comment --jira-url https://example.atlassian.net
+
+Notes:
+  - Runs as a post-commit hook; the commit itself is never affected
+  - Comments are posted by the hook daemon if it is running, otherwise by a
+    detached 'jira-helper flush' process
+  - Credentials are read from $JIRA_API_TOKEN and $JIRA_USER_EMAIL
+        """,
+    )
+    parser.add_argument(
+        "--jira-url", type=str, metavar="URL", required=True, help="Base URL of the Jira site"
+    )
+    parser.add_argument(
+        "--spool",
+        type=str,
+        metavar="DIR",
+        default=None,
+        help="Spool directory (default: ~/.cache/pre-commit-jira-helper/spool)",
+    )
+    parser.add_argument(
+        "--no-flush",
+        action="store_true",
+        help="Only spool the comments; run 'jira-helper flush' yourself to post them",
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    add_issue_arguments(parser, separator=False)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the post-commit hook.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 for success, 1 if the comments could not be spooled).
+    """
+    args = build_parser().parse_args(argv)
+
+    from pathlib import Path
+
+    from pre_commit_jira_helper.history import HistoryError, iter_commit_messages
+    from pre_commit_jira_helper.matcher import IssueMatcher
+    from pre_commit_jira_helper.spool import Spool, record_id, start_flusher
+
+    if args.debug:
+        from pre_commit_jira_helper.logger import enable_debug_logging
+
+        enable_debug_logging()
+
+    # The walk yields HEAD first; closing it stops reading the rest of the history
+    messages = iter_commit_messages(["HEAD"], native=True)
+    try:
+        commit, message = next(messages)
+    except (HistoryError, StopIteration) as e:
+        print(f"Cannot read the new commit: {e}", file=sys.stderr)
+        return 1
+    finally:
+        messages.close()
+
+    matcher = IssueMatcher(args.pattern, parse_prefixes(args.prefixes))
+    issues = list(dict.fromkeys(matcher.findall(message)))
+    if not issues:
+        return 0
+
+    site = args.jira_url.rstrip("/")
+    now = time.time()
+    records = [
+        {
+            "id": record_id(site, issue, commit),
+            "site": site,
+            "issue": issue,
+            "commit": commit,
+            "repository": Path.cwd().name,
+            "subject": message.split("\n", 1)[0],
+            "created": now,
+        }
+        for issue in issues
+    ]
+    spool = Spool(args.spool)
+    try:
+        spool.append(records)
+        if not args.no_flush:
+            start_flusher(spool)
+    except OSError as e:
+        print(f"Cannot spool the Jira comments: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+"""CLI module for rejecting pushes whose commits lack Jira issues (pre-receive hook)."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Sequence
+
+from pre_commit_jira_helper.cli.base import add_issue_arguments, parse_prefixes
+from pre_commit_jira_helper.receive import DEFAULT_TIMEOUT
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the pre-receive CLI.
+
+    Returns:
+        Configured ArgumentParser instance.
+    """
+    parser = argparse.ArgumentParser(
+        prog="jira-pre-receive",
+        description="Reject pushes containing commits that do not mention a Jira issue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Install as the pre-receive hook of a bare repository:
+    printf '#!/bin/sh\\nexec jira-pre-receive --prefixes ABC,DEF\\n' > hooks/pre-receive
+    chmod +x hooks/pre-receive
+
+Notes:
+  - Reads the "<old> <new> <ref>" lines git passes on stdin
+  - Only commits not yet reachable from any ref of the repository are checked
+  - Refs are checked in parallel, one git log per ref
+  - Exit code 0 accepts the push, 1 rejects it
+        """,
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Seconds allowed for the whole check (default: {DEFAULT_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--on-timeout",
+        choices=("reject", "accept"),
+        default="reject",
+        help="What to do with the push when the deadline is reached (default: reject)",
+    )
+    parser.add_argument("--skip-merges", action="store_true", help="Do not check merge commits")
+    parser.add_argument(
+        "--max-report",
+        type=int,
+        default=20,
+        help="Offending commits to list before summarizing the rest (default: 20)",
+    )
+    add_issue_arguments(parser, separator=False)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main entry point for the pre-receive CLI.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        Exit code (0 to accept the push).
+    """
+    args = build_parser().parse_args(argv)
+
+    from pre_commit_jira_helper.receive import check_push, parse_ref_updates
+
+    try:
+        updates = parse_ref_updates(sys.stdin)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    report = check_push(
+        updates,
+        pattern=args.pattern,
+        prefixes=parse_prefixes(args.prefixes),
+        skip_merges=args.skip_merges,
+        jobs=args.jobs,
+        timeout=args.timeout,
+    )
+
+    # Hook output is relayed to the pusher, so it goes to stderr like git's own
+    for ref in report.refs:
+        if ref.error:
+            print(f"Error: cannot check {ref.ref}: {ref.error}", file=sys.stderr)
+
+    offenders = report.offenders
+    if offenders:
+        print(f"{len(offenders)} pushed commit(s) do not mention a Jira issue:", file=sys.stderr)
+        for commit, subject in offenders[: args.max_report]:
+            print(f"  {commit[:12]} {subject}", file=sys.stderr)
+        if len(offenders) > args.max_report:
+            print(f"  ... and {len(offenders) - args.max_report} more", file=sys.stderr)
+
+    if report.timed_out:
+        action = "accepting" if args.on_timeout == "accept" else "rejecting"
+        print(f"Jira check did not finish in {args.timeout:g}s, {action} push", file=sys.stderr)
+        if args.on_timeout == "reject":
+            return 1
+        # Accepting on timeout only waives the unfinished part of the check
+        return 1 if offenders or any(ref.error for ref in report.refs) else 0
+
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+"""CLI module for backfilling Jira issues into existing history."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from pre_commit_jira_helper.cli.base import add_issue_arguments
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the rewrite subcommand.
+
+    Args:
+        subparsers: Subparsers of the jira-helper parser.
+    """
+    parser = subparsers.add_parser(
+        "rewrite",
+        help="Prepend branch Jira issues to every commit message in a revision range",
+        description=(
+            "Apply the prepend-jira-issue transformation to existing commits. History is "
+            "streamed through git fast-export and git fast-import, and the branches in the "
+            "range are force-updated. Issues are taken from each rewritten branch's name "
+            "unless --branch is given."
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Backfill the commits of a feature branch that are not on main:
+    jira-helper rewrite main..feature/ABC-123-login
+
+  Use an explicit issue source and only report what would change:
+    jira-helper rewrite --branch ABC-123 --dry-run main..topic
+        """,
+    )
+    parser.add_argument(
+        "revisions",
+        nargs="+",
+        help="Revision range to rewrite, as accepted by git fast-export (name branches)",
+    )
+    parser.add_argument(
+        "--branch",
+        type=str,
+        help="Branch name to extract issues from instead of the rewritten branch",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many commit messages would change",
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    add_issue_arguments(parser)
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the rewrite subcommand.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    from pre_commit_jira_helper.cli.jira import create_hook
+    from pre_commit_jira_helper.rewrite import RewriteError, rewrite_history
+
+    hook = create_hook(args)
+    try:
+        result = rewrite_history(args.revisions, hook, branch=args.branch, dry_run=args.dry_run)
+    except RewriteError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"{verb} {result.changed} of {result.commits} commit messages")
+    return 0
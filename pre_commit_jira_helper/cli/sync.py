@@ -0,0 +1,90 @@
+"""CLI module for syncing the local snapshot of a Jira site's issues."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+
+def register(subparsers: argparse._SubParsersAction) -> None:
+    """Register the sync subcommand.
+
+    Args:
+        subparsers: Subparsers of the jira-helper parser.
+    """
+    parser = subparsers.add_parser(
+        "sync",
+        help="Update the local snapshot of the issues that exist in a Jira site",
+        description=(
+            "Record which projects and issues exist in a Jira site, so that "
+            "prepend-jira-issue can check issues without network calls. The first sync "
+            "reads every issue; later ones only read the issues updated since. "
+            "Credentials are read from $JIRA_API_TOKEN and $JIRA_USER_EMAIL."
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  Update the snapshot used by 'prepend-jira-issue --jira-url https://example.atlassian.net':
+    jira-helper sync https://example.atlassian.net
+
+  Rebuild a snapshot from scratch, dropping deleted issues:
+    jira-helper sync --full --output jira.snapshot https://example.atlassian.net
+        """,
+    )
+    parser.add_argument("url", help="Base URL of the Jira site")
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        metavar="FILE",
+        default=None,
+        help="Snapshot file (default: a file named after the site in ~/.cache)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Read every issue instead of the ones updated since the last sync",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=1000,
+        help="Issues requested per page (default: 1000; Jira may return fewer)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for each response (default: 30)",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the sync subcommand.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code (0 for success, 1 if the snapshot could not be updated).
+    """
+    from pre_commit_jira_helper.snapshot import default_snapshot_path, sync_snapshot
+    from pre_commit_jira_helper.validation import JiraError, env_credentials
+
+    try:
+        path = args.output or default_snapshot_path(args.url)
+        projects, issues = sync_snapshot(
+            args.url,
+            path,
+            full=args.full,
+            page_size=args.page_size,
+            timeout=args.timeout,
+            **env_credentials(),
+        )
+    except (JiraError, OSError, ValueError) as e:
+        print(f"Cannot sync {args.url}: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{path}: {projects} projects, {issues} issues read", file=sys.stderr)
+    return 0
@@ -0,0 +1,330 @@
+"""Long-lived hook daemon serving prepend-jira-issue runs over a Unix socket."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+from pre_commit_jira_helper import trace
+from pre_commit_jira_helper.cli.client import check_private_directory, send_request
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.logger import logger as package_logger
+
+logger = get_logger("daemon")
+
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one newline-delimited JSON request per connection."""
+
+    server: HookDaemon
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            response = {"error": "invalid request"}
+        else:
+            response = self.server.dispatch(request)
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class HookDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that runs prepend-jira-issue requests in a warm process.
+
+    Connections are accepted concurrently, each on its own thread. Because a hook
+    run depends on the working directory and environment of the commit, runs are
+    executed one at a time under a lock while that state is swapped in, which
+    keeps commits from several repositories isolated from each other. Hook
+    instances (and their compiled matchers) are cached per configuration.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        """Initialize the daemon and bind its socket.
+
+        Args:
+            socket_path: Path of the Unix socket to listen on.
+            idle_timeout: Seconds without requests after which the daemon exits.
+
+        Raises:
+            OSError: If the socket cannot be bound, or its directory could be
+                used by other users.
+        """
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.started = time.monotonic()
+        self.last_activity = self.started
+        self.requests_served = 0
+        self._active = 0
+        self._stopping = False
+        self._state_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._hooks: dict[tuple, object] = {}
+        self._flushing: set[Path] = set()
+
+        directory = Path(socket_path).parent
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Another user may have created the directory first to serve the socket
+        check_private_directory(str(directory))
+        super().__init__(socket_path, _RequestHandler)
+        Path(socket_path).chmod(0o600)
+
+    def dispatch(self, request: dict) -> dict:
+        """Answer a decoded request.
+
+        Args:
+            request: Either a control command or a hook run with argv, cwd and env.
+
+        Returns:
+            JSON-serializable response.
+        """
+        with self._state_lock:
+            self._active += 1
+            self.last_activity = time.monotonic()
+        try:
+            command = request.get("command")
+            if command == "ping":
+                return {
+                    "pid": os.getpid(),
+                    "uptime": time.monotonic() - self.started,
+                    "requests": self.requests_served,
+                }
+            if command == "stop":
+                self._stopping = True
+                return {"stopping": True}
+            if command == "flush":
+                return {
+                    "flushing": self.start_flush(
+                        request.get("spool"), request.get("user"), request.get("token")
+                    )
+                }
+
+            exit_code, stdout, stderr = self.run_hook(
+                request.get("argv", []), request.get("cwd", "."), request.get("env", {})
+            )
+            return {"exit_code": exit_code, "stdout": stdout, "stderr": stderr}
+        finally:
+            with self._state_lock:
+                self._active -= 1
+                self.requests_served += 1
+                self.last_activity = time.monotonic()
+
+    def start_flush(
+        self, spool_dir: str | None, user: str | None = None, token: str | None = None
+    ) -> bool:
+        """Deliver spooled Jira comments in a background thread.
+
+        The daemon counts as busy until the flush is done, so it does not exit
+        while comments are being posted. The credentials come with the request:
+        the thread must not read the environment, which hook runs replace.
+
+        Args:
+            spool_dir: Spool directory, or None for the default one.
+            user: Email of the user, for basic authentication with the token.
+            token: Jira API token or personal access token.
+
+        Returns:
+            True if a flush was started, False if this daemon is already
+            flushing that spool.
+        """
+        from pre_commit_jira_helper.spool import Spool, flush_spool
+        from pre_commit_jira_helper.validation import JiraError
+
+        spool = Spool(spool_dir)
+        with self._state_lock:
+            if spool.directory in self._flushing:
+                return False
+            self._flushing.add(spool.directory)
+            self._active += 1
+
+        def flush() -> None:
+            try:
+                result = flush_spool(spool, linger=self.idle_timeout, user=user, token=token)
+                logger.debug(f"Flushed {spool.directory}: {result}")
+            except (JiraError, OSError) as e:
+                logger.warning(f"Cannot flush {spool.directory}: {e}")
+            finally:
+                with self._state_lock:
+                    self._flushing.discard(spool.directory)
+                    self._active -= 1
+                    self.last_activity = time.monotonic()
+
+        threading.Thread(target=flush, name="spool-flush", daemon=True).start()
+        return True
+
+    def run_hook(self, argv: list[str], cwd: str, env: dict[str, str]) -> tuple[int, str, str]:
+        """Run prepend-jira-issue as if it had been started in the client's context.
+
+        Args:
+            argv: Command line arguments of the client.
+            cwd: Working directory of the client.
+            env: Environment of the client.
+
+        Returns:
+            Tuple of (exit code, captured stdout, captured stderr).
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with self._run_lock:
+            saved_cwd = Path.cwd()
+            saved_env = dict(os.environ)
+            saved_level = package_logger.level
+            saved_handlers = list(package_logger.handlers)
+            saved_propagate = package_logger.propagate
+            try:
+                os.chdir(cwd)
+                os.environ.clear()
+                os.environ.update(env)
+                trace.enable_tracing(env.get(trace.TRACE_ENV))
+                # Stream handlers write to the daemon's own stderr, which is
+                # /dev/null when detached; send their records to the client
+                package_logger.handlers[:] = [
+                    _redirected(handler, stderr) for handler in saved_handlers
+                ]
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    exit_code = self._execute(argv)
+            except OSError as e:
+                stderr.write(f"[ERROR] {package_logger.name}: {e}\n")
+                exit_code = 1
+            finally:
+                os.chdir(saved_cwd)
+                os.environ.clear()
+                os.environ.update(saved_env)
+                trace.enable_tracing(saved_env.get(trace.TRACE_ENV))
+                package_logger.handlers[:] = saved_handlers
+                package_logger.setLevel(saved_level)
+                package_logger.propagate = saved_propagate
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def _execute(self, argv: list[str]) -> int:
+        """Parse arguments and run a (possibly cached) hook."""
+        from pre_commit_jira_helper.cli.jira import create_hook, parse_args
+
+        try:
+            args = parse_args(argv)
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else 1
+
+        if args.trace:
+            trace.enable_tracing(args.trace)
+
+        if args.debug:
+            # Debug hooks attach handlers to the current stderr, so never reuse them
+            hook = create_hook(args)
+        else:
+            skip_during = tuple(args.skip_during or ())
+            key = (
+                args.pattern,
+                args.separator,
+                args.prefixes,
+                skip_during,
+                args.owners,
+                args.owners_mode,
+                args.jira_url,
+                args.validation_budget,
+                args.snapshot,
+                tuple(args.tracker or ()),
+                tuple(args.tracker_prefixes or ()),
+                tuple(args.tracker_format or ()),
+            )
+            hook = self._hooks.get(key)
+            if hook is None:
+                hook = self._hooks[key] = create_hook(args)
+
+        return hook.run(commit_msg_filepath=args.commit_msg_filepath)
+
+    def handle_timeout(self) -> None:
+        """Stop serving once the daemon has been idle for too long."""
+        with self._state_lock:
+            idle = time.monotonic() - self.last_activity
+            if self._active == 0 and idle >= self.idle_timeout:
+                logger.info(f"Idle for {idle:.0f}s, shutting down")
+                self._stopping = True
+
+    def serve_until_idle(self, poll_interval: float = 1.0) -> None:
+        """Serve requests until stopped or idle for longer than idle_timeout.
+
+        Args:
+            poll_interval: Seconds between idle checks.
+        """
+        self.timeout = poll_interval
+        try:
+            while not self._stopping:
+                self.handle_request()
+                self.handle_timeout()
+        finally:
+            self.server_close()
+
+    def server_close(self) -> None:
+        """Close the socket and remove its path."""
+        super().server_close()
+        Path(self.socket_path).unlink(missing_ok=True)
+
+
+def _redirected(handler: logging.Handler, stream) -> logging.Handler:
+    """Get a handler writing to a request's stream instead of the daemon's stderr.
+
+    Args:
+        handler: A handler of the package logger.
+        stream: Stream capturing the request's stderr.
+
+    Returns:
+        A stream handler with the same level and format, or handler itself if it
+        does not write to a stream (e.g. a file handler).
+    """
+    if type(handler) is not logging.StreamHandler:
+        return handler
+    redirected = logging.StreamHandler(stream)
+    redirected.setLevel(handler.level)
+    redirected.setFormatter(handler.formatter)
+    return redirected
+
+
+def is_daemon_running(socket_path: str) -> bool:
+    """Check whether a daemon answers on the given socket.
+
+    Args:
+        socket_path: Path of the Unix socket.
+
+    Returns:
+        True if a daemon responded to a ping.
+    """
+    return send_request({"command": "ping"}, socket_path, timeout=1.0) is not None
+
+
+def serve(socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> int:
+    """Run the daemon in the foreground.
+
+    Args:
+        socket_path: Path of the Unix socket to listen on.
+        idle_timeout: Seconds without requests after which the daemon exits.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    path = Path(socket_path)
+    if path.exists():
+        if is_daemon_running(socket_path):
+            logger.error(f"Daemon already running on {socket_path}")
+            return 1
+        logger.debug(f"Removing stale socket {socket_path}")
+        path.unlink()
+
+    try:
+        server = HookDaemon(socket_path, idle_timeout)
+    except OSError as e:
+        logger.error(f"Cannot listen on {socket_path}: {e}")
+        return 1
+    logger.info(f"Listening on {socket_path} (idle timeout {idle_timeout:.0f}s)")
+    server.serve_until_idle()
+    return 0
@@ -2,22 +2,383 @@
 
 from __future__ import annotations
 
+import os
+import sys
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from pre_commit_jira_helper import trace
 from pre_commit_jira_helper.logger import get_logger
-from pre_commit_jira_helper.utils import run_command
+from pre_commit_jira_helper.utils import run_command, stream_command
 
 logger = get_logger("git")
 
+# Returned by the filesystem readers when the repository layout is not one we
+# understand; callers then defer to the git binary.
+_UNRESOLVED = object()
+
+# Git itself gives up on symref chains deeper than this.
+_MAX_SYMREF_DEPTH = 5
+
+# Refs that live in the per-worktree git dir rather than the common dir.
+_PER_WORKTREE_REF_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+
+# Environment variables that change repository discovery in ways we do not mirror.
+_UNSUPPORTED_DISCOVERY_ENV = ("GIT_CEILING_DIRECTORIES", "GIT_DISCOVERY_ACROSS_FILESYSTEM")
+
+# Environment variables that inject configuration (e.g. ``git -c``) we do not parse.
+_CONFIG_OVERRIDE_ENV = ("GIT_CONFIG_PARAMETERS", "GIT_CONFIG_COUNT")
+
+# Config sections that pull in other files; their presence defers lookups to git.
+_INCLUDE_SECTIONS = ("include", "includeif")
+
+# Operations a repository can be in the middle of, as reported by get_repo_state().
+REPO_OPERATIONS = ("rebase", "am", "merge", "cherry-pick", "revert")
+
+# First word of a sequencer todo line, for multi-commit cherry-picks and reverts.
+_SEQUENCER_COMMANDS = {"pick": "cherry-pick", "p": "cherry-pick", "revert": "revert"}
+
+# Escapes allowed inside config values.
+_CONFIG_ESCAPES = {"n": "\n", "t": "\t", "b": "\b", "\\": "\\", '"': '"'}
+
+
+def _read_text(path: Path) -> str | None:
+    """Read a small git metadata file, returning None if it cannot be read."""
+    try:
+        with path.open(encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _resolve_gitfile(path: Path) -> Path | None:
+    """Follow a ``.git`` file (``gitdir: <path>``) used by worktrees and submodules."""
+    content = _read_text(path)
+    if content is None or not content.startswith("gitdir:"):
+        return None
+    target = Path(content[len("gitdir:") :].strip())
+    if not target.is_absolute():
+        target = path.parent / target
+    return target if target.is_dir() else None
+
+
+def _is_git_dir(path: Path) -> bool:
+    """Check whether a directory looks like a git dir (bare or ``.git``)."""
+    return (path / "HEAD").is_file() and (path / "objects").is_dir() and (path / "refs").is_dir()
+
+
+def _is_object_name(value: str) -> bool:
+    """Check whether a value is a full SHA-1 or SHA-256 object name."""
+    return len(value) in (40, 64) and all(c in "0123456789abcdef" for c in value)
+
+
+def _parse_config_value(raw: str) -> str | None:
+    """Unquote a config value the way git does, or None for unsupported syntax."""
+    value = []
+    spaces = 0
+    quoted = False
+    chars = iter(raw)
+    for c in chars:
+        if not quoted and c in "#;":
+            break
+        if not quoted and c in " \t":
+            # Inner runs of whitespace are kept, leading and trailing ones dropped
+            if value:
+                spaces += 1
+            continue
+        value.append(" " * spaces)
+        spaces = 0
+        if c == '"':
+            quoted = not quoted
+        elif c == "\\":
+            escaped = _CONFIG_ESCAPES.get(next(chars, ""))
+            if escaped is None:
+                # Line continuations and invalid escapes
+                return None
+            value.append(escaped)
+        else:
+            value.append(c)
+    return None if quoted else "".join(value)
+
+
+def _parse_config(content: str, names: frozenset[str], values: dict[str, str]) -> bool:
+    """Collect the requested variables from one config file.
+
+    Args:
+        content: Text of the config file.
+        names: Lower-case ``section.key`` names to collect.
+        values: Mapping updated in place; later files override earlier ones.
+
+    Returns:
+        False if the file uses syntax that only git should interpret.
+    """
+    section = None
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+
+        if line[0] == "[":
+            header, bracket, rest = line[1:].partition("]")
+            if not bracket or rest.strip() and rest.strip()[0] not in "#;":
+                return False
+            name, quote, subsection = header.partition('"')
+            section = name.strip().lower()
+            if section in _INCLUDE_SECTIONS:
+                return False
+            if quote:
+                # Subsection names are case sensitive and never requested here
+                section += "." + subsection.rstrip('"')
+            continue
+
+        if section is None:
+            return False
+        key, equals, raw = line.partition("=")
+        name = f"{section}.{key.strip().lower()}"
+        if name not in names:
+            continue
+        value = _parse_config_value(raw) if equals else "true"
+        if value is None:
+            return False
+        values[name] = value
+    return True
+
+
+class RepoState:
+    """An operation in progress in a repository, read from its state files."""
+
+    __slots__ = ("operation", "head_name", "interactive")
+
+    def __init__(
+        self,
+        operation: str | None = None,
+        head_name: str | None = None,
+        interactive: bool = False,
+    ):
+        """Initialize the state.
+
+        Args:
+            operation: One of REPO_OPERATIONS, or None if nothing is in progress.
+            head_name: Full name of the ref a rebase or am started from.
+            interactive: Whether a rebase is interactive.
+        """
+        self.operation = operation
+        self.head_name = head_name
+        self.interactive = interactive
+
+    @property
+    def branch(self) -> str | None:
+        """The branch a rebase or am started from, if it started on one."""
+        if self.head_name and self.head_name.startswith("refs/heads/"):
+            return self.head_name[len("refs/heads/") :]
+        return None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RepoState):
+            return NotImplemented
+        return (self.operation, self.head_name, self.interactive) == (
+            other.operation,
+            other.head_name,
+            other.interactive,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.operation, self.head_name, self.interactive))
+
+    def __repr__(self) -> str:
+        return (
+            f"RepoState(operation={self.operation!r}, head_name={self.head_name!r}, "
+            f"interactive={self.interactive!r})"
+        )
+
+
+class StagedFile:
+    """A staged change, as listed by ``git diff --cached --name-status``."""
+
+    __slots__ = ("status", "path", "source", "score")
+
+    def __init__(
+        self,
+        status: str,
+        path: str,
+        source: str | None = None,
+        score: int | None = None,
+    ):
+        """Initialize the change.
+
+        Args:
+            status: Status letter, e.g. "A", "M", "D", or "R" and "C" for
+                    renames and copies.
+            path: Path of the file in the index.
+            source: Original path of a renamed or copied file.
+            score: Similarity percentage of a renamed or copied file.
+        """
+        self.status = status
+        self.path = path
+        self.source = source
+        self.score = score
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StagedFile):
+            return NotImplemented
+        return (self.status, self.path, self.source, self.score) == (
+            other.status,
+            other.path,
+            other.source,
+            other.score,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.status, self.path, self.source, self.score))
+
+    def __repr__(self) -> str:
+        return (
+            f"StagedFile(status={self.status!r}, path={self.path!r}, "
+            f"source={self.source!r}, score={self.score!r})"
+        )
+
 
 class GitOperations:
     """Handle Git-related operations."""
 
+    @staticmethod
+    def get_git_dir(cwd: Path | str | None = None, discover: bool = True) -> Path | None:
+        """Locate the git dir for a working directory without running git.
+
+        Honours ``$GIT_DIR`` and follows ``.git`` files, so linked worktrees and
+        submodules resolve to their own git dir.
+
+        Args:
+            cwd: Directory to start from (default: the current directory).
+            discover: Search cwd and its parents as git does. If False, only
+                check whether cwd itself is the root of a repository (or a bare
+                one), regardless of the environment.
+
+        Returns:
+            The git dir, or None if it could not be determined from the filesystem.
+        """
+        start = Path(cwd) if cwd is not None else Path.cwd()
+
+        env_git_dir = os.environ.get("GIT_DIR") if discover else None
+        if env_git_dir:
+            path = start / env_git_dir
+            if path.is_file():
+                return _resolve_gitfile(path)
+            return path if path.is_dir() else None
+
+        if discover and any(os.environ.get(name) for name in _UNSUPPORTED_DISCOVERY_ENV):
+            return None
+
+        for directory in (start, *start.parents) if discover else (start,):
+            dot_git = directory / ".git"
+            if dot_git.is_dir():
+                return dot_git
+            if dot_git.is_file():
+                return _resolve_gitfile(dot_git)
+            if _is_git_dir(directory):
+                return directory
+
+        return None
+
+    @staticmethod
+    def get_common_dir(git_dir: Path) -> Path:
+        """Get the common dir shared by all worktrees of a repository.
+
+        Args:
+            git_dir: The (possibly per-worktree) git dir.
+
+        Returns:
+            The common dir, which is ``git_dir`` itself outside linked worktrees.
+        """
+        env_common_dir = os.environ.get("GIT_COMMON_DIR")
+        if env_common_dir:
+            return Path(env_common_dir)
+
+        commondir = _read_text(git_dir / "commondir")
+        if commondir and commondir.strip():
+            path = Path(commondir.strip())
+            return path if path.is_absolute() else git_dir / path
+        return git_dir
+
+    @staticmethod
+    def _read_head_ref(git_dir: Path):
+        """Resolve HEAD to the full name of the ref it points at.
+
+        Args:
+            git_dir: The git dir holding HEAD.
+
+        Returns:
+            The full ref name, None for a detached HEAD, or ``_UNRESOLVED`` if the
+            layout is not recognized.
+        """
+        content = _read_text(git_dir / "HEAD")
+        if content is None:
+            return _UNRESOLVED
+
+        content = content.strip()
+        if not content.startswith("ref:"):
+            return None if _is_object_name(content) else _UNRESOLVED
+
+        common_dir = GitOperations.get_common_dir(git_dir)
+        refname = None
+        for _ in range(_MAX_SYMREF_DEPTH):
+            if not content.startswith("ref:"):
+                return refname if _is_object_name(content) else _UNRESOLVED
+
+            refname = content[len("ref:") :].strip()
+            # Reftable repositories keep a placeholder HEAD pointing at this name
+            if not refname.startswith("refs/") or refname == "refs/heads/.invalid":
+                return _UNRESOLVED
+
+            base = git_dir if refname.startswith(_PER_WORKTREE_REF_PREFIXES) else common_dir
+            ref_content = _read_text(base / refname)
+            if ref_content is None:
+                # Packed or unborn refs cannot be symbolic, so the chain ends here
+                return refname
+            content = ref_content.strip()
+
+        return _UNRESOLVED
+
+    @staticmethod
+    def _read_current_branch():
+        """Read the current branch name straight from the git dir.
+
+        Returns:
+            The short branch name, None if HEAD is detached, or ``_UNRESOLVED`` if
+            the repository layout is not recognized.
+        """
+        git_dir = GitOperations.get_git_dir()
+        if git_dir is None:
+            return _UNRESOLVED
+
+        refname = GitOperations._read_head_ref(git_dir)
+        if refname is None or refname is _UNRESOLVED:
+            return refname
+        if not refname.startswith("refs/heads/"):
+            # Shortening other namespaces needs git's ambiguity rules
+            return _UNRESOLVED
+        return refname[len("refs/heads/") :]
+
     @staticmethod
     def get_current_branch() -> str | None:
         """Get the current Git branch name.
 
+        HEAD is read from the filesystem; ``git symbolic-ref`` is only run when the
+        repository layout is not recognized.
+
         Returns:
             The branch name or None if in detached state or error.
         """
+        with trace.span("read_head"):
+            branch = GitOperations._read_current_branch()
+        if branch is not _UNRESOLVED:
+            if branch:
+                logger.debug(f"Current branch: {branch}")
+            else:
+                logger.debug("No branch detected (detached HEAD)")
+            return branch
+
+        logger.debug("Unrecognized repository layout, asking git for the branch")
         success, stdout, _ = run_command(["git", "symbolic-ref", "--short", "HEAD"])
 
         if success and stdout:
@@ -27,10 +388,147 @@ class GitOperations:
         logger.debug("No branch detected (possibly in detached HEAD state)")
         return None
 
+    @staticmethod
+    def get_repo_state() -> RepoState:
+        """Detect a rebase, am, merge, cherry-pick or revert in progress.
+
+        Only the state files in the git dir are checked, in the same order git
+        status uses, so this takes a few stat calls and never runs git.
+
+        Returns:
+            The operation in progress (operation is None if there is none or the
+            git dir cannot be found).
+        """
+        git_dir = GitOperations.get_git_dir()
+        if git_dir is None:
+            return RepoState()
+
+        with trace.span("repo_state"):
+            for name in ("rebase-merge", "rebase-apply"):
+                directory = git_dir / name
+                if not directory.is_dir():
+                    continue
+                head_name = (_read_text(directory / "head-name") or "").strip()
+                if name == "rebase-apply" and (directory / "applying").exists():
+                    operation = "am"
+                else:
+                    operation = "rebase"
+                return RepoState(
+                    operation,
+                    head_name if head_name.startswith("refs/") else None,
+                    interactive=(directory / "interactive").exists(),
+                )
+
+            if (git_dir / "MERGE_HEAD").is_file():
+                return RepoState("merge")
+            if (git_dir / "CHERRY_PICK_HEAD").is_file():
+                return RepoState("cherry-pick")
+            if (git_dir / "REVERT_HEAD").is_file():
+                return RepoState("revert")
+
+            # Between commits of a multi-commit cherry-pick or revert
+            todo = _read_text(git_dir / "sequencer" / "todo")
+            if todo:
+                command = todo.split(None, 1)[0] if todo.strip() else ""
+                if command in _SEQUENCER_COMMANDS:
+                    return RepoState(_SEQUENCER_COMMANDS[command])
+
+        return RepoState()
+
+    @staticmethod
+    def _config_files(git_dir: Path):
+        """List the config files git reads, lowest precedence first.
+
+        Args:
+            git_dir: The git dir of the repository.
+
+        Yields:
+            Paths of the system, global, repository and worktree config files.
+        """
+        if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+            yield Path(os.environ.get("GIT_CONFIG_SYSTEM") or "/etc/gitconfig")
+
+        global_config = os.environ.get("GIT_CONFIG_GLOBAL")
+        if global_config:
+            yield Path(global_config)
+        else:
+            xdg_config_home = os.environ.get("XDG_CONFIG_HOME")
+            home = os.environ.get("HOME")
+            if xdg_config_home:
+                yield Path(xdg_config_home) / "git" / "config"
+            elif home:
+                yield Path(home) / ".config" / "git" / "config"
+            if home:
+                yield Path(home) / ".gitconfig"
+
+        yield GitOperations.get_common_dir(git_dir) / "config"
+
+    @staticmethod
+    def _read_config(names: frozenset[str]):
+        """Read config variables straight from the config files.
+
+        Args:
+            names: Lower-case ``section.key`` names to read.
+
+        Returns:
+            Mapping of the variables that are set, or ``_UNRESOLVED`` if the
+            configuration needs git to be interpreted.
+        """
+        if any(os.environ.get(name) for name in _CONFIG_OVERRIDE_ENV):
+            return _UNRESOLVED
+
+        git_dir = GitOperations.get_git_dir()
+        if git_dir is None:
+            return _UNRESOLVED
+
+        values: dict[str, str] = {}
+        lookup = names | {"extensions.worktreeconfig"}
+        for path in GitOperations._config_files(git_dir):
+            content = _read_text(path)
+            if content is not None and not _parse_config(content, lookup, values):
+                return _UNRESOLVED
+
+        if values.pop("extensions.worktreeconfig", "false").lower() in ("true", "yes", "on", "1"):
+            content = _read_text(git_dir / "config.worktree")
+            if content is not None and not _parse_config(content, names, values):
+                return _UNRESOLVED
+        return values
+
+    @staticmethod
+    def get_config(names: Sequence[str]) -> dict[str, str]:
+        """Get the values of git config variables.
+
+        Plain config files are parsed in-process; ``git config`` is only run when
+        includes or ``git -c`` overrides are in effect.
+
+        Args:
+            names: Variable names such as ``core.commentChar``.
+
+        Returns:
+            Mapping of lower-case variable names to the values that are set.
+        """
+        wanted = frozenset(name.lower() for name in names)
+        with trace.span("read_config"):
+            values = GitOperations._read_config(wanted)
+        if values is not _UNRESOLVED:
+            return values
+
+        logger.debug("Configuration needs git to be interpreted, asking git")
+        pattern = "^(" + "|".join(name.replace(".", "\\.") for name in sorted(wanted)) + ")$"
+        success, stdout, _ = run_command(["git", "config", "--get-regexp", pattern])
+        values = {}
+        if success:
+            for line in stdout.splitlines():
+                name, _, value = line.partition(" ")
+                values[name.lower()] = value
+        return values
+
     @staticmethod
     def get_staged_files() -> list[str]:
         """Get list of staged files.
 
+        See iter_staged_files() for large changesets and unusual paths.
+
         Returns:
             List of staged file paths.
         """
@@ -43,6 +541,56 @@ class GitOperations:
 
         return []
 
+    @staticmethod
+    def iter_staged_files(
+        status: bool = False,
+        renames: bool = True,
+        timeout: float | None = None,
+        max_bytes: int | None = None,
+    ) -> Iterator[str] | Iterator[StagedFile]:
+        """Stream the staged files without holding the whole list in memory.
+
+        Paths come from ``git diff --cached -z``, so they are never quoted and may
+        contain newlines; undecodable bytes are kept as with ``os.fsdecode()``.
+
+        Args:
+            status: Yield StagedFile objects with the status and rename
+                    information instead of bare paths.
+            renames: Detect renames and copies (only used with status).
+            timeout: Optional timeout in seconds for the whole listing.
+            max_bytes: Optional limit on the bytes of git output read.
+
+        Yields:
+            Paths of the staged files, or StagedFile objects if status is True.
+
+        Raises:
+            CommandError: If git fails, times out or writes more than max_bytes.
+        """
+        command = ["git", "diff", "--cached", "-z"]
+        if not status:
+            command.append("--name-only")
+        else:
+            command += ["--name-status", "-M" if renames else "--no-renames"]
+        records = stream_command(
+            command,
+            separator="\0",
+            timeout=timeout,
+            max_bytes=max_bytes,
+            encoding=sys.getfilesystemencoding(),
+            errors=sys.getfilesystemencodeerrors(),
+        )
+        if not status:
+            yield from records
+            return
+
+        for code in records:
+            path = next(records)
+            if code[0] in "RC":
+                # Renames and copies list the source, then the destination
+                yield StagedFile(code[0], next(records), path, int(code[1:]))
+            else:
+                yield StagedFile(code[0], path)
+
     @staticmethod
     def get_commit_hash(short: bool = False) -> str | None:
         """Get the current commit hash.
@@ -70,3 +618,26 @@ class GitOperations:
         """
         success, stdout, _ = run_command(["git", "rev-parse", "--show-toplevel"])
         return stdout if success else None
+
+    @staticmethod
+    def gather(*queries: str) -> dict[str, object]:
+        """Answer several independent queries at once, running git concurrently.
+
+        A thin wrapper around ``AsyncGitOperations.gather()`` for code without an
+        event loop; it must not be called from a running one.
+
+        Args:
+            *queries: Query names such as "current_branch", "commit_hash",
+                      "repo_root" or "staged_files".
+
+        Returns:
+            Mapping of each query name to the result of the method of that name.
+
+        Raises:
+            ValueError: If a query name is unknown.
+        """
+        import asyncio
+
+        from pre_commit_jira_helper.git_async import AsyncGitOperations
+
+        return asyncio.run(AsyncGitOperations.gather(*queries))
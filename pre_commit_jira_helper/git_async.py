@@ -0,0 +1,102 @@
+"""Asyncio counterparts of the GitOperations queries that run git."""
+
+from __future__ import annotations
+
+import asyncio
+
+from pre_commit_jira_helper import trace
+from pre_commit_jira_helper.git import _UNRESOLVED, GitOperations
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.utils import run_command_async
+
+logger = get_logger("git_async")
+
+# Queries gather() accepts, each answered by the get_<name>() coroutine
+QUERIES = ("current_branch", "commit_hash", "repo_root", "staged_files")
+
+
+class AsyncGitOperations:
+    """Git queries as coroutines, so independent ones can run concurrently.
+
+    Results are the same as those of the GitOperations methods of the same name.
+    """
+
+    @staticmethod
+    async def get_current_branch() -> str | None:
+        """Get the current Git branch name.
+
+        HEAD is read from the filesystem; ``git symbolic-ref`` is only run when the
+        repository layout is not recognized.
+
+        Returns:
+            The branch name or None if in detached state or error.
+        """
+        with trace.span("read_head"):
+            branch = GitOperations._read_current_branch()
+        if branch is not _UNRESOLVED:
+            return branch
+
+        logger.debug("Unrecognized repository layout, asking git for the branch")
+        success, stdout, _ = await run_command_async(["git", "symbolic-ref", "--short", "HEAD"])
+        return stdout if success and stdout else None
+
+    @staticmethod
+    async def get_commit_hash(short: bool = False) -> str | None:
+        """Get the current commit hash.
+
+        Args:
+            short: Return short hash if True.
+
+        Returns:
+            The commit hash or None if error.
+        """
+        cmd = ["git", "rev-parse"]
+        if short:
+            cmd.append("--short")
+        cmd.append("HEAD")
+
+        success, stdout, _ = await run_command_async(cmd)
+        return stdout if success else None
+
+    @staticmethod
+    async def get_repo_root() -> str | None:
+        """Get the repository root directory.
+
+        Returns:
+            The repository root path or None if not in a git repo.
+        """
+        success, stdout, _ = await run_command_async(["git", "rev-parse", "--show-toplevel"])
+        return stdout if success else None
+
+    @staticmethod
+    async def get_staged_files() -> list[str]:
+        """Get list of staged files.
+
+        Returns:
+            List of staged file paths.
+        """
+        success, stdout, _ = await run_command_async(["git", "diff", "--cached", "--name-only"])
+        if success and stdout:
+            return stdout.split("\n")
+        return []
+
+    @staticmethod
+    async def gather(*queries: str) -> dict[str, object]:
+        """Run several queries concurrently.
+
+        Args:
+            *queries: Names from QUERIES, e.g. "repo_root" for get_repo_root().
+
+        Returns:
+            Mapping of each query name to its result.
+
+        Raises:
+            ValueError: If a query name is unknown.
+        """
+        unknown = [name for name in queries if name not in QUERIES]
+        if unknown:
+            raise ValueError(f"Unknown git queries: {', '.join(unknown)}")
+        results = await asyncio.gather(
+            *(getattr(AsyncGitOperations, f"get_{name}")() for name in queries)
+        )
+        return dict(zip(queries, results))
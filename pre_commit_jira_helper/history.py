@@ -0,0 +1,95 @@
+"""Stream commit messages out of git history."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.utils import CommandError, stream_command
+
+logger = get_logger("history")
+
+
+class HistoryError(Exception):
+    """Raised when the history cannot be read."""
+
+
+def iter_commit_messages(
+    revisions: Sequence[str],
+    skip_merges: bool = False,
+    cwd: str | Path | None = None,
+    native: bool = False,
+) -> Iterator[tuple[str, str]]:
+    """Yield the ID and message of every commit in a revision range.
+
+    A single ``git log -z`` is streamed and split on the fly, so memory use does
+    not depend on the size of the range. Closing the generator early stops git.
+
+    Args:
+        revisions: Arguments selecting the commits, e.g. ``["main..HEAD"]``.
+        skip_merges: Leave out merge commits.
+        cwd: Repository to read (default: the current directory).
+        native: Read the object database in-process instead of running git,
+            falling back to git when the repository or revisions need it.
+
+    Yields:
+        Tuples of (commit ID, raw commit message).
+
+    Raises:
+        HistoryError: If git cannot list the commits.
+    """
+    if native:
+        from pre_commit_jira_helper.objects import UnsupportedRepository, open_walk
+
+        try:
+            walk = open_walk(revisions, cwd)
+        except UnsupportedRepository as e:
+            logger.debug(f"Reading history with git log: {e}")
+        else:
+            yield from walk.messages(skip_merges)
+            return
+
+    command = ["git", "log", "-z", "--format=%H%n%B"]
+    if skip_merges:
+        command.append("--no-merges")
+    command.extend([*revisions, "--"])
+
+    try:
+        for record in stream_command(command, separator="\0", cwd=cwd):
+            yield _parse_record(record)
+    except CommandError as e:
+        raise HistoryError(str(e)) from e
+
+
+def iter_messages_of(
+    commits: Sequence[str], cwd: str | Path | None = None
+) -> Iterator[tuple[str, str]]:
+    """Yield the ID and message of the given commits, without walking their history.
+
+    Args:
+        commits: Full commit IDs.
+        cwd: Repository to read (default: the current directory).
+
+    Yields:
+        Tuples of (commit ID, raw commit message), in the order of commits.
+
+    Raises:
+        HistoryError: If a commit cannot be read.
+    """
+    # Checking every full ID for a ref of the same name costs git more than
+    # reading the commit
+    command = ["git", "-c", "core.warnAmbiguousRefs=false", "log", "-z", "--format=%H%n%B"]
+    command.extend(["--no-walk=unsorted", *commits, "--"])
+
+    try:
+        for record in stream_command(command, separator="\0", cwd=cwd):
+            yield _parse_record(record)
+    except CommandError as e:
+        raise HistoryError(str(e)) from e
+
+
+def _parse_record(record: str) -> tuple[str, str]:
+    """Split one ``%H%n%B`` record into the commit ID and message."""
+    commit, _, message = record.partition("\n")
+    return commit, message
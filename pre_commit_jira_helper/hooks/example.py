@@ -16,14 +16,20 @@ class ExamplePrefixHook(CommitMessageHook):
     This demonstrates how easy it is to create new hooks.
     """
 
-    def __init__(self, debug: bool = False, prefix: str = "[COMMIT]"):
+    def __init__(
+        self,
+        debug: bool = False,
+        prefix: str = "[COMMIT]",
+        skip_during: list[str] | None = None,
+    ):
         """Initialize the example hook.
 
         Args:
             debug: Enable debug logging.
             prefix: Custom prefix to add.
+            skip_during: Operations during which the hook does nothing.
         """
-        super().__init__(debug=debug)
+        super().__init__(debug=debug, skip_during=skip_during)
         self.prefix = prefix
 
     def should_run(self, commit_msg_filepath: Path | str) -> bool:
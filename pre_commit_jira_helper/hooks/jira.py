@@ -5,12 +5,30 @@ from __future__ import annotations
 import re
 from pathlib import Path
 
+from pre_commit_jira_helper import trace
 from pre_commit_jira_helper.base import CommitMessageHook
 from pre_commit_jira_helper.git import GitOperations
 from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.matcher import (
+    DEFAULT_ISSUE_PATTERN,
+    DEFAULT_TRACKER,
+    IssueMatcher,
+    TrackerMatcher,
+)
+
+# Avoids importing typing at startup; type checkers treat the name specially
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pre_commit_jira_helper.matcher import Tracker
+    from pre_commit_jira_helper.snapshot import Snapshot
 
 logger = get_logger("hooks.jira")
 
+# How an owners file is used: "infer" prepends the keys of the projects owning
+# the staged files when the branch names no issue, "restrict" only keeps branch
+# issues of those projects
+OWNERS_MODES = ("infer", "restrict")
+
 
 class JiraIssuePrependHook(CommitMessageHook):
     """Hook to prepend Jira issue from branch name to commit message."""
@@ -21,6 +39,13 @@ class JiraIssuePrependHook(CommitMessageHook):
         issue_pattern: str | None = None,
         separator: str = ": ",
         allowed_prefixes: list[str] | None = None,
+        skip_during: list[str] | None = None,
+        owners_file: Path | str | None = None,
+        owners_mode: str = "infer",
+        jira_url: str | None = None,
+        validation_budget: float | None = None,
+        snapshot_file: Path | str | None = None,
+        trackers: list[Tracker] | None = None,
     ):
         """Initialize the Jira hook.
 
@@ -31,11 +56,38 @@ class JiraIssuePrependHook(CommitMessageHook):
             allowed_prefixes: List of allowed Jira project prefixes (e.g., ['ABC', 'DEF']).
                              If provided, only issues with these prefixes will be processed.
                              If None, all issues matching the pattern will be extracted.
+            skip_during: Operations during which the hook does nothing.
+            owners_file: File mapping paths to the Jira projects that own them.
+            owners_mode: One of OWNERS_MODES.
+            jira_url: Base URL of the Jira site to check that issues exist in.
+            validation_budget: Seconds the check may take before only cached
+                               answers are used.
+            snapshot_file: Snapshot written by ``jira-helper sync`` to check issues
+                           against before asking Jira (default: the snapshot of
+                           jira_url, if there is one).
+            trackers: Issue trackers to take keys from, all found in one scan. When
+                      given, they replace issue_pattern and allowed_prefixes for
+                      matching, and the owners file and Jira checks only apply to
+                      the keys of the DEFAULT_TRACKER tracker.
         """
-        super().__init__(debug=debug)
-        self.issue_pattern = issue_pattern or r"[A-Z][A-Z0-9_]*-\d+"
+        super().__init__(debug=debug, skip_during=skip_during)
+        self.issue_pattern = issue_pattern or DEFAULT_ISSUE_PATTERN
         self.separator = separator
         self.allowed_prefixes = allowed_prefixes
+        self.trackers = trackers
+        if trackers:
+            self.matcher = TrackerMatcher(trackers)
+        else:
+            self.matcher = IssueMatcher(self.issue_pattern, allowed_prefixes)
+        self.owners_file = owners_file
+        self.owners_mode = owners_mode
+        self.jira_url = jira_url
+        self.validation_budget = validation_budget
+        self.snapshot_file = snapshot_file
+        self._validator = None
+        self._credentials = None
+        # Tracker of each branch issue of the current run
+        self._branch_trackers: dict[str, str] = {}
         self.git = GitOperations()
 
     def extract_jira_issues(self, content: str) -> list[str]:
@@ -47,36 +99,156 @@ class JiraIssuePrependHook(CommitMessageHook):
         Returns:
             List of valid Jira issues found.
         """
-        # Find all matches using the issue pattern
-        matches = re.findall(self.issue_pattern, content)
+        return [issue for issue, _ in self.extract_issues_with_origin(content)]
+
+    def extract_issues_with_origin(self, content: str) -> list[tuple[str, str]]:
+        """Extract all issues from content, with the tracker each was found for.
 
-        if not matches:
+        Args:
+            content: The text to search for issues.
+
+        Returns:
+            Tuples of (issue key, tracker name) for the valid issues found.
+        """
+        with trace.span("extract"):
+            found = self.matcher.findall_with_origin(content)
+
+        if found:
+            logger.debug(f"Found Jira issues: {[issue for issue, _ in found]}")
+        else:
             logger.debug(f"No Jira issues found in: {content[:50]}...")
+
+        return found
+
+    def find_new_issues(self, message: str, branch_issues: list[str]) -> list[str]:
+        """Find the branch issues that are not yet mentioned in a commit message.
+
+        Keys that a tracker template rewrites, such as ``org/repo#12`` for
+        ``gh-12``, are no longer matched by the tracker's pattern once
+        prepended, so they also count as mentioned if their text appears.
+
+        Args:
+            message: The commit message.
+            branch_issues: Issues extracted from the branch name.
+
+        Returns:
+            Branch issues missing from the message, in branch order.
+        """
+        existing_issues = self.extract_jira_issues(message)
+        new_issues = [issue for issue in branch_issues if issue not in existing_issues]
+        if new_issues and any(t.template != "{key}" for t in self.trackers or ()):
+            new_issues = [
+                issue
+                for issue in new_issues
+                if not re.search(rf"(?<!\w){re.escape(issue)}(?!\w)", message)
+            ]
+        return new_issues
+
+    def prepend_issues(self, message: str, issues: list[str]) -> str:
+        """Prepend issues to a commit message.
+
+        Args:
+            message: The commit message.
+            issues: Issues to prepend.
+
+        Returns:
+            The updated commit message.
+        """
+        return f"{', '.join(issues)}{self.separator} {message}"
+
+    def get_owning_projects(self) -> list[str]:
+        """Get the projects owning the staged files, according to the owners file.
+
+        Returns:
+            Project keys, sorted and limited to the allowed prefixes; empty if
+            there is no owners file or it cannot be used.
+        """
+        if not self.owners_file:
             return []
 
-        valid_issues = []
+        from pre_commit_jira_helper.ownership import load_project_map
+        from pre_commit_jira_helper.utils import CommandError
 
-        # If no prefix filter, return all matches
-        if not self.allowed_prefixes:
-            valid_issues = matches
-            logger.debug(f"Found {len(matches)} Jira issues (no prefix filter): {matches}")
-        else:
-            # Filter by allowed prefixes
-            for issue in matches:
-                issue_prefix = issue.split("-")[0]
-                if issue_prefix in self.allowed_prefixes:
-                    valid_issues.append(issue)
-                    logger.debug(f"Issue {issue} prefix '{issue_prefix}' is allowed")
-                else:
-                    logger.debug(
-                        f"Issue {issue} prefix '{issue_prefix}' not in allowed prefixes: "
-                        f"{self.allowed_prefixes}"
-                    )
-
-        if valid_issues:
-            logger.debug(f"Final valid issues: {valid_issues}")
-
-        return valid_issues
+        try:
+            with trace.span("owners"):
+                project_map = load_project_map(self.owners_file, self.git.get_git_dir())
+                projects = project_map.projects(self.git.iter_staged_files())
+        except (OSError, ValueError, CommandError) as e:
+            logger.warning(f"Cannot determine the projects owning the staged files: {e}")
+            return []
+
+        if self.allowed_prefixes:
+            projects = [project for project in projects if project in self.allowed_prefixes]
+        logger.debug(f"Staged files are owned by: {projects}")
+        return projects
+
+    def is_jira_issue(self, issue: str) -> bool:
+        """Check whether a branch issue was found for the Jira tracker.
+
+        Args:
+            issue: An issue key found in the branch name by should_run().
+
+        Returns:
+            True for Jira keys, False for keys of other trackers.
+        """
+        return self._branch_trackers.get(issue, DEFAULT_TRACKER) == DEFAULT_TRACKER
+
+    def find_missing_issues(self, issues: list[str]) -> list[str]:
+        """Find the issues that do not exist in Jira.
+
+        Issues are looked up in the snapshot first; only those it cannot answer
+        for are checked with Jira.
+
+        Args:
+            issues: Issue keys to check.
+
+        Returns:
+            The keys known not to exist; empty if validation is disabled.
+        """
+        if not issues or not (self.jira_url or self.snapshot_file):
+            return []
+        missing = []
+        snapshot = self.load_snapshot()
+        if snapshot is not None:
+            with trace.span("snapshot", issues=len(issues)):
+                answers = {issue: snapshot.lookup(issue) for issue in issues}
+            missing = [issue for issue in issues if answers[issue] is False]
+            issues = [issue for issue in issues if answers[issue] is None]
+        if not self.jira_url or not issues:
+            return missing
+        from pre_commit_jira_helper.validation import env_credentials
+
+        # Read for every run, as the daemon reuses hooks across environments
+        credentials = env_credentials()
+        if self._validator is None or self._credentials != credentials:
+            from pre_commit_jira_helper.validation import DEFAULT_BUDGET, IssueValidator
+
+            budget = self.validation_budget
+            self._validator = IssueValidator(
+                self.jira_url, DEFAULT_BUDGET if budget is None else budget, **credentials
+            )
+            self._credentials = credentials
+        with trace.span("validate", issues=len(issues)):
+            return missing + self._validator.find_missing(issues)
+
+    def load_snapshot(self) -> Snapshot | None:
+        """Map the snapshot of the Jira site.
+
+        Returns:
+            The Snapshot, or None if there is none or it cannot be read.
+        """
+        from pre_commit_jira_helper.snapshot import default_snapshot_path, load_snapshot
+
+        path = self.snapshot_file
+        if path is None:
+            path = default_snapshot_path(self.jira_url)
+            if not path.exists():
+                return None
+        try:
+            return load_snapshot(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot read the Jira snapshot: {e}")
+            return None
 
     def should_run(self, commit_msg_filepath: Path | str) -> bool:
         """Check if the hook should run.
@@ -87,14 +259,35 @@ class JiraIssuePrependHook(CommitMessageHook):
         Returns:
             True if hook should run, False otherwise.
         """
-        # Get branch name
+        # Get branch name, or the branch being rebased while HEAD is detached
         branch_name = self.git.get_current_branch()
         if not branch_name:
+            branch_name = self.get_repo_state().branch
+            if branch_name:
+                logger.debug(f"Using branch {branch_name} from the rebase in progress")
+        infer = self.owners_file and self.owners_mode == "infer"
+        if not branch_name and not infer:
             logger.debug("No branch name found, skipping")
             return False
 
         # Check for Jira issues in branch
-        self.branch_issues = self.extract_jira_issues(branch_name)
+        found = self.extract_issues_with_origin(branch_name) if branch_name else []
+        self.branch_issues = [issue for issue, _ in found]
+        self._branch_trackers = dict(found)
+        if self.branch_issues and self.owners_file and self.owners_mode == "restrict":
+            projects = self.get_owning_projects()
+            if projects:
+                self.branch_issues = [
+                    issue
+                    for issue in self.branch_issues
+                    if not self.is_jira_issue(issue) or issue.split("-", 1)[0] in projects
+                ]
+                logger.debug(f"Branch issues of the owning projects: {self.branch_issues}")
+
+        project_keys = False
+        if not self.branch_issues and infer:
+            self.branch_issues = self.get_owning_projects()
+            project_keys = True
         if not self.branch_issues:
             logger.debug("No valid Jira issues in branch name, skipping")
             return False
@@ -106,8 +299,15 @@ class JiraIssuePrependHook(CommitMessageHook):
             return False
 
         # Check if any of the branch issues already exist in the commit message
-        existing_issues = self.extract_jira_issues(self.commit_msg)
-        new_issues = [issue for issue in self.branch_issues if issue not in existing_issues]
+        if project_keys:
+            # A project key counts as present on its own or as part of an issue key
+            new_issues = [
+                key
+                for key in self.branch_issues
+                if not re.search(rf"\b{re.escape(key)}\b", self.commit_msg)
+            ]
+        else:
+            new_issues = self.find_new_issues(self.commit_msg, self.branch_issues)
 
         if not new_issues:
             logger.debug(
@@ -115,6 +315,16 @@ class JiraIssuePrependHook(CommitMessageHook):
             )
             return False
 
+        if not project_keys:
+            missing = self.find_missing_issues(
+                [issue for issue in new_issues if self.is_jira_issue(issue)]
+            )
+            if missing:
+                logger.warning(f"Not prepending issues that do not exist in Jira: {missing}")
+                new_issues = [issue for issue in new_issues if issue not in missing]
+                if not new_issues:
+                    return False
+
         # Store only the new issues that need to be added
         self.new_issues = new_issues
         return True
@@ -129,9 +339,8 @@ class JiraIssuePrependHook(CommitMessageHook):
             True if processing was successful.
         """
         # Prepend all new issues to message
-        issues_str = ", ".join(self.new_issues)
-        new_message = f"{issues_str}{self.separator} {self.commit_msg}"
-        logger.info(f"Prepending issues ({issues_str}) to commit message")
+        new_message = self.prepend_issues(self.commit_msg, self.new_issues)
+        logger.info(f"Prepending issues ({', '.join(self.new_issues)}) to commit message")
 
         # Write updated message
         self.write_commit_message(commit_msg_filepath, new_message)
@@ -0,0 +1,589 @@
+"""Precompiled issue key matching."""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from pre_commit_jira_helper.logger import get_logger
+
+logger = get_logger("matcher")
+
+DEFAULT_ISSUE_PATTERN = r"[A-Z][A-Z0-9_]*-\d+"
+
+# Name of the tracker the Jira-specific features (owners, validation) apply to
+DEFAULT_TRACKER = "jira"
+
+# Classes of bytes in keys of the default pattern: 2 for capitals, 1 for the
+# other characters allowed before the hyphen, 0 for the rest
+_KEY_CLASSES = bytes(
+    2 if 65 <= byte <= 90 else 1 if 48 <= byte <= 57 or byte == 95 else 0 for byte in range(256)
+)
+# Below this length the regex engine is faster than scanning in Python
+_SCAN_MIN_LENGTH = 256
+# Each hyphen costs the scan about as much as the regex engine spends on this
+# many bytes of text; every _DENSE_CHECK hyphens, the scan hands the rest of a
+# text with denser hyphens over to the regex engine
+_HYPHEN_SPACING = 96
+_DENSE_CHECK = 256
+_non_ascii_digit: re.Pattern | None = None
+
+# Seconds a custom pattern may spend on one text before the default is used
+MATCH_TIME_LIMIT = 1.0
+
+
+def scan_issue_keys(content: str) -> list[str] | None:
+    """Find the keys matching DEFAULT_ISSUE_PATTERN without the regex engine.
+
+    A key always contains a hyphen followed by a digit, so the scan jumps
+    between hyphens with bytes.find() and only looks around those followed by
+    a digit: back to the first capital of the run of key characters before
+    the hyphen, and forward over the digits. This gives the same keys as
+    re.findall() with the pattern, in the same order. Texts dense in hyphens
+    are faster to search with the regex engine, which then takes over.
+
+    Args:
+        content: The text to search.
+
+    Returns:
+        The keys, or None if the text contains decimal digits outside ASCII,
+        which ``\\d`` also matches and the scan does not handle.
+    """
+    global _non_ascii_digit
+
+    if not content.isascii():
+        if _non_ascii_digit is None:
+            _non_ascii_digit = re.compile(r"(?![0-9])\d")
+        if _non_ascii_digit.search(content):
+            return None
+    # Non-ASCII characters become bytes of class 0; the NUL stops the digit loop
+    data = content.encode("utf-8", "surrogatepass") + b"\0"
+    classes = _KEY_CLASSES
+    find = data.find
+    keys = []
+    end = checkpoint = 0
+    countdown = _DENSE_CHECK
+    hyphen = find(45)
+    while hyphen >= 0:
+        countdown -= 1
+        if not countdown:
+            if hyphen - checkpoint < _DENSE_CHECK * _HYPHEN_SPACING:
+                break
+            countdown, checkpoint = _DENSE_CHECK, hyphen
+        stop = hyphen + 1
+        if 48 <= data[stop] <= 57:
+            # Like the regex, start at the first capital of the run before the
+            # hyphen that is not part of the previous key
+            first = -1
+            start = hyphen
+            while start > end and classes[data[start - 1]]:
+                start -= 1
+                if classes[data[start]] == 2:
+                    first = start
+            if first >= 0:
+                stop += 1
+                while 48 <= data[stop] <= 57:
+                    stop += 1
+                keys.append(data[first:stop].decode("ascii"))
+                end = stop
+        hyphen = find(45, stop)
+    else:
+        return keys
+
+    # Resume where the last key ended, as re.findall() would
+    if len(data) != len(content) + 1:
+        end = len(data[:end].decode("utf-8", "surrogatepass"))
+    keys += re.compile(DEFAULT_ISSUE_PATTERN).findall(content, end)
+    return keys
+
+
+class _MatchTimeout(Exception):
+    """Raised when a custom pattern runs out of time."""
+
+
+@contextmanager
+def _alarm(seconds: float) -> Iterator[None]:
+    """Interrupt the block with _MatchTimeout after some time.
+
+    Only possible on the main thread, where signals are delivered; elsewhere the
+    block runs unbounded and callers rely on checking a deadline between
+    matches.
+
+    Args:
+        seconds: Time limit.
+
+    Yields:
+        Nothing.
+    """
+    import signal
+
+    if (
+        not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def expire(*_args) -> None:
+        raise _MatchTimeout
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class IssueMatcher:
+    """Find issue keys in text, optionally restricted to allowed project prefixes.
+
+    The pattern is compiled once and the allowed prefixes are kept in a set, so
+    matching and filtering is a single pass over the text regardless of how many
+    prefixes are allowed. findall() finds keys of the default pattern in long
+    texts with scan_issue_keys() rather than the regex engine.
+
+    A custom pattern could backtrack catastrophically and hang the commit, so it
+    is checked for risky shapes up front and matched within time_limit; in
+    either case the default pattern is used instead. The whole text is matched
+    at once, so anchors, word boundaries and lookarounds behave as with re.
+    Off the main thread, where a match in progress cannot be interrupted, the
+    limit is only checked between matches.
+    """
+
+    def __init__(
+        self,
+        pattern: str | None = None,
+        allowed_prefixes: Iterable[str] | None = None,
+        time_limit: float = MATCH_TIME_LIMIT,
+    ):
+        """Initialize the matcher.
+
+        Args:
+            pattern: Regex pattern for issue keys (default: DEFAULT_ISSUE_PATTERN).
+            allowed_prefixes: Allowed project prefixes. If empty or None, every match
+                              is accepted.
+            time_limit: Seconds a custom pattern may take on one text.
+
+        Raises:
+            re.error: If the pattern is invalid.
+        """
+        self.pattern = pattern or DEFAULT_ISSUE_PATTERN
+        self.regex = re.compile(self.pattern)
+        self.allowed_prefixes = frozenset(allowed_prefixes) if allowed_prefixes else None
+        self.time_limit = time_limit
+        self._group = 1 if self.regex.groups == 1 else 0
+        self.guarded = self.pattern != DEFAULT_ISSUE_PATTERN
+        if self.guarded:
+            from pre_commit_jira_helper.backtracking import find_backtracking_risk
+
+            risk = find_backtracking_risk(self.pattern)
+            if risk:
+                self._fall_back(f"it has {risk}, which can make matching hang")
+
+    def _fall_back(self, reason: str) -> None:
+        """Switch to the default pattern.
+
+        Args:
+            reason: Why the custom pattern is not used, for the diagnostic.
+        """
+        logger.warning(
+            f"Not using the issue pattern {self.pattern!r}: {reason}. "
+            f"Using the default pattern {DEFAULT_ISSUE_PATTERN!r} instead."
+        )
+        self.pattern = DEFAULT_ISSUE_PATTERN
+        self.regex = re.compile(self.pattern)
+        self._group = 0
+        self.guarded = False
+
+    def _issue(self, match: re.Match) -> tuple[str, str] | None:
+        """Get the issue key of a match of a custom pattern.
+
+        Args:
+            match: A match of the pattern.
+
+        Returns:
+            Tuple of (issue key, tracker name), or None if the match is to be
+            ignored.
+        """
+        # Like findall(), report the group rather than the whole match for a
+        # pattern with a single capturing group
+        return match.group(self._group), DEFAULT_TRACKER
+
+    def _guarded_matches(self, content: str, first: bool) -> list[tuple[str, str]]:
+        """Match a custom pattern within the time limit.
+
+        Args:
+            content: The text to search.
+            first: Stop at the first allowed match.
+
+        Returns:
+            Tuples of (issue key, tracker name), before prefix filtering unless
+            first is set.
+
+        Raises:
+            _MatchTimeout: If the time limit is exceeded.
+        """
+        allowed = self.allowed_prefixes
+        deadline = time.monotonic() + self.time_limit
+        issues = []
+        with _alarm(self.time_limit):
+            for match in self.regex.finditer(content):
+                if time.monotonic() > deadline:
+                    raise _MatchTimeout
+                found = self._issue(match)
+                if found is None:
+                    continue
+                if not first:
+                    issues.append(found)
+                elif allowed is None or found[0].split("-", 1)[0] in allowed:
+                    return [found]
+        return issues
+
+    def _matches(self, content: str, first: bool = False) -> list[tuple[str, str]] | None:
+        """Match a custom pattern, falling back to the default if it runs out of time.
+
+        Args:
+            content: The text to search.
+            first: Stop at the first allowed match.
+
+        Returns:
+            Tuples of (issue key, tracker name), or None once the default
+            pattern is in use.
+        """
+        try:
+            return self._guarded_matches(content, first)
+        except _MatchTimeout:
+            self._fall_back(
+                f"matching it took more than {self.time_limit:g}s on {len(content)} characters"
+            )
+            return None
+
+    def findall(self, content: str) -> list[str]:
+        """Find all allowed issue keys in content.
+
+        Args:
+            content: The text to search.
+
+        Returns:
+            Matched issue keys in order of appearance.
+        """
+        if self.guarded:
+            return [issue for issue, _ in self.findall_with_origin(content)]
+        matches = None
+        if len(content) >= _SCAN_MIN_LENGTH and self.pattern == DEFAULT_ISSUE_PATTERN:
+            matches = scan_issue_keys(content)
+        if matches is None:
+            matches = self.regex.findall(content)
+        return self._allowed(matches)
+
+    def findall_with_origin(self, content: str) -> list[tuple[str, str]]:
+        """Find all allowed issue keys in content, with the tracker of each.
+
+        Args:
+            content: The text to search.
+
+        Returns:
+            Tuples of (issue key, tracker name) in order of appearance.
+        """
+        matches = self._matches(content) if self.guarded else None
+        if matches is None:
+            return [(issue, DEFAULT_TRACKER) for issue in self.findall(content)]
+        if self.allowed_prefixes is None:
+            return matches
+        valid = set(self._allowed([issue for issue, _ in matches]))
+        return [match for match in matches if match[0] in valid]
+
+    def _allowed(self, matches: list[str]) -> list[str]:
+        """Keep the issue keys with an allowed prefix.
+
+        Args:
+            matches: Matched issue keys.
+
+        Returns:
+            The allowed keys, in the same order.
+        """
+        if self.allowed_prefixes is None or not matches:
+            return matches
+
+        allowed = self.allowed_prefixes
+        valid = [issue for issue in matches if issue.split("-", 1)[0] in allowed]
+
+        if logger.isEnabledFor(logging.DEBUG) and len(valid) != len(matches):
+            rejected = [issue for issue in matches if issue not in valid]
+            logger.debug(f"Issues with prefixes outside the allowed set: {rejected}")
+
+        return valid
+
+    def search(self, content: str) -> str | None:
+        """Find the first allowed issue key in content.
+
+        Stops at the first allowed match, which makes it cheaper than findall()
+        when only the presence of an issue matters.
+
+        Args:
+            content: The text to search.
+
+        Returns:
+            The first allowed issue key, or None if there is none.
+        """
+        if self.guarded:
+            matches = self._matches(content, first=True)
+            if matches is not None:
+                return matches[0][0] if matches else None
+
+        group = self._group
+        allowed = self.allowed_prefixes
+        for match in self.regex.finditer(content):
+            issue = match.group(group)
+            if allowed is None or issue.split("-", 1)[0] in allowed:
+                return issue
+        return None
+
+
+def _first_chars(pattern: str) -> str | None:
+    """Get a character class body matching the first character of any match.
+
+    Args:
+        pattern: Regex pattern.
+
+    Returns:
+        The body of a class such as ``A-Z#`` (possibly matching more than the
+        pattern can start with), or None if it cannot be determined simply.
+    """
+    from pre_commit_jira_helper.backtracking import sre_constants, sre_parse
+
+    categories = {
+        "DIGIT": r"\d",
+        "NOT_DIGIT": r"\D",
+        "SPACE": r"\s",
+        "NOT_SPACE": r"\S",
+        "WORD": r"\w",
+        "NOT_WORD": r"\W",
+    }
+
+    def first(items) -> list[str] | None:
+        for op, av in items:
+            if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                # Zero-width: the first character is that of the next item
+                continue
+            if op is sre_constants.LITERAL:
+                return [re.escape(chr(av))]
+            if op is sre_constants.IN:
+                chars = []
+                for item_op, item_av in av:
+                    if item_op is sre_constants.LITERAL:
+                        chars.append(re.escape(chr(item_av)))
+                    elif item_op is sre_constants.RANGE:
+                        chars.append(f"{re.escape(chr(item_av[0]))}-{re.escape(chr(item_av[1]))}")
+                    elif item_op is sre_constants.CATEGORY:
+                        name = str(item_av).replace("CATEGORY_", "").replace("UNI_", "")
+                        if name not in categories:
+                            return None
+                        chars.append(categories[name])
+                    else:
+                        return None
+                return chars
+            if op is sre_constants.SUBPATTERN:
+                # Scoped flags such as (?i:...) change what the characters match
+                if av[1] or av[2] or not av[-1].getwidth()[0]:
+                    return None
+                return first(av[-1])
+            if op is sre_constants.BRANCH:
+                chars = []
+                for branch in av[1]:
+                    found = first(branch)
+                    if found is None:
+                        return None
+                    chars.extend(found)
+                return chars
+            if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0]:
+                return first(av[2])
+            return None
+        return None
+
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & (sre_constants.SRE_FLAG_IGNORECASE | sre_constants.SRE_FLAG_LOCALE):
+        return None
+    chars = first(parsed)
+    return "".join(chars) if chars else None
+
+
+def key_prefix(key: str) -> str:
+    """Get the prefix of an issue key.
+
+    Args:
+        key: Issue key, e.g. ``ABC-12``, ``CHG0012345`` or ``#12``.
+
+    Returns:
+        The part before the first hyphen, or the key without its trailing
+        digits if it has no hyphen: ``ABC``, ``CHG`` or ``#``.
+    """
+    prefix, hyphen, _ = key.partition("-")
+    return prefix if hyphen else key.rstrip("0123456789")
+
+
+class Tracker:
+    """An issue tracker whose keys are looked for in branches and messages."""
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str | None = None,
+        prefixes: Iterable[str] | None = None,
+        template: str = "{key}",
+    ):
+        """Initialize the tracker.
+
+        Args:
+            name: Tracker name; DEFAULT_TRACKER for Jira.
+            pattern: Regex pattern for its keys (default: DEFAULT_ISSUE_PATTERN). A
+                     single capturing group selects the key within the match.
+            prefixes: Allowed key prefixes, as returned by key_prefix(). If empty
+                      or None, every key is accepted.
+            template: How keys are written, with ``{key}`` standing for the
+                      matched key, e.g. ``org/repo{key}`` for GitHub issues.
+        """
+        self.name = name
+        self.pattern = pattern or DEFAULT_ISSUE_PATTERN
+        self.prefixes = frozenset(prefixes) if prefixes else None
+        self.template = template
+
+    def __repr__(self) -> str:
+        return f"Tracker({self.name!r}, {self.pattern!r})"
+
+    def render(self, key: str) -> str:
+        """Write a key the way this tracker's keys are written.
+
+        Args:
+            key: A matched key.
+
+        Returns:
+            The key filled into the template.
+        """
+        return key if self.template == "{key}" else self.template.format(key=key)
+
+
+class TrackerMatcher(IssueMatcher):
+    """Find the keys of several issue trackers in one scan of the text.
+
+    The tracker patterns are compiled into a single alternation, each
+    alternative ending with an empty named group, and each match is attributed
+    to its tracker by ``lastgroup``, so adding trackers does not add passes
+    over the text. Prefix filters and
+    templates are applied per tracker after the scan.
+
+    Patterns are matched like custom patterns of IssueMatcher: a tracker whose
+    pattern may backtrack catastrophically is left out, and if matching runs out
+    of time only the keys of the first tracker using the default pattern are
+    looked for, or none if no tracker uses it. Numbered back
+    references are not supported, as groups are renumbered in the alternation.
+    """
+
+    def __init__(self, trackers: Iterable[Tracker], time_limit: float = MATCH_TIME_LIMIT):
+        """Initialize the matcher.
+
+        Args:
+            trackers: Trackers in order of precedence: where several patterns
+                      match at the same position, the first tracker wins.
+            time_limit: Seconds matching may take on one text.
+
+        Raises:
+            re.error: If a pattern is invalid.
+        """
+        from pre_commit_jira_helper.backtracking import find_backtracking_risk
+
+        self.trackers = []
+        for tracker in trackers:
+            re.compile(tracker.pattern)
+            risk = (
+                find_backtracking_risk(tracker.pattern)
+                if tracker.pattern != DEFAULT_ISSUE_PATTERN
+                else None
+            )
+            if risk:
+                logger.warning(
+                    f"Not using the {tracker.name} pattern {tracker.pattern!r}: "
+                    f"it has {risk}, which can make matching hang."
+                )
+            else:
+                self.trackers.append(tracker)
+
+        # Each tracker's pattern is followed by an empty group "t<index>", the
+        # last group to close when the pattern matches
+        parts = []
+        self._dispatch = {}
+        number = 1
+        for index, tracker in enumerate(self.trackers):
+            name = f"t{index}"
+            inner = re.compile(tracker.pattern).groups
+            parts.append(f"(?:{tracker.pattern})(?P<{name}>)")
+            self._dispatch[name] = (tracker, number if inner == 1 else 0)
+            number += inner + 1
+
+        self.pattern = "|".join(parts) or DEFAULT_ISSUE_PATTERN
+        # The engine tries every alternative at every position of the text;
+        # looking ahead for a possible first character first makes the cost
+        # of a position without a key independent of the number of trackers
+        firsts = [_first_chars(tracker.pattern) for tracker in self.trackers]
+        if len(parts) > 1 and None not in firsts:
+            self.pattern = f"(?=[{''.join(firsts)}])(?:{self.pattern})"
+        self.regex = re.compile(self.pattern)
+        self.allowed_prefixes = None
+        self.time_limit = time_limit
+        self._group = 0
+        self.guarded = bool(parts)
+        # Tracker of the keys found once the default pattern is in use
+        self._fallback = None if parts else Tracker(DEFAULT_TRACKER)
+
+    def _fall_back(self, reason: str) -> None:
+        """Switch to the first tracker using the default pattern, or to finding nothing.
+
+        Args:
+            reason: Why the trackers are not used, for the diagnostic.
+        """
+        safe = [tracker for tracker in self.trackers if tracker.pattern == DEFAULT_ISSUE_PATTERN]
+        if safe:
+            super()._fall_back(reason)
+            self._fallback = safe[0]
+            self.allowed_prefixes = safe[0].prefixes
+            return
+
+        logger.warning(
+            f"Not using the issue pattern {self.pattern!r}: {reason}. No keys are looked for."
+        )
+        # An empty negative lookahead never matches
+        self.pattern = "(?!)"
+        self.regex = re.compile(self.pattern)
+        self.guarded = False
+
+    def _issue(self, match: re.Match) -> tuple[str, str] | None:
+        tracker, group = self._dispatch[match.lastgroup]
+        key = match.group(group)
+        if tracker.prefixes is not None and key_prefix(key) not in tracker.prefixes:
+            return None
+        return tracker.render(key), tracker.name
+
+    def findall(self, content: str) -> list[str]:
+        return [issue for issue, _ in self.findall_with_origin(content)]
+
+    def findall_with_origin(self, content: str) -> list[tuple[str, str]]:
+        if self.guarded:
+            matches = self._matches(content)
+            if matches is not None:
+                return matches
+        tracker = self._fallback
+        if tracker is None:
+            return []
+        return [(tracker.render(key), tracker.name) for key in IssueMatcher.findall(self, content)]
+
+    def search(self, content: str) -> str | None:
+        issue = super().search(content)
+        if issue is None or self.guarded:
+            return issue
+        return self._fallback.render(issue)
@@ -0,0 +1,657 @@
+"""Read commit messages straight from a repository's object database, without git.
+
+Loose objects and version 2 pack files are supported, including offset and ref
+deltas. Anything that changes how git itself would see the history (SHA-256,
+reftable, grafts, replace refs) or revision syntax beyond plain names and
+ranges makes open_walk() raise UnsupportedRepository, so callers can fall back
+to ``git log``.
+"""
+
+from __future__ import annotations
+
+import binascii
+import heapq
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from pre_commit_jira_helper.git import GitOperations, _parse_config, _read_text
+from pre_commit_jira_helper.history import HistoryError
+from pre_commit_jira_helper.logger import get_logger
+
+logger = get_logger("objects")
+
+# Object types as stored in pack entry headers
+_COMMIT, _TREE, _BLOB, _TAG = 1, 2, 3, 4
+_OFS_DELTA, _REF_DELTA = 6, 7
+_TYPE_NAMES = {b"commit": _COMMIT, b"tree": _TREE, b"blob": _BLOB, b"tag": _TAG}
+
+_IDX_SIGNATURE = b"\377tOc"
+_IDX_HEADER = 8 + 256 * 4
+
+# Upper bound on the delta base objects kept in memory
+DEFAULT_BASE_CACHE_BYTES = 16 << 20
+
+# How a short name is turned into a ref, in git's order (see git-rev-parse)
+_DWIM_RULES = ("{}", "refs/{}", "refs/tags/{}", "refs/heads/{}", "refs/remotes/{}")
+_MAX_SYMREF_DEPTH = 5
+_MAX_ALTERNATE_DEPTH = 5
+
+# Extra commits walked after only excluded ones remain queued, as git does,
+# to tolerate committer dates that go back in time
+_SLOP = 5
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+class UnsupportedRepository(HistoryError):
+    """Raised when reading the history needs git itself."""
+
+
+def _is_hex_oid(value: str) -> bool:
+    return len(value) == 40 and _HEX_DIGITS.issuperset(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Read a little-endian base-128 size from a delta header."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild an object from its delta base and a git delta.
+
+    Args:
+        base: Contents of the base object.
+        delta: Delta instructions, as stored in a pack.
+
+    Returns:
+        Contents of the target object.
+
+    Raises:
+        HistoryError: If the delta does not fit the base.
+    """
+    source_size, pos = _read_varint(delta, 0)
+    target_size, pos = _read_varint(delta, pos)
+    if source_size != len(base):
+        raise HistoryError("Delta base size mismatch")
+
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            # Copy from the base: bits 0-3 select offset bytes, bits 4-6 size bytes
+            offset = size = 0
+            for bit in range(4):
+                if op & (1 << bit):
+                    offset |= delta[pos] << (8 * bit)
+                    pos += 1
+            for bit in range(3):
+                if op & (0x10 << bit):
+                    size |= delta[pos] << (8 * bit)
+                    pos += 1
+            out += base[offset : offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos : pos + op]
+            pos += op
+        else:
+            raise HistoryError("Invalid delta opcode")
+
+    if len(out) != target_size:
+        raise HistoryError("Delta result size mismatch")
+    return bytes(out)
+
+
+def _inflate(data: mmap.mmap, pos: int, size: int) -> bytes:
+    """Inflate the zlib stream at a pack offset whose output is ``size`` bytes."""
+    inflater = zlib.decompressobj()
+    parts = []
+    # Deflated data is rarely much larger than its output, so one read usually does
+    step = size + 64
+    while not inflater.eof:
+        chunk = data[pos : pos + step]
+        if not chunk:
+            raise HistoryError("Truncated pack entry")
+        parts.append(inflater.decompress(chunk))
+        pos += step
+        step = max(step, 1 << 16)
+    result = b"".join(parts)
+    if len(result) != size:
+        raise HistoryError("Pack entry size mismatch")
+    return result
+
+
+class _Pack:
+    """One pack file and its version 2 index, both memory-mapped."""
+
+    def __init__(self, index_path: Path):
+        with index_path.open("rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.index[:8] != _IDX_SIGNATURE + b"\0\0\0\2":
+            self.index.close()
+            raise UnsupportedRepository(f"Unsupported pack index: {index_path.name}")
+        self.fanout = struct.unpack_from(">256I", self.index, 8)
+        count = self.fanout[255]
+        self._offsets = _IDX_HEADER + 24 * count  # after object names and CRCs
+        self._large_offsets = self._offsets + 4 * count
+        with index_path.with_suffix(".pack").open("rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def find(self, oid: bytes) -> int | None:
+        """Return the pack offset of an object, found by bisecting the index."""
+        first = oid[0]
+        low = self.fanout[first - 1] if first else 0
+        high = self.fanout[first]
+        index = self.index
+        while low < high:
+            middle = (low + high) // 2
+            start = _IDX_HEADER + 20 * middle
+            name = index[start : start + 20]
+            if name < oid:
+                low = middle + 1
+            elif name > oid:
+                high = middle
+            else:
+                (offset,) = struct.unpack_from(">I", index, self._offsets + 4 * middle)
+                if offset & 0x80000000:
+                    large = self._large_offsets + 8 * (offset & 0x7FFFFFFF)
+                    (offset,) = struct.unpack_from(">Q", index, large)
+                return offset
+        return None
+
+    def close(self) -> None:
+        self.index.close()
+        self.data.close()
+
+
+class ObjectStore:
+    """Read objects from loose files and pack files.
+
+    Delta bases are kept in a least-recently-used cache bounded in bytes, so
+    long delta chains are not inflated again for every object built on them.
+    """
+
+    def __init__(self, object_dirs: Sequence[Path], cache_bytes: int = DEFAULT_BASE_CACHE_BYTES):
+        """Open the pack files of the object directories.
+
+        Args:
+            object_dirs: Object directories, the repository's own first.
+            cache_bytes: Upper bound on the size of cached delta bases.
+        """
+        self.object_dirs = list(object_dirs)
+        self.packs: list[_Pack] = []
+        try:
+            for directory in self.object_dirs:
+                pack_dir = directory / "pack"
+                if not pack_dir.is_dir():
+                    continue
+                # Newest packs first, like git, since they hold the recent commits
+                indexes = sorted(
+                    pack_dir.glob("*.idx"), key=lambda p: p.stat().st_mtime, reverse=True
+                )
+                for index_path in indexes:
+                    if index_path.with_suffix(".pack").is_file():
+                        self.packs.append(_Pack(index_path))
+        except OSError as e:
+            self.close()
+            raise UnsupportedRepository(f"Cannot open pack files: {e}") from e
+        except UnsupportedRepository:
+            self.close()
+            raise
+        self.cache_bytes = cache_bytes
+        self._cache: OrderedDict[tuple[int, int], tuple[int, bytes]] = OrderedDict()
+        self._cached_bytes = 0
+
+    def close(self) -> None:
+        """Unmap the pack files."""
+        for pack in self.packs:
+            pack.close()
+        self.packs = []
+
+    def read(self, oid: bytes) -> tuple[int, bytes]:
+        """Read an object.
+
+        Args:
+            oid: Binary object name.
+
+        Returns:
+            Tuple of (object type, contents).
+
+        Raises:
+            HistoryError: If the object is missing or corrupt.
+        """
+        for pack in self.packs:
+            offset = pack.find(oid)
+            if offset is not None:
+                return self._read_packed(pack, offset)
+
+        name = oid.hex()
+        for directory in self.object_dirs:
+            try:
+                raw = zlib.decompress((directory / name[:2] / name[2:]).read_bytes())
+            except FileNotFoundError:
+                continue
+            except (OSError, zlib.error) as e:
+                raise HistoryError(f"Cannot read object {name}: {e}") from e
+            header, _, contents = raw.partition(b"\0")
+            kind = _TYPE_NAMES.get(header.split(b" ", 1)[0])
+            if kind is None:
+                raise HistoryError(f"Unknown type of object {name}")
+            return kind, contents
+
+        raise HistoryError(f"Object {name} not found")
+
+    def _read_packed(self, pack: _Pack, offset: int) -> tuple[int, bytes]:
+        """Read a pack entry, resolving its delta chain."""
+        data = pack.data
+        pack_key = id(pack)
+        deltas = []
+        while True:
+            cached = self._cache.get((pack_key, offset))
+            if cached is not None:
+                self._cache.move_to_end((pack_key, offset))
+                kind, contents = cached
+                break
+
+            byte = data[offset]
+            kind, size, shift, pos = (byte >> 4) & 7, byte & 0x0F, 4, offset + 1
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                size |= (byte & 0x7F) << shift
+                shift += 7
+
+            if kind == _OFS_DELTA:
+                byte = data[pos]
+                pos += 1
+                distance = byte & 0x7F
+                while byte & 0x80:
+                    byte = data[pos]
+                    pos += 1
+                    distance = ((distance + 1) << 7) | (byte & 0x7F)
+                deltas.append((offset, pos, size))
+                offset -= distance
+            elif kind == _REF_DELTA:
+                deltas.append((offset, pos + 20, size))
+                kind, contents = self.read(data[pos : pos + 20])
+                offset = -1  # not cached: the base may live in another pack
+                break
+            elif kind in (_COMMIT, _TREE, _BLOB, _TAG):
+                contents = _inflate(data, pos, size)
+                break
+            else:
+                raise HistoryError(f"Invalid pack entry type {kind}")
+
+        # Apply the deltas from the base outwards, caching each intermediate base
+        for entry_offset, pos, size in reversed(deltas):
+            if offset >= 0:
+                self._remember((pack_key, offset), kind, contents)
+            contents = apply_delta(contents, _inflate(data, pos, size))
+            offset = entry_offset
+        return kind, contents
+
+    def _remember(self, key: tuple[int, int], kind: int, contents: bytes) -> None:
+        if key in self._cache or len(contents) > self.cache_bytes:
+            return
+        self._cache[key] = (kind, contents)
+        self._cached_bytes += len(contents)
+        while self._cached_bytes > self.cache_bytes:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+
+def _parse_commit(contents: bytes) -> tuple[list[bytes], int, str]:
+    """Split a commit object into its parents, committer time and message."""
+    header_end = contents.find(b"\n\n")
+    if header_end == -1:
+        header_end = len(contents)
+
+    # Git writes the tree first, then the parents, so they are read in place
+    parents = []
+    pos = contents.find(b"\n") + 1
+    while contents.startswith(b"parent ", pos):
+        parents.append(binascii.unhexlify(contents[pos + 7 : pos + 47]))
+        pos += 48
+
+    timestamp = 0
+    committer = contents.find(b"\ncommitter ", pos - 1, header_end)
+    if committer != -1:
+        line = contents[committer + 1 : contents.find(b"\n", committer + 1)]
+        fields = line.rsplit(b" ", 2)
+        if len(fields) == 3 and fields[1].isdigit():
+            timestamp = int(fields[1])
+
+    encoding = "utf-8"
+    start = contents.find(b"\nencoding ", pos - 1, header_end)
+    if start != -1:
+        line = contents[start + 10 : contents.find(b"\n", start + 1)]
+        encoding = line.decode("ascii", errors="replace").strip()
+
+    message = contents[header_end + 2 :]
+    try:
+        return parents, timestamp, message.decode(encoding, errors="replace")
+    except LookupError:
+        return parents, timestamp, message.decode("utf-8", errors="replace")
+
+
+class _Refs:
+    """Read loose and packed refs."""
+
+    def __init__(self, git_dir: Path, common_dir: Path):
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self._packed: dict[str, str] | None = None
+
+    @property
+    def packed(self) -> dict[str, str]:
+        if self._packed is None:
+            self._packed = {}
+            content = _read_text(self.common_dir / "packed-refs") or ""
+            for line in content.splitlines():
+                if line and line[0] not in "#^":
+                    oid, _, name = line.partition(" ")
+                    self._packed[name] = oid
+        return self._packed
+
+    def resolve(self, name: str) -> str | None:
+        """Return the object a ref points at, following symbolic refs."""
+        for _ in range(_MAX_SYMREF_DEPTH):
+            base = self.common_dir if name.startswith("refs/") else self.git_dir
+            content = _read_text(base / name)
+            if content is None:
+                return self.packed.get(name)
+            content = content.strip()
+            if not content.startswith("ref:"):
+                return content if _is_hex_oid(content) else None
+            name = content[len("ref:") :].strip()
+        return None
+
+    def names(self) -> list[str]:
+        """List every ref under refs/."""
+        names = set(self.packed)
+        refs_dir = self.common_dir / "refs"
+        for directory, _, files in os.walk(refs_dir):
+            relative = Path(directory).relative_to(self.common_dir).as_posix()
+            names.update(f"{relative}/{name}" for name in files if not name.endswith(".lock"))
+        return sorted(names)
+
+
+class CommitWalk:
+    """Walk the commits selected by a set of revisions.
+
+    Commits come out newest first by committer date, as with ``git log``.
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        include: list[bytes],
+        exclude: list[bytes],
+        shallow: frozenset[bytes] = frozenset(),
+    ):
+        self.store = store
+        self.include = include
+        self.exclude = exclude
+        self.shallow = shallow
+
+    def _read_commit(self, oid: bytes) -> tuple[list[bytes], int, str]:
+        kind, contents = self.store.read(oid)
+        if kind != _COMMIT:
+            raise HistoryError(f"Object {oid.hex()} is not a commit")
+        parents, timestamp, message = _parse_commit(contents)
+        # Commits at the boundary of a shallow clone have no parents locally
+        return ([] if oid in self.shallow else parents), timestamp, message
+
+    def messages(self, skip_merges: bool = False) -> Iterator[tuple[str, str]]:
+        """Yield the ID and message of every selected commit.
+
+        Args:
+            skip_merges: Leave out merge commits.
+
+        Yields:
+            Tuples of (commit ID, raw commit message).
+        """
+        try:
+            walk = self._limited() if self.exclude else self._unlimited()
+            for oid, parents, message in walk:
+                if not (skip_merges and len(parents) > 1):
+                    yield oid.hex(), message
+        finally:
+            self.store.close()
+
+    def _unlimited(self) -> Iterator[tuple[bytes, list[bytes], str]]:
+        """Stream the history of the included commits in date order."""
+        # Entries are (-date, discovery order, oid, parents, message)
+        queue: list[tuple[int, int, bytes, list[bytes], str]] = []
+        seen: set[bytes] = set()
+
+        def push(oid: bytes) -> None:
+            if oid in seen:
+                return
+            seen.add(oid)
+            parents, timestamp, message = self._read_commit(oid)
+            heapq.heappush(queue, (-timestamp, len(seen), oid, parents, message))
+
+        for oid in self.include:
+            push(oid)
+        while queue:
+            _, _, oid, parents, message = heapq.heappop(queue)
+            yield oid, parents, message
+            for parent in parents:
+                push(parent)
+
+    def _limited(self) -> Iterator[tuple[bytes, list[bytes], str]]:
+        """Collect the included commits not reachable from excluded ones.
+
+        Like git's limit_list(), the walk stops a few commits after only
+        excluded commits remain queued, and commits found to be excluded late
+        are dropped before anything is returned.
+        """
+        queue: list[tuple[int, int, bytes]] = []
+        parents_of: dict[bytes, list[bytes]] = {}
+        messages: dict[bytes, str] = {}
+        excluded: dict[bytes, bool] = {}
+        selected: list[tuple[bytes, str]] = []
+
+        def exclude(oid: bytes) -> None:
+            stack = [oid]
+            while stack:
+                current = stack.pop()
+                if excluded.get(current) is False:
+                    excluded[current] = True
+                    stack.extend(parents_of.get(current, ()))
+
+        def push(oid: bytes, is_excluded: bool) -> None:
+            if oid in excluded:
+                if is_excluded:
+                    exclude(oid)
+                return
+            excluded[oid] = is_excluded
+            parents, timestamp, message = self._read_commit(oid)
+            parents_of[oid] = parents
+            if not is_excluded:
+                messages[oid] = message
+            heapq.heappush(queue, (-timestamp, len(excluded), oid))
+
+        for oid in self.exclude:
+            push(oid, True)
+        for oid in self.include:
+            push(oid, False)
+
+        slop = _SLOP
+        while queue:
+            oid = heapq.heappop(queue)[2]
+            message = messages.pop(oid, None)
+            is_excluded = excluded[oid]
+            for parent in parents_of[oid]:
+                push(parent, is_excluded)
+            if not is_excluded:
+                selected.append((oid, message))
+            if all(excluded[queued] for _, _, queued in queue):
+                slop -= 1
+                if not slop:
+                    break
+            else:
+                slop = _SLOP
+
+        for oid, message in selected:
+            if not excluded[oid]:
+                yield oid, parents_of[oid], message
+
+
+def _object_dirs(common_dir: Path) -> list[Path]:
+    """List the object directory and its alternates, honouring git's environment."""
+    primary = os.environ.get("GIT_OBJECT_DIRECTORY")
+    dirs = [Path(primary) if primary else common_dir / "objects"]
+    extra = os.environ.get("GIT_ALTERNATE_OBJECT_DIRECTORIES")
+    if extra:
+        dirs.extend(Path(path) for path in extra.split(os.pathsep) if path)
+
+    # Alternates may list further alternates
+    pending = [(directory, 0) for directory in dirs]
+    while pending:
+        directory, depth = pending.pop(0)
+        content = _read_text(directory / "info" / "alternates")
+        if not content or depth >= _MAX_ALTERNATE_DEPTH:
+            continue
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith('"'):
+                raise UnsupportedRepository("Quoted alternate object directory")
+            alternate = (directory / line).resolve()
+            if alternate not in dirs:
+                dirs.append(alternate)
+                pending.append((alternate, depth + 1))
+    return dirs
+
+
+def open_walk(revisions: Sequence[str], cwd: str | Path | None = None) -> CommitWalk:
+    """Prepare an in-process walk of the commits selected by revisions.
+
+    Supported revisions are full object names, ref names (as git would
+    complete them), ``A..B`` ranges, ``^A`` exclusions, ``--all`` and ``--not``.
+
+    Args:
+        revisions: Arguments selecting the commits, e.g. ``["main..HEAD"]``.
+        cwd: Repository to read (default: the current directory).
+
+    Returns:
+        A walk whose messages() yields what ``git log`` would list.
+
+    Raises:
+        UnsupportedRepository: If the repository or the revisions need git.
+    """
+    git_dir = GitOperations.get_git_dir(cwd)
+    if git_dir is None:
+        raise UnsupportedRepository("No git directory found")
+    common_dir = GitOperations.get_common_dir(git_dir)
+
+    values: dict[str, str] = {}
+    names = frozenset(("extensions.objectformat", "extensions.refstorage"))
+    if not _parse_config(_read_text(common_dir / "config") or "", names, values):
+        raise UnsupportedRepository("Repository config needs git to be interpreted")
+    if values.get("extensions.objectformat", "sha1").lower() != "sha1":
+        raise UnsupportedRepository("Only SHA-1 repositories are supported")
+    if values.get("extensions.refstorage", "files").lower() != "files":
+        raise UnsupportedRepository("Only the files ref backend is supported")
+    if (common_dir / "info" / "grafts").exists():
+        raise UnsupportedRepository("Grafts are not supported")
+
+    refs = _Refs(git_dir, common_dir)
+    ref_names = refs.names()
+    if not os.environ.get("GIT_NO_REPLACE_OBJECTS") and any(
+        name.startswith("refs/replace/") for name in ref_names
+    ):
+        raise UnsupportedRepository("Replace refs are not supported")
+
+    store = ObjectStore(_object_dirs(common_dir))
+    try:
+        include: list[bytes] = []
+        exclude: list[bytes] = []
+        negate = False
+
+        def add(name: str, excluded: bool, required: bool = True) -> None:
+            oid = _resolve_revision(refs, name)
+            if oid is None:
+                raise UnsupportedRepository(f"Cannot resolve revision {name!r}")
+            commit = _peel(store, bytes.fromhex(oid), required)
+            if commit is not None:
+                (exclude if excluded else include).append(commit)
+
+        for argument in revisions:
+            if argument == "--all":
+                for name in ["HEAD", *ref_names]:
+                    if refs.resolve(name) is not None:
+                        add(name, negate, required=False)
+            elif argument == "--not":
+                negate = not negate
+            elif argument.startswith("-") or "..." in argument:
+                raise UnsupportedRepository(f"Unsupported revision {argument!r}")
+            elif ".." in argument:
+                start, _, end = argument.partition("..")
+                add(start or "HEAD", not negate)
+                add(end or "HEAD", negate)
+            elif argument.startswith("^"):
+                add(argument[1:], not negate)
+            else:
+                add(argument, negate)
+
+        shallow = frozenset(
+            bytes.fromhex(line.strip())
+            for line in (_read_text(common_dir / "shallow") or "").splitlines()
+            if _is_hex_oid(line.strip())
+        )
+    except UnsupportedRepository:
+        store.close()
+        raise
+    except HistoryError as e:
+        # Missing or unreadable objects, e.g. in a partial clone: leave them to git
+        store.close()
+        raise UnsupportedRepository(str(e)) from e
+    return CommitWalk(store, include, exclude, shallow)
+
+
+def _resolve_revision(refs: _Refs, name: str) -> str | None:
+    """Resolve a full object name or a ref name the way git completes it."""
+    if _is_hex_oid(name):
+        return name
+    if not name or any(c in name for c in "~^:@{}* \\?["):
+        return None
+    for rule in _DWIM_RULES:
+        # Outside refs/ git only looks at pseudorefs such as HEAD or ORIG_HEAD
+        if rule == "{}" and not (name.startswith("refs/") or name.isupper()):
+            continue
+        oid = refs.resolve(rule.format(name))
+        if oid is not None:
+            return oid
+    return refs.resolve(f"refs/remotes/{name}/HEAD")
+
+
+def _peel(store: ObjectStore, oid: bytes, required: bool) -> bytes | None:
+    """Follow annotated tags down to a commit."""
+    kind, contents = store.read(oid)
+    while kind == _TAG:
+        target = contents.split(b"\n", 1)[0]
+        if not target.startswith(b"object "):
+            raise HistoryError(f"Malformed tag {oid.hex()}")
+        oid = bytes.fromhex(target[7:47].decode("ascii"))
+        kind, contents = store.read(oid)
+    if kind == _COMMIT:
+        return oid
+    if required:
+        raise UnsupportedRepository(f"Object {oid.hex()} is not a commit")
+    return None
@@ -0,0 +1,207 @@
+"""Map repository paths to the Jira projects that own them.
+
+Ownership is read from a mapping file with one rule per line: a path and the
+key of the project owning it, e.g. ``services/billing/** BILL``. A rule covers
+the path and everything below it, and the most specific rule wins. Blank lines
+and lines starting with ``#`` are ignored.
+
+Rules are compiled into a trie of path segments, which is serialized with
+marshal into the git dir and reused until the mapping file changes.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.utils import stat_identity
+
+logger = get_logger("ownership")
+
+OWNERS_CACHE_FILE = "jira-helper-owners-cache"
+
+# Bumped whenever the layout of the stored trie changes
+_FORMAT_VERSION = 1
+
+# Key of the project in a trie node; never a path segment
+_PROJECT = ""
+
+# Compiled mappings already loaded by this process, keyed by the mapping file
+_loaded: dict[str, tuple[tuple, ProjectMap]] = {}
+
+
+def _segments(pattern: str) -> list[str]:
+    """Split a rule's path into segments, dropping a trailing ``/**``."""
+    if pattern.endswith("**"):
+        pattern = pattern[:-2]
+    segments = [segment for segment in pattern.split("/") if segment not in ("", ".")]
+    if any("*" in segment or segment == ".." for segment in segments):
+        raise ValueError(f"Unsupported path in owners rule: {pattern!r}")
+    return segments
+
+
+def compile_rules(content: str) -> dict:
+    """Compile the rules of a mapping file into a trie.
+
+    Args:
+        content: Text of the mapping file.
+
+    Returns:
+        Nested dicts keyed by path segment; a node owned by a project holds its
+        key under the empty string. Later rules for the same path win.
+
+    Raises:
+        ValueError: If a line is not a path followed by a project key.
+    """
+    trie: dict = {}
+    for number, line in enumerate(content.splitlines(), 1):
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        if len(fields) != 2:
+            raise ValueError(f"Line {number}: expected '<path> <PROJECT>', got {line.strip()!r}")
+        node = trie
+        for segment in _segments(fields[0]):
+            node = node.setdefault(segment, {})
+        node[_PROJECT] = fields[1].upper()
+    return trie
+
+
+class ProjectMap:
+    """Look up the project owning a path in a compiled trie.
+
+    Staged files cluster in a few directories, so the project and trie node of
+    each directory are memoized and most lookups are two dict accesses.
+    """
+
+    def __init__(self, trie: dict):
+        """Initialize the map.
+
+        Args:
+            trie: Trie from compile_rules().
+        """
+        self.trie = trie
+        self._directories: dict[str, tuple[str | None, dict | None]] = {}
+
+    def _directory(self, directory: str) -> tuple[str | None, dict | None]:
+        """Get the owner of a directory and its trie node, if it has one."""
+        found = self._directories.get(directory)
+        if found is None:
+            parent, _, name = directory.rpartition("/")
+            if not directory:
+                found = self.trie.get(_PROJECT), self.trie
+            else:
+                project, node = self._directory(parent)
+                node = node.get(name) if node is not None else None
+                if node is not None:
+                    project = node.get(_PROJECT, project)
+                found = project, node
+            self._directories[directory] = found
+        return found
+
+    def project(self, path: str) -> str | None:
+        """Get the project owning a path.
+
+        Args:
+            path: Slash-separated path relative to the repository root.
+
+        Returns:
+            The key of the owning project, or None if no rule covers the path.
+        """
+        directory, _, name = path.rpartition("/")
+        project, node = self._directory(directory)
+        if node is not None:
+            leaf = node.get(name)
+            if leaf is not None:
+                return leaf.get(_PROJECT, project)
+        return project
+
+    def projects(self, paths: Iterable[str]) -> list[str]:
+        """Get the projects owning any of the paths.
+
+        Equivalent to calling project() for every path, but inlined: git lists
+        paths sorted, so consecutive paths usually share their directory.
+
+        Args:
+            paths: Slash-separated paths relative to the repository root.
+
+        Returns:
+            Keys of the owning projects, sorted.
+        """
+        found = set()
+        last_directory = None
+        for path in paths:
+            directory, _, name = path.rpartition("/")
+            if directory != last_directory:
+                last_directory = directory
+                owner, node = self._directories.get(directory) or self._directory(directory)
+            project = owner
+            if node is not None:
+                leaf = node.get(name)
+                if leaf is not None:
+                    project = leaf.get(_PROJECT, owner)
+            found.add(project)
+        found.discard(None)
+        return sorted(found)
+
+
+def load_project_map(path: Path | str, cache_dir: Path | None = None) -> ProjectMap:
+    """Load a mapping file, reusing its compiled trie while the file is unchanged.
+
+    Args:
+        path: The mapping file.
+        cache_dir: Directory to keep the compiled trie in (usually the git dir),
+                   or None to compile it in memory only.
+
+    Returns:
+        The project map.
+
+    Raises:
+        OSError: If the mapping file cannot be read.
+        ValueError: If the mapping file is malformed.
+    """
+    key = os.path.abspath(path)  # noqa: PTH100
+    identity = stat_identity(key)
+    if identity is None:
+        raise FileNotFoundError(f"Owners file not found: {path}")
+    loaded = _loaded.get(key)
+    if loaded is not None and loaded[0] == identity:
+        return loaded[1]
+
+    cache_path = cache_dir / OWNERS_CACHE_FILE if cache_dir is not None else None
+    trie = _read_cache(cache_path, key, identity) if cache_path is not None else None
+    if trie is None:
+        trie = compile_rules(Path(key).read_text(encoding="utf-8"))
+        if cache_path is not None:
+            _write_cache(cache_path, key, identity, trie)
+
+    project_map = ProjectMap(trie)
+    _loaded[key] = identity, project_map
+    return project_map
+
+
+def _read_cache(cache_path: Path, source: str, identity: tuple) -> dict | None:
+    """Read a compiled trie, or None if it is missing, corrupt or stale."""
+    try:
+        # marshal.load() reads file objects in small pieces; one read is much faster
+        version, cached_source, cached_identity, trie = marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (version, cached_source, cached_identity) != (_FORMAT_VERSION, source, identity):
+        return None
+    return trie if isinstance(trie, dict) else None
+
+
+def _write_cache(cache_path: Path, source: str, identity: tuple, trie: dict) -> None:
+    """Store a compiled trie, replacing the cache file atomically."""
+    temp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with temp.open("wb") as f:
+            marshal.dump((_FORMAT_VERSION, source, identity, trie), f)
+        temp.replace(cache_path)
+    except OSError as e:
+        logger.debug(f"Could not store the compiled owners file: {e}")
+        temp.unlink(missing_ok=True)
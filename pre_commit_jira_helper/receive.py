@@ -0,0 +1,266 @@
+"""Server-side validation of pushed commits for a pre-receive hook."""
+
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+import os
+import signal
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+
+from pre_commit_jira_helper.history import HistoryError, iter_commit_messages, iter_messages_of
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.matcher import IssueMatcher
+from pre_commit_jira_helper.utils import CommandError, stream_command
+
+logger = get_logger("receive")
+
+# Wall-clock seconds allowed for checking a whole push
+DEFAULT_TIMEOUT = 20.0
+
+# Bounds on the commits of a split ref that one worker reads with one git log:
+# smaller chunks pay for starting git more often, larger ones make its command
+# line long
+_MIN_CHUNK = 256
+_MAX_CHUNK = 8192
+
+# Old or new value of a ref update that creates or deletes the ref
+_NULL_OIDS = frozenset(("0" * 40, "0" * 64))
+
+# Matcher and options of the current worker process, set by _init_worker()
+_worker_matcher: IssueMatcher | None = None
+_worker_skip_merges = False
+
+
+@dataclass
+class RefUpdate:
+    """One line of pre-receive input."""
+
+    old: str
+    new: str
+    ref: str
+
+    @property
+    def is_deletion(self) -> bool:
+        """Whether the push deletes the ref."""
+        return self.new in _NULL_OIDS
+
+
+@dataclass
+class RefReport:
+    """Outcome of checking the new commits of one ref."""
+
+    ref: str
+    commits: int = 0
+    offenders: list[tuple[str, str]] = field(default_factory=list)
+    error: str | None = None
+
+
+@dataclass
+class PushReport:
+    """Outcome of checking a whole push."""
+
+    refs: list[RefReport] = field(default_factory=list)
+    timed_out: bool = False
+
+    @property
+    def offenders(self) -> list[tuple[str, str]]:
+        """Offending commits across all refs, each listed once."""
+        seen = {}
+        for report in self.refs:
+            for commit, subject in report.offenders:
+                seen.setdefault(commit, subject)
+        return list(seen.items())
+
+    @property
+    def ok(self) -> bool:
+        """Whether every new commit has an issue and every ref was checked."""
+        return not self.timed_out and all(not r.offenders and not r.error for r in self.refs)
+
+
+def parse_ref_updates(lines: Iterable[str]) -> list[RefUpdate]:
+    """Parse the ``<old> <new> <ref>`` lines git feeds to pre-receive.
+
+    Args:
+        lines: Lines read from stdin.
+
+    Returns:
+        The ref updates, in input order.
+
+    Raises:
+        ValueError: If a line is malformed.
+    """
+    updates = []
+    for line in lines:
+        if not line.strip():
+            continue
+        parts = line.split()
+        if len(parts) != 3:
+            raise ValueError(f"Malformed ref update: {line.strip()!r}")
+        updates.append(RefUpdate(*parts))
+    return updates
+
+
+def _init_worker(pattern: str | None, prefixes: list[str] | None, skip_merges: bool) -> None:
+    """Build the matcher once per worker process."""
+    global _worker_matcher, _worker_skip_merges
+    _worker_matcher = IssueMatcher(pattern, prefixes)
+    _worker_skip_merges = skip_merges
+
+
+def _stop_worker(signum: int, _frame) -> None:
+    """Exit a worker through the cleanup of the git processes it runs."""
+    raise SystemExit(128 + signum)
+
+
+@contextlib.contextmanager
+def _terminable() -> Iterator[None]:
+    """Let Pool.terminate() stop the current task through its cleanup.
+
+    Pool.terminate() sends SIGTERM; unwinding instead of dying on the spot lets
+    the git command of the task be killed along with its process group. Idle
+    workers keep the default action: they wait for tasks on a lock that the
+    terminating pool holds, and a Python handler could miss a signal arriving
+    just before that wait, leaving the worker blocked forever.
+    """
+    signal.signal(signal.SIGTERM, _stop_worker)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _new_commits(update: RefUpdate) -> list[str]:
+    """Get the revisions selecting the commits a ref update introduces."""
+    # Commits not reachable from any existing ref are the ones being pushed
+    return [update.new, "--not", "--all"]
+
+
+def _check_messages(report: RefReport, messages: Iterable[tuple[str, str]]) -> RefReport:
+    """Add commit messages to a report, noting those without an issue."""
+    try:
+        for commit, message in messages:
+            report.commits += 1
+            if _worker_matcher.search(message) is None:
+                report.offenders.append((commit, message.split("\n", 1)[0]))
+    except HistoryError as e:
+        report.error = str(e)
+    return report
+
+
+def _check_ref(update: RefUpdate) -> RefReport:
+    """Check the commits a ref update introduces (runs in a worker)."""
+    messages = iter_commit_messages(_new_commits(update), skip_merges=_worker_skip_merges)
+    with _terminable():
+        return _check_messages(RefReport(update.ref), messages)
+
+
+def _check_commits(ref: str, commits: list[str]) -> RefReport:
+    """Check some of the commits of a ref (runs in a worker)."""
+    with _terminable():
+        return _check_messages(RefReport(ref), iter_messages_of(commits))
+
+
+def _list_commits(update: RefUpdate) -> tuple[list[str], str | None]:
+    """List the commits a ref update introduces, newest first (runs in a worker).
+
+    Returns:
+        Tuple of (commit IDs, error message or None).
+    """
+    command = ["git", "rev-list"]
+    if _worker_skip_merges:
+        command.append("--no-merges")
+    command.extend([*_new_commits(update), "--"])
+    try:
+        with _terminable():
+            return list(stream_command(command)), None
+    except CommandError as e:
+        return [], str(e)
+
+
+def _chunk_size(commits: int, processes: int) -> int:
+    """Get how many commits of a split ref one task checks."""
+    return min(_MAX_CHUNK, max(_MIN_CHUNK, -(-commits // processes)))
+
+
+def check_push(
+    updates: Sequence[RefUpdate],
+    pattern: str | None = None,
+    prefixes: list[str] | None = None,
+    skip_merges: bool = False,
+    jobs: int | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> PushReport:
+    """Check that every commit introduced by a push mentions an issue.
+
+    The refs are spread over a pool of worker processes. Each is walked by its
+    own ``git log``, unless there are fewer refs than workers: the new commits
+    of each ref are then listed by ``git rev-list`` and split into chunks whose
+    messages are read by one ``git log`` each, so that a push of a single ref
+    still keeps every worker busy. Workers still running at the deadline are
+    terminated, along with the git processes they started, and the report is
+    marked as timed out.
+
+    Args:
+        updates: Ref updates of the push.
+        pattern: Issue pattern (default: DEFAULT_ISSUE_PATTERN).
+        prefixes: Allowed project prefixes, or None to accept any.
+        skip_merges: Do not check merge commits.
+        jobs: Worker processes (default: the number of CPUs).
+        timeout: Wall-clock seconds allowed for the whole check.
+
+    Returns:
+        Per-ref results, in input order.
+    """
+    deadline = time.monotonic() + timeout
+    updates = [u for u in updates if not u.is_deletion]
+    report = PushReport()
+    if not updates:
+        return report
+
+    processes = max(1, jobs or os.cpu_count() or 1)
+    # Listing the commits first walks the history twice, which only pays off
+    # when workers would otherwise be idle
+    split = len(updates) < processes
+    logger.debug(f"Checking {len(updates)} ref(s) with {processes} worker(s), split: {split}")
+
+    pool = multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(pattern, prefixes, skip_merges)
+    )
+    ref = updates[0].ref
+    try:
+        # Per ref: a report for the listing error and the tasks checking its commits
+        pending = []
+        if split:
+            listings = [(u.ref, pool.apply_async(_list_commits, (u,))) for u in updates]
+            # The chunks of a ref are queued as soon as its commits are listed
+            for ref, listing in listings:
+                commits, error = listing.get(max(0.0, deadline - time.monotonic()))
+                size = _chunk_size(len(commits), processes)
+                chunks = [
+                    pool.apply_async(_check_commits, (ref, commits[i : i + size]))
+                    for i in range(0, len(commits), size)
+                ]
+                pending.append((RefReport(ref, error=error), chunks))
+        else:
+            pending = [(RefReport(u.ref), [pool.apply_async(_check_ref, (u,))]) for u in updates]
+        pool.close()
+
+        for ref_report, parts in pending:
+            ref = ref_report.ref
+            for part in parts:
+                result = part.get(max(0.0, deadline - time.monotonic()))
+                ref_report.commits += result.commits
+                ref_report.offenders.extend(result.offenders)
+                ref_report.error = ref_report.error or result.error
+            report.refs.append(ref_report)
+    except multiprocessing.TimeoutError:
+        logger.error(f"Deadline of {timeout:g}s reached while checking {ref}")
+        report.timed_out = True
+    finally:
+        # Also stops workers (and their git processes) still busy after the deadline
+        pool.terminate()
+        pool.join()
+    return report
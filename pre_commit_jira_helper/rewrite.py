@@ -0,0 +1,189 @@
+"""Backfill Jira issues into existing history with a streamed fast-export/fast-import."""
+
+from __future__ import annotations
+
+import subprocess
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+from pre_commit_jira_helper.logger import get_logger
+
+logger = get_logger("rewrite")
+
+# Commit data larger than this is copied through in chunks instead of being decoded
+_COPY_CHUNK = 1 << 20
+
+
+class RewriteError(Exception):
+    """Raised when history cannot be rewritten."""
+
+
+@dataclass
+class RewriteResult:
+    """Outcome of a history rewrite."""
+
+    commits: int = 0
+    changed: int = 0
+
+
+def _branch_name(ref: str) -> str:
+    """Strip the refs/heads/ namespace from a ref exported by fast-export."""
+    return ref[len("refs/heads/") :] if ref.startswith("refs/heads/") else ref
+
+
+class _MessageRewriter:
+    """Rewrite commit messages of a fast-export stream while copying it through.
+
+    Only the ``data`` block that follows a ``commit`` header is decoded; every
+    other line and data block is copied verbatim, so memory use does not depend
+    on the size of the history.
+    """
+
+    def __init__(self, hook: JiraIssuePrependHook, branch: str | None = None):
+        self.hook = hook
+        self.branch = branch
+        self.result = RewriteResult()
+        self._issues_by_ref: dict[str, list[str]] = {}
+
+    def _branch_issues(self, ref: str) -> list[str]:
+        issues = self._issues_by_ref.get(ref)
+        if issues is None:
+            issues = self.hook.extract_jira_issues(self.branch or _branch_name(ref))
+            self._issues_by_ref[ref] = issues
+        return issues
+
+    def transform(self, message: bytes, ref: str) -> bytes:
+        """Apply the hook's transformation to one raw commit message."""
+        self.result.commits += 1
+
+        branch_issues = self._branch_issues(ref)
+        if not branch_issues:
+            return message
+
+        text = message.decode("utf-8", errors="surrogateescape")
+        new_issues = self.hook.find_new_issues(text, branch_issues)
+        if not new_issues:
+            return message
+
+        self.result.changed += 1
+        return self.hook.prepend_issues(text, new_issues).encode("utf-8", errors="surrogateescape")
+
+    def pump(self, source: BinaryIO, sink: BinaryIO | None) -> RewriteResult:
+        """Copy a fast-export stream to fast-import, rewriting commit messages.
+
+        Args:
+            source: fast-export output.
+            sink: fast-import input, or None to only count changes.
+
+        Returns:
+            Counts of seen and changed commits.
+        """
+        ref = None
+        for line in source:
+            if line.startswith(b"commit "):
+                ref = line[len(b"commit ") :].rstrip(b"\n").decode("utf-8", "surrogateescape")
+                if not ref.startswith("refs/"):
+                    raise RewriteError(
+                        f"Cannot rewrite '{ref}': name branches in the revision range, "
+                        "not HEAD or commit IDs"
+                    )
+
+            if not line.startswith(b"data "):
+                if sink is not None:
+                    sink.write(line)
+                continue
+
+            size = int(line[len(b"data ") :])
+            if ref is not None:
+                # The first data block after a commit header is its message
+                message = source.read(size)
+                if len(message) != size:
+                    raise RewriteError("Truncated fast-export stream")
+                message = self.transform(message, ref)
+                ref = None
+                if sink is not None:
+                    sink.write(b"data %d\n" % len(message))
+                    sink.write(message)
+                continue
+
+            if sink is not None:
+                sink.write(line)
+            while size > 0:
+                chunk = source.read(min(size, _COPY_CHUNK))
+                if not chunk:
+                    raise RewriteError("Truncated fast-export stream")
+                size -= len(chunk)
+                if sink is not None:
+                    sink.write(chunk)
+
+        return self.result
+
+
+def rewrite_history(
+    revisions: Sequence[str],
+    hook: JiraIssuePrependHook,
+    branch: str | None = None,
+    dry_run: bool = False,
+) -> RewriteResult:
+    """Prepend branch issues to every commit message in a revision range.
+
+    History is streamed from ``git fast-export`` through the hook's message
+    transformation into ``git fast-import``. Blobs are not exported, so the cost
+    is proportional to the number of commits and the refs are only updated once
+    the whole stream has been imported.
+
+    Args:
+        revisions: Arguments selecting the commits, e.g. ``["main~100..main"]``.
+        hook: Hook providing the issue extraction and message format.
+        branch: Branch name to take issues from (default: each exported branch).
+        dry_run: Only count the messages that would change.
+
+    Returns:
+        Counts of seen and changed commits.
+
+    Raises:
+        RewriteError: If git fails or the stream cannot be rewritten.
+    """
+    export_cmd = [
+        "git",
+        "fast-export",
+        "--no-data",
+        "--use-done-feature",
+        "--reencode=yes",
+        "--signed-tags=strip",
+        "--tag-of-filtered-object=rewrite",
+        "--reference-excluded-parents",
+        *revisions,
+    ]
+    import_cmd = ["git", "fast-import", "--done", "--force", "--quiet"]
+
+    rewriter = _MessageRewriter(hook, branch)
+    exporter = subprocess.Popen(export_cmd, stdout=subprocess.PIPE)
+    importer = None
+    try:
+        if not dry_run:
+            importer = subprocess.Popen(import_cmd, stdin=subprocess.PIPE)
+        result = rewriter.pump(exporter.stdout, importer.stdin if importer else None)
+    except BaseException:
+        # Without the final "done" command fast-import aborts without touching refs
+        exporter.kill()
+        if importer is not None:
+            importer.kill()
+        raise
+    finally:
+        exporter.stdout.close()
+        if importer is not None and not importer.stdin.closed:
+            importer.stdin.close()
+        exporter.wait()
+        if importer is not None:
+            importer.wait()
+
+    if exporter.returncode != 0:
+        raise RewriteError(f"git fast-export failed with code {exporter.returncode}")
+    if importer is not None and importer.returncode != 0:
+        raise RewriteError(f"git fast-import failed with code {importer.returncode}")
+
+    logger.info(f"Rewrote {result.changed} of {result.commits} commit messages")
+    return result
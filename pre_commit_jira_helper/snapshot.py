@@ -0,0 +1,348 @@
+"""Local snapshot of the issues that exist in a Jira site, for offline checks.
+
+``jira-helper sync`` pages through every issue of the site once, then only
+through the issues updated since the previous sync, and stores which issue
+numbers exist in each project. The snapshot is memory-mapped and queried in
+place: a lookup binary-searches the sorted project table and tests one bit, so
+a commit never parses the whole file.
+
+File layout, all integers little-endian:
+
+* header: magic, format version, project count, sync time (epoch seconds);
+* project table, sorted by key: key offset and length, first issue number,
+  number of bits, bitmap offset;
+* project keys, ASCII;
+* bitmaps, one per project, where bit ``n`` is set if issue ``first + n``
+  exists.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from pathlib import Path
+
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.utils import stat_identity
+from pre_commit_jira_helper.validation import (
+    _KEY,
+    JiraClient,
+    JiraError,
+    default_cache_path,
+)
+
+logger = get_logger("snapshot")
+
+PROJECTS_PATH = "/rest/api/2/project"
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_TIMEOUT = 30.0
+
+_MAGIC = b"JHSNAP\x00\x00"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIId")
+_ENTRY = struct.Struct("<IIIIQ")
+
+_PROJECT_KEY = re.compile(r"[A-Z][A-Z0-9_]*")
+
+# Incremental syncs look this much further back, covering clock skew with Jira
+_OVERLAP_MINUTES = 10
+
+# Snapshots already mapped by this process, keyed by file
+_loaded: dict[str, tuple[tuple, Snapshot]] = {}
+
+
+def default_snapshot_path(base_url: str) -> Path:
+    """Get the location of the snapshot of a Jira site shared by all repositories.
+
+    Args:
+        base_url: Base URL of the Jira site.
+
+    Returns:
+        A file named after the site in the user's cache directory.
+    """
+    from urllib.parse import urlsplit
+
+    url = urlsplit(base_url)
+    name = re.sub(r"[^A-Za-z0-9.-]+", "_", url.netloc + url.path).strip("_")
+    return default_cache_path().with_name(f"{name}.snapshot")
+
+
+class Snapshot:
+    """Read-only view of a snapshot file.
+
+    The file is memory-mapped, so only the pages holding the project table and
+    the tested bits are ever read.
+    """
+
+    def __init__(self, path: Path | str):
+        """Map a snapshot file.
+
+        Args:
+            path: The snapshot file.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is not a snapshot.
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"Not a snapshot file: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, synced_at = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Not a snapshot file, or from another version: {path}")
+        if size < _HEADER.size + count * _ENTRY.size:
+            self.close()
+            raise ValueError(f"Truncated snapshot file: {path}")
+        self.count = count
+        self.synced_at = synced_at
+
+    def _key(self, index: int) -> tuple[bytes, int, int, int]:
+        """Get a project table entry as (key, first number, bits, bitmap offset)."""
+        key_offset, key_length, first, bits, offset = _ENTRY.unpack_from(
+            self._map, _HEADER.size + index * _ENTRY.size
+        )
+        return self._map[key_offset : key_offset + key_length], first, bits, offset
+
+    def _find(self, project: bytes) -> tuple[bytes, int, int, int] | None:
+        """Binary-search the project table."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._key(middle)
+            if entry[0] < project:
+                low = middle + 1
+            elif entry[0] > project:
+                high = middle
+            else:
+                return entry
+        return None
+
+    def lookup(self, key: str) -> bool | None:
+        """Check whether an issue existed at the last sync.
+
+        Args:
+            key: Issue key, e.g. ``ABC-123``.
+
+        Returns:
+            True if the issue exists, False if it does not, and None if the
+            snapshot cannot tell: the key is malformed, its project is not in
+            the snapshot, or its number is higher than any issue of the project
+            at the last sync, so it may have been created since.
+        """
+        project, _, number = key.rpartition("-")
+        if not project or not (number.isascii() and number.isdigit()) or not project.isascii():
+            return None
+        entry = self._find(project.encode())
+        if entry is None:
+            return None
+        _, first, bits, offset = entry
+        index = int(number) - first
+        if index >= bits:
+            return None
+        if index < 0:
+            return False
+        try:
+            return bool(self._map[offset + (index >> 3)] >> (index & 7) & 1)
+        except IndexError:
+            # A bitmap past the end of the file; the snapshot is corrupt
+            return None
+
+    def projects(self) -> list[str]:
+        """Get the keys of the projects in the snapshot.
+
+        Returns:
+            Project keys, sorted.
+        """
+        return [self._key(index)[0].decode("ascii") for index in range(self.count)]
+
+    def bitmaps(self) -> dict[str, bytearray]:
+        """Read the whole snapshot, for updating it.
+
+        Returns:
+            Mapping of project keys to bitmaps where bit ``n`` is set if issue
+            ``n`` exists.
+        """
+        bitmaps = {}
+        for index in range(self.count):
+            key, first, bits, offset = self._key(index)
+            # First numbers are always multiples of 8, so bitmaps are byte-aligned
+            bitmap = bytearray(first >> 3)
+            bitmap += self._map[offset : offset + ((bits + 7) >> 3)]
+            bitmaps[key.decode("ascii")] = bitmap
+        return bitmaps
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+
+def load_snapshot(path: Path | str) -> Snapshot:
+    """Map a snapshot file, reusing the mapping while the file is unchanged.
+
+    Args:
+        path: The snapshot file.
+
+    Returns:
+        The snapshot.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a snapshot.
+    """
+    key = os.path.abspath(path)  # noqa: PTH100
+    identity = stat_identity(key)
+    if identity is None:
+        raise FileNotFoundError(f"Snapshot not found: {path}")
+    loaded = _loaded.get(key)
+    if loaded is not None:
+        if loaded[0] == identity:
+            return loaded[1]
+        loaded[1].close()
+        del _loaded[key]
+    snapshot = Snapshot(key)
+    _loaded[key] = identity, snapshot
+    return snapshot
+
+
+def write_snapshot(path: Path | str, bitmaps: dict[str, bytearray], synced_at: float) -> None:
+    """Write a snapshot, replacing the file atomically.
+
+    Readers that mapped the previous file keep seeing it until they map again.
+
+    Args:
+        path: The snapshot file.
+        bitmaps: Mapping of project keys to bitmaps where bit ``n`` is set if
+                 issue ``n`` exists.
+        synced_at: Time the issues were read from Jira, in epoch seconds.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    keys = sorted(key.encode("ascii") for key in bitmaps)
+    table = bytearray()
+    data = bytearray()
+    key_offset = _HEADER.size + len(keys) * _ENTRY.size
+    bitmap_offset = key_offset + sum(map(len, keys))
+    for key in keys:
+        bitmap = bitmaps[key.decode("ascii")]
+        # Leading and trailing zero bytes are dropped; the first number stays a multiple of 8
+        start = len(bitmap) - len(bitmap.lstrip(b"\0"))
+        end = len(bitmap.rstrip(b"\0"))
+        if start < end:
+            first = start << 3
+            bits = ((end - 1) << 3) + bitmap[end - 1].bit_length() - first
+        else:
+            first = bits = 0
+        table += _ENTRY.pack(key_offset, len(key), first, bits, bitmap_offset + len(data))
+        data += bitmap[start:end]
+        key_offset += len(key)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with temp.open("wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(keys), synced_at))
+            f.write(table)
+            f.write(b"".join(keys))
+            f.write(data)
+        temp.replace(path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+def _add(bitmap: bytearray, number: int) -> None:
+    """Set the bit of an issue number, growing the bitmap as needed."""
+    index = number >> 3
+    if index >= len(bitmap):
+        bitmap.extend(bytes(index + 1 - len(bitmap)))
+    bitmap[index] |= 1 << (number & 7)
+
+
+def sync_snapshot(
+    base_url: str,
+    path: Path | str | None = None,
+    full: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    timeout: float = DEFAULT_TIMEOUT,
+    user: str | None = None,
+    token: str | None = None,
+) -> tuple[int, int]:
+    """Update the snapshot of a Jira site.
+
+    Projects are listed on every sync. Issues are read from a search ordered by
+    creation, so issues created while paging land on later pages; only issues
+    updated since the previous sync are read unless there is no usable snapshot
+    or full is True. Deleted issues are only dropped by a full sync.
+
+    Args:
+        base_url: Base URL of the Jira site.
+        path: The snapshot file (default: default_snapshot_path(base_url)).
+        full: Read every issue instead of the ones updated since the last sync.
+        page_size: Issues requested per search page.
+        timeout: Socket timeout of each request in seconds.
+        user: Email of the user, for basic authentication with the token.
+        token: Jira API token or personal access token.
+
+    Returns:
+        Tuple of (number of projects, number of issues read from Jira).
+
+    Raises:
+        JiraError: If Jira cannot be read; the snapshot is left unchanged.
+        OSError: If the snapshot cannot be written.
+        ValueError: If the URL is not an http or https URL.
+    """
+    client = JiraClient(base_url, user=user, token=token)
+    path = Path(path) if path is not None else default_snapshot_path(base_url)
+    started = time.time()
+
+    bitmaps: dict[str, bytearray] = {}
+    jql = None
+    if not full:
+        try:
+            snapshot = Snapshot(path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Reading every issue, no usable snapshot: {e}")
+        else:
+            bitmaps = snapshot.bitmaps()
+            minutes = math.ceil(max(started - snapshot.synced_at, 0) / 60) + _OVERLAP_MINUTES
+            jql = f"updated >= -{minutes}m ORDER BY created ASC"
+            snapshot.close()
+
+    projects = client.request("GET", PROJECTS_PATH, timeout=timeout)
+    try:
+        for project in projects:
+            key = project["key"]
+            if not _PROJECT_KEY.fullmatch(key):
+                raise ValueError(f"invalid project key {key!r}")
+            bitmaps.setdefault(key, bytearray())
+    except (KeyError, TypeError, ValueError) as e:
+        raise JiraError(f"Unexpected project list from Jira: {e}") from e
+
+    if jql is None:
+        # Jira Cloud refuses searches without a restriction
+        projects = ", ".join(f'"{key}"' for key in sorted(bitmaps))
+        jql = f"project in ({projects}) ORDER BY created ASC"
+
+    count = 0
+    for keys in client.iter_search(jql, page_size, timeout) if bitmaps else ():
+        for key in keys:
+            if not _KEY.fullmatch(key):
+                raise JiraError(f"Unexpected search results from Jira: invalid issue key {key!r}")
+            project, _, number = key.rpartition("-")
+            _add(bitmaps.setdefault(project, bytearray()), int(number))
+        count += len(keys)
+        logger.debug(f"Read {count} issues")
+
+    write_snapshot(path, bitmaps, started)
+    return len(bitmaps), count
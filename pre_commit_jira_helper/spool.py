@@ -0,0 +1,485 @@
+"""Durable local spool of Jira comments, delivered in the background.
+
+The post-commit hook only appends records to the spool, so a commit never
+waits on Jira. A flusher, run detached or by the daemon, sends them later:
+
+* Records are appended under an exclusive lock and fsynced, one JSON line
+  each. A line torn by a crash is skipped, and the next append starts on a
+  fresh line.
+* Delivery progress is appended to a separate state file, batch by batch, and
+  folded back into the records file when the flusher compacts the spool.
+* Each record has an ID derived from the site, issue and commit, stored as a
+  property of the comment it creates. A record that may already have been
+  sent, because an earlier attempt failed or was interrupted, is only posted
+  again if the issue has no comment with that ID.
+* Failures caused by the network or by Jira being unavailable are retried
+  with exponential backoff; records Jira rejects are dropped with a warning.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from pre_commit_jira_helper.logger import get_logger
+from pre_commit_jira_helper.validation import JiraClient, JiraError, default_cache_path
+
+logger = get_logger("spool")
+
+RECORDS_FILE = "records.jsonl"
+STATE_FILE = "state.jsonl"
+LOCK_FILE = "spool.lock"
+FLUSH_LOCK_FILE = "flush.lock"
+
+# Entity property holding the record ID on each comment
+COMMENT_PROPERTY = "pre-commit-jira-helper"
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_TIMEOUT = 10.0
+
+# Retry delays grow from _BACKOFF_BASE seconds, doubling up to _BACKOFF_MAX
+_BACKOFF_BASE = 5.0
+_BACKOFF_MAX = 3600.0
+
+# Statuses worth retrying; None means Jira could not be reached at all
+_TRANSIENT_STATUSES = (None, 408, 409, 425, 429)
+
+
+def default_spool_dir() -> Path:
+    """Get the location of the spool shared by all repositories.
+
+    Returns:
+        ``spool`` in the user's cache directory.
+    """
+    return default_cache_path().with_name("spool")
+
+
+def record_id(site: str, issue: str, commit: str) -> str:
+    """Get the idempotency key of a comment.
+
+    Args:
+        site: Base URL of the Jira site.
+        issue: Issue key.
+        commit: Full commit ID.
+
+    Returns:
+        A hex digest, the same every time the comment is spooled.
+    """
+    return hashlib.sha256(f"{site}\0{issue}\0{commit}".encode()).hexdigest()[:32]
+
+
+def backoff(attempts: int) -> float:
+    """Get the delay before retrying a record.
+
+    Args:
+        attempts: Failed attempts so far, at least 1.
+
+    Returns:
+        Seconds to wait: doubling from _BACKOFF_BASE, capped, with jitter so that
+        records failing together are not retried together.
+    """
+    delay = min(_BACKOFF_BASE * 2 ** (attempts - 1), _BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _transient(error: JiraError) -> bool:
+    return error.status in _TRANSIENT_STATUSES or (error.status or 0) >= 500
+
+
+class Spool:
+    """Append-only spool of comment records in a directory.
+
+    Every change to the records file happens under an exclusive lock on a
+    separate lock file, whose inode never changes, so compaction can replace
+    the records file without losing concurrent appends.
+    """
+
+    def __init__(self, directory: Path | str | None = None):
+        """Initialize the spool; its directory is created on first write.
+
+        Args:
+            directory: Spool directory (default: default_spool_dir()).
+        """
+        self.directory = Path(directory) if directory is not None else default_spool_dir()
+        self.records_path = self.directory / RECORDS_FILE
+        self.state_path = self.directory / STATE_FILE
+
+    def _acquire(self, name: str, blocking: bool = True) -> int | None:
+        """Take an exclusive lock on a file in the spool directory.
+
+        Returns:
+            The locked file descriptor, closed to release the lock, or None if
+            the lock is taken and blocking is False.
+        """
+        import fcntl
+
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd = os.open(self.directory / name, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[None]:
+        """Hold the spool lock."""
+        fd = self._acquire(LOCK_FILE)
+        try:
+            yield
+        finally:
+            os.close(fd)
+
+    def append(self, records: Iterable[dict]) -> None:
+        """Add records durably.
+
+        Args:
+            records: JSON-serializable records, each with an ``id``.
+
+        Raises:
+            OSError: If the spool cannot be written.
+        """
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        if not data:
+            return
+        with self._lock():
+            _append_synced(self.records_path, data.encode())
+
+    def pending(self) -> list[dict]:
+        """Read the records not yet delivered or dropped.
+
+        Returns:
+            Records in spool order, with ``attempts`` and ``retry_at`` updated
+            from the state file; each ID appears once.
+        """
+        with self._lock():
+            return self._read()
+
+    def _read(self) -> list[dict]:
+        """Read the pending records; the spool lock must be held."""
+        records: dict[str, dict] = {}
+        for record in _read_lines(self.records_path):
+            if "id" in record:
+                records.setdefault(record["id"], record)
+        for state in _read_lines(self.state_path):
+            record = records.get(state.get("id"))
+            if record is None:
+                continue
+            if state.get("done"):
+                del records[state["id"]]
+            else:
+                record.update(state)
+        return list(records.values())
+
+    def update(self, states: Iterable[dict]) -> None:
+        """Record delivery progress durably.
+
+        Args:
+            states: Dicts with the ``id`` of a record and either ``done`` or new
+                    ``attempts`` and ``retry_at`` values.
+        """
+        data = "".join(json.dumps(state, separators=(",", ":")) + "\n" for state in states)
+        if data:
+            with self._lock():
+                _append_synced(self.state_path, data.encode())
+
+    def compact(self) -> int:
+        """Rewrite the records file with the pending records only.
+
+        Returns:
+            The number of records kept.
+        """
+        with self._lock():
+            return self._compact()
+
+    def _compact(self) -> int:
+        """Compact the spool; the spool lock must be held."""
+        records = self._read()
+        temp = self.records_path.with_name(f"{RECORDS_FILE}.{os.getpid()}.tmp")
+        try:
+            with temp.open("wb") as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            temp.replace(self.records_path)
+        except OSError:
+            temp.unlink(missing_ok=True)
+            raise
+        self.state_path.unlink(missing_ok=True)
+        return len(records)
+
+    def is_flushing(self) -> bool:
+        """Check whether a flusher holds the spool.
+
+        Returns:
+            True if another process or thread is flushing.
+        """
+        fd = self._acquire(FLUSH_LOCK_FILE, blocking=False)
+        if fd is None:
+            return True
+        os.close(fd)
+        return False
+
+
+def _append_synced(path: Path, data: bytes) -> None:
+    """Append to a file and wait until the data is on disk."""
+    fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b"\n":
+            # The last write was torn by a crash; keep it apart from the new line
+            data = b"\n" + data
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_lines(path: Path) -> Iterator[dict]:
+    """Yield the JSON objects of a spool file, skipping torn or corrupt lines."""
+    try:
+        content = path.read_bytes()
+    except FileNotFoundError:
+        return
+    for line in content.splitlines():
+        try:
+            value = json.loads(line)
+        except ValueError:
+            logger.debug(f"Skipping a corrupt line of {path}")
+            continue
+        if isinstance(value, dict):
+            yield value
+
+
+def comment_body(record: dict) -> str:
+    """Format the comment posted for a record.
+
+    Args:
+        record: Spool record.
+
+    Returns:
+        Comment text in Jira wiki markup.
+    """
+    return f"Commit {{{{{record['commit'][:12]}}}}} in {record['repository']}: {record['subject']}"
+
+
+def _deliver(client: JiraClient, record: dict, timeout: float) -> None:
+    """Post a record's comment unless an earlier attempt already did.
+
+    Raises:
+        JiraError: If Jira cannot be asked or rejects the comment.
+    """
+    from urllib.parse import quote
+
+    path = f"/rest/api/2/issue/{quote(record['issue'], safe='')}/comment"
+    if record.get("attempts", 0) > 1:
+        response = client.request("GET", f"{path}?expand=properties&maxResults=1000", None, timeout)
+        marker = {"key": COMMENT_PROPERTY, "value": {"id": record["id"]}}
+        if any(marker in comment.get("properties", ()) for comment in response["comments"]):
+            logger.debug(f"Comment {record['id']} was already posted")
+            return
+    payload = {
+        "body": comment_body(record),
+        "properties": [{"key": COMMENT_PROPERTY, "value": {"id": record["id"]}}],
+    }
+    client.request("POST", path, payload, timeout)
+
+
+def flush_spool(
+    spool: Spool,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    timeout: float = DEFAULT_TIMEOUT,
+    linger: float = 0.0,
+    user: str | None = None,
+    token: str | None = None,
+) -> tuple[int, int, int] | None:
+    """Deliver the pending records of a spool.
+
+    Records are sent in batches over a pooled connection per site. Before a
+    batch is sent, its attempts are counted in the state file, so a flusher
+    that dies mid-batch leaves records that are checked for an existing
+    comment before being posted again.
+
+    Args:
+        spool: The spool.
+        batch_size: Records whose progress is saved together.
+        max_attempts: Attempts after which a record is dropped.
+        timeout: Socket timeout of each request in seconds.
+        linger: Seconds to keep waiting for records due for a retry before
+                returning.
+        user: Email of the user, for basic authentication with the token.
+        token: Jira API token or personal access token.
+
+    Returns:
+        Tuple of (delivered, dropped, still pending), or None if another
+        flusher is running.
+    """
+    flush_lock = spool._acquire(FLUSH_LOCK_FILE, blocking=False)
+    if flush_lock is None:
+        logger.debug("Another flusher is running")
+        return None
+    options = {"max_attempts": max_attempts, "timeout": timeout}
+    try:
+        delivered = dropped = 0
+        # Built on first use, with the credentials given to this flusher
+        clients: dict[str, JiraClient] = {}
+        credentials = {"user": user, "token": token}
+        deadline = time.monotonic() + linger
+        while True:
+            now = time.time()
+            records = spool.pending()
+            due = [record for record in records if record.get("retry_at", 0) <= now]
+            if due:
+                for start in range(0, len(due), batch_size):
+                    batch = due[start : start + batch_size]
+                    counts = _send_batch(batch, spool, clients, credentials, **options)
+                    delivered += counts[0]
+                    dropped += counts[1]
+                continue
+
+            waits = [record["retry_at"] - now for record in records]
+            if waits and min(waits) <= deadline - time.monotonic():
+                time.sleep(max(min(waits), 0))
+                continue
+
+            spool_lock = spool._acquire(LOCK_FILE)
+            try:
+                if any(record.get("retry_at", 0) <= time.time() for record in spool._read()):
+                    # Appended since the last read
+                    continue
+                pending = spool._compact()
+                # Released while the spool is locked, so that a record appended from
+                # now on finds no flusher and starts a new one
+                os.close(flush_lock)
+                flush_lock = None
+            finally:
+                os.close(spool_lock)
+            return delivered, dropped, pending
+    finally:
+        if flush_lock is not None:
+            os.close(flush_lock)
+
+
+def _send_batch(
+    batch: list[dict],
+    spool: Spool,
+    clients: dict,
+    credentials: dict,
+    max_attempts: int,
+    timeout: float,
+) -> tuple[int, int]:
+    """Deliver a batch of records, saving their progress before and after.
+
+    Returns:
+        Tuple of (delivered, dropped) records.
+
+    Raises:
+        JiraError: If Jira rejects the credentials.
+    """
+    for record in batch:
+        record["attempts"] = record.get("attempts", 0) + 1
+    spool.update({"id": record["id"], "attempts": record["attempts"]} for record in batch)
+    states = []
+    try:
+        for record in batch:
+            states.append(_attempt(record, clients, credentials, max_attempts, timeout))
+    finally:
+        spool.update(states)
+    done = [state.get("done") for state in states]
+    return done.count("delivered"), done.count("dropped")
+
+
+def _attempt(
+    record: dict, clients: dict, credentials: dict, max_attempts: int, timeout: float
+) -> dict:
+    """Try to deliver one record.
+
+    Returns:
+        The record's new state.
+
+    Raises:
+        JiraError: If Jira rejects the credentials; the flush stops.
+    """
+    try:
+        client = clients.get(record["site"])
+        if client is None:
+            client = clients[record["site"]] = JiraClient(record["site"], **credentials)
+        _deliver(client, record, timeout)
+    except JiraError as e:
+        if e.status in (401, 403):
+            raise
+        if _transient(e) and record["attempts"] < max_attempts:
+            delay = backoff(record["attempts"])
+            logger.debug(f"Retrying {record['issue']} in {delay:.0f}s: {e}")
+            return {
+                "id": record["id"],
+                "attempts": record["attempts"],
+                "retry_at": time.time() + delay,
+            }
+        logger.warning(
+            f"Dropping the comment for {record['commit'][:12]} on {record['issue']}: {e}"
+        )
+        return {"id": record["id"], "done": "dropped"}
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Dropping a malformed spool record: {e}")
+        return {"id": record["id"], "done": "dropped"}
+    return {"id": record["id"], "done": "delivered"}
+
+
+def start_flusher(spool: Spool, socket_path: str | None = None) -> str | None:
+    """Make sure a flusher drains the spool, without waiting for it.
+
+    The daemon is asked first, and given the credentials of this process since
+    it cannot see its environment; otherwise a detached ``jira-helper flush``
+    is started, unless a flusher is already running.
+
+    Args:
+        spool: The spool.
+        socket_path: Daemon socket (default: the client's default).
+
+    Returns:
+        "daemon", "process", or None if a flusher was already running.
+    """
+    from pre_commit_jira_helper.cli.client import send_request
+    from pre_commit_jira_helper.validation import env_credentials
+
+    request = {"command": "flush", "spool": str(spool.directory), **env_credentials()}
+    response = send_request(request, socket_path, timeout=0.5)
+    if response is not None and response.get("flushing"):
+        return "daemon"
+    if spool.is_flushing():
+        return None
+
+    import subprocess
+
+    subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pre_commit_jira_helper.cli.helper",
+            "flush",
+            "--spool",
+            str(spool.directory),
+            "--linger",
+            "600",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    return "process"
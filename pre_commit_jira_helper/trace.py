@@ -0,0 +1,223 @@
+"""Opt-in per-phase timing of hook runs, written as JSON lines.
+
+Tracing is enabled by setting ``PRE_COMMIT_JIRA_HELPER_TRACE`` to a file path,
+or with the ``--trace`` option of the hook commands. When it is disabled,
+``span()`` returns a shared no-op context manager and nothing else happens.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from pathlib import Path
+
+TRACE_ENV = "PRE_COMMIT_JIRA_HELPER_TRACE"
+
+# Reference point for the startup phase when /proc is not available
+_MODULE_LOADED_NS = time.perf_counter_ns()
+
+_path: str | None = os.environ.get(TRACE_ENV) or None
+_records: list[dict] = []
+_startup_recorded = False
+
+
+class _NullSpan:
+    """Context manager that records nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Context manager recording the duration of one phase."""
+
+    __slots__ = ("name", "attrs", "start")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, self.start, time.perf_counter_ns(), **self.attrs)
+        return False
+
+
+def is_enabled() -> bool:
+    """Check whether tracing is enabled.
+
+    Returns:
+        True if spans are being recorded.
+    """
+    return _path is not None
+
+
+def enable_tracing(path: str | None) -> None:
+    """Enable tracing to a JSON lines file, or disable it with None.
+
+    Args:
+        path: File to append trace records to.
+    """
+    global _path
+    _path = path or None
+    _records.clear()
+
+
+def span(name: str, **attrs):
+    """Time a phase of the current run.
+
+    Args:
+        name: Phase name, e.g. "read" or "run_command".
+        **attrs: Extra JSON-serializable fields for the record.
+
+    Returns:
+        A context manager; a shared no-op one when tracing is disabled.
+    """
+    if _path is None:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def record(name: str, start_ns: int, end_ns: int, **attrs) -> None:
+    """Record a phase with explicit perf_counter_ns() timestamps.
+
+    Args:
+        name: Phase name.
+        start_ns: Start of the phase.
+        end_ns: End of the phase.
+        **attrs: Extra JSON-serializable fields for the record.
+    """
+    if _path is None:
+        return
+    _records.append(
+        {"phase": name, "start_ns": start_ns, "duration_ns": end_ns - start_ns, **attrs}
+    )
+
+
+def _process_age_ns() -> int | None:
+    """Time since the interpreter process started, if the platform exposes it."""
+    try:
+        # The command name may contain spaces, so split after its closing paren
+        fields = Path("/proc/self/stat").read_text().rpartition(")")[2].split()
+        uptime = float(Path("/proc/uptime").read_text().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    # Field 22 (starttime) of proc(5), counted from the field after the name
+    start_ticks = int(fields[19])
+    return int((uptime - start_ticks / os.sysconf("SC_CLK_TCK")) * 1e9)
+
+
+def record_startup() -> None:
+    """Record the time from process start (or package import) until now.
+
+    Only the first run of a process has a startup phase; later runs in the same
+    process (e.g. in the daemon) skip it.
+    """
+    global _startup_recorded
+    if _path is None or _startup_recorded:
+        return
+    _startup_recorded = True
+    now = time.perf_counter_ns()
+    age = _process_age_ns()
+    if age is not None and age >= 0:
+        record("startup", now - age, now, source="process")
+    else:
+        record("startup", _MODULE_LOADED_NS, now, source="import")
+
+
+def flush(run_name: str) -> None:
+    """Append the recorded spans of one run to the trace file.
+
+    Args:
+        run_name: Name identifying the kind of run (e.g. the hook class).
+    """
+    if _path is None or not _records:
+        return
+
+    import json
+
+    run_id = f"{os.getpid()}-{time.time_ns()}"
+    origin = min(r["start_ns"] for r in _records)
+    lines = []
+    for r in _records:
+        entry = {
+            "run": run_id,
+            "name": run_name,
+            "phase": r.pop("phase"),
+            "offset_ms": (r.pop("start_ns") - origin) / 1e6,
+            "duration_ms": r.pop("duration_ns") / 1e6,
+        }
+        entry.update(r)
+        lines.append(json.dumps(entry) + "\n")
+    _records.clear()
+
+    try:
+        # A single append keeps lines from concurrent runs from interleaving
+        fd = os.open(_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values: Values in ascending order (not empty).
+        fraction: Percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        The percentile value.
+    """
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+
+def summarize(lines) -> dict[str, dict[str, float]]:
+    """Summarize trace records per phase.
+
+    Args:
+        lines: Iterable of JSON lines as written by flush().
+
+    Returns:
+        Mapping of phase to count, p50, p95, p99 and max duration in milliseconds.
+    """
+    import json
+
+    durations: dict[str, list[float]] = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+            durations.setdefault(entry["phase"], []).append(float(entry["duration_ms"]))
+        except (ValueError, KeyError, TypeError):
+            continue
+
+    summary = {}
+    for phase, values in durations.items():
+        values.sort()
+        summary[phase] = {
+            "count": len(values),
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": values[-1],
+        }
+    return summary
@@ -2,12 +2,54 @@
 
 from __future__ import annotations
 
-import subprocess
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
 
+from pre_commit_jira_helper import trace
 from pre_commit_jira_helper.logger import get_logger
 
 logger = get_logger("utils")
 
+# Bytes read from a streamed command at a time
+_READ_SIZE = 1 << 16
+
+# Bytes of stderr kept from a streamed command for its error message
+_STDERR_LIMIT = 1 << 16
+
+
+def stat_identity(path: Path | str) -> tuple[int, int, int] | None:
+    """Get the (inode, size, mtime) identity of a file, or None if it is missing.
+
+    Args:
+        path: The file.
+
+    Returns:
+        The identity, which changes whenever the file is replaced or modified.
+    """
+    try:
+        st = os.stat(path)  # noqa: PTH116 - avoids creating a Path on hot paths
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class CommandError(Exception):
+    """Raised when a streamed command fails, times out or exceeds its output cap."""
+
+    def __init__(self, message: str, returncode: int | None = None, stderr: str = ""):
+        """Initialize the error.
+
+        Args:
+            message: Description of the failure.
+            returncode: Exit code, or None if the command was killed or never ran.
+            stderr: Start of the command's stderr.
+        """
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
+
 
 def run_command(command: list[str], timeout: int | None = None) -> tuple[bool, str, str]:
     """Run a command and return its output.
@@ -19,14 +61,18 @@ def run_command(command: list[str], timeout: int | None = None) -> tuple[bool, s
     Returns:
         Tuple of (success, stdout, stderr).
     """
+    # Imported here: most hook runs never fork, and subprocess is slow to import
+    import subprocess
+
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=timeout,
-        )
+        with trace.span("run_command", command=" ".join(command[:2])):
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=timeout,
+            )
         success = result.returncode == 0
         if not success:
             logger.debug(f"Command failed with code {result.returncode}: {result.stderr}")
@@ -39,3 +85,188 @@ def run_command(command: list[str], timeout: int | None = None) -> tuple[bool, s
     except (subprocess.SubprocessError, OSError) as e:
         logger.error(f"Failed to run command {command}: {e}")
         return False, "", str(e)
+
+
+async def run_command_async(
+    command: list[str], timeout: float | None = None
+) -> tuple[bool, str, str]:
+    """Run a command without blocking the event loop and return its output.
+
+    The asyncio counterpart of run_command(), so independent commands can run
+    concurrently, e.g. with ``asyncio.gather()``.
+
+    Args:
+        command: Command to run as a list of arguments.
+        timeout: Optional timeout in seconds; the command is killed when it expires.
+
+    Returns:
+        Tuple of (success, stdout, stderr).
+    """
+    # Imported here: asyncio is only needed by callers running an event loop
+    import asyncio
+    import subprocess
+
+    try:
+        with trace.span("run_command", command=" ".join(command[:2])):
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Command timed out after {timeout} seconds: {' '.join(command)}")
+                return False, "", "Command timed out"
+            finally:
+                # Also reached when the awaiting task is cancelled
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+    except (subprocess.SubprocessError, OSError) as e:
+        logger.error(f"Failed to run command {command}: {e}")
+        return False, "", str(e)
+
+    success = process.returncode == 0
+    out = stdout.decode(errors="replace").strip()
+    err = stderr.decode(errors="replace").strip()
+    if not success:
+        logger.debug(f"Command failed with code {process.returncode}: {err}")
+    return success, out, err
+
+
+def stream_command(
+    command: list[str],
+    separator: str = "\n",
+    timeout: float | None = None,
+    max_bytes: int | None = None,
+    encoding: str | None = "utf-8",
+    errors: str = "replace",
+    cwd: str | Path | None = None,
+) -> Iterator[str] | Iterator[bytes]:
+    """Run a command and yield its output one record at a time.
+
+    Unlike run_command(), output is never held in memory as a whole: it is read
+    in chunks and only the complete records of each chunk are decoded, so memory
+    use is bounded by the chunk size plus the longest record. The command runs in
+    its own process group, so a timeout, an output cap being exceeded or the
+    generator being closed early kills every process it started, not just the
+    command itself.
+
+    Args:
+        command: Command to run as a list of arguments.
+        separator: Single-character record separator, e.g. "\\0" for the output
+                   of ``git ... -z``.
+        timeout: Optional timeout in seconds for the whole command, including the
+                 time spent by the caller between records.
+        max_bytes: Optional limit on the bytes of output read.
+        encoding: Encoding of the records, or None to yield bytes.
+        errors: How undecodable bytes are handled, as for ``bytes.decode()``.
+        cwd: Directory to run the command in.
+
+    Yields:
+        Records without their separator; a trailing record without one is
+        yielded too.
+
+    Raises:
+        CommandError: If the command cannot be started, exits with a non-zero
+            code, times out or writes more than max_bytes.
+        ValueError: If the separator is not a single ASCII character.
+    """
+    # Imported here: most hook runs never fork, and subprocess is slow to import
+    import select
+    import subprocess
+
+    sep = separator.encode("ascii")
+    if len(sep) != 1:
+        raise ValueError(f"Separator must be a single character: {separator!r}")
+
+    try:
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+    except OSError as e:
+        logger.error(f"Failed to run command {command}: {e}")
+        raise CommandError(str(e)) from e
+
+    start_ns = time.perf_counter_ns()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    out_fd = process.stdout.fileno()
+    err_fd = process.stderr.fileno()
+    open_fds = [out_fd, err_fd]
+    buffer = bytearray()
+    stderr = bytearray()
+    total = 0
+    returncode = None
+    try:
+        while open_fds:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise _timed_out(command, timeout)
+            ready = select.select(open_fds, [], [], remaining)[0]
+            if not ready:
+                raise _timed_out(command, timeout)
+            for fd in ready:
+                chunk = os.read(fd, _READ_SIZE)
+                if not chunk:
+                    open_fds.remove(fd)
+                elif fd == err_fd:
+                    stderr += chunk[: _STDERR_LIMIT - len(stderr)]
+                else:
+                    total += len(chunk)
+                    if max_bytes is not None and total > max_bytes:
+                        logger.error(f"Command wrote more than {max_bytes} bytes: {command}")
+                        raise CommandError(f"Command output exceeds {max_bytes} bytes")
+                    end = chunk.rfind(sep)
+                    if end == -1:
+                        # Still inside the pending record
+                        buffer += chunk
+                        continue
+                    # Complete records are split and decoded a chunk at a time
+                    data = bytes(buffer + chunk[:end])
+                    buffer = bytearray(chunk[end + 1 :])
+                    if encoding:
+                        yield from data.decode(encoding, errors).split(separator)
+                    else:
+                        yield from data.split(sep)
+        if buffer:
+            data = bytes(buffer)
+            yield data.decode(encoding, errors) if encoding else data
+
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            returncode = process.wait(remaining)
+        except subprocess.TimeoutExpired:
+            raise _timed_out(command, timeout) from None
+    finally:
+        if returncode is None:
+            _kill_process_group(process)
+        process.stdout.close()
+        process.stderr.close()
+        trace.record("run_command", start_ns, time.perf_counter_ns(), command=" ".join(command[:2]))
+
+    if returncode != 0:
+        message = stderr.decode("utf-8", errors="replace").strip()
+        logger.debug(f"Command failed with code {returncode}: {message}")
+        raise CommandError(message or f"Command failed with code {returncode}", returncode, message)
+
+
+def _timed_out(command: list[str], timeout: float | None) -> CommandError:
+    logger.error(f"Command timed out after {timeout} seconds: {' '.join(command)}")
+    return CommandError("Command timed out")
+
+
+def _kill_process_group(process) -> None:
+    """Kill a command started in its own session along with its children."""
+    import signal
+
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        # Already gone, or the group leader has been reaped
+        process.kill()
+    process.wait()
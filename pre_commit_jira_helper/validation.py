@@ -0,0 +1,530 @@
+"""Check that issue keys exist in Jira, within a latency budget.
+
+Answers are kept in an SQLite cache shared by all repositories, with separate
+lifetimes for keys that exist and keys that do not. Keys missing from the cache
+are looked up with a single JQL search over a kept-alive connection. When the
+budget runs out, or Jira cannot be reached, only cached answers are used and
+unknown keys are assumed to exist, so a slow or unreachable Jira never blocks
+a commit. A search that outlives the budget still caches its answer when it
+completes.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+
+from pre_commit_jira_helper.logger import get_logger
+
+logger = get_logger("validation")
+
+DEFAULT_BUDGET = 0.5
+DEFAULT_POSITIVE_TTL = 7 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 15 * 60
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Credentials are read from the environment, never from the command line
+USER_ENV = "JIRA_USER_EMAIL"
+TOKEN_ENV = "JIRA_API_TOKEN"
+
+# Jira Cloud removed the offset-paged search in favour of one paged by token
+SEARCH_PATH = "/rest/api/2/search"
+CLOUD_SEARCH_PATH = "/rest/api/3/search/jql"
+CLOUD_DOMAIN = ".atlassian.net"
+
+# Socket timeout of a search, which may finish after the budget to fill the cache
+SEARCH_TIMEOUT = 10.0
+
+# Keys per JQL query, well below the length limits of Jira and proxies
+_BATCH_SIZE = 100
+
+# Only keys of this form are put into JQL; anything else is never validated
+_KEY = re.compile(r"[A-Z][A-Z0-9_]*-[0-9]+")
+
+
+class JiraError(Exception):
+    """Raised when Jira cannot answer a request."""
+
+    def __init__(self, message: str, status: int | None = None, details: Sequence[str] = ()):
+        """Initialize the error.
+
+        Args:
+            message: Description of the failure.
+            status: HTTP status of Jira's response, or None if there was none.
+            details: Error messages from the body of Jira's response.
+        """
+        super().__init__(message)
+        self.status = status
+        self.details = list(details)
+
+
+def env_credentials(env: Mapping[str, str] | None = None) -> dict[str, str | None]:
+    """Read the Jira credentials from an environment.
+
+    Args:
+        env: Environment variables (default: os.environ).
+
+    Returns:
+        The ``user`` and ``token`` keyword arguments of JiraClient.
+    """
+    env = os.environ if env is None else env
+    return {"user": env.get(USER_ENV) or None, "token": env.get(TOKEN_ENV) or None}
+
+
+def default_cache_path() -> Path:
+    """Get the location of the cache shared by all repositories.
+
+    Returns:
+        ``issues.sqlite3`` in the user's cache directory.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pre-commit-jira-helper" / "issues.sqlite3"
+
+
+class IssueCache:
+    """On-disk cache of whether issue keys exist, per Jira site.
+
+    Entries expire after positive_ttl seconds for keys that exist and
+    negative_ttl seconds for keys that do not, and the least recently checked
+    entries are evicted once there are more than max_entries. Errors reading or
+    writing the database are logged and treated as cache misses. The cache may
+    be used from several threads.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        positive_ttl: float = DEFAULT_POSITIVE_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Initialize the cache; the database is opened on first use.
+
+        Args:
+            path: Database file (default: default_cache_path()).
+            positive_ttl: Seconds an existing key is trusted.
+            negative_ttl: Seconds a missing key is trusted.
+            max_entries: Entries kept before the oldest are evicted.
+        """
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._db is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=1.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS issues (site TEXT NOT NULL, key TEXT NOT NULL, "
+                "found INTEGER NOT NULL, checked REAL NOT NULL, PRIMARY KEY (site, key))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS issues_checked ON issues (checked)")
+            self._db = db
+        return self._db
+
+    def get(self, site: str, keys: Sequence[str]) -> dict[str, bool]:
+        """Look up keys whose answer has not expired.
+
+        Args:
+            site: Base URL of the Jira site.
+            keys: Issue keys.
+
+        Returns:
+            Mapping of the cached keys to whether they exist.
+        """
+        if not keys:
+            return {}
+        import sqlite3
+
+        now = time.time()
+        try:
+            with self._lock:
+                rows = (
+                    self._connect()
+                    .execute(
+                        "SELECT key, found, checked FROM issues WHERE site = ? AND key IN "
+                        f"({', '.join('?' * len(keys))})",
+                        (site, *keys),
+                    )
+                    .fetchall()
+                )
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Cannot read the issue cache {self.path}: {e}")
+            return {}
+        return {
+            key: bool(found)
+            for key, found, checked in rows
+            if now - checked < (self.positive_ttl if found else self.negative_ttl)
+        }
+
+    def put(self, site: str, results: dict[str, bool]) -> None:
+        """Store answers, evicting the oldest entries beyond max_entries.
+
+        Args:
+            site: Base URL of the Jira site.
+            results: Mapping of issue keys to whether they exist.
+        """
+        import sqlite3
+
+        now = time.time()
+        try:
+            with self._lock:
+                self._write(site, results, now)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Cannot update the issue cache {self.path}: {e}")
+
+    def _write(self, site: str, results: dict[str, bool], now: float) -> None:
+        db = self._connect()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?)",
+                [(site, key, int(found), now) for key, found in results.items()],
+            )
+            (count,) = db.execute("SELECT COUNT(*) FROM issues").fetchone()
+            if count > self.max_entries:
+                db.execute(
+                    "DELETE FROM issues WHERE rowid IN "
+                    "(SELECT rowid FROM issues ORDER BY checked LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class JiraClient:
+    """Minimal Jira REST client reusing connections across searches.
+
+    Idle connections are kept per host for the life of the process, so the
+    daemon and batched lookups skip the TCP and TLS handshakes. Credentials are
+    given when the client is built, never read from the environment, so a
+    client can be used from any thread.
+    """
+
+    _idle: dict[tuple[str, str], list] = {}
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        base_url: str,
+        cloud: bool | None = None,
+        user: str | None = None,
+        token: str | None = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            base_url: Base URL of the Jira site, e.g. ``https://example.atlassian.net``.
+            cloud: Whether the site is Jira Cloud, which decides the search API
+                (default: whether the host is under ``atlassian.net``).
+            user: Email of the user, for basic authentication with the token.
+            token: API token, or personal access token if there is no user.
+
+        Raises:
+            ValueError: If the URL is not an http or https URL.
+        """
+        from urllib.parse import urlsplit
+
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.netloc:
+            raise ValueError(f"Not an http(s) URL: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self._scheme = url.scheme
+        self._netloc = url.netloc
+        self._path = url.path.rstrip("/")
+        if cloud is None:
+            cloud = (url.hostname or "").endswith(CLOUD_DOMAIN)
+        self.cloud = cloud
+        self._headers = self._build_headers(user, token)
+
+    @staticmethod
+    def _build_headers(user: str | None, token: str | None) -> dict[str, str]:
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if token and user:
+            import base64
+
+            credentials = base64.b64encode(f"{user}:{token}".encode()).decode("ascii")
+            headers["Authorization"] = f"Basic {credentials}"
+        elif token:
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    def _connection(self):
+        """Borrow an idle connection to the site, or create a new one.
+
+        Returns:
+            Tuple of (connection, whether it was used before).
+        """
+        import http.client
+
+        with self._lock:
+            idle = self._idle.get((self._scheme, self._netloc))
+            if idle:
+                return idle.pop(), True
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(self._netloc), False
+        return http.client.HTTPConnection(self._netloc), False
+
+    def _release(self, connection) -> None:
+        with self._lock:
+            self._idle.setdefault((self._scheme, self._netloc), []).append(connection)
+
+    def request(
+        self, method: str, path: str, payload: object = None, timeout: float | None = None
+    ) -> object:
+        """Send a request to the REST API and decode the JSON response.
+
+        Args:
+            method: HTTP method.
+            path: Path below the base URL, e.g. ``/rest/api/2/search``.
+            payload: Value sent as the JSON body, or None to send no body.
+            timeout: Socket timeout in seconds.
+
+        Returns:
+            The decoded response, or None if it has no body.
+
+        Raises:
+            JiraError: If the request fails or Jira rejects it.
+        """
+        import http.client
+        import json
+
+        # A bytes body is sent with the headers in one packet, avoiding a delayed ACK
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = self._headers
+        while True:
+            connection, reused = self._connection()
+            try:
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                connection.request(method, self._path + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                if reused:
+                    # The server may have closed an idle connection; retry on a new one
+                    continue
+                raise JiraError(f"Cannot reach Jira at {self.base_url}: {e}") from e
+            break
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+
+        if response.status in (401, 403):
+            raise JiraError(f"Jira rejected the credentials ({response.status})", response.status)
+        if not 200 <= response.status < 300:
+            raise JiraError(
+                f"Jira {method} {path} failed with status {response.status}",
+                response.status,
+                _error_messages(data),
+            )
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise JiraError(f"Unexpected response from Jira: {e}") from e
+
+    def iter_search(
+        self, jql: str, page_size: int, timeout: float | None = None
+    ) -> Iterator[list[str]]:
+        """Run a JQL search and yield the keys of the issues found, page by page.
+
+        Jira Cloud is paged with ``nextPageToken`` on ``/rest/api/3/search/jql``,
+        other sites with ``startAt`` on ``/rest/api/2/search``.
+
+        Args:
+            jql: The query.
+            page_size: Issues requested per page.
+            timeout: Socket timeout of each request in seconds.
+
+        Yields:
+            The issue keys of each page.
+
+        Raises:
+            JiraError: If a request fails or Jira rejects it.
+        """
+        payload: dict = {"jql": jql, "fields": ["key"], "maxResults": page_size}
+        if not self.cloud:
+            # Report unknown keys as warnings instead of failing the query
+            payload.update(startAt=0, validateQuery="warn")
+        while True:
+            response = self.request(
+                "POST", CLOUD_SEARCH_PATH if self.cloud else SEARCH_PATH, payload, timeout
+            )
+            try:
+                keys = [issue["key"] for issue in response["issues"]]
+                if self.cloud:
+                    token = response.get("nextPageToken")
+                    last = bool(response.get("isLast")) or token is None
+                else:
+                    total = response.get("total")
+                    payload["startAt"] += len(keys)
+                    last = total is None or payload["startAt"] >= total
+            except (KeyError, TypeError) as e:
+                raise JiraError(f"Unexpected search results from Jira: {e}") from e
+            yield keys
+            if last or not keys:
+                return
+            if self.cloud:
+                payload["nextPageToken"] = token
+
+    def search(self, keys: Sequence[str], timeout: float | None = None) -> set[str]:
+        """Find which of the keys exist and are visible to the user.
+
+        Args:
+            keys: Issue keys, all of the form ``ABC-123``.
+            timeout: Socket timeout of each request in seconds.
+
+        Returns:
+            The keys that exist.
+
+        Raises:
+            JiraError: If a request fails or Jira rejects it.
+        """
+        keys = list(keys)
+        while keys:
+            try:
+                return {
+                    key
+                    for page in self.iter_search(f"key in ({', '.join(keys)})", len(keys), timeout)
+                    for key in page
+                }
+            except JiraError as e:
+                # Jira Cloud fails the query on keys that do not exist, naming them
+                absent = {key for message in e.details for key in _KEY.findall(message)}
+                if e.status != 400 or not absent.intersection(keys):
+                    raise
+                keys = [key for key in keys if key not in absent]
+        return set()
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close every idle connection."""
+        with cls._lock:
+            for connections in cls._idle.values():
+                for connection in connections:
+                    connection.close()
+            cls._idle.clear()
+
+
+class IssueValidator:
+    """Find issue keys that do not exist in Jira, within a latency budget."""
+
+    def __init__(
+        self,
+        base_url: str,
+        budget: float = DEFAULT_BUDGET,
+        cache: IssueCache | None = None,
+        user: str | None = None,
+        token: str | None = None,
+    ):
+        """Initialize the validator.
+
+        Args:
+            base_url: Base URL of the Jira site.
+            budget: Seconds a validation may take, including the Jira search.
+            cache: Cache of earlier answers (default: the shared on-disk cache).
+            user: Email of the user, for basic authentication with the token.
+            token: Jira API token or personal access token.
+
+        Raises:
+            ValueError: If the URL is not an http or https URL.
+        """
+        self.client = JiraClient(base_url, user=user, token=token)
+        self.budget = budget
+        self.cache = cache if cache is not None else IssueCache()
+
+    def find_missing(self, keys: Iterable[str]) -> list[str]:
+        """Find the keys known not to exist.
+
+        Keys that are neither cached nor answered by Jira within the budget are
+        assumed to exist.
+
+        Args:
+            keys: Issue keys.
+
+        Returns:
+            The keys that do not exist, in the given order.
+        """
+        deadline = time.monotonic() + self.budget
+        keys = list(dict.fromkeys(keys))
+        site = self.client.base_url
+        known = self.cache.get(site, keys)
+        unknown = [key for key in keys if key not in known and _KEY.fullmatch(key)]
+        if unknown:
+            found = self._search(unknown, deadline)
+            if found is not None:
+                known.update({key: key in found for key in unknown})
+        return [key for key in keys if known.get(key) is False]
+
+    def _search(self, keys: list[str], deadline: float) -> set[str] | None:
+        """Search Jira for the keys, giving up at the deadline.
+
+        The search runs in a thread so that name resolution and slow responses
+        cannot hold up the caller beyond the deadline. The thread caches the
+        answer itself, so one that comes too late still serves later lookups
+        made while the process lives on (as in the daemon).
+
+        Returns:
+            The keys that exist, or None if Jira did not answer in time.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.debug("No time left to ask Jira, using cached answers only")
+            return None
+
+        result: list = []
+        site = self.client.base_url
+
+        def search():
+            found = set()
+            try:
+                for start in range(0, len(keys), _BATCH_SIZE):
+                    found |= self.client.search(keys[start : start + _BATCH_SIZE], SEARCH_TIMEOUT)
+            except JiraError as e:
+                result.append(e)
+                return
+            # Cached even when the caller gave up waiting, for the next commits
+            self.cache.put(site, {key: key in found for key in keys})
+            result.append(found)
+
+        thread = threading.Thread(target=search, name="jira-search", daemon=True)
+        thread.start()
+        thread.join(remaining)
+        if not result:
+            logger.warning(f"Jira did not answer within {self.budget:g}s, using cached answers")
+            return None
+        if isinstance(result[0], JiraError):
+            logger.warning(f"Cannot validate issues: {result[0]}")
+            return None
+        return result[0]
+
+
+def _error_messages(data: bytes) -> list[str]:
+    """Get the error messages of a Jira error response, if it has any."""
+    import json
+
+    try:
+        body = json.loads(data)
+        return [*body.get("errorMessages", ()), *body.get("errors", {}).values()]
+    except (ValueError, TypeError, AttributeError):
+        return []
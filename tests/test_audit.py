@@ -0,0 +1,169 @@
+"""Tests for audit module."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper.audit import (
+    RepoAudit,
+    audit_repositories,
+    discover_repositories,
+    repository_size,
+)
+from pre_commit_jira_helper.cli.helper import main as helper_main
+
+
+def git(*args, cwd):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def make_repo(path, messages, bare=False):
+    """Create a repository whose main branch has the given commit messages."""
+    work = path.with_name(path.name + "-work") if bare else path
+    git("init", "-q", "-b", "main", str(work), cwd=path.parent)
+    for message in messages:
+        git("commit", "-q", "--allow-empty", "-m", message, cwd=work)
+    if bare:
+        git("clone", "-q", "--bare", str(work), str(path), cwd=path.parent)
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """Directory with a clone, a bare repository, an empty one and a plain directory."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+
+    root = tmp_path / "root"
+    (root / "team" / "docs").mkdir(parents=True)
+    make_repo(root / "team" / "app", ["ABC-1: Add form", "Fix typo", "XYZ-2: Tweak"])
+    (root / "mirrors").mkdir()
+    make_repo(tmp_path / "lib.git", ["ABC-3: Start"], bare=True)
+    (tmp_path / "lib.git").rename(root / "mirrors" / "lib.git")
+    git("init", "-q", str(root / "empty"), cwd=tmp_path)
+    # Nested repositories inside a repository are not audited
+    git("init", "-q", str(root / "team" / "app" / "vendor"), cwd=tmp_path)
+    return root
+
+
+class TestDiscoverRepositories:
+    """Test discover_repositories function."""
+
+    def test_finds_repositories(self, tree):
+        """Test that clones and bare repositories are found, without nesting."""
+        found = sorted(path.relative_to(tree).as_posix() for path, _ in discover_repositories(tree))
+
+        assert found == ["empty", "mirrors/lib.git", "team/app"]
+
+    def test_worktree(self, tree):
+        """Test that a linked worktree is found and sized from the main repository."""
+        app = tree / "team" / "app"
+        git("gc", "-q", cwd=app)
+        git("worktree", "add", "-q", str(tree / "wt"), cwd=app)
+
+        sizes = {path.name: size for path, size in discover_repositories(tree)}
+
+        assert sizes["wt"] == sizes["app"] > 0
+
+    def test_size_without_packs(self, tmp_path):
+        """Test that a repository without packs has size 0."""
+        assert repository_size(tmp_path) == 0
+
+
+class TestAuditRepositories:
+    """Test audit_repositories function."""
+
+    def test_counts_commits(self, tree):
+        """Test that every repository is scanned with the matcher."""
+        results = {
+            r.repository: r
+            for r in audit_repositories(discover_repositories(tree), prefixes=["ABC"], jobs=2)
+        }
+
+        app = results[str(tree / "team" / "app")]
+        assert (app.commits, app.missing, app.error) == (3, 2, None)
+        lib = results[str(tree / "mirrors" / "lib.git")]
+        assert (lib.commits, lib.missing) == (1, 0)
+        empty = results[str(tree / "empty")]
+        assert (empty.commits, empty.error) == (0, None)
+
+    def test_broken_repository(self, tree):
+        """Test that a repository whose HEAD names a missing commit is reported."""
+        app = tree / "team" / "app"
+        branch = git("symbolic-ref", "HEAD", cwd=app).strip()
+        (app / ".git" / branch).write_text("1" * 40 + "\n")
+
+        (result,) = audit_repositories([(app, 0)])
+
+        assert result.error
+
+    def test_native(self, tree):
+        """Test that reading objects directly gives the same counts."""
+
+        def counts(**kwargs):
+            results = audit_repositories(discover_repositories(tree), jobs=1, **kwargs)
+            return sorted((r.repository, r.commits, r.missing) for r in results)
+
+        assert counts(native=True) == counts()
+
+    def test_largest_first(self, tree):
+        """Test that repositories are scheduled by decreasing size."""
+        repositories = [(path, i) for i, (path, _) in enumerate(discover_repositories(tree))]
+
+        results = list(audit_repositories(repositories, jobs=1))
+
+        assert [r.size for r in results] == [2, 1, 0]
+
+    def test_no_repositories(self):
+        """Test that nothing is started for an empty tree."""
+        assert list(audit_repositories([])) == []
+
+
+class TestAuditCommand:
+    """Test the jira-helper audit subcommand."""
+
+    def test_csv(self, tree, capsys):
+        """Test streaming CSV results and the summary."""
+        exit_code = helper_main(["audit", "--prefixes", "ABC", str(tree)])
+
+        out, err = capsys.readouterr()
+        rows = {row["repository"]: row for row in csv.DictReader(io.StringIO(out))}
+        assert rows[str(tree / "team" / "app")]["missing"] == "2"
+        assert "3 repositories: 2 of 4 commits have no Jira issue\n" in err
+        assert exit_code == 0
+
+    def test_jsonl_to_file(self, tree, tmp_path):
+        """Test writing JSON lines to a file."""
+        output = tmp_path / "audit.jsonl"
+        helper_main(["audit", "--format", "jsonl", "-o", str(output), str(tree / "team")])
+
+        (row,) = [json.loads(line) for line in output.read_text().splitlines()]
+        assert row == {
+            "repository": str(tree / "team" / "app"),
+            "size": row["size"],
+            "commits": 3,
+            "missing": 1,
+            "error": None,
+        }
+
+    def test_interrupted(self, tree, mocker, capsys):
+        """Test that results written before an interruption are kept."""
+
+        def results(*_, **__):
+            yield RepoAudit("done", commits=1)
+            raise KeyboardInterrupt
+
+        mocker.patch("pre_commit_jira_helper.audit.audit_repositories", side_effect=results)
+
+        assert helper_main(["audit", str(tree)]) == 130
+        out, err = capsys.readouterr()
+        assert out.splitlines()[1].startswith("done,")
+        assert "Interrupted after 1 repositories" in err
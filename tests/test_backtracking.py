@@ -0,0 +1,57 @@
+"""Tests for backtracking module."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from pre_commit_jira_helper.backtracking import find_backtracking_risk
+from pre_commit_jira_helper.matcher import DEFAULT_ISSUE_PATTERN
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"([A-Z]+)+-\d+",
+        r"(a+)+",
+        r"(\w+\s?)*x",
+        r"(.*a){20}",
+        r"(a*)*b",
+        r"(\d+\d+)+",
+        r"(?i)([a-z]+[A-Z])+",
+        r"(a|aa)*b",
+        r"(a|a)+b",
+        r"(?:x|\w+)+",
+    ],
+)
+def test_risky_patterns(pattern):
+    """Test that nested and overlapping repetitions are reported."""
+    assert find_backtracking_risk(pattern)
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        DEFAULT_ISSUE_PATTERN,
+        r"(?:ABC|XYZ)-\d+",
+        r"\b([A-Z]{2,10}-\d+)\b",
+        r"(?:[A-Z]+-)+\d+",
+        r"([A-Z][A-Z0-9_]*-\d+)+",
+        r"(?:(?:PROJ|OPS)-\d+,?)+",
+        r"(ab|ac)*",
+        r"(?:\w+\s)+x",
+        r"(?<![A-Z])[A-Z]+-\d+",
+        r"(?:[A-Z]+-\d+|#\d+)",
+        r"[^\s]+-\d+",
+    ],
+)
+def test_safe_patterns(pattern):
+    """Test that common issue patterns are not reported."""
+    assert find_backtracking_risk(pattern) is None
+
+
+def test_invalid_pattern():
+    """Test that invalid patterns raise like re.compile."""
+    with pytest.raises(re.error):
+        find_backtracking_risk("([A-Z]+")
@@ -4,7 +4,10 @@ from __future__ import annotations
 
 from unittest.mock import Mock
 
-from pre_commit_jira_helper.base import BaseHook, CommitMessageHook
+import pytest
+
+from pre_commit_jira_helper.base import BaseHook, CommitMessageHook, CommitMessageHookChain
+from pre_commit_jira_helper.git import RepoState
 
 
 class ConcreteBaseHook(BaseHook):
@@ -85,6 +88,51 @@ class TestBaseHook:
         assert result == 1
 
 
+class TestSkipDuring:
+    """Test skipping hooks while an operation is in progress."""
+
+    def test_skips_configured_operation(self, mocker):
+        """Test that the hook does nothing during a configured operation."""
+        mocker.patch(
+            "pre_commit_jira_helper.base.GitOperations.get_repo_state",
+            return_value=RepoState("rebase", "refs/heads/ABC-1"),
+        )
+        hook = ConcreteBaseHook(skip_during=["rebase", "merge"], process_result=False)
+        should_run = mocker.spy(hook, "should_run")
+
+        assert hook.is_skipped() is True
+        assert hook.run() == 0
+        should_run.assert_not_called()
+
+    def test_runs_during_other_operations(self, mocker):
+        """Test that other operations do not skip the hook."""
+        mocker.patch(
+            "pre_commit_jira_helper.base.GitOperations.get_repo_state",
+            return_value=RepoState("cherry-pick"),
+        )
+        hook = ConcreteBaseHook(skip_during=["rebase"], process_result=False)
+
+        assert hook.run() == 1
+
+    def test_state_not_read_without_skip_during(self, mocker):
+        """Test that hooks without skip_during never look at the repository state."""
+        mock_state = mocker.patch("pre_commit_jira_helper.base.GitOperations.get_repo_state")
+
+        assert ConcreteBaseHook().run() == 0
+        mock_state.assert_not_called()
+
+    def test_transform_message_skips(self, mocker):
+        """Test that skipped hooks leave the message unchanged inside a chain."""
+        mocker.patch(
+            "pre_commit_jira_helper.base.GitOperations.get_repo_state",
+            return_value=RepoState("merge"),
+        )
+
+        hook = UppercaseHook(skip_during=["merge"])
+
+        assert hook.transform_message("fix\n", "unused") == ("fix\n", True)
+
+
 class ConcreteCommitMessageHook(CommitMessageHook):
     """Concrete implementation of CommitMessageHook for testing."""
 
@@ -98,27 +146,18 @@ class ConcreteCommitMessageHook(CommitMessageHook):
 class TestCommitMessageHook:
     """Test CommitMessageHook class."""
 
-    def test_read_commit_message_success(self, mocker):
+    def test_read_commit_message_success(self, tmp_path):
         """Test successful commit message reading."""
-        test_content = (
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text(
             "Initial commit\n# Please enter the commit message\n"
             "# Lines starting with '#' will be ignored"
         )
 
-        # Mock the path's existence and open method
-        mock_path = mocker.patch("pre_commit_jira_helper.base.Path")
-        mock_path_instance = Mock()
-        mock_path.return_value = mock_path_instance
-        mock_path_instance.exists.return_value = True
-        mock_path_instance.open.return_value.__enter__ = Mock(
-            return_value=iter(test_content.split("\n"))
-        )
-        mock_path_instance.open.return_value.__exit__ = Mock(return_value=None)
-
         hook = ConcreteCommitMessageHook()
-        result = hook.read_commit_message("/tmp/commit_msg")
+        result = hook.read_commit_message(path)
 
-        assert result == "Initial commit"
+        assert result == "Initial commit\n"
 
     def test_read_commit_message_file_not_exists(self, mocker):
         """Test commit message reading when file doesn't exist."""
@@ -170,3 +209,289 @@ class TestCommitMessageHook:
 
         for message in non_merge_messages:
             assert hook.is_merge_commit(message) is False
+
+
+class UppercaseHook(CommitMessageHook):
+    """File-based hook written without knowledge of transform_message."""
+
+    def should_run(self, commit_msg_filepath):
+        self.commit_msg = self.read_commit_message(commit_msg_filepath)
+        return not self.commit_msg.isupper()
+
+    def process(self, commit_msg_filepath):
+        self.write_commit_message(commit_msg_filepath, self.commit_msg.upper())
+        return True
+
+
+class TestTransformMessage:
+    """Test CommitMessageHook.transform_message."""
+
+    def test_transform_in_memory(self, tmp_path):
+        """Test that a file-based hook transforms a message without file I/O."""
+        path = tmp_path / "COMMIT_EDITMSG"
+
+        result = UppercaseHook().transform_message("fix bug\n", path)
+
+        assert result == ("FIX BUG\n", True)
+        assert not path.exists()
+
+    def test_transform_skipped(self, tmp_path):
+        """Test that the message is returned unchanged when the hook skips."""
+        assert UppercaseHook().transform_message("DONE\n", tmp_path / "msg") == ("DONE\n", True)
+
+    def test_transform_reports_failure(self, tmp_path):
+        """Test that the result of process() is returned with the message."""
+
+        class RejectingHook(UppercaseHook):
+            def process(self, commit_msg_filepath):
+                super().process(commit_msg_filepath)
+                return False
+
+        assert RejectingHook().transform_message("fix\n", tmp_path / "msg") == ("FIX\n", False)
+
+    def test_buffer_released_after_error(self, tmp_path):
+        """Test that file access is restored when the hook raises."""
+
+        class FailingHook(UppercaseHook):
+            def process(self, **_kwargs):
+                raise ValueError("boom")
+
+        hook = FailingHook()
+        with pytest.raises(ValueError):
+            hook.transform_message("fix\n", tmp_path / "msg")
+        (tmp_path / "msg").write_text("from file\n")
+
+        assert hook.read_commit_message(tmp_path / "msg") == "from file\n"
+
+
+class TestCommitMessageHookChain:
+    """Test CommitMessageHookChain class."""
+
+    def test_chain_applies_hooks_in_order(self, tmp_path):
+        """Test that every hook sees the previous hook's output and the file is written once."""
+
+        class SuffixHook(UppercaseHook):
+            def should_run(self, commit_msg_filepath):
+                self.commit_msg = self.read_commit_message(commit_msg_filepath)
+                return True
+
+            def process(self, commit_msg_filepath):
+                self.write_commit_message(commit_msg_filepath, self.commit_msg + "done\n")
+                return True
+
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text("fix\n# comment\n")
+
+        chain = CommitMessageHookChain([UppercaseHook(), SuffixHook])
+
+        assert chain.run(commit_msg_filepath=path) == 0
+        assert path.read_text() == "FIX\ndone\n"
+
+    def test_factories_are_lazy(self):
+        """Test that hook factories are not called until the chain runs."""
+        factory = Mock(return_value=UppercaseHook())
+        chain = CommitMessageHookChain([factory])
+
+        factory.assert_not_called()
+        assert chain.hooks == [factory.return_value]
+        assert chain.hooks == [factory.return_value]
+        factory.assert_called_once()
+
+    def test_unchanged_message_is_not_written(self, tmp_path, mocker):
+        """Test that the file is left alone when no hook changes the message."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text("ALREADY UPPER\n")
+        mock_write = mocker.patch.object(CommitMessageHookChain, "write_commit_message")
+
+        assert CommitMessageHookChain([UppercaseHook()]).run(commit_msg_filepath=path) == 0
+        mock_write.assert_not_called()
+
+    def test_empty_message_skips(self, tmp_path):
+        """Test that an empty message skips the chain."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text("# only comments\n")
+        factory = Mock()
+
+        assert CommitMessageHookChain([factory]).run(commit_msg_filepath=path) == 0
+        factory.assert_not_called()
+
+    def test_failing_hook_leaves_file_untouched(self, tmp_path):
+        """Test that an exception in any hook aborts without writing."""
+
+        class FailingHook(UppercaseHook):
+            def should_run(self, **_kwargs):
+                return True
+
+            def process(self, **_kwargs):
+                raise ValueError("boom")
+
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text("fix\n")
+
+        assert (
+            CommitMessageHookChain([UppercaseHook(), FailingHook()]).run(commit_msg_filepath=path)
+            == 1
+        )
+        assert path.read_text() == "fix\n"
+
+    def test_hook_returning_failure_stops_chain(self, tmp_path):
+        """Test that a hook whose process() fails fails the chain like it fails alone."""
+
+        class RejectingHook(UppercaseHook):
+            def should_run(self, **_kwargs):
+                return True
+
+            def process(self, **_kwargs):
+                return False
+
+        after = Mock()
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text("fix\n")
+
+        assert RejectingHook().run(commit_msg_filepath=path) == 1
+        chain = CommitMessageHookChain([UppercaseHook(), RejectingHook(), after])
+        assert chain.run(commit_msg_filepath=path) == 1
+        assert path.read_text() == "fix\n"
+        after.return_value.transform_message.assert_not_called()
+
+
+VERBOSE_TAIL = (
+    b"# ------------------------ >8 ------------------------\n"
+    b"# Do not modify or remove the line above.\n"
+    b"diff --git a/data.bin b/data.bin\n"
+    b"+# not a comment\n"
+    b"+\xff\xfe binary-ish \r\n"
+)
+
+
+@pytest.fixture
+def comment_settings(mocker):
+    """Control core.commentChar and commit.cleanup without reading git config."""
+
+    def configure(comment_char="#", cleanup="default"):
+        config = {"core.commentchar": comment_char, "commit.cleanup": cleanup}
+        return mocker.patch(
+            "pre_commit_jira_helper.base.GitOperations.get_config", return_value=config
+        )
+
+    configure()
+    return configure
+
+
+@pytest.mark.usefixtures("comment_settings")
+class TestScissors:
+    """Test reading and writing messages written by ``git commit -v``."""
+
+    def test_read_stops_at_scissors(self, tmp_path):
+        """Test that the diff below the scissors line is not part of the message."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix bug\n\n# Please enter the commit message\n" + VERBOSE_TAIL)
+
+        assert ConcreteCommitMessageHook().read_commit_message(path) == "fix bug\n\n"
+
+    def test_write_preserves_tail(self, tmp_path):
+        """Test that the scissors line and diff are copied over byte for byte."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix bug\n# comment\n" + VERBOSE_TAIL)
+        path.chmod(0o640)
+        hook = ConcreteCommitMessageHook()
+
+        message = hook.read_commit_message(path)
+        hook.write_commit_message(path, "ABC-1: " + message)
+
+        assert path.read_bytes() == b"ABC-1: fix bug\n" + VERBOSE_TAIL
+        assert path.stat().st_mode & 0o777 == 0o640
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_write_keeps_scissors_at_line_start(self, tmp_path):
+        """Test that a message without a final newline does not swallow the cut line."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix\n" + VERBOSE_TAIL)
+        hook = ConcreteCommitMessageHook()
+
+        hook.read_commit_message(path)
+        hook.write_commit_message(path, "ABC-1: fix")
+
+        assert path.read_bytes() == b"ABC-1: fix\n" + VERBOSE_TAIL
+
+    def test_modified_file_is_rewritten_without_tail(self, tmp_path):
+        """Test that a file changed since it was read is not spliced."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix\n" + VERBOSE_TAIL)
+        hook = ConcreteCommitMessageHook()
+
+        hook.read_commit_message(path)
+        path.write_bytes(b"replaced by someone else\n")
+        hook.write_commit_message(path, "ABC-1: fix\n")
+
+        assert path.read_bytes() == b"ABC-1: fix\n"
+
+    def test_scissors_must_start_a_line(self, tmp_path):
+        """Test that a cut line quoted inside another line is ignored."""
+        content = "see x# ------------------------ >8 ------------------------\nmore\n"
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text(content)
+
+        assert ConcreteCommitMessageHook().read_commit_message(path) == content
+
+    def test_custom_comment_char(self, tmp_path, comment_settings):
+        """Test that core.commentChar selects comment and scissors lines."""
+        comment_settings(comment_char=";")
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(
+            b"fix\n#123 is kept\n; comment\n"
+            b"# ------------------------ >8 ------------------------\n"
+            b"; ------------------------ >8 ------------------------\ndiff\n"
+        )
+
+        message = ConcreteCommitMessageHook().read_commit_message(path)
+
+        assert message == (
+            "fix\n#123 is kept\n# ------------------------ >8 ------------------------\n"
+        )
+
+    def test_auto_comment_char(self, tmp_path, comment_settings):
+        """Test that core.commentChar=auto takes the comment char from the cut line."""
+        comment_settings(comment_char="auto")
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(
+            b"#123 fix\n; comment\n; ------------------------ >8 ------------------------\ndiff\n"
+        )
+
+        assert ConcreteCommitMessageHook().read_commit_message(path) == "#123 fix\n"
+
+    @pytest.mark.parametrize("cleanup", ["verbatim", "whitespace", "scissors"])
+    def test_cleanup_modes_keep_comments(self, tmp_path, comment_settings, cleanup):
+        """Test that comment lines are kept when git would keep them."""
+        comment_settings(cleanup=cleanup)
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix\n# kept\n" + VERBOSE_TAIL)
+
+        assert ConcreteCommitMessageHook().read_commit_message(path) == "fix\n# kept\n"
+
+    def test_large_file_is_mapped(self, tmp_path, mocker):
+        """Test the mmap path used for large files."""
+        mocker.patch("pre_commit_jira_helper.base._MMAP_THRESHOLD", 16)
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix\n" + VERBOSE_TAIL + b"+x\n" * 1000)
+        hook = ConcreteCommitMessageHook()
+
+        assert hook.read_commit_message(path) == "fix\n"
+        hook.write_commit_message(path, "ABC-1: fix\n")
+        assert path.read_bytes() == b"ABC-1: fix\n" + VERBOSE_TAIL + b"+x\n" * 1000
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64])
+    def test_scissors_across_chunks(self, tmp_path, mocker, chunk_size):
+        """Test that a cut line split between read chunks is found."""
+        mocker.patch("pre_commit_jira_helper.base._CHUNK_SIZE", chunk_size)
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix bug\n" + VERBOSE_TAIL)
+
+        assert ConcreteCommitMessageHook().read_commit_message(path) == "fix bug\n"
+
+    def test_crlf_message(self, tmp_path):
+        """Test that CRLF line endings are normalized as before."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_bytes(b"fix\r\n# comment\r\n")
+
+        assert ConcreteCommitMessageHook().read_commit_message(path) == "fix\n"
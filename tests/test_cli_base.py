@@ -4,7 +4,14 @@ from __future__ import annotations
 
 import argparse
 
-from pre_commit_jira_helper.cli.base import add_common_arguments, create_parser
+import pytest
+
+from pre_commit_jira_helper.cli.base import (
+    add_common_arguments,
+    add_issue_arguments,
+    create_parser,
+    parse_prefixes,
+)
 
 
 class TestAddCommonArguments:
@@ -30,6 +37,25 @@ class TestAddCommonArguments:
 
         assert args.commit_msg_filepath == "test_commit_msg"
         assert args.debug is False
+        assert args.skip_during is None
+
+    def test_skip_during(self):
+        """Test parsing the operations to skip."""
+        parser = argparse.ArgumentParser()
+        add_common_arguments(parser)
+
+        args = parser.parse_args(["msg", "--skip-during", "rebase, cherry-pick"])
+
+        assert args.skip_during == ["rebase", "cherry-pick"]
+
+    def test_skip_during_unknown_operation(self, capsys):
+        """Test that unknown operations are rejected."""
+        parser = argparse.ArgumentParser()
+        add_common_arguments(parser)
+
+        with pytest.raises(SystemExit):
+            parser.parse_args(["msg", "--skip-during", "rebase,bisect"])
+        assert "unknown operation(s) bisect" in capsys.readouterr().err
 
 
 class TestCreateParser:
@@ -62,3 +88,23 @@ class TestCreateParser:
 
         assert args.commit_msg_filepath == "test_commit_msg"
         assert args.debug is True
+
+
+class TestIssueArguments:
+    """Test add_issue_arguments and parse_prefixes."""
+
+    def test_without_separator(self):
+        """Test that read-only commands can leave out --separator."""
+        parser = argparse.ArgumentParser()
+        add_issue_arguments(parser, separator=False)
+
+        args = parser.parse_args(["--prefixes", "abc"])
+
+        assert not hasattr(args, "separator")
+        assert args.prefixes == "abc"
+
+    def test_parse_prefixes(self):
+        """Test that prefixes are split, stripped and upper-cased."""
+        assert parse_prefixes("abc, Def ,XYZ") == ["ABC", "DEF", "XYZ"]
+        assert parse_prefixes(None) is None
+        assert parse_prefixes("") is None
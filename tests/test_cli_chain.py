@@ -0,0 +1,77 @@
+"""Tests for the hook chain CLI module."""
+
+from __future__ import annotations
+
+import pytest
+
+from pre_commit_jira_helper.cli.chain import hook_factory, main
+from pre_commit_jira_helper.hooks.example import ExamplePrefixHook
+from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+
+
+class TestHookFactory:
+    """Test hook_factory function."""
+
+    def test_builtin_hook_with_options(self):
+        """Test that built-in hooks are configured from their own CLI options."""
+        hook = hook_factory("prepend-jira-issue --prefixes abc --separator ' |'", "msg")()
+
+        assert isinstance(hook, JiraIssuePrependHook)
+        assert hook.allowed_prefixes == ["ABC"]
+        assert hook.separator == " |"
+
+    def test_custom_hook_class(self):
+        """Test module:Class specifications with keyword arguments."""
+        hook = hook_factory(
+            "pre_commit_jira_helper.hooks.example:ExamplePrefixHook prefix=[X]", "m"
+        )()
+
+        assert isinstance(hook, ExamplePrefixHook)
+        assert hook.prefix == "[X]"
+
+    def test_factory_is_lazy(self, mocker):
+        """Test that nothing is imported until the factory is called."""
+        mock_import = mocker.patch("pre_commit_jira_helper.cli.chain.importlib.import_module")
+
+        hook_factory("some.module:Hook", "msg")
+
+        mock_import.assert_not_called()
+
+    @pytest.mark.parametrize("spec", ["", "unknown-hook", "module:Class novalue"])
+    def test_invalid_specs(self, spec):
+        """Test malformed specifications."""
+        with pytest.raises(ValueError):
+            hook_factory(spec, "msg")
+
+
+class TestMain:
+    """Test main function."""
+
+    def test_chain_end_to_end(self, tmp_path, mocker):
+        """Test running two built-in hooks over one file."""
+        mocker.patch(
+            "pre_commit_jira_helper.git.GitOperations.get_current_branch",
+            return_value="feature/ABC-123",
+        )
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text("Add feature\n")
+
+        exit_code = main(
+            [
+                str(path),
+                "--hook",
+                "prepend-jira-issue",
+                "--hook",
+                "example-prefix-hook --prefix [WIP]",
+            ]
+        )
+
+        assert exit_code == 0
+        assert path.read_text() == "[WIP] ABC-123:  Add feature\n"
+
+    def test_invalid_spec_exits(self, tmp_path):
+        """Test that a malformed specification is a usage error."""
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(tmp_path / "msg"), "--hook", "nope"])
+
+        assert exc_info.value.code == 2
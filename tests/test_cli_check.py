@@ -0,0 +1,76 @@
+"""Tests for CLI check module."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper.cli.check import main
+
+
+def git(*args, cwd):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repository with one commit on main and three on a feature branch."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    git("init", "-q", "-b", "main", cwd=tmp_path)
+    git("commit", "-q", "--allow-empty", "-m", "Initial commit", cwd=tmp_path)
+    git("checkout", "-qb", "feature", cwd=tmp_path)
+    for message in ("ABC-1: Add form", "Fix typo", "XYZ-2: Tweak"):
+        git("commit", "-q", "--allow-empty", "-m", message, cwd=tmp_path)
+    return tmp_path
+
+
+class TestMain:
+    """Test main function."""
+
+    def test_reports_offenders(self, repo, capsys):
+        """Test that commits without issues are printed and fail the check."""
+        assert main(["main..feature"]) == 1
+
+        out, err = capsys.readouterr()
+        assert out == f"{git('rev-parse', 'feature~1', cwd=repo)} Fix typo\n"
+        assert "1 of 3 commits have no Jira issue" in err
+
+    @pytest.mark.usefixtures("repo")
+    def test_all_commits_have_issues(self, capsys):
+        """Test a range where every commit has an issue."""
+        assert main(["feature~1..feature"]) == 0
+        assert capsys.readouterr().out == ""
+
+    def test_json_report_with_prefixes(self, repo, capsys):
+        """Test JSON lines output and prefix filtering."""
+        assert main(["--json", "--prefixes", "abc", "main..feature"]) == 1
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines == [
+            {"commit": git("rev-parse", "feature", cwd=repo), "subject": "XYZ-2: Tweak"},
+            {"commit": git("rev-parse", "feature~1", cwd=repo), "subject": "Fix typo"},
+        ]
+
+    @pytest.mark.usefixtures("repo")
+    def test_native(self, capsys):
+        """Test that reading objects directly reports the same commits."""
+        assert main(["main..feature"]) == 1
+        expected = capsys.readouterr()
+
+        assert main(["--native", "main..feature"]) == 1
+        assert capsys.readouterr() == expected
+
+    @pytest.mark.usefixtures("repo")
+    def test_git_error(self, capsys):
+        """Test that git failures exit with code 2."""
+        assert main(["does-not-exist"]) == 2
+        assert "Error:" in capsys.readouterr().err
@@ -4,7 +4,10 @@ from __future__ import annotations
 
 from unittest.mock import Mock
 
+import pytest
+
 from pre_commit_jira_helper.cli.jira import main
+from pre_commit_jira_helper.matcher import DEFAULT_ISSUE_PATTERN
 
 
 class TestMain:
@@ -15,7 +18,9 @@ class TestMain:
         mock_hook = Mock()
         mock_hook.run.return_value = 0
 
-        mocker.patch("pre_commit_jira_helper.cli.jira.JiraIssuePrependHook", return_value=mock_hook)
+        mocker.patch(
+            "pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook", return_value=mock_hook
+        )
 
         result = main(["/tmp/commit_msg"])
 
@@ -28,7 +33,7 @@ class TestMain:
         mock_hook.run.return_value = 0
 
         mock_class = mocker.patch(
-            "pre_commit_jira_helper.cli.jira.JiraIssuePrependHook", return_value=mock_hook
+            "pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook", return_value=mock_hook
         )
 
         result = main(["/tmp/commit_msg", "--debug"])
@@ -39,6 +44,13 @@ class TestMain:
             issue_pattern=None,
             separator=": ",
             allowed_prefixes=None,
+            skip_during=None,
+            owners_file=None,
+            owners_mode="infer",
+            jira_url=None,
+            validation_budget=None,
+            snapshot_file=None,
+            trackers=None,
         )
 
     def test_main_with_custom_pattern(self, mocker):
@@ -47,7 +59,7 @@ class TestMain:
         mock_hook.run.return_value = 0
 
         mock_class = mocker.patch(
-            "pre_commit_jira_helper.cli.jira.JiraIssuePrependHook", return_value=mock_hook
+            "pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook", return_value=mock_hook
         )
 
         result = main(["/tmp/commit_msg", "--pattern", "[A-Z]{3,}-\\d+"])
@@ -58,6 +70,13 @@ class TestMain:
             issue_pattern="[A-Z]{3,}-\\d+",
             separator=": ",
             allowed_prefixes=None,
+            skip_during=None,
+            owners_file=None,
+            owners_mode="infer",
+            jira_url=None,
+            validation_budget=None,
+            snapshot_file=None,
+            trackers=None,
         )
 
     def test_main_with_custom_separator(self, mocker):
@@ -66,7 +85,7 @@ class TestMain:
         mock_hook.run.return_value = 0
 
         mock_class = mocker.patch(
-            "pre_commit_jira_helper.cli.jira.JiraIssuePrependHook", return_value=mock_hook
+            "pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook", return_value=mock_hook
         )
 
         result = main(["/tmp/commit_msg", "--separator", " - "])
@@ -77,6 +96,13 @@ class TestMain:
             issue_pattern=None,
             separator=" - ",
             allowed_prefixes=None,
+            skip_during=None,
+            owners_file=None,
+            owners_mode="infer",
+            jira_url=None,
+            validation_budget=None,
+            snapshot_file=None,
+            trackers=None,
         )
 
     def test_main_with_prefixes_single(self, mocker):
@@ -85,7 +111,7 @@ class TestMain:
         mock_hook.run.return_value = 0
 
         mock_class = mocker.patch(
-            "pre_commit_jira_helper.cli.jira.JiraIssuePrependHook", return_value=mock_hook
+            "pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook", return_value=mock_hook
         )
 
         result = main(["/tmp/commit_msg", "--prefixes", "ABC"])
@@ -96,6 +122,13 @@ class TestMain:
             issue_pattern=None,
             separator=": ",
             allowed_prefixes=["ABC"],
+            skip_during=None,
+            owners_file=None,
+            owners_mode="infer",
+            jira_url=None,
+            validation_budget=None,
+            snapshot_file=None,
+            trackers=None,
         )
 
     def test_main_with_prefixes_multiple(self, mocker):
@@ -104,7 +137,7 @@ class TestMain:
         mock_hook.run.return_value = 0
 
         mock_class = mocker.patch(
-            "pre_commit_jira_helper.cli.jira.JiraIssuePrependHook", return_value=mock_hook
+            "pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook", return_value=mock_hook
         )
 
         result = main(["/tmp/commit_msg", "--prefixes", "ABC,def,XYZ"])
@@ -115,6 +148,13 @@ class TestMain:
             issue_pattern=None,
             separator=": ",
             allowed_prefixes=["ABC", "DEF", "XYZ"],
+            skip_during=None,
+            owners_file=None,
+            owners_mode="infer",
+            jira_url=None,
+            validation_budget=None,
+            snapshot_file=None,
+            trackers=None,
         )
 
     def test_main_hook_failure(self, mocker):
@@ -122,8 +162,68 @@ class TestMain:
         mock_hook = Mock()
         mock_hook.run.return_value = 1
 
-        mocker.patch("pre_commit_jira_helper.cli.jira.JiraIssuePrependHook", return_value=mock_hook)
+        mocker.patch(
+            "pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook", return_value=mock_hook
+        )
 
         result = main(["/tmp/commit_msg"])
 
         assert result == 1
+
+    def test_main_with_owners(self, mocker):
+        """Test main with an owners file in restrict mode."""
+        mock_class = mocker.patch("pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook")
+        mock_class.return_value.run.return_value = 0
+
+        main(["/tmp/commit_msg", "--owners", "OWNERS", "--owners-mode", "restrict"])
+
+        kwargs = mock_class.call_args.kwargs
+        assert (kwargs["owners_file"], kwargs["owners_mode"]) == ("OWNERS", "restrict")
+
+    def test_main_with_trackers(self, mocker):
+        """Test that tracker options build the trackers, Jira first."""
+        mock_class = mocker.patch("pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook")
+        mock_class.return_value.run.return_value = 0
+
+        main(
+            [
+                "/tmp/commit_msg",
+                "--prefixes",
+                "ABC",
+                "--tracker",
+                r"github=#\d+",
+                "--tracker-format",
+                "github=org/repo{key}",
+                "--tracker",
+                r"servicenow=CHG\d{7}",
+                "--tracker-prefixes",
+                "servicenow=chg",
+            ]
+        )
+
+        trackers = mock_class.call_args.kwargs["trackers"]
+        assert [(t.name, t.pattern, t.template) for t in trackers] == [
+            ("jira", DEFAULT_ISSUE_PATTERN, "{key}"),
+            ("github", r"#\d+", "org/repo{key}"),
+            ("servicenow", r"CHG\d{7}", "{key}"),
+        ]
+        assert [t.prefixes for t in trackers] == [{"ABC"}, None, {"CHG"}]
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            ["--tracker", "github"],
+            ["--tracker", "github=(#"],
+            ["--tracker", r"github=#\d+", "--tracker-format", "github={number}"],
+            ["--tracker-prefixes", "linear=ENG"],
+        ],
+    )
+    def test_main_with_bad_trackers(self, mocker, options):
+        """Test that malformed tracker options are usage errors."""
+        mock_class = mocker.patch("pre_commit_jira_helper.hooks.jira.JiraIssuePrependHook")
+        mocker.patch("sys.stderr")
+
+        with pytest.raises(SystemExit) as e:
+            main(["/tmp/commit_msg", *options])
+        assert e.value.code == 2
+        mock_class.assert_not_called()
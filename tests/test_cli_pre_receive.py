@@ -0,0 +1,130 @@
+"""Tests for CLI pre_receive module."""
+
+from __future__ import annotations
+
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pre_commit_jira_helper.cli.pre_receive import main
+from pre_commit_jira_helper.receive import PushReport, RefReport
+
+ZERO = "0" * 40
+
+
+def git(*args, cwd):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def identity(monkeypatch):
+    """Fixed author and committer for the commits of a test."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+
+
+def feed(monkeypatch, text):
+    """Replace stdin with the given pre-receive input."""
+    monkeypatch.setattr(sys, "stdin", io.StringIO(text))
+
+
+class TestMain:
+    """Test main function."""
+
+    def test_accepts_clean_push(self, mocker, monkeypatch):
+        """Test that a push without offenders is accepted."""
+        check = mocker.patch(
+            "pre_commit_jira_helper.receive.check_push",
+            return_value=PushReport([RefReport("refs/heads/main", 5)]),
+        )
+        feed(monkeypatch, f"{ZERO} {'a' * 40} refs/heads/main\n")
+
+        assert main(["--prefixes", "abc", "--jobs", "3"]) == 0
+        _, kwargs = check.call_args
+        assert kwargs["prefixes"] == ["ABC"]
+        assert kwargs["jobs"] == 3
+
+    def test_rejects_offenders(self, mocker, monkeypatch, capsys):
+        """Test that offenders are listed, up to --max-report."""
+        offenders = [(str(i) * 40, f"Change {i}") for i in range(3)]
+        mocker.patch(
+            "pre_commit_jira_helper.receive.check_push",
+            return_value=PushReport([RefReport("refs/heads/main", 3, offenders)]),
+        )
+        feed(monkeypatch, f"{ZERO} {'a' * 40} refs/heads/main\n")
+
+        assert main(["--max-report", "2"]) == 1
+        err = capsys.readouterr().err
+        assert "3 pushed commit(s) do not mention a Jira issue" in err
+        assert "111111111111 Change 1" in err
+        assert "Change 2" not in err
+        assert "... and 1 more" in err
+
+    @pytest.mark.parametrize(
+        ("on_timeout", "expected"),
+        [("reject", 1), ("accept", 0)],
+    )
+    def test_timeout(self, mocker, monkeypatch, capsys, on_timeout, expected):
+        """Test the --on-timeout policy."""
+        mocker.patch(
+            "pre_commit_jira_helper.receive.check_push",
+            return_value=PushReport([], timed_out=True),
+        )
+        feed(monkeypatch, f"{ZERO} {'a' * 40} refs/heads/main\n")
+
+        assert main(["--on-timeout", on_timeout]) == expected
+        assert "did not finish" in capsys.readouterr().err
+
+    def test_accept_on_timeout_keeps_offenders(self, mocker, monkeypatch):
+        """Test that accepting on timeout does not waive offenders already found."""
+        mocker.patch(
+            "pre_commit_jira_helper.receive.check_push",
+            return_value=PushReport(
+                [RefReport("refs/heads/main", 1, [("a" * 40, "No issue")])], timed_out=True
+            ),
+        )
+        feed(monkeypatch, f"{ZERO} {'a' * 40} refs/heads/main\n")
+
+        assert main(["--on-timeout", "accept"]) == 1
+
+    def test_malformed_input(self, monkeypatch, capsys):
+        """Test that unexpected input rejects the push."""
+        feed(monkeypatch, "garbage\n")
+
+        assert main([]) == 1
+        assert "Malformed ref update" in capsys.readouterr().err
+
+    @pytest.mark.usefixtures("identity")
+    def test_as_git_hook(self, tmp_path, monkeypatch):
+        """Test the hook installed in a bare repository, objects in quarantine."""
+        monkeypatch.setenv("PYTHONPATH", str(Path(__file__).parents[1]))
+        server = tmp_path / "server.git"
+        git("init", "-q", "--bare", str(server), cwd=tmp_path)
+        hook = server / "hooks" / "pre-receive"
+        hook.write_text(
+            f"#!/bin/sh\nexec {sys.executable} -m pre_commit_jira_helper.cli.pre_receive"
+            " --prefixes ABC\n"
+        )
+        hook.chmod(0o755)
+        client = tmp_path / "client"
+        git("init", "-q", "-b", "main", str(client), cwd=tmp_path)
+        git("commit", "-q", "--allow-empty", "-m", "ABC-1: Initial commit", cwd=client)
+        git("push", "-q", str(server), "main", cwd=client)
+        git("commit", "-q", "--allow-empty", "-m", "No issue", cwd=client)
+        git("commit", "-q", "--allow-empty", "-m", "ABC-2: Tweak", cwd=client)
+
+        result = subprocess.run(
+            ["git", "push", str(server), "main"], cwd=client, capture_output=True, text=True
+        )
+
+        assert result.returncode != 0
+        assert "1 pushed commit(s) do not mention a Jira issue" in result.stderr
+        assert "No issue" in result.stderr
+        assert git("log", "--format=%s", "main", cwd=server) == "ABC-1: Initial commit"
@@ -0,0 +1,268 @@
+"""Tests for the hook daemon and its client."""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import socket
+import subprocess
+import threading
+from pathlib import Path
+
+import pytest
+
+from pre_commit_jira_helper.cli import client
+from pre_commit_jira_helper.cli.helper import main as helper_main
+from pre_commit_jira_helper.daemon import HookDaemon, is_daemon_running, serve
+from pre_commit_jira_helper.logger import logger as package_logger
+
+
+@pytest.fixture
+def socket_path(tmp_path_factory):
+    """Short socket path (Unix socket paths are limited to ~100 bytes)."""
+    return str(tmp_path_factory.mktemp("sock") / "d.sock")
+
+
+@pytest.fixture
+def running_daemon(socket_path):
+    """Run a daemon on a background thread."""
+    server = HookDaemon(socket_path, idle_timeout=60)
+    thread = threading.Thread(target=server.serve_until_idle, kwargs={"poll_interval": 0.05})
+    thread.start()
+    yield server
+    client.send_request({"command": "stop"}, socket_path)
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Git repository on a branch carrying a Jira issue, with a commit message file."""
+    subprocess.run(["git", "init", "-q", "-b", "feature/ABC-123-daemon", str(tmp_path)], check=True)
+    msg = tmp_path / ".git" / "COMMIT_EDITMSG"
+    msg.write_text("Add daemon\n")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    return tmp_path
+
+
+class TestClient:
+    """Test the thin client."""
+
+    def test_default_socket_path_override(self, monkeypatch):
+        """Test that the socket path can be overridden from the environment."""
+        monkeypatch.setenv(client.SOCKET_ENV, "/tmp/custom.sock")
+        assert client.default_socket_path() == "/tmp/custom.sock"
+
+    def test_default_socket_path_runtime_dir(self, monkeypatch):
+        """Test that $XDG_RUNTIME_DIR is preferred for the socket."""
+        monkeypatch.delenv(client.SOCKET_ENV, raising=False)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert client.default_socket_path() == "/run/user/1000/pre-commit-jira-helper.sock"
+
+    def test_send_request_without_daemon(self, socket_path):
+        """Test that a missing daemon yields None."""
+        assert client.send_request({"command": "ping"}, socket_path) is None
+
+    def test_check_private_directory(self, tmp_path):
+        """Test that only a 0700 directory of the current user is accepted."""
+        private = tmp_path / "private"
+        private.mkdir(mode=0o700)
+        client.check_private_directory(str(private))
+
+        private.chmod(0o755)
+        with pytest.raises(OSError, match="mode 755"):
+            client.check_private_directory(str(private))
+
+        link = tmp_path / "link"
+        link.symlink_to(private)
+        with pytest.raises(OSError, match="not a directory"):
+            client.check_private_directory(str(link))
+
+    def test_check_private_directory_other_owner(self, tmp_path, mocker):
+        """Test that a directory owned by another user is refused."""
+        mocker.patch("os.getuid", return_value=os.getuid() + 1)
+        with pytest.raises(OSError, match="another user"):
+            client.check_private_directory(str(tmp_path))
+
+    def test_send_request_refuses_shared_directory(self, tmp_path):
+        """Test that nothing is sent to a socket in a directory others can use."""
+        shared = tmp_path / "shared"
+        shared.mkdir(mode=0o777)
+        shared.chmod(0o777)
+        path = str(shared / "d.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(path)
+            listener.listen()
+            assert client.send_request({"command": "ping"}, path) is None
+
+    def test_send_request_without_answer(self, socket_path):
+        """Test that a daemon taking a request without answering is an error."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(socket_path)
+            listener.listen()
+            response = client.send_request({"command": "ping"}, socket_path, timeout=0.1)
+
+        assert "no answer from the daemon" in response["error"]
+
+    def test_main_does_not_rerun_a_sent_request(self, mocker, monkeypatch, socket_path, capsys):
+        """Test that the hook is not run in-process once the daemon has the request."""
+        monkeypatch.setenv(client.SOCKET_ENV, socket_path)
+        mocker.patch.object(client, "send_request", return_value={"error": "timed out"})
+        mock_main = mocker.patch("pre_commit_jira_helper.cli.jira.main", return_value=0)
+
+        assert client.main(["/tmp/commit_msg"]) == 1
+        mock_main.assert_not_called()
+        assert "timed out" in capsys.readouterr().err
+
+    def test_forwarded_env(self, monkeypatch):
+        """Test that only the variables a hook run needs are sent to the daemon."""
+        monkeypatch.setenv("GIT_DIR", "/repo/.git")
+        monkeypatch.setenv("JIRA_API_TOKEN", "secret")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+
+        env = client.forwarded_env(["msg"])
+        assert env["GIT_DIR"] == "/repo/.git"
+        assert "JIRA_API_TOKEN" not in env
+        assert "AWS_SECRET_ACCESS_KEY" not in env
+
+        env = client.forwarded_env(["msg", "--jira-url", "https://example.atlassian.net"])
+        assert env["JIRA_API_TOKEN"] == "secret"
+        assert "AWS_SECRET_ACCESS_KEY" not in env
+
+    def test_main_falls_back_in_process(self, mocker, monkeypatch, socket_path):
+        """Test that the client runs the hook itself when the daemon is missing."""
+        monkeypatch.setenv(client.SOCKET_ENV, socket_path)
+        mock_main = mocker.patch("pre_commit_jira_helper.cli.jira.main", return_value=0)
+
+        assert client.main(["/tmp/commit_msg", "--prefixes", "ABC"]) == 0
+        mock_main.assert_called_once_with(["/tmp/commit_msg", "--prefixes", "ABC"])
+
+
+class TestHookDaemon:
+    """Test HookDaemon class."""
+
+    @pytest.mark.usefixtures("running_daemon")
+    def test_ping(self, socket_path):
+        """Test that the daemon answers pings."""
+        assert is_daemon_running(socket_path)
+        response = client.send_request({"command": "ping"}, socket_path)
+        assert response["pid"] > 0
+
+    def test_client_runs_hook_in_daemon(self, running_daemon, socket_path, repo, monkeypatch):
+        """Test a full client run served by the daemon in the client's repository."""
+        monkeypatch.setenv(client.SOCKET_ENV, socket_path)
+        monkeypatch.chdir(repo)
+
+        assert client.main([".git/COMMIT_EDITMSG"]) == 0
+        assert (repo / ".git" / "COMMIT_EDITMSG").read_text() == "ABC-123:  Add daemon\n"
+        assert running_daemon.requests_served >= 1
+
+    def test_hooks_are_cached_per_configuration(self, running_daemon, repo):
+        """Test that repeated runs with the same options reuse the hook."""
+        argv = [str(repo / ".git" / "COMMIT_EDITMSG"), "--prefixes", "ABC"]
+        running_daemon.run_hook(argv, str(repo), {})
+        running_daemon.run_hook(argv, str(repo), {})
+
+        assert len(running_daemon._hooks) == 1
+
+    def test_run_hook_restores_process_state(self, running_daemon, repo):
+        """Test that cwd and environment are restored after a run."""
+        cwd = Path.cwd()
+        env = dict(os.environ)
+        running_daemon.run_hook([str(repo / ".git" / "COMMIT_EDITMSG")], str(repo), {"X": "1"})
+
+        assert Path.cwd() == cwd
+        assert dict(os.environ) == env
+
+    def test_client_sees_logged_warnings(self, running_daemon, repo, mocker):
+        """Test that log records go to the request's stderr, not the daemon's."""
+        daemon_stderr = io.StringIO()
+        mocker.patch.object(package_logger, "handlers", [logging.StreamHandler(daemon_stderr)])
+        argv = [str(repo / ".git" / "COMMIT_EDITMSG"), "--pattern", r"([A-Z]+)+-\d+"]
+
+        exit_code, _, stderr = running_daemon.run_hook(argv, str(repo), {})
+
+        assert exit_code == 0
+        assert "Not using the issue pattern" in stderr
+        assert daemon_stderr.getvalue() == ""
+        assert package_logger.handlers[0].stream is daemon_stderr
+
+    def test_invalid_arguments(self, running_daemon, repo):
+        """Test that argparse errors are reported instead of killing the daemon."""
+        exit_code, _, stderr = running_daemon.run_hook(["--bogus"], str(repo), {})
+
+        assert exit_code == 2
+        assert "usage:" in stderr
+
+    def test_missing_cwd(self, running_daemon, tmp_path):
+        """Test that an unusable working directory fails the run."""
+        exit_code, _, stderr = running_daemon.run_hook(["msg"], str(tmp_path / "missing"), {})
+
+        assert exit_code == 1
+        assert stderr
+
+    def test_idle_shutdown(self, socket_path):
+        """Test that the daemon exits on its own when idle."""
+        server = HookDaemon(socket_path, idle_timeout=0)
+        server.serve_until_idle(poll_interval=0.01)
+
+        assert not is_daemon_running(socket_path)
+
+    @pytest.mark.usefixtures("running_daemon")
+    def test_flush_spool(self, socket_path, tmp_path, mocker):
+        """Test that the daemon flushes a spool in the background, once at a time."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def flush(*_args, **_kwargs):
+            started.set()
+            release.wait(5)
+            return 0, 0, 0
+
+        flush_spool = mocker.patch("pre_commit_jira_helper.spool.flush_spool", side_effect=flush)
+        request = {"command": "flush", "spool": str(tmp_path / "spool"), "token": "t0k"}
+
+        assert client.send_request(request, socket_path) == {"flushing": True}
+        assert started.wait(5)
+        assert client.send_request(request, socket_path) == {"flushing": False}
+        release.set()
+
+        (call,) = flush_spool.call_args_list
+        assert call.args[0].directory == tmp_path / "spool"
+        # The credentials of the request, not of the daemon's environment
+        assert call.kwargs == {"linger": 60, "user": None, "token": "t0k"}
+
+    def test_refuses_shared_directory(self, tmp_path):
+        """Test that the daemon does not listen in a directory others can use."""
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o755)
+
+        with pytest.raises(OSError, match="mode 755"):
+            HookDaemon(str(shared / "d.sock"))
+        assert serve(str(shared / "d.sock")) == 1
+
+    @pytest.mark.usefixtures("running_daemon")
+    def test_serve_refuses_second_instance(self, socket_path):
+        """Test that a second daemon does not steal a live socket."""
+        assert serve(socket_path) == 1
+
+
+class TestDaemonCli:
+    """Test the jira-helper daemon subcommand."""
+
+    def test_status_not_running(self, socket_path, capsys):
+        """Test status when no daemon is running."""
+        assert helper_main(["daemon", "status", "--socket", socket_path]) == 1
+        assert "not running" in capsys.readouterr().out
+
+    @pytest.mark.usefixtures("running_daemon")
+    def test_status_and_stop(self, socket_path, capsys):
+        """Test status and stop against a running daemon."""
+        assert helper_main(["daemon", "status", "--socket", socket_path]) == 0
+        assert "pid" in capsys.readouterr().out
+        assert helper_main(["daemon", "stop", "--socket", socket_path]) == 0
+
+    def test_stop_not_running(self, socket_path):
+        """Test stop when no daemon is running."""
+        assert helper_main(["daemon", "stop", "--socket", socket_path]) == 1
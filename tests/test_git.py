@@ -2,14 +2,43 @@
 
 from __future__ import annotations
 
-from pre_commit_jira_helper.git import GitOperations
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper.git import GitOperations, RepoState, StagedFile
+from pre_commit_jira_helper.utils import CommandError
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+def make_git_dir(path, head="ref: refs/heads/main\n"):
+    """Create a minimal git dir layout."""
+    (path / "objects").mkdir(parents=True)
+    (path / "refs" / "heads").mkdir(parents=True)
+    (path / "HEAD").write_text(head)
+    return path
+
+
+@pytest.fixture
+def clean_git_env(monkeypatch):
+    """Remove environment variables that change repository discovery."""
+    for name in (
+        "GIT_DIR",
+        "GIT_COMMON_DIR",
+        "GIT_WORK_TREE",
+        "GIT_CEILING_DIRECTORIES",
+        "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+    ):
+        monkeypatch.delenv(name, raising=False)
 
 
 class TestGitOperations:
     """Test GitOperations class."""
 
     def test_get_current_branch_success(self, mocker):
-        """Test successful branch name retrieval."""
+        """Test successful branch name retrieval via git fallback."""
+        mocker.patch("pre_commit_jira_helper.git.GitOperations.get_git_dir", return_value=None)
         mocker.patch(
             "pre_commit_jira_helper.git.run_command",
             return_value=(True, "feature/ABC-123-test", ""),
@@ -20,7 +49,8 @@ class TestGitOperations:
         assert result == "feature/ABC-123-test"
 
     def test_get_current_branch_no_branch(self, mocker):
-        """Test branch retrieval when in detached HEAD state."""
+        """Test branch retrieval when in detached HEAD state via git fallback."""
+        mocker.patch("pre_commit_jira_helper.git.GitOperations.get_git_dir", return_value=None)
         mocker.patch(
             "pre_commit_jira_helper.git.run_command",
             return_value=(False, "", "fatal: ref HEAD is not a symbolic ref"),
@@ -31,7 +61,8 @@ class TestGitOperations:
         assert result is None
 
     def test_get_current_branch_empty_stdout(self, mocker):
-        """Test branch retrieval with empty stdout."""
+        """Test branch retrieval with empty stdout via git fallback."""
+        mocker.patch("pre_commit_jira_helper.git.GitOperations.get_git_dir", return_value=None)
         mocker.patch("pre_commit_jira_helper.git.run_command", return_value=(True, "", ""))
 
         result = GitOperations.get_current_branch()
@@ -113,3 +144,402 @@ class TestGitOperations:
         result = GitOperations.get_repo_root()
 
         assert result is None
+
+
+@pytest.mark.usefixtures("clean_git_env")
+class TestInProcessBranchResolution:
+    """Test reading the current branch from the filesystem."""
+
+    def test_branch_from_dot_git_dir(self, tmp_path, monkeypatch, mocker):
+        """Test resolving the branch from a regular .git directory."""
+        make_git_dir(tmp_path / ".git", "ref: refs/heads/feature/ABC-123\n")
+        (tmp_path / "src").mkdir()
+        monkeypatch.chdir(tmp_path / "src")
+        mock_run = mocker.patch("pre_commit_jira_helper.git.run_command")
+
+        assert GitOperations.get_current_branch() == "feature/ABC-123"
+        mock_run.assert_not_called()
+
+    def test_detached_head(self, tmp_path, monkeypatch, mocker):
+        """Test that a detached HEAD resolves to None without running git."""
+        make_git_dir(tmp_path / ".git", f"{SHA}\n")
+        monkeypatch.chdir(tmp_path)
+        mock_run = mocker.patch("pre_commit_jira_helper.git.run_command")
+
+        assert GitOperations.get_current_branch() is None
+        mock_run.assert_not_called()
+
+    def test_gitfile_worktree_with_commondir(self, tmp_path, monkeypatch):
+        """Test a linked worktree whose .git file points at a per-worktree git dir."""
+        common = make_git_dir(tmp_path / "main" / ".git")
+        worktree_git_dir = common / "worktrees" / "wt"
+        worktree_git_dir.mkdir(parents=True)
+        (worktree_git_dir / "HEAD").write_text("ref: refs/heads/ABC-1-wt\n")
+        (worktree_git_dir / "commondir").write_text("../..\n")
+        worktree = tmp_path / "wt"
+        worktree.mkdir()
+        (worktree / ".git").write_text(f"gitdir: {worktree_git_dir}\n")
+        monkeypatch.chdir(worktree)
+
+        assert GitOperations.get_git_dir() == worktree_git_dir
+        assert GitOperations.get_common_dir(worktree_git_dir).resolve() == common.resolve()
+        assert GitOperations.get_current_branch() == "ABC-1-wt"
+
+    def test_relative_gitfile_submodule(self, tmp_path, monkeypatch):
+        """Test a submodule .git file with a relative gitdir path."""
+        module_git_dir = make_git_dir(
+            tmp_path / ".git" / "modules" / "sub", "ref: refs/heads/DEF-2\n"
+        )
+        sub = tmp_path / "sub"
+        sub.mkdir()
+        (sub / ".git").write_text("gitdir: ../.git/modules/sub\n")
+        monkeypatch.chdir(sub)
+
+        assert GitOperations.get_git_dir().resolve() == module_git_dir.resolve()
+        assert GitOperations.get_current_branch() == "DEF-2"
+
+    def test_git_dir_env(self, tmp_path, monkeypatch):
+        """Test that $GIT_DIR overrides discovery."""
+        make_git_dir(tmp_path / "elsewhere.git", "ref: refs/heads/XYZ-9\n")
+        make_git_dir(tmp_path / "cwd" / ".git", "ref: refs/heads/other\n")
+        monkeypatch.chdir(tmp_path / "cwd")
+        monkeypatch.setenv("GIT_DIR", str(tmp_path / "elsewhere.git"))
+        monkeypatch.setenv("GIT_WORK_TREE", str(tmp_path / "cwd"))
+
+        assert GitOperations.get_current_branch() == "XYZ-9"
+
+    def test_git_dir_without_discovery(self, tmp_path, monkeypatch):
+        """Test that only the directory itself is checked without discovery."""
+        git_dir = make_git_dir(tmp_path / ".git", "ref: refs/heads/main\n")
+        (tmp_path / "sub").mkdir()
+        monkeypatch.setenv("GIT_DIR", str(git_dir))
+
+        assert GitOperations.get_git_dir(tmp_path / "sub", discover=False) is None
+        assert GitOperations.get_git_dir(tmp_path, discover=False) == git_dir
+
+    def test_bare_repository(self, tmp_path, monkeypatch):
+        """Test discovery from inside a bare repository."""
+        make_git_dir(tmp_path / "repo.git", "ref: refs/heads/trunk\n")
+        monkeypatch.chdir(tmp_path / "repo.git")
+
+        assert GitOperations.get_current_branch() == "trunk"
+
+    def test_symref_chain(self, tmp_path, monkeypatch):
+        """Test following a symbolic ref that points at another symbolic ref."""
+        git_dir = make_git_dir(tmp_path / ".git", "ref: refs/heads/alias\n")
+        (git_dir / "refs" / "heads" / "alias").write_text("ref: refs/heads/ABC-7-real\n")
+        (git_dir / "refs" / "heads" / "ABC-7-real").write_text(f"{SHA}\n")
+        monkeypatch.chdir(tmp_path)
+
+        assert GitOperations.get_current_branch() == "ABC-7-real"
+
+    def test_unborn_branch(self, tmp_path, monkeypatch):
+        """Test a branch that has no commits yet."""
+        make_git_dir(tmp_path / ".git", "ref: refs/heads/ABC-5-new\n")
+        monkeypatch.chdir(tmp_path)
+
+        assert GitOperations.get_current_branch() == "ABC-5-new"
+
+    @pytest.mark.parametrize(
+        "head",
+        ["ref: refs/heads/.invalid\n", "ref: refs/remotes/origin/main\n", "garbage\n"],
+    )
+    def test_unrecognized_layout_falls_back_to_git(self, tmp_path, monkeypatch, mocker, head):
+        """Test that unrecognized HEAD contents defer to git symbolic-ref."""
+        make_git_dir(tmp_path / ".git", head)
+        monkeypatch.chdir(tmp_path)
+        mock_run = mocker.patch(
+            "pre_commit_jira_helper.git.run_command", return_value=(True, "from-git", "")
+        )
+
+        assert GitOperations.get_current_branch() == "from-git"
+        mock_run.assert_called_once_with(["git", "symbolic-ref", "--short", "HEAD"])
+
+    def test_symref_loop_falls_back_to_git(self, tmp_path, monkeypatch, mocker):
+        """Test that overly deep symref chains defer to git."""
+        git_dir = make_git_dir(tmp_path / ".git", "ref: refs/heads/a\n")
+        (git_dir / "refs" / "heads" / "a").write_text("ref: refs/heads/b\n")
+        (git_dir / "refs" / "heads" / "b").write_text("ref: refs/heads/a\n")
+        monkeypatch.chdir(tmp_path)
+        mocker.patch("pre_commit_jira_helper.git.run_command", return_value=(False, "", ""))
+
+        assert GitOperations.get_current_branch() is None
+
+    def test_ceiling_directories_fall_back_to_git(self, tmp_path, monkeypatch):
+        """Test that discovery settings we do not mirror disable the fast path."""
+        make_git_dir(tmp_path / ".git")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path))
+
+        assert GitOperations.get_git_dir() is None
+
+    def test_no_repository(self, tmp_path):
+        """Test that no git dir is found outside a repository."""
+        assert GitOperations.get_git_dir(tmp_path) is None
+
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """Point git at a repository with no system or user configuration."""
+    for name in ("GIT_DIR", "GIT_COMMON_DIR", "GIT_CONFIG_PARAMETERS", "GIT_CONFIG_COUNT"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "global"))
+    git_dir = make_git_dir(tmp_path / "repo" / ".git")
+    monkeypatch.chdir(tmp_path / "repo")
+    return git_dir
+
+
+class TestGetConfig:
+    """Test reading git config variables."""
+
+    def test_reads_repository_config(self, isolated_config, mocker):
+        """Test parsing values, comments and case-insensitive names in-process."""
+        (isolated_config / "config").write_text(
+            "# comment\n"
+            '[remote "origin"]\n'
+            "\tcommentChar = x\n"
+            "[Core]\n"
+            "\tbare = false\n"
+            '\tCommentChar = ";"  ; trailing comment\n'
+            "[commit]\n"
+            "\tcleanup = scissors\n"
+        )
+        mock_run = mocker.patch("pre_commit_jira_helper.git.run_command")
+
+        config = GitOperations.get_config(["core.commentChar", "commit.cleanup", "user.name"])
+
+        assert config == {"core.commentchar": ";", "commit.cleanup": "scissors"}
+        mock_run.assert_not_called()
+
+    def test_repository_overrides_global(self, isolated_config, tmp_path):
+        """Test that later config files take precedence."""
+        (tmp_path / "global").write_text("[core]\n\tcommentChar = %\n[commit]\n\tcleanup = strip\n")
+        (isolated_config / "config").write_text("[core]\n\tcommentChar = @\n")
+
+        config = GitOperations.get_config(["core.commentChar", "commit.cleanup"])
+
+        assert config == {"core.commentchar": "@", "commit.cleanup": "strip"}
+
+    def test_worktree_config(self, isolated_config):
+        """Test that config.worktree is read when the extension is enabled."""
+        (isolated_config / "config").write_text(
+            "[extensions]\n\tworktreeConfig = true\n[core]\n\tcommentChar = @\n"
+        )
+        (isolated_config / "config.worktree").write_text("[core]\n\tcommentChar = !\n")
+
+        assert GitOperations.get_config(["core.commentChar"]) == {"core.commentchar": "!"}
+
+    def test_quoted_value_with_escapes(self, isolated_config):
+        """Test whitespace and escapes inside values."""
+        (isolated_config / "config").write_text('[user]\n\tname = "  A \\"B\\""  C  # x\n')
+
+        assert GitOperations.get_config(["user.name"]) == {"user.name": '  A "B"  C'}
+
+    @pytest.mark.parametrize(
+        "content",
+        ["[include]\n\tpath = other\n", '[includeIf "gitdir:~/"]\n\tpath = other\n'],
+    )
+    def test_includes_fall_back_to_git(self, isolated_config, mocker, content):
+        """Test that config with includes is interpreted by git."""
+        (isolated_config / "config").write_text(content)
+        mock_run = mocker.patch(
+            "pre_commit_jira_helper.git.run_command",
+            return_value=(True, "core.commentchar ;\ncommit.cleanup verbatim", ""),
+        )
+
+        config = GitOperations.get_config(["core.commentChar", "commit.cleanup"])
+
+        assert config == {"core.commentchar": ";", "commit.cleanup": "verbatim"}
+        mock_run.assert_called_once_with(
+            ["git", "config", "--get-regexp", r"^(commit\.cleanup|core\.commentchar)$"]
+        )
+
+    def test_command_line_config_falls_back_to_git(self, isolated_config, monkeypatch, mocker):
+        """Test that ``git -c`` overrides are interpreted by git."""
+        (isolated_config / "config").write_text("[core]\n\tcommentChar = @\n")
+        monkeypatch.setenv("GIT_CONFIG_PARAMETERS", "'core.commentchar'=';'")
+        mocker.patch(
+            "pre_commit_jira_helper.git.run_command", return_value=(True, "core.commentchar ;", "")
+        )
+
+        assert GitOperations.get_config(["core.commentChar"]) == {"core.commentchar": ";"}
+
+    def test_unset_variables_via_git(self, isolated_config, mocker):
+        """Test that git reporting no matches yields an empty mapping."""
+        (isolated_config / "config").write_text("[core]\n\tcommentChar = a\\\n")
+        mocker.patch("pre_commit_jira_helper.git.run_command", return_value=(False, "", ""))
+
+        assert GitOperations.get_config(["core.commentChar"]) == {}
+
+
+@pytest.mark.usefixtures("clean_git_env")
+class TestRepoState:
+    """Test detecting operations in progress from the git dir."""
+
+    @pytest.fixture
+    def git_dir(self, tmp_path, monkeypatch):
+        """A repository with a detached HEAD."""
+        monkeypatch.chdir(tmp_path)
+        return make_git_dir(tmp_path / ".git", f"{SHA}\n")
+
+    @pytest.mark.usefixtures("git_dir")
+    def test_no_operation(self):
+        """Test a repository with nothing in progress."""
+        assert GitOperations.get_repo_state() == RepoState()
+
+    def test_interactive_rebase(self, git_dir):
+        """Test that rebase-merge yields the branch being rebased."""
+        (git_dir / "rebase-merge").mkdir()
+        (git_dir / "rebase-merge" / "head-name").write_text("refs/heads/feature/ABC-1\n")
+        (git_dir / "rebase-merge" / "interactive").write_text("")
+
+        state = GitOperations.get_repo_state()
+
+        assert state == RepoState("rebase", "refs/heads/feature/ABC-1", interactive=True)
+        assert state.branch == "feature/ABC-1"
+
+    def test_rebase_of_detached_head(self, git_dir):
+        """Test a rebase that did not start on a branch."""
+        (git_dir / "rebase-merge").mkdir()
+        (git_dir / "rebase-merge" / "head-name").write_text("detached HEAD\n")
+
+        state = GitOperations.get_repo_state()
+
+        assert state == RepoState("rebase")
+        assert state.branch is None
+
+    @pytest.mark.parametrize(("applying", "operation"), [(False, "rebase"), (True, "am")])
+    def test_rebase_apply(self, git_dir, applying, operation):
+        """Test that rebase-apply is a rebase unless git am is applying patches."""
+        (git_dir / "rebase-apply").mkdir()
+        (git_dir / "rebase-apply" / "head-name").write_text("refs/heads/DEF-2\n")
+        if applying:
+            (git_dir / "rebase-apply" / "applying").write_text("")
+
+        assert GitOperations.get_repo_state() == RepoState(operation, "refs/heads/DEF-2")
+
+    @pytest.mark.parametrize(
+        ("name", "operation"),
+        [("MERGE_HEAD", "merge"), ("CHERRY_PICK_HEAD", "cherry-pick"), ("REVERT_HEAD", "revert")],
+    )
+    def test_head_files(self, git_dir, name, operation):
+        """Test the pseudo-refs written while an operation waits for a commit."""
+        (git_dir / name).write_text(f"{SHA}\n")
+
+        assert GitOperations.get_repo_state().operation == operation
+
+    @pytest.mark.parametrize(
+        ("command", "operation"), [("pick", "cherry-pick"), ("revert", "revert")]
+    )
+    def test_sequencer(self, git_dir, command, operation):
+        """Test a multi-commit cherry-pick or revert between commits."""
+        (git_dir / "sequencer").mkdir()
+        (git_dir / "sequencer" / "todo").write_text(f"{command} {SHA[:7]} Subject\n")
+
+        assert GitOperations.get_repo_state().operation == operation
+
+    def test_no_repository(self, tmp_path, monkeypatch):
+        """Test that no state is reported outside a repository."""
+        monkeypatch.chdir(tmp_path)
+
+        assert GitOperations.get_repo_state() == RepoState()
+
+    def test_real_interactive_rebase(self, tmp_path, monkeypatch):
+        """Test against a rebase stopped by git itself."""
+        for name in ("AUTHOR", "COMMITTER"):
+            monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+            monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+        monkeypatch.setenv("GIT_SEQUENCE_EDITOR", "sed -i 's/^pick/edit/'")
+        monkeypatch.chdir(tmp_path)
+
+        def git(*args):
+            subprocess.run(["git", *args], check=True, capture_output=True)
+
+        git("init", "-q", "-b", "feature/ABC-42-rebase")
+        for i in range(3):
+            (tmp_path / "file.txt").write_text(f"{i}\n")
+            git("add", "file.txt")
+            git("commit", "-qm", f"Commit {i}")
+        git("rebase", "-i", "HEAD~2")
+
+        state = GitOperations.get_repo_state()
+
+        assert state.operation == "rebase"
+        assert state.interactive is True
+        assert state.branch == "feature/ABC-42-rebase"
+        assert GitOperations.get_current_branch() is None
+
+
+@pytest.mark.usefixtures("clean_git_env")
+class TestIterStagedFiles:
+    """Test GitOperations.iter_staged_files method."""
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        """Repository with a commit and changes of every kind staged."""
+        for name in ("AUTHOR", "COMMITTER"):
+            monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+            monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+        monkeypatch.chdir(tmp_path)
+
+        def git(*args):
+            subprocess.run(["git", *args], check=True, capture_output=True)
+
+        git("init", "-q")
+        content = "".join(f"line {i}\n" for i in range(50))
+        for name in ("old.txt", "edit.txt", "gone.txt"):
+            (tmp_path / name).write_text(content + name)
+        git("add", ".")
+        git("commit", "-qm", "ABC-1: Start")
+
+        git("mv", "old.txt", "new.txt")
+        (tmp_path / "edit.txt").write_text("changed\n")
+        git("rm", "-q", "gone.txt")
+        for name in ('caf\u00e9 "quoted".txt', "line\nbreak.txt"):
+            (tmp_path / name).write_text("x\n")
+        git("add", ".")
+        return tmp_path
+
+    @pytest.mark.usefixtures("repo")
+    def test_paths(self):
+        """Test that unusual paths are returned unquoted."""
+        paths = sorted(GitOperations.iter_staged_files())
+
+        assert paths == [
+            'caf\u00e9 "quoted".txt',
+            "edit.txt",
+            "gone.txt",
+            "line\nbreak.txt",
+            "new.txt",
+        ]
+
+    @pytest.mark.usefixtures("repo")
+    def test_status_and_renames(self):
+        """Test status letters and rename sources."""
+        changes = sorted(GitOperations.iter_staged_files(status=True), key=lambda c: c.path)
+
+        assert changes == [
+            StagedFile("A", 'caf\u00e9 "quoted".txt'),
+            StagedFile("M", "edit.txt"),
+            StagedFile("D", "gone.txt"),
+            StagedFile("A", "line\nbreak.txt"),
+            StagedFile("R", "new.txt", "old.txt", 100),
+        ]
+
+    @pytest.mark.usefixtures("repo")
+    def test_without_renames(self):
+        """Test that renames can be listed as a deletion and an addition."""
+        changes = {
+            c.path: c.status for c in GitOperations.iter_staged_files(status=True, renames=False)
+        }
+
+        assert (changes["old.txt"], changes["new.txt"]) == ("D", "A")
+
+    def test_outside_repository(self, tmp_path, monkeypatch):
+        """Test that git failing is reported."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+        with pytest.raises(CommandError):
+            list(GitOperations.iter_staged_files())
@@ -0,0 +1,91 @@
+"""Tests for git_async module."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper.git import GitOperations
+from pre_commit_jira_helper.git_async import QUERIES, AsyncGitOperations
+
+
+def git(*args, cwd):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repository on a feature branch with one commit and a staged file."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+    git("init", "-q", "-b", "feature/ABC-1", cwd=tmp_path)
+    git("commit", "-q", "--allow-empty", "-m", "ABC-1: Initial commit", cwd=tmp_path)
+    (tmp_path / "a.txt").write_text("a\n")
+    git("add", "a.txt", cwd=tmp_path)
+    return tmp_path
+
+
+class TestAsyncGitOperations:
+    """Test AsyncGitOperations class."""
+
+    @pytest.mark.usefixtures("repo")
+    def test_same_results_as_sync(self):
+        """Test that every query agrees with its GitOperations counterpart."""
+        for name in QUERIES:
+            result = asyncio.run(getattr(AsyncGitOperations, f"get_{name}")())
+            assert result == getattr(GitOperations, f"get_{name}")()
+
+        assert asyncio.run(AsyncGitOperations.get_commit_hash(short=True)) == (
+            GitOperations.get_commit_hash(short=True)
+        )
+
+    def test_outside_repository(self, tmp_path, monkeypatch):
+        """Test the results outside a git repository."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+        results = asyncio.run(AsyncGitOperations.gather(*QUERIES))
+
+        assert results == {
+            "current_branch": None,
+            "commit_hash": None,
+            "repo_root": None,
+            "staged_files": [],
+        }
+
+    def test_branch_falls_back_to_git(self, mocker):
+        """Test that git is asked for the branch when HEAD cannot be read."""
+        mocker.patch("pre_commit_jira_helper.git.GitOperations.get_git_dir", return_value=None)
+        run = mocker.patch(
+            "pre_commit_jira_helper.git_async.run_command_async",
+            return_value=(True, "feature/ABC-2", ""),
+        )
+
+        assert asyncio.run(AsyncGitOperations.get_current_branch()) == "feature/ABC-2"
+        run.assert_called_once_with(["git", "symbolic-ref", "--short", "HEAD"])
+
+    def test_gather_unknown_query(self):
+        """Test that unknown query names are rejected before anything runs."""
+        with pytest.raises(ValueError, match="branch"):
+            asyncio.run(AsyncGitOperations.gather("repo_root", "branch"))
+
+
+class TestGather:
+    """Test the synchronous GitOperations.gather wrapper."""
+
+    def test_gather(self, repo):
+        """Test answering several queries in one call."""
+        results = GitOperations.gather("current_branch", "repo_root", "staged_files")
+
+        assert results == {
+            "current_branch": "feature/ABC-1",
+            "repo_root": str(repo.resolve()),
+            "staged_files": ["a.txt"],
+        }
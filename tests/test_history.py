@@ -0,0 +1,117 @@
+"""Tests for history module."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper.history import HistoryError, iter_commit_messages, iter_messages_of
+
+
+def git(*args, cwd):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repository with a merged topic branch."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    git("init", "-q", "-b", "main", cwd=tmp_path)
+    git("commit", "-q", "--allow-empty", "-m", "ABC-1: Initial commit", cwd=tmp_path)
+    git("checkout", "-qb", "topic", cwd=tmp_path)
+    git("commit", "-q", "--allow-empty", "-m", "Subject\n\nBody with ABC-2", cwd=tmp_path)
+    git("checkout", "-q", "main", cwd=tmp_path)
+    git("commit", "-q", "--allow-empty", "-m", "No issue", cwd=tmp_path)
+    git("merge", "-q", "--no-ff", "-m", "Merge topic", "topic", cwd=tmp_path)
+    return tmp_path
+
+
+class TestIterCommitMessages:
+    """Test iter_commit_messages function."""
+
+    def test_streams_messages(self, repo):
+        """Test that every commit is listed with its full message."""
+        messages = dict(iter_commit_messages(["main"]))
+
+        assert len(messages) == 4
+        assert messages[git("rev-parse", "topic", cwd=repo)] == "Subject\n\nBody with ABC-2\n"
+        assert messages[git("rev-parse", "main~1", cwd=repo)] == "No issue\n"
+
+    def test_skip_merges(self, repo):
+        """Test leaving out merge commits."""
+        commits = [commit for commit, _ in iter_commit_messages(["main"], skip_merges=True)]
+
+        assert git("rev-parse", "main", cwd=repo) not in commits
+        assert len(commits) == 3
+
+    @pytest.mark.usefixtures("repo")
+    def test_records_split_across_reads(self, mocker):
+        """Test that records are reassembled when they span several reads."""
+        expected = list(iter_commit_messages(["main"]))
+        mocker.patch("pre_commit_jira_helper.utils._READ_SIZE", 3)
+
+        assert list(iter_commit_messages(["main"])) == expected
+
+    @pytest.mark.usefixtures("repo")
+    def test_empty_range(self):
+        """Test a range without commits."""
+        assert list(iter_commit_messages(["main..main"])) == []
+
+    @pytest.mark.usefixtures("repo")
+    def test_unknown_revision(self):
+        """Test that git errors are raised once the stream ends."""
+        with pytest.raises(HistoryError, match="unknown-branch"):
+            list(iter_commit_messages(["unknown-branch"]))
+
+    def test_large_stderr(self, tmp_path, monkeypatch):
+        """Test that git writing more than a pipe buffer to stderr does not block."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        fake_git = bin_dir / "git"
+        fake_git.write_text(
+            "#!/bin/sh\nhead -c 1000000 /dev/zero | tr '\\0' w >&2\nprintf 'abc\\nABC-1 Fix\\n'\n"
+        )
+        fake_git.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+
+        assert list(iter_commit_messages(["main"])) == [("abc", "ABC-1 Fix\n")]
+
+    @pytest.mark.usefixtures("repo")
+    def test_close_early(self, mocker):
+        """Test that closing the generator stops git without raising."""
+        popen = mocker.spy(subprocess, "Popen")
+        messages = iter_commit_messages(["main"])
+        next(messages)
+        messages.close()
+
+        assert popen.spy_return.returncode is not None
+
+
+class TestIterMessagesOf:
+    """Test iter_messages_of function."""
+
+    def test_given_commits_only(self, repo):
+        """Test that only the given commits are read, in the given order."""
+        commits = [git("rev-parse", rev, cwd=repo) for rev in ("main~1", "topic")]
+
+        messages = list(iter_messages_of(commits))
+
+        assert messages == [
+            (commits[0], "No issue\n"),
+            (commits[1], "Subject\n\nBody with ABC-2\n"),
+        ]
+
+    @pytest.mark.usefixtures("repo")
+    def test_unknown_commit(self):
+        """Test that a missing commit raises."""
+        with pytest.raises(HistoryError):
+            list(iter_messages_of(["f" * 40]))
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import pytest
+
+from pre_commit_jira_helper import ownership, validation
+from pre_commit_jira_helper.git import GitOperations, RepoState
 from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+from pre_commit_jira_helper.matcher import Tracker
 
 
 class TestJiraIssuePrependHook:
@@ -158,3 +163,246 @@ class TestJiraIssuePrependHook:
 
         assert result is True
         mock_write.assert_called_once_with("/tmp/commit_msg", "ABC-123 -  Initial commit")
+
+    def test_should_run_during_rebase_uses_original_branch(self, mocker):
+        """Test that the branch being rebased is used while HEAD is detached."""
+        hook = JiraIssuePrependHook()
+        mocker.patch.object(hook.git, "get_current_branch", return_value=None)
+        mocker.patch(
+            "pre_commit_jira_helper.base.GitOperations.get_repo_state",
+            return_value=RepoState("rebase", "refs/heads/feature/ABC-123", interactive=True),
+        )
+        mocker.patch.object(hook, "read_commit_message", return_value="Reworded")
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["ABC-123"]
+
+
+class TestOwnership:
+    """Test the use of an owners file by JiraIssuePrependHook."""
+
+    @pytest.fixture
+    def owners(self, tmp_path, mocker):
+        """Owners file, with the git dir kept out of the test."""
+        ownership._loaded.clear()
+        path = tmp_path / "OWNERS"
+        path.write_text("services/billing BILL\nservices/search SRCH\n")
+        mocker.patch.object(GitOperations, "get_git_dir", return_value=None)
+        yield path
+        ownership._loaded.clear()
+
+    def make_hook(self, mocker, owners, branch, staged, message="Fix rounding", **kwargs):
+        """Create a hook seeing the given branch, staged files and message."""
+        hook = JiraIssuePrependHook(owners_file=owners, **kwargs)
+        mocker.patch.object(hook.git, "get_current_branch", return_value=branch)
+        mocker.patch.object(hook.git, "iter_staged_files", return_value=iter(staged))
+        mocker.patch.object(hook, "read_commit_message", return_value=message)
+        return hook
+
+    def test_infer_without_branch_issue(self, mocker, owners):
+        """Test that the owning projects' keys are used on branches without issues."""
+        hook = self.make_hook(
+            mocker, owners, "main", ["services/search/a.py", "services/billing/b.py", "README"]
+        )
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["BILL", "SRCH"]
+
+    def test_infer_skips_mentioned_projects(self, mocker, owners):
+        """Test that keys already in the message, alone or in an issue, are not added."""
+        hook = self.make_hook(
+            mocker,
+            owners,
+            None,
+            ["services/search/a.py", "services/billing/b.py"],
+            message="BILL-7: Fix rounding for SRCH",
+        )
+
+        assert hook.should_run("/tmp/commit_msg") is False
+
+    def test_infer_respects_allowed_prefixes(self, mocker, owners):
+        """Test that only allowed projects are inferred."""
+        hook = self.make_hook(
+            mocker,
+            owners,
+            "main",
+            ["services/search/a.py", "services/billing/b.py"],
+            allowed_prefixes=["SRCH"],
+        )
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["SRCH"]
+
+    def test_branch_issue_wins_over_inference(self, mocker, owners):
+        """Test that staged files are not listed when the branch names an issue."""
+        hook = self.make_hook(mocker, owners, "feature/ABC-1", [])
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["ABC-1"]
+        hook.git.iter_staged_files.assert_not_called()
+
+    def test_restrict(self, mocker, owners):
+        """Test that restrict mode keeps only issues of the owning projects."""
+        hook = self.make_hook(
+            mocker,
+            owners,
+            "feature/BILL-1-SRCH-2-OPS-3",
+            ["services/billing/b.py"],
+            owners_mode="restrict",
+        )
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["BILL-1"]
+
+    def test_restrict_without_owned_files(self, mocker, owners):
+        """Test that nothing is filtered when no staged file has an owner."""
+        hook = self.make_hook(
+            mocker, owners, "feature/BILL-1-OPS-3", ["README"], owners_mode="restrict"
+        )
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["BILL-1", "OPS-3"]
+
+    def test_unusable_owners_file(self, mocker, owners):
+        """Test that a malformed owners file is reported and ignored."""
+        owners.write_text("not a rule\n")
+        hook = self.make_hook(mocker, owners, "main", ["services/billing/b.py"])
+
+        assert hook.should_run("/tmp/commit_msg") is False
+
+
+class TestValidation:
+    """Test checking branch issues against Jira in JiraIssuePrependHook."""
+
+    def make_hook(self, mocker, missing):
+        """Create a hook on a branch with two issues, some of them missing in Jira."""
+        hook = JiraIssuePrependHook(jira_url="https://jira.example.com", validation_budget=0.1)
+        mocker.patch.object(hook.git, "get_current_branch", return_value="feature/ABC-1-ABC-12")
+        mocker.patch.object(hook, "read_commit_message", return_value="Fix rounding")
+        find_missing = mocker.patch(
+            "pre_commit_jira_helper.validation.IssueValidator.find_missing", return_value=missing
+        )
+        return hook, find_missing
+
+    def test_missing_issues_are_dropped(self, mocker):
+        """Test that issues that do not exist are not prepended."""
+        hook, find_missing = self.make_hook(mocker, ["ABC-12"])
+        warning = mocker.patch("pre_commit_jira_helper.hooks.jira.logger.warning")
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["ABC-1"]
+        find_missing.assert_called_once_with(["ABC-1", "ABC-12"])
+        assert hook._validator.budget == 0.1
+        assert "do not exist in Jira: ['ABC-12']" in warning.call_args.args[0]
+
+    def test_credentials_are_read_per_run(self, mocker, monkeypatch):
+        """Test that a reused hook picks up credentials changed since its last run."""
+        hook, _ = self.make_hook(mocker, [])
+        monkeypatch.setenv(validation.TOKEN_ENV, "first")
+        hook.should_run("/tmp/commit_msg")
+        first = hook._validator
+        hook.should_run("/tmp/commit_msg")
+        assert hook._validator is first
+
+        monkeypatch.setenv(validation.TOKEN_ENV, "second")
+        hook.should_run("/tmp/commit_msg")
+
+        assert hook._validator is not first
+        assert hook._validator.client._headers["Authorization"] == "Bearer second"
+
+    def test_all_missing(self, mocker):
+        """Test that the hook skips when no issue exists."""
+        hook, _ = self.make_hook(mocker, ["ABC-1", "ABC-12"])
+
+        assert hook.should_run("/tmp/commit_msg") is False
+
+    def test_disabled_by_default(self, mocker):
+        """Test that Jira is not asked without a URL."""
+        find_missing = mocker.patch("pre_commit_jira_helper.validation.IssueValidator.find_missing")
+        hook = JiraIssuePrependHook()
+        mocker.patch.object(hook.git, "get_current_branch", return_value="feature/ABC-1")
+        mocker.patch.object(hook, "read_commit_message", return_value="Fix rounding")
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        find_missing.assert_not_called()
+
+
+def test_find_new_issues_matches_whole_message(mocker):
+    """Test that the pattern runs over the whole message, across lines."""
+    hook = JiraIssuePrependHook(issue_pattern=r"Refs:\s+([A-Z]+-\d+)")
+    findall = mocker.spy(hook.matcher, "findall_with_origin")
+    message = "Fix\n\nRefs:\nABC-1\n" + "x" * 1000
+
+    assert hook.find_new_issues(message, ["ABC-1", "ABC-2"]) == ["ABC-2"]
+    findall.assert_called_once_with(message)
+    assert hook.find_new_issues("Fix rounding", ["ABC-1"]) == ["ABC-1"]
+
+
+class TestTrackers:
+    """Test JiraIssuePrependHook with several issue trackers."""
+
+    TRACKERS = [
+        Tracker("jira"),
+        Tracker("github", r"gh-(\d+)", template="org/repo#{key}"),
+        Tracker("servicenow", r"CHG\d{7}"),
+    ]
+
+    def make_hook(self, mocker, branch, message="Fix rounding", **kwargs):
+        """Create a hook seeing the given branch and message."""
+        hook = JiraIssuePrependHook(trackers=self.TRACKERS, **kwargs)
+        mocker.patch.object(hook.git, "get_current_branch", return_value=branch)
+        mocker.patch.object(hook, "read_commit_message", return_value=message)
+        return hook
+
+    def test_prepends_keys_of_every_tracker(self, mocker):
+        """Test that keys of all trackers are found and written by their tracker."""
+        hook = self.make_hook(mocker, "fix/ABC-1-gh-12-CHG0012345")
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["ABC-1", "org/repo#12", "CHG0012345"]
+
+    def test_mentioned_keys_are_not_prepended(self, mocker):
+        """Test that keys already in the message are recognised by their raw form."""
+        hook = self.make_hook(mocker, "fix/ABC-1-gh-12", "Fix rounding\n\nCloses gh-12")
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["ABC-1"]
+
+    def test_templated_keys_are_prepended_once(self, mocker, tmp_path):
+        """Test that running the hook again does not prepend a templated key twice."""
+        path = tmp_path / "COMMIT_EDITMSG"
+        path.write_text("Fix rounding\n")
+        hook = JiraIssuePrependHook(trackers=self.TRACKERS)
+        mocker.patch.object(hook.git, "get_current_branch", return_value="fix/ABC-1-gh-12")
+
+        assert hook.run(commit_msg_filepath=path) == 0
+        assert hook.run(commit_msg_filepath=path) == 0
+        assert path.read_text() == "ABC-1, org/repo#12:  Fix rounding\n"
+
+    def test_validation_only_checks_jira_keys(self, mocker):
+        """Test that keys of other trackers are not looked up in Jira."""
+        find_missing = mocker.patch(
+            "pre_commit_jira_helper.validation.IssueValidator.find_missing", return_value=[]
+        )
+        hook = self.make_hook(mocker, "fix/ABC-1-gh-12", jira_url="https://jira.example.com")
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        find_missing.assert_called_once_with(["ABC-1"])
+        assert hook.new_issues == ["ABC-1", "org/repo#12"]
+
+    def test_restrict_only_filters_jira_keys(self, mocker, tmp_path):
+        """Test that restrict mode keeps the keys of other trackers."""
+        ownership._loaded.clear()
+        owners = tmp_path / "OWNERS"
+        owners.write_text("services/billing BILL\n")
+        mocker.patch.object(GitOperations, "get_git_dir", return_value=None)
+        hook = self.make_hook(
+            mocker, "fix/BILL-1-OPS-2-gh-12", owners_file=owners, owners_mode="restrict"
+        )
+        mocker.patch.object(
+            hook.git, "iter_staged_files", return_value=iter(["services/billing/a"])
+        )
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["BILL-1", "org/repo#12"]
+        ownership._loaded.clear()
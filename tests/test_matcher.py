@@ -0,0 +1,321 @@
+"""Tests for matcher module."""
+
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from pre_commit_jira_helper import matcher as matcher_module
+from pre_commit_jira_helper.matcher import (
+    DEFAULT_ISSUE_PATTERN,
+    IssueMatcher,
+    Tracker,
+    TrackerMatcher,
+    _first_chars,
+    key_prefix,
+    scan_issue_keys,
+)
+
+
+class TestIssueMatcher:
+    """Test IssueMatcher class."""
+
+    def test_default_pattern(self):
+        """Test that the default pattern is used when none is given."""
+        matcher = IssueMatcher()
+        assert matcher.pattern == DEFAULT_ISSUE_PATTERN
+        assert matcher.findall("feature/ABC-123-DEF-456") == ["ABC-123", "DEF-456"]
+
+    def test_no_matches(self):
+        """Test text without issue keys."""
+        assert IssueMatcher(allowed_prefixes=["ABC"]).findall("no issues here") == []
+
+    def test_allowed_prefixes_filter(self):
+        """Test that only allowed prefixes are kept, in order of appearance."""
+        matcher = IssueMatcher(allowed_prefixes=["XYZ", "ABC"])
+        assert matcher.findall("ABC-1 DEF-2 XYZ-3 ABC-4") == ["ABC-1", "XYZ-3", "ABC-4"]
+
+    def test_empty_prefixes_accept_everything(self):
+        """Test that an empty prefix list disables filtering."""
+        assert IssueMatcher(allowed_prefixes=[]).findall("ABC-1 DEF-2") == ["ABC-1", "DEF-2"]
+
+    def test_prefix_is_not_matched_inside_longer_key(self):
+        """Test that an allowed prefix does not match the tail of a longer project key."""
+        matcher = IssueMatcher(allowed_prefixes=["ABC"])
+        assert matcher.findall("XABC-1 ABC-2") == ["ABC-2"]
+
+    def test_large_prefix_set(self):
+        """Test filtering against thousands of allowed prefixes."""
+        prefixes = [f"P{i}" for i in range(5000)]
+        matcher = IssueMatcher(allowed_prefixes=prefixes)
+        assert matcher.findall("P4999-1 Q1-2 P0-3") == ["P4999-1", "P0-3"]
+
+    def test_custom_pattern(self):
+        """Test a custom issue pattern."""
+        matcher = IssueMatcher(r"[A-Z]{3,}-\d+", ["ABCD"])
+        assert matcher.findall("AB-1 ABC-2 ABCD-3") == ["ABCD-3"]
+
+    def test_search_returns_first_allowed(self):
+        """Test that search skips disallowed keys and stops at the first allowed one."""
+        matcher = IssueMatcher(allowed_prefixes=["ABC", "XYZ"])
+        assert matcher.search("DEF-1 XYZ-2 ABC-3") == "XYZ-2"
+        assert matcher.search("DEF-1 only") is None
+
+    def test_search_single_group_pattern(self):
+        """Test that search reports the group like findall does."""
+        matcher = IssueMatcher(r"\[([A-Z]+-\d+)\]")
+        assert matcher.search("fix [ABC-12] bug") == matcher.findall("fix [ABC-12] bug")[0]
+
+
+class TestBacktrackingGuard:
+    """Test the protection against custom patterns that hang."""
+
+    def test_risky_pattern_falls_back(self, mocker):
+        """Test that a pattern with nested repetitions is replaced by the default."""
+        warning = mocker.patch("pre_commit_jira_helper.matcher.logger.warning")
+        matcher = IssueMatcher(r"([A-Z]+)+-\d+")
+
+        assert matcher.pattern == DEFAULT_ISSUE_PATTERN
+        assert matcher.findall("A" * 40 + "! ABC-1") == ["ABC-1"]
+        assert "([A-Z]+)+" in warning.call_args.args[0]
+        assert "can make matching hang" in warning.call_args.args[0]
+
+    def test_default_pattern_is_not_analyzed(self, mocker):
+        """Test that the default pattern skips the analysis."""
+        analyze = mocker.patch("pre_commit_jira_helper.backtracking.find_backtracking_risk")
+        assert IssueMatcher().guarded is False
+        analyze.assert_not_called()
+
+    def test_safe_custom_pattern(self):
+        """Test that a safe custom pattern is kept and matched."""
+        matcher = IssueMatcher(r"#([A-Z]+-\d+)", ["ABC"])
+        assert matcher.guarded is True
+        assert matcher.findall("#ABC-1 #XYZ-2\n#ABC-3") == ["ABC-1", "ABC-3"]
+        assert matcher.search("#XYZ-2 #ABC-3") == "ABC-3"
+        assert matcher.search("ABC-3") is None
+        assert matcher.findall_with_origin("#XYZ-2 #ABC-3") == [("ABC-3", "jira")]
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            r"[A-Z]{3}-\d+",
+            r"\b[A-Z]{2,}-\d+\b",
+            r"^[A-Z]+-\d+",
+            r"[A-Z]+-\d+$",
+            r"(?m)^([A-Z]+-\d+)",
+            r"(?<=#)[A-Z]+-\d+",
+            r"[A-Z]+-\d+(?![\d.])",
+            r"Refs:\s+([A-Z]+-\d+)",
+        ],
+    )
+    def test_same_matches_as_re(self, pattern):
+        """Test that custom patterns match like re over long texts, keys anywhere."""
+        rng = random.Random(pattern)
+        for _ in range(50):
+            pieces = []
+            length = 0
+            # Put keys around positions where long lines used to be cut
+            for edge in (900, 1000, 1800, 1900, 2700):
+                filler = rng.choice("ab #.\n") * max(edge - length - rng.randint(0, 12), 0)
+                key = rng.choice(["#ABC-12", "Refs:\nDEF-345", "GH-7.", "XYZ-99999"])
+                pieces += [filler, key]
+                length += len(filler) + len(key)
+            content = rng.choice(["", "ABC-1 "]) + "".join(pieces) + rng.choice(["", " ZZ-9"])
+
+            assert IssueMatcher(pattern).findall(content) == re.findall(pattern, content)
+
+    def test_timeout_falls_back(self, mocker):
+        """Test that running out of time switches to the default pattern."""
+        warning = mocker.patch("pre_commit_jira_helper.matcher.logger.warning")
+        # Unbounded on a line of As, but not reported by the analysis
+        matcher = IssueMatcher(r"(?:A|B)*A*A*A*A*A*A*A*-\d+", time_limit=0.2)
+
+        assert matcher.findall("A" * 200 + "\nABC-1") == ["ABC-1"]
+        assert matcher.pattern == DEFAULT_ISSUE_PATTERN
+        assert "took more than 0.2s on 206 characters" in warning.call_args.args[0]
+
+    def test_deadline_off_the_main_thread(self, mocker):
+        """Test that the deadline is checked between matches where signals cannot be used."""
+        mocker.patch("pre_commit_jira_helper.matcher.threading.main_thread", return_value=None)
+        mocker.patch("pre_commit_jira_helper.matcher.logger.warning")
+        mocker.patch("pre_commit_jira_helper.matcher.time.monotonic", side_effect=[0.0, 2.0])
+        matcher = IssueMatcher(r"#([A-Z]+-\d+)")
+
+        assert matcher.search("ABC-2 #ABC-1") == "ABC-2"
+        assert matcher.guarded is False
+
+
+class TestTrackerMatcher:
+    """Test matching several trackers in one scan."""
+
+    @pytest.fixture
+    def matcher(self):
+        return TrackerMatcher(
+            [
+                Tracker("jira", prefixes=["ABC"]),
+                Tracker("github", r"#\d+", template="org/repo{key}"),
+                Tracker("servicenow", r"\bCHG\d{7}\b", prefixes=["CHG"]),
+            ]
+        )
+
+    def test_findall_dispatches_by_tracker(self, matcher):
+        """Test that each key is filtered and written by its own tracker."""
+        content = "ABC-1 DEF-2 fixes #12, CHG0012345\nsee ABC-3"
+        assert matcher.findall(content) == ["ABC-1", "org/repo#12", "CHG0012345", "ABC-3"]
+        assert matcher.findall_with_origin(content) == [
+            ("ABC-1", "jira"),
+            ("org/repo#12", "github"),
+            ("CHG0012345", "servicenow"),
+            ("ABC-3", "jira"),
+        ]
+
+    def test_search(self, matcher):
+        """Test that search returns the first key of any tracker."""
+        assert matcher.search("DEF-1 then #5 and ABC-1") == "org/repo#5"
+        assert matcher.search("nothing") is None
+
+    def test_single_group_selects_key(self):
+        """Test that a tracker pattern with one group reports the group."""
+        matcher = TrackerMatcher(
+            [Tracker("jira"), Tracker("github", r"gh-(\d+)", template="#{key}")]
+        )
+        assert matcher.findall_with_origin("fix/ABC-1-gh-12") == [
+            ("ABC-1", "jira"),
+            ("#12", "github"),
+        ]
+
+    def test_risky_tracker_is_left_out(self, mocker):
+        """Test that a tracker whose pattern may hang is not used."""
+        warning = mocker.patch("pre_commit_jira_helper.matcher.logger.warning")
+        matcher = TrackerMatcher([Tracker("jira"), Tracker("bad", r"(x+)+y")])
+
+        assert [tracker.name for tracker in matcher.trackers] == ["jira"]
+        assert "Not using the bad pattern" in warning.call_args.args[0]
+        assert matcher.findall("ABC-1 xxxy") == ["ABC-1"]
+
+    def test_timeout_keeps_jira_prefixes(self, mocker):
+        """Test that running out of time falls back to Jira keys of the allowed prefixes."""
+        mocker.patch("pre_commit_jira_helper.matcher.logger.warning")
+        mocker.patch("pre_commit_jira_helper.matcher.time.monotonic", side_effect=[0.0, 2.0])
+        matcher = TrackerMatcher([Tracker("jira", prefixes=["ABC"]), Tracker("gh", r"#\d+")])
+
+        assert matcher.findall("#1 ABC-1 DEF-2") == ["ABC-1"]
+        assert matcher.guarded is False
+
+    def test_timeout_keeps_the_default_pattern_tracker(self, mocker):
+        """Test that running out of time keeps the name and template of its tracker."""
+        mocker.patch("pre_commit_jira_helper.matcher.logger.warning")
+        mocker.patch("pre_commit_jira_helper.matcher.time.monotonic", side_effect=[0.0, 2.0])
+        matcher = TrackerMatcher(
+            [Tracker("gh", r"#\d+"), Tracker("jira2", template="see {key}"), Tracker("jira")]
+        )
+
+        assert matcher.findall_with_origin("#1 ABC-1") == [("see ABC-1", "jira2")]
+        assert matcher.search("#1 ABC-1") == "see ABC-1"
+
+    def test_timeout_without_default_pattern_finds_nothing(self, mocker):
+        """Test that Jira keys are not looked for when no tracker uses the default pattern."""
+        warning = mocker.patch("pre_commit_jira_helper.matcher.logger.warning")
+        mocker.patch("pre_commit_jira_helper.matcher.time.monotonic", side_effect=[0.0, 2.0])
+        matcher = TrackerMatcher([Tracker("gh", r"#\d+"), Tracker("change", r"CHG\d{7}")])
+
+        assert matcher.findall("#1 ABC-1 CHG0000001") == []
+        assert matcher.findall("ABC-1 CHG0000001") == []
+        assert matcher.search("ABC-1 #2") is None
+        assert "No keys are looked for" in warning.call_args.args[0]
+
+    @pytest.mark.parametrize(
+        ("key", "prefix"),
+        [("ABC-12", "ABC"), ("CHG0012345", "CHG"), ("#12", "#"), ("A1-2-3", "A1")],
+    )
+    def test_key_prefix(self, key, prefix):
+        """Test the prefix used by tracker filters."""
+        assert key_prefix(key) == prefix
+
+    @pytest.mark.parametrize(
+        ("pattern", "chars"),
+        [
+            (DEFAULT_ISSUE_PATTERN, "A-Z"),
+            (r"\b(?:ABC|XY)-\d+", "AX"),
+            (r"#\d+", r"\#"),
+            (r"\d+|\w", r"\d\w"),
+            (r"(?i)abc", None),
+            (r"(?i:abc)-\d+", None),
+            (r"(?-i:abc)", None),
+            (r"a?b", None),
+            (r"[^a]", None),
+        ],
+    )
+    def test_first_chars(self, pattern, chars):
+        """Test the first characters looked ahead for before trying the trackers."""
+        assert _first_chars(pattern) == chars
+
+    def test_lookahead_does_not_change_matches(self):
+        """Test that matches are the same with and without the first-character lookahead."""
+        trackers = [Tracker("jira"), Tracker("change", r"\bCHG\d{7}\b"), Tracker("gh", r"#\d+")]
+        content = "xCHG0000001 CHG0000002 #3 ABC-4 aBC-5 ##6"
+        with_lookahead = TrackerMatcher(trackers)
+        without = TrackerMatcher([*trackers, Tracker("any", r"a?z")])
+
+        assert with_lookahead.pattern.startswith("(?=[")
+        assert not without.pattern.startswith("(?=[")
+        assert with_lookahead.findall(content) == without.findall(content)
+        assert with_lookahead.findall(content) == ["CHG0000002", "#3", "ABC-4", "BC-5", "#6"]
+
+
+class TestScanner:
+    """Test the scan for keys of the default pattern against the regex engine."""
+
+    REGEX = re.compile(DEFAULT_ISSUE_PATTERN)
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "",
+            "ABC-123",
+            "abc-123 A-1 _A-1 1A-1 A_1-2 9-9 Z9_-0",
+            "ABC-12-34 AB-1CD-2 A-B-1 ABC--1 ABC- 1 ABC-x1",
+            "-1 --1 A-",
+            "feature/ABC-123-DEF-456-new-feature",
+            "ÉABC-1 ABC-1é A中B-2 ABC-0001",
+        ],
+    )
+    def test_edge_cases(self, content):
+        """Test hand-picked texts."""
+        assert scan_issue_keys(content) == self.REGEX.findall(content)
+
+    def test_differential_fuzz(self):
+        """Test that random texts give exactly the keys re.findall() finds."""
+        rng = random.Random(20261017)
+        alphabet = "AABZZ0019__---- a-z\n\té中\ud800"
+        for _ in range(5000):
+            content = "".join(rng.choices(alphabet, k=rng.randrange(60)))
+            assert scan_issue_keys(content) == self.REGEX.findall(content), content
+
+    def test_non_ascii_digits_use_the_regex(self):
+        """Test that texts with digits outside ASCII are left to the regex engine."""
+        content = "ABC-١٢ DEF-3 " * 30
+        assert scan_issue_keys(content) is None
+        assert IssueMatcher().findall(content) == self.REGEX.findall(content)
+
+    def test_matcher_uses_the_scan_for_long_texts(self, mocker):
+        """Test that findall() scans long texts for keys of the default pattern only."""
+        scan = mocker.spy(matcher_module, "scan_issue_keys")
+        content = "Round totals\n" * 30 + "Refs DEF-2, ABC-1\n"
+
+        assert IssueMatcher(allowed_prefixes=["ABC"]).findall(content) == ["ABC-1"]
+        assert scan.call_count == 1
+        assert IssueMatcher().findall("ABC-1") == ["ABC-1"]
+        assert IssueMatcher(r"[A-Z]{3}-\d+").findall(content) == ["DEF-2", "ABC-1"]
+        assert scan.call_count == 1
+
+    def test_dense_texts_switch_to_the_regex(self, mocker):
+        """Test that handing dense texts over to the regex engine keeps the keys exact."""
+        mocker.patch.object(matcher_module, "_DENSE_CHECK", 4)
+        rng = random.Random(17)
+        alphabet = "AABZ019_--- a\né中\ud800"
+        for _ in range(2000):
+            content = "".join(rng.choices(alphabet, k=rng.randrange(200)))
+            assert scan_issue_keys(content) == self.REGEX.findall(content), content
@@ -0,0 +1,237 @@
+"""Tests for objects module."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper.history import HistoryError, iter_commit_messages
+from pre_commit_jira_helper.objects import (
+    ObjectStore,
+    UnsupportedRepository,
+    apply_delta,
+    open_walk,
+)
+
+BODY = "Lorem ipsum dolor sit amet. " * 40
+
+
+def git(*args, cwd, **kwargs):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=True, **kwargs
+    )
+    return result.stdout.strip()
+
+
+def commit(repo, message, date, *options):
+    """Create an empty commit with a fixed committer date."""
+    message_file = repo / ".git" / "MESSAGE"
+    message_file.write_bytes(message if isinstance(message, bytes) else message.encode())
+    subprocess.run(
+        ["git", *options, "commit", "-q", "--allow-empty", "-F", str(message_file)],
+        cwd=repo,
+        check=True,
+        env={**os.environ, "GIT_COMMITTER_DATE": f"@{1_600_000_000 + date} +0000"},
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repository with long similar messages, a merged topic branch and a tag."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    git("init", "-q", "-b", "main", cwd=tmp_path)
+    for i in range(12):
+        commit(tmp_path, f"ABC-{i}: Change {i}\n\n{BODY}{i}", i * 60)
+    git("checkout", "-qb", "topic", "HEAD~4", cwd=tmp_path)
+    for i in range(3):
+        commit(tmp_path, f"Topic {i}", 1000 + i)
+    git("checkout", "-q", "main", cwd=tmp_path)
+    monkeypatch.setenv("GIT_COMMITTER_DATE", "@1600002000 +0000")
+    git("merge", "-q", "--no-ff", "-m", "Merge topic", "topic", cwd=tmp_path)
+    monkeypatch.delenv("GIT_COMMITTER_DATE")
+    git("tag", "-a", "v1", "-m", "Release", "main~2", cwd=tmp_path)
+    commit(tmp_path, "caf\xe9 ABC-99".encode("latin-1"), 3000, "-c", "i18n.commitEncoding=latin-1")
+    return tmp_path
+
+
+def native(revisions, **kwargs):
+    """List a walk read without git."""
+    return list(open_walk(revisions).messages(**kwargs))
+
+
+def with_git(revisions, **kwargs):
+    """List the same walk through git log."""
+    return list(iter_commit_messages(revisions, **kwargs))
+
+
+REVISIONS = [
+    ["--all"],
+    ["main"],
+    ["HEAD"],
+    ["topic..main"],
+    ["main..topic"],
+    ["v1", "^topic"],
+    ["--not", "topic", "--not", "main"],
+    ["refs/heads/main"],
+]
+
+
+class TestOpenWalk:
+    """Test reading history without git against git log."""
+
+    @pytest.mark.usefixtures("repo")
+    @pytest.mark.parametrize("revisions", REVISIONS)
+    def test_loose_objects(self, revisions):
+        """Test that loose objects give the same commits as git log."""
+        assert native(revisions) == with_git(revisions)
+
+    @pytest.mark.parametrize("revisions", REVISIONS)
+    def test_offset_deltas(self, repo, revisions):
+        """Test a pack whose commits are stored as offset deltas."""
+        git("repack", "-qadf", "--window=50", "--depth=50", cwd=repo)
+
+        assert native(revisions) == with_git(revisions)
+
+    def test_ref_deltas(self, repo):
+        """Test a pack whose commits are stored as deltas against object names."""
+        objects = git("rev-list", "--objects", "--all", cwd=repo)
+        git(
+            "pack-objects",
+            "-q",
+            "--window=50",
+            ".git/objects/pack/pack",
+            cwd=repo,
+            input=objects + "\n",
+        )
+        git("prune-packed", cwd=repo)
+
+        assert native(["--all"]) == with_git(["--all"])
+
+    @pytest.mark.usefixtures("repo")
+    def test_skip_merges_and_encoding(self):
+        """Test leaving out merges and decoding the commit encoding."""
+        messages = native(["main"], skip_merges=True)
+
+        assert messages == with_git(["main"], skip_merges=True)
+        assert messages[0][1] == "caf\xe9 ABC-99\n"
+        assert not any(message.startswith("Merge") for _, message in messages)
+
+    def test_shared_clone_and_shallow_clone(self, repo, tmp_path):
+        """Test objects found through alternates and a shallow history."""
+        shared = tmp_path / "shared"
+        git("clone", "-q", "--shared", str(repo), str(shared), cwd=tmp_path)
+        shallow = tmp_path / "shallow"
+        git("clone", "-q", "--depth=3", f"file://{repo}", str(shallow), cwd=tmp_path)
+
+        for clone in (shared, shallow):
+            walk = list(open_walk(["HEAD"], cwd=clone).messages())
+            assert walk == with_git(["HEAD"], cwd=clone)
+        assert 0 < len(walk) < 10  # cut off at the shallow boundary
+
+    def test_worktree(self, repo, tmp_path):
+        """Test a linked worktree reading refs and objects of its main repository."""
+        worktree = tmp_path / "wt"
+        git("worktree", "add", "-q", str(worktree), "topic", cwd=repo)
+
+        assert list(open_walk(["HEAD"], cwd=worktree).messages()) == with_git(
+            ["HEAD"], cwd=worktree
+        )
+
+
+class TestUnsupported:
+    """Test the cases left to git."""
+
+    @pytest.mark.usefixtures("repo")
+    @pytest.mark.parametrize(
+        "revisions",
+        [["HEAD~1"], ["main...topic"], ["--first-parent"], ["missing"], ["a" * 40]],
+    )
+    def test_revisions(self, revisions):
+        """Test that revision syntax beyond names and ranges is refused."""
+        with pytest.raises(UnsupportedRepository):
+            open_walk(revisions)
+
+    def test_grafts(self, repo):
+        """Test that grafted histories are refused."""
+        (repo / ".git" / "info" / "grafts").write_text("")
+
+        with pytest.raises(UnsupportedRepository, match="Grafts"):
+            open_walk(["main"])
+
+    def test_replace_refs(self, repo):
+        """Test that replaced objects are refused unless replacing is disabled."""
+        git("replace", "main~1", "main~2", cwd=repo)
+
+        with pytest.raises(UnsupportedRepository, match="Replace"):
+            open_walk(["main"])
+
+    def test_object_format(self, repo):
+        """Test that SHA-256 repositories are refused."""
+        git("config", "extensions.objectFormat", "sha256", cwd=repo)
+
+        with pytest.raises(UnsupportedRepository, match="SHA-1"):
+            open_walk(["main"])
+
+    def test_no_repository(self, tmp_path, monkeypatch):
+        """Test that a directory outside any repository is refused."""
+        monkeypatch.setenv("GIT_DIR", str(tmp_path / "missing"))
+
+        with pytest.raises(UnsupportedRepository):
+            open_walk(["main"])
+
+    @pytest.mark.usefixtures("repo")
+    def test_history_falls_back_to_git(self):
+        """Test that iter_commit_messages() uses git log when needed."""
+        assert with_git(["HEAD~1"], native=True) == with_git(["HEAD~1"])
+
+
+class TestObjectStore:
+    """Test ObjectStore class."""
+
+    def test_missing_object(self, repo):
+        """Test that a missing object is an error."""
+        store = ObjectStore([repo / ".git" / "objects"])
+
+        with pytest.raises(HistoryError, match="not found"):
+            store.read(b"\0" * 20)
+
+    def test_base_cache_bounded(self, repo):
+        """Test that cached delta bases stay within the byte budget."""
+        git("repack", "-qadf", "--window=50", "--depth=50", cwd=repo)
+        store = ObjectStore([repo / ".git" / "objects"], cache_bytes=3000)
+
+        for oid in git("rev-list", "--all", cwd=repo).split():
+            store.read(bytes.fromhex(oid))
+
+        assert 0 < store._cached_bytes <= 3000
+        store.close()
+
+
+class TestApplyDelta:
+    """Test apply_delta function."""
+
+    def test_copy_and_insert(self):
+        """Test copy and insert instructions."""
+        base = b"Hello, world"
+        # sizes 12 -> 11, copy 7 bytes from offset 0, insert "there"
+        delta = bytes([12, 12, 0x91, 0, 7, 5]) + b"there"
+
+        assert apply_delta(base, delta) == b"Hello, there"
+
+    def test_size_mismatch(self):
+        """Test that a delta for another base is rejected."""
+        with pytest.raises(HistoryError, match="base size"):
+            apply_delta(b"short", bytes([12, 1, 1]) + b"x")
+
+    def test_invalid_opcode(self):
+        """Test that the reserved opcode is rejected."""
+        with pytest.raises(HistoryError, match="opcode"):
+            apply_delta(b"", bytes([0, 1, 0]))
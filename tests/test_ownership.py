@@ -0,0 +1,163 @@
+"""Tests for ownership module."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper import ownership
+from pre_commit_jira_helper.cli.jira import main
+from pre_commit_jira_helper.ownership import (
+    OWNERS_CACHE_FILE,
+    ProjectMap,
+    compile_rules,
+    load_project_map,
+)
+
+RULES = """\
+# Path → owning project
+services/billing/**   bill
+services/billing/reports/  REP
+/docs                 DOC
+docs/api/openapi.yaml API
+"""
+
+
+@pytest.fixture(autouse=True)
+def forget_loaded():
+    """Start every test without mappings loaded by earlier ones."""
+    ownership._loaded.clear()
+    yield
+    ownership._loaded.clear()
+
+
+class TestCompileRules:
+    """Test compile_rules function."""
+
+    def test_trie(self):
+        """Test that rules become nested segments with upper-cased keys."""
+        trie = compile_rules(RULES)
+
+        assert trie["services"]["billing"][""] == "BILL"
+        assert trie["services"]["billing"]["reports"][""] == "REP"
+        assert trie["docs"]["api"]["openapi.yaml"][""] == "API"
+
+    @pytest.mark.parametrize(
+        "line",
+        ["services/billing", "a b c", "services/*/api X", "../outside X"],
+    )
+    def test_malformed(self, line):
+        """Test that lines without a plain path and a key are rejected."""
+        with pytest.raises(ValueError):
+            compile_rules(f"docs DOC\n{line}\n")
+
+    def test_root_rule(self):
+        """Test that a rule for the root covers every path."""
+        project_map = ProjectMap(compile_rules("** ALL\nlib LIB\n"))
+
+        assert project_map.project("README.md") == "ALL"
+        assert project_map.project("lib/x.py") == "LIB"
+
+
+class TestProjectMap:
+    """Test ProjectMap class."""
+
+    @pytest.mark.parametrize(
+        ("path", "project"),
+        [
+            ("services/billing/api.py", "BILL"),
+            ("services/billing/reports/monthly/q1.csv", "REP"),
+            ("services/billing-v2/api.py", None),
+            ("services/README.md", None),
+            ("docs/index.md", "DOC"),
+            ("docs/api/openapi.yaml", "API"),
+            ("docs/api/other.yaml", "DOC"),
+            ("docs", "DOC"),
+            ("setup.py", None),
+        ],
+    )
+    def test_most_specific_rule_wins(self, path, project):
+        """Test looking up single paths."""
+        assert ProjectMap(compile_rules(RULES)).project(path) == project
+
+    def test_projects(self):
+        """Test that projects() agrees with project() for every path."""
+        project_map = ProjectMap(compile_rules(RULES))
+        paths = [
+            "docs/api/openapi.yaml",
+            "docs/api/z.yaml",
+            "services/billing/a.py",
+            "services/billing/reports/b.py",
+            "setup.py",
+        ]
+
+        assert project_map.projects(paths) == ["API", "BILL", "DOC", "REP"]
+        assert project_map.projects(paths) == sorted(
+            {project_map.project(path) for path in paths} - {None}
+        )
+        assert project_map.projects([]) == []
+
+
+class TestLoadProjectMap:
+    """Test load_project_map function."""
+
+    def test_compiled_trie_is_cached(self, tmp_path, mocker):
+        """Test that the compiled trie is stored and reused by a new process."""
+        owners = tmp_path / "OWNERS"
+        owners.write_text(RULES)
+
+        first = load_project_map(owners, tmp_path)
+        assert (tmp_path / OWNERS_CACHE_FILE).is_file()
+        assert load_project_map(owners, tmp_path) is first
+
+        ownership._loaded.clear()
+        compile_rules = mocker.patch("pre_commit_jira_helper.ownership.compile_rules")
+        assert load_project_map(owners, tmp_path).trie == first.trie
+        compile_rules.assert_not_called()
+
+    def test_changed_file_is_recompiled(self, tmp_path):
+        """Test that editing the mapping file invalidates both caches."""
+        owners = tmp_path / "OWNERS"
+        owners.write_text(RULES)
+        load_project_map(owners, tmp_path)
+
+        owners.write_text("services/billing BILLING\n")
+        os.utime(owners, ns=(1, 1))
+
+        assert load_project_map(owners, tmp_path).project("services/billing/x") == "BILLING"
+
+    def test_corrupt_cache(self, tmp_path):
+        """Test that an unreadable cache file is ignored and replaced."""
+        owners = tmp_path / "OWNERS"
+        owners.write_text(RULES)
+        (tmp_path / OWNERS_CACHE_FILE).write_bytes(b"garbage")
+
+        assert load_project_map(owners, tmp_path).project("docs/x") == "DOC"
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing mapping file raises."""
+        with pytest.raises(OSError):
+            load_project_map(tmp_path / "OWNERS")
+
+
+def test_prepend_owning_project(tmp_path, monkeypatch):
+    """Test the hook end to end on a branch without an issue."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q", "-b", "main"], check=True)
+    (tmp_path / "OWNERS").write_text(RULES)
+    (tmp_path / "services" / "billing").mkdir(parents=True)
+    (tmp_path / "services" / "billing" / "invoice.py").write_text("x = 1\n")
+    subprocess.run(["git", "add", "services"], check=True)
+    message = tmp_path / ".git" / "COMMIT_EDITMSG"
+    message.write_text("Round totals\n")
+
+    assert main([str(message), "--owners", "OWNERS"]) == 0
+
+    assert message.read_text() == "BILL:  Round totals\n"
+    assert (tmp_path / ".git" / OWNERS_CACHE_FILE).is_file()
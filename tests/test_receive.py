@@ -0,0 +1,199 @@
+"""Tests for receive module."""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import time
+
+import pytest
+
+from pre_commit_jira_helper import receive
+from pre_commit_jira_helper.receive import (
+    PushReport,
+    RefReport,
+    RefUpdate,
+    check_push,
+    parse_ref_updates,
+)
+
+ZERO = "0" * 40
+
+
+def git(*args, cwd):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repository with main and two unreferenced branches, as seen before a push.
+
+    Returns the tip commits of the "good" and "bad" branches.
+    """
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    git("init", "-q", "-b", "main", cwd=tmp_path)
+    git("commit", "-q", "--allow-empty", "-m", "Initial commit", cwd=tmp_path)
+    tips = {}
+    for branch, messages in {
+        "good": ["ABC-1: Add form", "ABC-2: Tweak"],
+        "bad": ["ABC-3: Add list", "Fix typo", "XYZ-4: Style"],
+    }.items():
+        git("checkout", "-qb", branch, "main", cwd=tmp_path)
+        for message in messages:
+            git("commit", "-q", "--allow-empty", "-m", message, cwd=tmp_path)
+        tips[branch] = git("rev-parse", "HEAD", cwd=tmp_path)
+    git("checkout", "-q", "main", cwd=tmp_path)
+    # Pushed objects exist before any ref points at them
+    git("branch", "-qD", "good", "bad", cwd=tmp_path)
+    return tips
+
+
+class TestParseRefUpdates:
+    """Test parse_ref_updates function."""
+
+    def test_parses_lines(self):
+        """Test that every non-blank line becomes an update."""
+        updates = parse_ref_updates([f"{ZERO} {'a' * 40} refs/heads/main\n", "\n"])
+
+        assert updates == [RefUpdate(ZERO, "a" * 40, "refs/heads/main")]
+        assert not updates[0].is_deletion
+
+    def test_deletion(self):
+        """Test that a zero new value is a deletion."""
+        (update,) = parse_ref_updates([f"{'a' * 40} {ZERO} refs/heads/main"])
+
+        assert update.is_deletion
+
+    def test_malformed_line(self):
+        """Test that malformed input is rejected."""
+        with pytest.raises(ValueError, match="Malformed ref update"):
+            parse_ref_updates(["garbage"])
+
+
+class TestPushReport:
+    """Test PushReport class."""
+
+    def test_offenders_deduplicated(self):
+        """Test that a commit pushed to several refs is listed once."""
+        report = PushReport(
+            [
+                RefReport("refs/heads/a", 2, [("c1", "One"), ("c2", "Two")]),
+                RefReport("refs/heads/b", 1, [("c1", "One")]),
+            ]
+        )
+
+        assert report.offenders == [("c1", "One"), ("c2", "Two")]
+        assert not report.ok
+
+    def test_ok(self):
+        """Test that a clean report is ok unless it timed out."""
+        assert PushReport([RefReport("refs/heads/a", 3)]).ok
+        assert not PushReport([RefReport("refs/heads/a", 3)], timed_out=True).ok
+        assert not PushReport([RefReport("refs/heads/a", error="boom")]).ok
+
+
+class TestCheckPush:
+    """Test check_push function."""
+
+    def test_checks_new_commits_per_ref(self, repo):
+        """Test that only commits not reachable from existing refs are checked."""
+        updates = [
+            RefUpdate(ZERO, repo["good"], "refs/heads/good"),
+            RefUpdate(ZERO, repo["bad"], "refs/heads/bad"),
+        ]
+
+        report = check_push(updates, prefixes=["ABC"], jobs=2)
+
+        assert [(r.ref, r.commits) for r in report.refs] == [
+            ("refs/heads/good", 2),
+            ("refs/heads/bad", 3),
+        ]
+        assert [subject for _, subject in report.offenders] == ["XYZ-4: Style", "Fix typo"]
+        assert not report.timed_out
+
+    def test_ref_is_split_over_workers(self, repo, monkeypatch):
+        """Test that the commits of one ref are checked in chunks, in order."""
+        monkeypatch.setattr(receive, "_MIN_CHUNK", 1)
+        updates = [RefUpdate(ZERO, repo["bad"], "refs/heads/bad")]
+
+        report = check_push(updates, prefixes=["ABC"], jobs=3)
+
+        assert [(r.ref, r.commits) for r in report.refs] == [("refs/heads/bad", 3)]
+        assert [subject for _, subject in report.offenders] == ["XYZ-4: Style", "Fix typo"]
+
+    @pytest.mark.parametrize(
+        ("commits", "processes", "size"),
+        [(10, 8, 256), (40_000, 8, 5000), (100_000, 8, 8192), (0, 4, 256)],
+    )
+    def test_chunk_size(self, commits, processes, size):
+        """Test that pushes are split evenly within the chunk bounds."""
+        assert receive._chunk_size(commits, processes) == size
+
+    def test_deletions_skipped(self):
+        """Test that deleting refs needs no workers."""
+        report = check_push([RefUpdate("a" * 40, ZERO, "refs/heads/main")])
+
+        assert report.ok
+        assert report.refs == []
+
+    @pytest.mark.usefixtures("repo")
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_git_error_reported(self, jobs):
+        """Test that a ref git cannot walk is reported, not raised."""
+        report = check_push([RefUpdate(ZERO, "f" * 40, "refs/heads/missing")], jobs=jobs)
+
+        assert report.refs[0].error
+        assert not report.ok
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_deadline(self, repo, mocker, jobs):
+        """Test that workers still running at the deadline are abandoned."""
+        for name in ("iter_commit_messages", "iter_messages_of"):
+            mocker.patch(
+                f"pre_commit_jira_helper.receive.{name}",
+                side_effect=lambda *_, **__: time.sleep(30) or [],
+            )
+
+        start = time.monotonic()
+        updates = [RefUpdate(ZERO, repo["good"], "refs/heads/good")]
+        report = check_push(updates, jobs=jobs, timeout=0.5)
+
+        assert report.timed_out
+        assert not report.ok
+        assert time.monotonic() - start < 10
+
+    def test_only_tasks_unwind_on_sigterm(self):
+        """Test that idle workers keep the default SIGTERM action."""
+        previous = signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            with receive._terminable():
+                assert signal.getsignal(signal.SIGTERM) is receive._stop_worker
+            assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_deadline_kills_git(self, repo, tmp_path, monkeypatch, jobs):
+        """Test that the git processes of terminated workers do not outlive the check."""
+        pid_file = tmp_path / "git.pid"
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        fake_git = bin_dir / "git"
+        fake_git.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 30\n")
+        fake_git.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+
+        updates = [RefUpdate(ZERO, repo["good"], "refs/heads/good")]
+        report = check_push(updates, jobs=jobs, timeout=1.0)
+
+        assert report.timed_out
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
@@ -0,0 +1,136 @@
+"""Tests for rewrite module."""
+
+from __future__ import annotations
+
+import io
+import subprocess
+
+import pytest
+
+from pre_commit_jira_helper.cli.helper import main as helper_main
+from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+from pre_commit_jira_helper.rewrite import RewriteError, _MessageRewriter, rewrite_history
+
+
+def git(*args, cwd):
+    """Run git and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repository with a main branch and a feature branch missing issue keys."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    git("init", "-q", "-b", "main", cwd=tmp_path)
+    (tmp_path / "file.txt").write_text("base\n")
+    git("add", "file.txt", cwd=tmp_path)
+    git("commit", "-qm", "Initial commit", cwd=tmp_path)
+    git("checkout", "-qb", "feature/ABC-123-login", cwd=tmp_path)
+    for i, message in enumerate(["Add login form", "ABC-123: Validate input", "Polish"]):
+        (tmp_path / "file.txt").write_text(f"change {i}\n")
+        git("commit", "-qam", message, cwd=tmp_path)
+    return tmp_path
+
+
+class TestRewriteHistory:
+    """Test rewrite_history function."""
+
+    def test_rewrites_range(self, repo):
+        """Test that commits in the range get the branch issue, once."""
+        result = rewrite_history(["main..feature/ABC-123-login"], JiraIssuePrependHook())
+
+        assert (result.commits, result.changed) == (3, 2)
+        assert git("log", "--format=%s", "main..feature/ABC-123-login", cwd=repo).splitlines() == [
+            "ABC-123:  Polish",
+            "ABC-123: Validate input",
+            "ABC-123:  Add login form",
+        ]
+        assert git("log", "--format=%s", "main", cwd=repo) == "Initial commit"
+        assert git("status", "--porcelain", cwd=repo) == ""
+
+    def test_trees_are_preserved(self, repo):
+        """Test that only messages change, never the content."""
+        before = git("log", "--format=%T", "feature/ABC-123-login", cwd=repo)
+        rewrite_history(["main..feature/ABC-123-login"], JiraIssuePrependHook())
+
+        assert git("log", "--format=%T", "feature/ABC-123-login", cwd=repo) == before
+
+    def test_dry_run(self, repo):
+        """Test that a dry run counts without updating refs."""
+        before = git("rev-parse", "feature/ABC-123-login", cwd=repo)
+        result = rewrite_history(
+            ["main..feature/ABC-123-login"], JiraIssuePrependHook(), dry_run=True
+        )
+
+        assert result.changed == 2
+        assert git("rev-parse", "feature/ABC-123-login", cwd=repo) == before
+
+    def test_branch_override(self, repo):
+        """Test taking issues from an explicit branch name."""
+        result = rewrite_history(["main"], JiraIssuePrependHook(), branch="DEF-9")
+
+        assert result.changed == 1
+        assert git("log", "-1", "--format=%s", "main", cwd=repo) == "DEF-9:  Initial commit"
+
+    @pytest.mark.usefixtures("repo")
+    def test_git_failure(self):
+        """Test that an invalid range raises instead of touching refs."""
+        with pytest.raises(RewriteError):
+            rewrite_history(["no-such-branch"], JiraIssuePrependHook())
+
+
+class TestMessageRewriter:
+    """Test the fast-export stream rewriter."""
+
+    def test_non_commit_data_is_copied(self):
+        """Test that tag data is copied verbatim and commit data is rewritten."""
+        stream = (
+            b"commit refs/heads/ABC-1\nmark :1\ncommitter A <a@b> 0 +0000\ndata 3\nfix\n"
+            b"tag v1\nfrom :1\ntagger A <a@b> 0 +0000\ndata 4\nnote\ndone\n"
+        )
+        sink = io.BytesIO()
+        result = _MessageRewriter(JiraIssuePrependHook()).pump(io.BytesIO(stream), sink)
+
+        assert result.changed == 1
+        assert b"data 11\nABC-1:  fix" in sink.getvalue()
+        assert sink.getvalue().endswith(b"data 4\nnote\ndone\n")
+
+    def test_rejects_non_branch_refs(self):
+        """Test that commits exported under a non-ref name are refused."""
+        stream = b"commit HEAD\ndata 3\nfix\n"
+        with pytest.raises(RewriteError):
+            _MessageRewriter(JiraIssuePrependHook()).pump(io.BytesIO(stream), None)
+
+    def test_truncated_stream(self):
+        """Test that a truncated data block is detected."""
+        stream = b"commit refs/heads/ABC-1\ndata 30\nfix\n"
+        with pytest.raises(RewriteError):
+            _MessageRewriter(JiraIssuePrependHook()).pump(io.BytesIO(stream), None)
+
+
+class TestRewriteCli:
+    """Test the jira-helper rewrite subcommand."""
+
+    def test_cli(self, repo, capsys):
+        """Test the subcommand end to end with a prefix filter."""
+        exit_code = helper_main(
+            ["rewrite", "--prefixes", "abc", "--separator", " |", "main..feature/ABC-123-login"]
+        )
+
+        assert exit_code == 0
+        assert "Rewrote 2 of 3" in capsys.readouterr().out
+        assert git("log", "-1", "--format=%s", cwd=repo) == "ABC-123 | Polish"
+
+    @pytest.mark.usefixtures("repo")
+    def test_cli_error(self, capsys):
+        """Test that git errors are reported with a non-zero exit code."""
+        assert helper_main(["rewrite", "--dry-run", "missing"]) == 1
+        captured = capsys.readouterr()
+        assert "Error" in captured.err
+        assert captured.out == ""
@@ -0,0 +1,372 @@
+"""Tests for snapshot module."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pre_commit_jira_helper import snapshot, validation
+from pre_commit_jira_helper.cli.helper import main as helper_main
+from pre_commit_jira_helper.hooks.jira import JiraIssuePrependHook
+from pre_commit_jira_helper.snapshot import (
+    PROJECTS_PATH,
+    Snapshot,
+    default_snapshot_path,
+    load_snapshot,
+    sync_snapshot,
+    write_snapshot,
+)
+from pre_commit_jira_helper.validation import (
+    CLOUD_SEARCH_PATH,
+    SEARCH_PATH,
+    JiraClient,
+    JiraError,
+)
+
+
+def bitmap(*numbers):
+    """Build a bitmap with the bits of the issue numbers set."""
+    bits = bytearray()
+    for number in numbers:
+        snapshot._add(bits, number)
+    return bits
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    """Serve the project list and paged searches over the server's issues."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        self.server.requests.append(("GET", self.path, None))
+        self.reply([{"key": key} for key in self.server.projects])
+
+    def do_POST(self):  # noqa: N802
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append(("POST", self.path, body))
+        if server.status != 200:
+            self.reply({"errorMessages": ["nope"]}, server.status)
+            return
+        issues = sorted(server.issues, key=lambda key: server.issues[key][0])
+        since = re.match(r"updated >= -(\d+)m", body["jql"])
+        if since:
+            cutoff = time.time() - int(since.group(1)) * 60
+            issues = [key for key in issues if server.issues[key][1] >= cutoff]
+        cloud = self.path.endswith(CLOUD_SEARCH_PATH)
+        start = int(body.get("nextPageToken", 0)) if cloud else body["startAt"]
+        page = issues[start : start + min(body["maxResults"], server.max_results)]
+        reply = {"issues": [{"key": k} for k in page]}
+        if not cloud:
+            reply.update(startAt=start, total=len(issues))
+        elif start + len(page) < len(issues):
+            reply["nextPageToken"] = str(start + len(page))
+        self.reply(reply)
+
+    def reply(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def jira(monkeypatch, tmp_path):
+    """Local stand-in for a Jira site, with the user's cache in a temporary directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv(validation.TOKEN_ENV, raising=False)
+    monkeypatch.delenv(validation.USER_ENV, raising=False)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeJiraHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.projects = ["ABC", "DEF", "EMPTY"]
+    # Issue key -> (created, updated); all last updated two days ago
+    old = time.time() - 2 * 86400
+    server.issues = {key: (old + i, old) for i, key in enumerate(["ABC-1", "ABC-2", "DEF-7"])}
+    server.issues["ABC-20"] = (old + 3, old)
+    server.issues["DEF-9"] = (old + 4, old)
+    server.status = 200
+    server.max_results = 1000
+    server.url = f"http://127.0.0.1:{server.server_port}/jira"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    JiraClient.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+class TestSnapshot:
+    """Test writing and reading snapshot files."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        path = tmp_path / "jira.snapshot"
+        write_snapshot(
+            path,
+            {"DEF": bitmap(7, 9), "ABC": bitmap(1, 2, 20), "EMPTY": bytearray(), "Z": bitmap(100)},
+            1234.5,
+        )
+        return path
+
+    @pytest.mark.parametrize(
+        ("key", "expected"),
+        [
+            ("ABC-1", True),
+            ("ABC-20", True),
+            ("ABC-3", False),
+            ("ABC-0", False),
+            ("DEF-9", True),
+            ("DEF-8", False),
+            ("Z-100", True),
+            ("Z-96", False),
+            # Not a project at the last sync: may have been created since
+            ("XYZ-1", None),
+            # Higher than any issue at the last sync: may have been created since
+            ("ABC-21", None),
+            ("EMPTY-1", None),
+            ("ABC", None),
+            ("ABC-x", None),
+            ("ÄBC-1", None),
+        ],
+    )
+    def test_lookup(self, path, key, expected):
+        """Test membership checks on a written snapshot."""
+        assert Snapshot(path).lookup(key) is expected
+
+    def test_round_trip(self, path):
+        """Test that the header, projects and bitmaps survive a round trip."""
+        view = Snapshot(path)
+
+        assert view.synced_at == 1234.5
+        assert view.projects() == ["ABC", "DEF", "EMPTY", "Z"]
+        bitmaps = view.bitmaps()
+        assert bitmaps["ABC"] == bitmap(1, 2, 20)
+        assert bitmaps["Z"] == bitmap(100)
+        assert bitmaps["EMPTY"] == bytearray()
+
+    def test_sparse_project_is_trimmed(self, tmp_path):
+        """Test that bytes below the first issue are not stored."""
+        small, large = tmp_path / "small", tmp_path / "large"
+        write_snapshot(small, {"A": bitmap(1)}, 0)
+        write_snapshot(large, {"A": bitmap(800_001)}, 0)
+
+        assert large.stat().st_size == small.stat().st_size
+
+    @pytest.mark.parametrize("content", [b"", b"not a snapshot file at all", b"JHSNAP"])
+    def test_not_a_snapshot(self, tmp_path, content):
+        """Test that other files are rejected."""
+        path = tmp_path / "jira.snapshot"
+        path.write_bytes(content)
+
+        with pytest.raises(ValueError, match="Not a snapshot"):
+            Snapshot(path)
+
+    def test_truncated(self, path):
+        """Test that a truncated project table is rejected."""
+        path.write_bytes(path.read_bytes()[:40])
+
+        with pytest.raises(ValueError, match="Truncated"):
+            Snapshot(path)
+
+    def test_bitmap_past_end(self, path):
+        """Test that a bitmap cut off by corruption answers None."""
+        data = path.read_bytes()
+        path.write_bytes(data[:-1])
+
+        assert Snapshot(path).lookup("Z-100") is None
+
+    def test_load_reuses_mapping(self, path):
+        """Test that a snapshot is mapped again only after it is replaced."""
+        first = load_snapshot(path)
+        assert load_snapshot(path) is first
+
+        write_snapshot(path, {"ABC": bitmap(5)}, 2.0)
+        os.utime(path, ns=(1, 1))
+        second = load_snapshot(path)
+
+        assert second is not first
+        assert second.lookup("ABC-5") is True
+
+    def test_load_missing(self, tmp_path):
+        """Test that a missing snapshot raises."""
+        with pytest.raises(FileNotFoundError):
+            load_snapshot(tmp_path / "missing.snapshot")
+
+    def test_default_path(self, monkeypatch, tmp_path):
+        """Test that the default snapshot is named after the site."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        assert default_snapshot_path("https://example.atlassian.net/jira/") == (
+            tmp_path / "pre-commit-jira-helper" / "example.atlassian.net_jira.snapshot"
+        )
+
+
+class TestSyncSnapshot:
+    """Test sync_snapshot against a local Jira stand-in."""
+
+    def test_full_sync(self, jira, tmp_path):
+        """Test that the first sync pages through every issue."""
+        jira.max_results = 2
+        path = tmp_path / "jira.snapshot"
+
+        assert sync_snapshot(jira.url, path, page_size=100) == (3, 5)
+
+        view = Snapshot(path)
+        assert view.projects() == ["ABC", "DEF", "EMPTY"]
+        assert [view.lookup(key) for key in ("ABC-2", "ABC-3", "DEF-9", "XYZ-1")] == [
+            True,
+            False,
+            True,
+            None,
+        ]
+        assert jira.requests[0][:2] == ("GET", "/jira" + PROJECTS_PATH)
+        searches = [body for method, _, body in jira.requests if method == "POST"]
+        assert [body["startAt"] for body in searches] == [0, 2, 4]
+        assert searches[0]["jql"] == 'project in ("ABC", "DEF", "EMPTY") ORDER BY created ASC'
+        assert jira.requests[1][1] == "/jira" + SEARCH_PATH
+
+    def test_cloud_sync(self, jira, tmp_path, mocker):
+        """Test that Jira Cloud is paged through with the token of each page."""
+        # Take the local stand-in for a Jira Cloud site
+        mocker.patch("pre_commit_jira_helper.validation.CLOUD_DOMAIN", ".0.0.1")
+        jira.max_results = 2
+        path = tmp_path / "jira.snapshot"
+
+        assert sync_snapshot(jira.url, path, page_size=100) == (3, 5)
+
+        searches = [(path, body) for method, path, body in jira.requests if method == "POST"]
+        assert {path for path, _ in searches} == {"/jira" + CLOUD_SEARCH_PATH}
+        assert [body.get("nextPageToken") for _, body in searches] == [None, "2", "4"]
+        assert Snapshot(path).lookup("DEF-9") is True
+
+    def test_incremental_sync(self, jira, tmp_path):
+        """Test that later syncs only read issues updated since, keeping the others."""
+        path = tmp_path / "jira.snapshot"
+        sync_snapshot(jira.url, path)
+        jira.requests.clear()
+        jira.issues["ABC-21"] = (time.time(), time.time())
+
+        assert sync_snapshot(jira.url, path) == (3, 1)
+
+        (search,) = [body for method, _, body in jira.requests if method == "POST"]
+        assert search["jql"] == "updated >= -11m ORDER BY created ASC"
+        view = Snapshot(path)
+        assert view.lookup("ABC-21") is True
+        assert view.lookup("ABC-1") is True
+
+    def test_full_sync_drops_deleted_issues(self, jira, tmp_path):
+        """Test that --full rebuilds the snapshot."""
+        path = tmp_path / "jira.snapshot"
+        sync_snapshot(jira.url, path)
+        del jira.issues["ABC-2"]
+        jira.projects.remove("EMPTY")
+
+        sync_snapshot(jira.url, path)
+        assert Snapshot(path).lookup("ABC-2") is True
+
+        assert sync_snapshot(jira.url, path, full=True) == (2, 4)
+        view = Snapshot(path)
+        assert view.lookup("ABC-2") is False
+        assert view.projects() == ["ABC", "DEF"]
+
+    def test_error_keeps_snapshot(self, jira, tmp_path):
+        """Test that a failed sync leaves the previous snapshot in place."""
+        path = tmp_path / "jira.snapshot"
+        sync_snapshot(jira.url, path)
+        before = path.read_bytes()
+        jira.status = 500
+
+        with pytest.raises(JiraError, match="500"):
+            sync_snapshot(jira.url, path, full=True)
+        assert path.read_bytes() == before
+        assert [p.name for p in tmp_path.iterdir()] == ["jira.snapshot"]
+
+    @pytest.mark.parametrize(
+        ("projects", "issue", "message"),
+        [
+            ([1], "ABC-1", "Unexpected project list"),
+            (["abc"], "ABC-1", "Unexpected project list"),
+            (["ABC"], "ABC-x", "Unexpected search results"),
+        ],
+    )
+    def test_unexpected_response(self, jira, tmp_path, projects, issue, message):
+        """Test that malformed responses raise JiraError."""
+        jira.projects = projects
+        jira.issues = {issue: (0, 0)}
+
+        with pytest.raises(JiraError, match=message):
+            sync_snapshot(jira.url, tmp_path / "jira.snapshot")
+
+
+class TestSyncCommand:
+    """Test the jira-helper sync command."""
+
+    def test_sync_default_path(self, jira, capsys):
+        """Test that the snapshot is written to the site's default location."""
+        assert helper_main(["sync", jira.url]) == 0
+
+        path = default_snapshot_path(jira.url)
+        assert Snapshot(path).lookup("DEF-7") is True
+        assert capsys.readouterr().err == f"{path}: 3 projects, 5 issues read\n"
+
+    def test_sync_failure(self, jira, tmp_path, capsys):
+        """Test that errors are reported with exit code 1."""
+        jira.status = 401
+
+        assert helper_main(["sync", "-o", str(tmp_path / "s"), "--full", jira.url]) == 1
+        assert "Jira rejected the credentials (401)" in capsys.readouterr().err
+
+
+class TestHookWithSnapshot:
+    """Test checking branch issues against a snapshot in JiraIssuePrependHook."""
+
+    def make_hook(self, mocker, branch, **kwargs):
+        hook = JiraIssuePrependHook(**kwargs)
+        mocker.patch.object(hook.git, "get_current_branch", return_value=branch)
+        mocker.patch.object(hook, "read_commit_message", return_value="Fix rounding")
+        return hook
+
+    def test_snapshot_without_network(self, tmp_path, mocker):
+        """Test that a snapshot alone drops missing issues and keeps unknown ones."""
+        path = tmp_path / "jira.snapshot"
+        write_snapshot(path, {"ABC": bitmap(1, 5)}, 0)
+        find_missing = mocker.patch("pre_commit_jira_helper.validation.IssueValidator.find_missing")
+        hook = self.make_hook(mocker, "feature/ABC-1-ABC-2-ABC-9-XYZ-1", snapshot_file=path)
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["ABC-1", "ABC-9", "XYZ-1"]
+        find_missing.assert_not_called()
+
+    def test_unknown_issues_are_asked(self, jira, mocker):
+        """Test that only issues the default snapshot cannot answer go to Jira."""
+        sync_snapshot(jira.url)
+        find_missing = mocker.patch(
+            "pre_commit_jira_helper.validation.IssueValidator.find_missing", return_value=[]
+        )
+        hook = self.make_hook(mocker, "feature/ABC-1-ABC-3-ABC-99-XYZ-1", jira_url=jira.url)
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert hook.new_issues == ["ABC-1", "ABC-99", "XYZ-1"]
+        find_missing.assert_called_once_with(["ABC-99", "XYZ-1"])
+
+    def test_unreadable_snapshot(self, tmp_path, mocker):
+        """Test that an unreadable snapshot is reported and ignored."""
+        path = tmp_path / "jira.snapshot"
+        path.write_bytes(b"garbage")
+        warning = mocker.patch("pre_commit_jira_helper.hooks.jira.logger.warning")
+        hook = self.make_hook(mocker, "feature/ABC-1", snapshot_file=path)
+
+        assert hook.should_run("/tmp/commit_msg") is True
+        assert "Cannot read the Jira snapshot" in warning.call_args.args[0]
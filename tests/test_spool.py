@@ -0,0 +1,425 @@
+"""Tests for spool module."""
+
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pre_commit_jira_helper import spool as spool_module
+from pre_commit_jira_helper import validation
+from pre_commit_jira_helper.cli.helper import main as helper_main
+from pre_commit_jira_helper.cli.post_commit import main as post_commit_main
+from pre_commit_jira_helper.spool import (
+    COMMENT_PROPERTY,
+    FLUSH_LOCK_FILE,
+    Spool,
+    default_spool_dir,
+    flush_spool,
+    record_id,
+    start_flusher,
+)
+from pre_commit_jira_helper.validation import JiraClient, JiraError
+
+_COMMENTS = re.compile(r"/jira/rest/api/2/issue/([^/]+)/comment")
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    """Store and list issue comments, failing as the server is told to."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        issue = _COMMENTS.match(self.path).group(1)
+        self.server.requests.append(("GET", issue))
+        self.reply(200, {"comments": self.server.comments.get(issue, [])})
+
+    def do_POST(self):  # noqa: N802
+        server = self.server
+        server.authorization = self.headers.get("Authorization")
+        issue = _COMMENTS.match(self.path).group(1)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append(("POST", issue))
+        failure = server.failures.pop(0) if server.failures else None
+        if isinstance(failure, int):
+            self.reply(failure, {"errorMessages": ["nope"]})
+            return
+        server.comments.setdefault(issue, []).append(body)
+        if failure == "lost":
+            # The comment is created but the response never arrives
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self.reply(201, {"id": str(len(server.comments[issue]))})
+
+    def reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def jira(monkeypatch):
+    """Local stand-in for a Jira site."""
+    monkeypatch.delenv(validation.TOKEN_ENV, raising=False)
+    monkeypatch.delenv(validation.USER_ENV, raising=False)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeJiraHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.comments = {}
+    server.failures = []
+    server.authorization = None
+    server.url = f"http://127.0.0.1:{server.server_port}/jira"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    JiraClient.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def spool(tmp_path):
+    """Spool in a temporary directory."""
+    return Spool(tmp_path / "spool")
+
+
+def make_record(site, issue="ABC-1", commit="a" * 40):
+    return {
+        "id": record_id(site, issue, commit),
+        "site": site,
+        "issue": issue,
+        "commit": commit,
+        "repository": "shop",
+        "subject": "ABC-1: Round totals",
+        "created": 0,
+    }
+
+
+class TestSpool:
+    """Test the spool files."""
+
+    def test_append_and_pending(self, spool):
+        """Test that appended records are pending once each, in order."""
+        first, second = make_record("s", "ABC-1"), make_record("s", "ABC-2")
+        spool.append([first, second])
+        spool.append([first])
+
+        assert spool.pending() == [first, second]
+
+    def test_torn_line_is_skipped(self, spool):
+        """Test that a record torn by a crash does not corrupt the next one."""
+        spool.append([make_record("s", "ABC-1")])
+        with spool.records_path.open("a") as f:
+            f.write('{"id": "torn", "si')
+        spool.append([make_record("s", "ABC-2")])
+
+        assert [record["issue"] for record in spool.pending()] == ["ABC-1", "ABC-2"]
+
+    def test_state_and_compaction(self, spool):
+        """Test that progress is applied to records and folded in by compaction."""
+        first, second = make_record("s", "ABC-1"), make_record("s", "ABC-2")
+        spool.append([first, second])
+        spool.update([{"id": first["id"], "done": "delivered"}])
+        spool.update([{"id": second["id"], "attempts": 2, "retry_at": 5.0}])
+
+        assert spool.compact() == 1
+        assert not spool.state_path.exists()
+        (line,) = spool.records_path.read_text().splitlines()
+        assert json.loads(line) == {**second, "attempts": 2, "retry_at": 5.0}
+
+    def test_concurrent_appends(self, spool):
+        """Test that appends from many threads are all kept."""
+
+        def append(thread):
+            for i in range(20):
+                spool.append([make_record("s", f"T{thread}-{i}")])
+
+        threads = [threading.Thread(target=append, args=(n,)) for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(spool.pending()) == 100
+
+    def test_default_dir(self, monkeypatch, tmp_path):
+        """Test that the spool lives in the user's cache directory."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        assert default_spool_dir() == tmp_path / "pre-commit-jira-helper" / "spool"
+
+
+class TestFlushSpool:
+    """Test flush_spool against a local Jira stand-in."""
+
+    def test_delivers_and_compacts(self, jira, spool):
+        """Test that comments are posted with their idempotency key."""
+        record = make_record(jira.url)
+        spool.append([record, make_record(jira.url, "DEF-2")])
+
+        assert flush_spool(spool) == (2, 0, 0)
+
+        (comment,) = jira.comments["ABC-1"]
+        assert comment["body"] == "Commit {{aaaaaaaaaaaa}} in shop: ABC-1: Round totals"
+        assert comment["properties"] == [{"key": COMMENT_PROPERTY, "value": {"id": record["id"]}}]
+        assert spool.records_path.read_bytes() == b""
+        assert flush_spool(spool) == (0, 0, 0)
+        assert len(jira.requests) == 2
+
+    def test_credentials(self, jira, spool, monkeypatch):
+        """Test that comments are posted with the credentials given to the flusher."""
+        monkeypatch.setenv(validation.TOKEN_ENV, "ignored")
+        spool.append([make_record(jira.url)])
+
+        assert flush_spool(spool, token="t0k") == (1, 0, 0)
+        assert jira.authorization == "Bearer t0k"
+
+    def test_transient_failure_is_retried(self, jira, spool, mocker):
+        """Test that unavailable Jira is retried after a backoff."""
+        mocker.patch.object(spool_module, "backoff", return_value=0.05)
+        spool.append([make_record(jira.url)])
+        jira.failures = [503]
+
+        assert flush_spool(spool) == (0, 0, 1)
+        (record,) = spool.pending()
+        assert record["attempts"] == 1
+        assert record["retry_at"] > 0
+
+        assert flush_spool(spool, linger=5) == (1, 0, 0)
+        assert len(jira.comments["ABC-1"]) == 1
+
+    def test_lost_response_is_not_posted_twice(self, jira, spool, mocker):
+        """Test that a retry finds the comment created by the attempt that failed."""
+        mocker.patch.object(spool_module, "backoff", return_value=0)
+        spool.append([make_record(jira.url)])
+        jira.failures = ["lost"]
+
+        assert flush_spool(spool, linger=5) == (1, 0, 0)
+
+        assert len(jira.comments["ABC-1"]) == 1
+        assert jira.requests == [("POST", "ABC-1"), ("GET", "ABC-1")]
+
+    def test_interrupted_flush_is_not_posted_twice(self, jira, spool):
+        """Test that records of a batch cut short are checked before posting."""
+        record = make_record(jira.url)
+        spool.append([record])
+        # A flusher counted the attempt, posted the comment and died
+        spool.update([{"id": record["id"], "attempts": 1}])
+        jira.comments["ABC-1"] = [
+            {"body": "x", "properties": [{"key": COMMENT_PROPERTY, "value": {"id": record["id"]}}]}
+        ]
+
+        assert flush_spool(spool) == (1, 0, 0)
+        assert jira.requests == [("GET", "ABC-1")]
+
+    def test_rejected_comment_is_dropped(self, jira, spool, mocker):
+        """Test that comments Jira refuses are dropped with a warning."""
+        warning = mocker.patch("pre_commit_jira_helper.spool.logger.warning")
+        spool.append([make_record(jira.url)])
+        jira.failures = [404]
+
+        assert flush_spool(spool) == (0, 1, 0)
+        assert "Dropping the comment for aaaaaaaaaaaa on ABC-1" in warning.call_args.args[0]
+
+    def test_gives_up_after_max_attempts(self, jira, spool, mocker):
+        """Test that a record failing every attempt is eventually dropped."""
+        mocker.patch.object(spool_module, "backoff", return_value=0)
+        mocker.patch("pre_commit_jira_helper.spool.logger.warning")
+        spool.append([make_record(jira.url)])
+        jira.failures = [502, 502, 502]
+
+        assert flush_spool(spool, max_attempts=3, linger=5) == (0, 1, 0)
+        assert len(jira.requests) == 5
+
+    def test_rejected_credentials_keep_records(self, jira, spool):
+        """Test that bad credentials stop the flush without losing records."""
+        spool.append([make_record(jira.url)])
+        jira.failures = [401]
+
+        with pytest.raises(JiraError, match="401"):
+            flush_spool(spool)
+        assert len(spool.pending()) == 1
+        assert not spool.is_flushing()
+
+    def test_unreachable_site(self, spool):
+        """Test that a site that cannot be reached is retried later."""
+        spool.append([make_record("http://127.0.0.1:9")])
+
+        assert flush_spool(spool, timeout=1) == (0, 0, 1)
+
+    def test_malformed_record_is_dropped(self, spool, mocker):
+        """Test that records missing fields are dropped."""
+        mocker.patch("pre_commit_jira_helper.spool.logger.warning")
+        spool.append([{"id": "x", "issue": "ABC-1"}])
+
+        assert flush_spool(spool) == (0, 1, 0)
+
+    def test_one_flusher_at_a_time(self, spool):
+        """Test that a second flusher returns at once."""
+        spool.append([make_record("s")])
+        lock = spool._acquire(FLUSH_LOCK_FILE)
+        try:
+            assert spool.is_flushing()
+            assert flush_spool(spool) is None
+        finally:
+            spool_module.os.close(lock)
+        assert not spool.is_flushing()
+
+
+class TestStartFlusher:
+    """Test start_flusher."""
+
+    def test_daemon_flushes(self, spool, mocker, monkeypatch):
+        """Test that a running daemon is asked first, with this process's credentials."""
+        monkeypatch.setenv(validation.TOKEN_ENV, "t0k")
+        monkeypatch.delenv(validation.USER_ENV, raising=False)
+        send = mocker.patch(
+            "pre_commit_jira_helper.cli.client.send_request", return_value={"flushing": True}
+        )
+        popen = mocker.patch("subprocess.Popen")
+
+        assert start_flusher(spool, "sock") == "daemon"
+        send.assert_called_once_with(
+            {"command": "flush", "spool": str(spool.directory), "user": None, "token": "t0k"},
+            "sock",
+            timeout=0.5,
+        )
+        popen.assert_not_called()
+
+    def test_detached_process(self, spool, mocker):
+        """Test that a detached flush is started without a daemon."""
+        mocker.patch("pre_commit_jira_helper.cli.client.send_request", return_value=None)
+        popen = mocker.patch("subprocess.Popen")
+
+        assert start_flusher(spool) == "process"
+        command = popen.call_args.args[0]
+        assert command[:4] == [sys.executable, "-m", "pre_commit_jira_helper.cli.helper", "flush"]
+        assert popen.call_args.kwargs["start_new_session"] is True
+
+    def test_already_flushing(self, spool, mocker):
+        """Test that nothing is started while a flusher runs."""
+        mocker.patch("pre_commit_jira_helper.cli.client.send_request", return_value=None)
+        popen = mocker.patch("subprocess.Popen")
+        lock = spool._acquire(FLUSH_LOCK_FILE)
+        try:
+            assert start_flusher(spool) is None
+        finally:
+            spool_module.os.close(lock)
+        popen.assert_not_called()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repository with one commit mentioning two issues."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    path = tmp_path / "shop"
+    path.mkdir()
+    monkeypatch.chdir(path)
+    subprocess.run(["git", "init", "-q", "-b", "main"], check=True)
+    subprocess.run(
+        ["git", "commit", "-q", "--allow-empty", "-m", "ABC-1, DEF-2: Round totals\n\nABC-1"],
+        check=True,
+    )
+    return path
+
+
+class TestCommands:
+    """Test spool-jira-comment and jira-helper flush."""
+
+    @pytest.mark.usefixtures("repo")
+    def test_post_commit_spools_comments(self, jira, tmp_path, mocker):
+        """Test that the post-commit hook spools one record per issue and starts a flush."""
+        start = mocker.patch("pre_commit_jira_helper.spool.start_flusher")
+        spool_dir = tmp_path / "spool"
+
+        assert post_commit_main(["--jira-url", jira.url + "/", "--spool", str(spool_dir)]) == 0
+
+        records = Spool(spool_dir).pending()
+        assert [record["issue"] for record in records] == ["ABC-1", "DEF-2"]
+        assert records[0]["site"] == jira.url
+        assert records[0]["repository"] == "shop"
+        assert records[0]["subject"] == "ABC-1, DEF-2: Round totals"
+        start.assert_called_once()
+        assert jira.requests == []
+
+        assert helper_main(["flush", "--spool", str(spool_dir)]) == 0
+        assert sorted(jira.comments) == ["ABC-1", "DEF-2"]
+
+    @pytest.mark.usefixtures("repo")
+    def test_post_commit_reads_head_in_process(self, tmp_path, mocker):
+        """Test that only the newest commit is read, without running git log."""
+        mocker.patch("pre_commit_jira_helper.spool.start_flusher")
+        stream = mocker.patch("pre_commit_jira_helper.history.stream_command")
+        subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "GHI-3: Next"], check=True)
+        spool_dir = tmp_path / "spool"
+
+        assert post_commit_main(["--jira-url", "https://x", "--spool", str(spool_dir)]) == 0
+        assert [record["issue"] for record in Spool(spool_dir).pending()] == ["GHI-3"]
+        stream.assert_not_called()
+
+    @pytest.mark.usefixtures("repo")
+    def test_post_commit_without_issues(self, tmp_path, mocker):
+        """Test that nothing is spooled for issues outside the allowed prefixes."""
+        start = mocker.patch("pre_commit_jira_helper.spool.start_flusher")
+        spool_dir = tmp_path / "spool"
+
+        argv = ["--jira-url", "https://x", "--spool", str(spool_dir), "--prefixes", "XYZ"]
+        assert post_commit_main(argv) == 0
+        assert not spool_dir.exists()
+        start.assert_not_called()
+
+    @pytest.mark.usefixtures("repo")
+    def test_post_commit_no_flush(self, tmp_path, mocker):
+        """Test that --no-flush only spools."""
+        start = mocker.patch("pre_commit_jira_helper.spool.start_flusher")
+
+        argv = ["--jira-url", "https://x", "--spool", str(tmp_path / "spool"), "--no-flush"]
+        assert post_commit_main(argv) == 0
+        start.assert_not_called()
+
+    def test_post_commit_outside_repository(self, tmp_path, monkeypatch, capsys):
+        """Test that a missing commit is reported."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path))
+
+        assert post_commit_main(["--jira-url", "https://x"]) == 1
+        assert "Cannot read the new commit" in capsys.readouterr().err
+
+    def test_flush_summary(self, jira, spool, capsys):
+        """Test that the flush command reports what it did."""
+        spool.append([make_record(jira.url)])
+
+        assert helper_main(["flush", "--spool", str(spool.directory)]) == 0
+        assert capsys.readouterr().err == "1 delivered, 0 dropped, 0 pending\n"
+
+    def test_flush_failure(self, jira, spool, capsys):
+        """Test that rejected credentials fail the flush command."""
+        spool.append([make_record(jira.url)])
+        jira.failures = [403]
+
+        assert helper_main(["flush", "--spool", str(spool.directory)]) == 1
+        assert "rejected the credentials" in capsys.readouterr().err
+
+    def test_flush_already_running(self, spool, capsys):
+        """Test that a second flush command exits quietly."""
+        lock = spool._acquire(FLUSH_LOCK_FILE)
+        try:
+            assert helper_main(["flush", "--spool", str(spool.directory)]) == 0
+        finally:
+            spool_module.os.close(lock)
+        assert capsys.readouterr().err == "Another flush is running\n"
@@ -0,0 +1,154 @@
+"""Tests for trace module."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from pre_commit_jira_helper import trace
+from pre_commit_jira_helper.base import BaseHook
+from pre_commit_jira_helper.cli.helper import main as helper_main
+
+
+class NoopHook(BaseHook):
+    """Hook that always runs and succeeds."""
+
+    def should_run(self, **_kwargs):
+        return True
+
+    def process(self, **_kwargs):
+        with trace.span("custom", detail="x"):
+            return True
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Enable tracing to a temporary file and disable it afterwards."""
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(trace, "_startup_recorded", False)
+    trace.enable_tracing(str(path))
+    yield path
+    trace.enable_tracing(None)
+
+
+def read_records(path):
+    """Parse a trace file."""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestTrace:
+    """Test span recording and flushing."""
+
+    def test_disabled_span_is_shared_noop(self):
+        """Test that disabled tracing allocates nothing per span."""
+        trace.enable_tracing(None)
+
+        assert not trace.is_enabled()
+        assert trace.span("a") is trace.span("b", attr=1)
+        with trace.span("a"):
+            pass
+        trace.flush("run")
+
+    def test_hook_run_is_traced(self, trace_file):
+        """Test that a hook run writes one line per phase with a shared run id."""
+        assert NoopHook().run() == 0
+
+        records = read_records(trace_file)
+        phases = [r["phase"] for r in records]
+        assert phases[0] == "startup"
+        assert set(phases) == {"startup", "should_run", "custom", "process"}
+        assert len({r["run"] for r in records}) == 1
+        assert all(r["name"] == "NoopHook" for r in records)
+        assert next(r for r in records if r["phase"] == "custom")["detail"] == "x"
+
+    def test_startup_recorded_once_per_process(self, trace_file):
+        """Test that only the first run of a process has a startup phase."""
+        NoopHook().run()
+        NoopHook().run()
+
+        phases = [r["phase"] for r in read_records(trace_file)]
+        assert phases.count("startup") == 1
+        assert phases.count("process") == 2
+
+    def test_startup_falls_back_to_import_time(self, trace_file, mocker):
+        """Test the startup phase where /proc is not available."""
+        mocker.patch("pre_commit_jira_helper.trace._process_age_ns", return_value=None)
+        NoopHook().run()
+
+        startup = read_records(trace_file)[0]
+        assert startup["phase"] == "startup"
+        assert startup["source"] == "import"
+
+    def test_run_command_is_traced(self, trace_file):
+        """Test that subprocesses are recorded with their command."""
+        from pre_commit_jira_helper.utils import run_command
+
+        run_command(["git", "--version"])
+        trace.flush("test")
+
+        record = read_records(trace_file)[0]
+        assert record["phase"] == "run_command"
+        assert record["command"] == "git --version"
+
+    def test_unwritable_trace_file_is_ignored(self, tmp_path):
+        """Test that tracing never fails a hook run."""
+        trace.enable_tracing(str(tmp_path / "missing" / "trace.jsonl"))
+        try:
+            assert NoopHook().run() == 0
+        finally:
+            trace.enable_tracing(None)
+
+
+class TestSummarize:
+    """Test trace summaries."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+        assert trace.percentile(values, 0.50) == 50.0
+        assert trace.percentile(values, 0.95) == 95.0
+        assert trace.percentile(values, 0.99) == 99.0
+        assert trace.percentile([7.0], 0.99) == 7.0
+
+    def test_summarize_skips_bad_lines(self):
+        """Test that malformed lines are ignored."""
+        lines = [
+            '{"phase": "read", "duration_ms": 1.0}\n',
+            "not json\n",
+            "\n",
+            '{"phase": "read", "duration_ms": 3.0}\n',
+            '{"duration_ms": 3.0}\n',
+        ]
+        summary = trace.summarize(lines)
+
+        assert summary == {"read": {"count": 2, "p50": 1.0, "p95": 3.0, "p99": 3.0, "max": 3.0}}
+
+
+class TestAnalyzeCli:
+    """Test the jira-helper analyze subcommand."""
+
+    def test_table(self, tmp_path, capsys):
+        """Test the default table output."""
+        path = tmp_path / "t.jsonl"
+        path.write_text('{"phase": "extract", "duration_ms": 0.5}\n')
+
+        assert helper_main(["analyze", str(path)]) == 0
+        assert "extract" in capsys.readouterr().out
+
+    def test_json(self, tmp_path, capsys):
+        """Test JSON output."""
+        path = tmp_path / "t.jsonl"
+        path.write_text('{"phase": "read", "duration_ms": 2}\n')
+
+        assert helper_main(["analyze", "--json", str(path)]) == 0
+        assert json.loads(capsys.readouterr().out)["read"]["count"] == 1
+
+    def test_empty_and_missing(self, tmp_path, capsys):
+        """Test empty input and unreadable files."""
+        path = tmp_path / "empty.jsonl"
+        path.write_text("")
+
+        assert helper_main(["analyze", str(path)]) == 1
+        assert helper_main(["analyze", str(tmp_path / "missing.jsonl")]) == 1
+        assert "Error" in capsys.readouterr().err
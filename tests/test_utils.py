@@ -2,10 +2,46 @@
 
 from __future__ import annotations
 
+import asyncio
 import subprocess
+import sys
+import time
+from pathlib import Path
 from unittest.mock import Mock
 
-from pre_commit_jira_helper.utils import run_command
+import pytest
+
+from pre_commit_jira_helper.utils import (
+    CommandError,
+    run_command,
+    run_command_async,
+    stream_command,
+)
+
+
+def python(script):
+    """Command running a Python script."""
+    return [sys.executable, "-c", script]
+
+
+needs_proc = pytest.mark.skipif(
+    not Path("/proc/self/stat").exists(), reason="process states are read from /proc"
+)
+
+
+def has_exited(pid, wait=5.0):
+    """Wait for a process to exit (or become a zombie) and report whether it did."""
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            stat = Path(f"/proc/{pid}/stat").read_text()
+        except OSError:
+            return True
+        if stat.rpartition(")")[2].split()[0] == "Z":
+            return True
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
 
 
 class TestRunCommand:
@@ -111,3 +147,125 @@ class TestRunCommand:
 
         assert stdout == "output with spaces"
         assert stderr == "error with spaces"
+
+
+class TestRunCommandAsync:
+    """Test the run_command_async function."""
+
+    def test_successful_command(self):
+        """Test that output is decoded and stripped like run_command's."""
+        result = asyncio.run(
+            run_command_async([sys.executable, "-c", "print('  out  ')"], timeout=30)
+        )
+
+        assert result == (True, "out", "")
+
+    def test_failed_command(self):
+        """Test that a non-zero exit is reported with stderr."""
+        script = "import sys; sys.stderr.write('bad\\n'); sys.exit(3)"
+
+        result = asyncio.run(run_command_async([sys.executable, "-c", script]))
+
+        assert result == (False, "", "bad")
+
+    def test_timeout_kills_command(self):
+        """Test that a command running past the timeout is killed."""
+        start = time.monotonic()
+
+        result = asyncio.run(
+            run_command_async([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.2)
+        )
+
+        assert result == (False, "", "Command timed out")
+        assert time.monotonic() - start < 10
+
+    def test_os_error(self):
+        """Test that a missing executable is reported as a failure."""
+        success, stdout, stderr = asyncio.run(run_command_async(["no-such-command-xyz"]))
+
+        assert (success, stdout) == (False, "")
+        assert stderr
+
+    def test_concurrent(self):
+        """Test that gathered commands run at the same time."""
+
+        async def sleep_twice():
+            command = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+            return await asyncio.gather(run_command_async(command), run_command_async(command))
+
+        start = time.monotonic()
+        results = asyncio.run(sleep_twice())
+
+        assert results == [(True, "", "")] * 2
+        assert time.monotonic() - start < 0.95
+
+
+class TestStreamCommand:
+    """Test the stream_command function."""
+
+    def test_lines(self):
+        """Test that lines are yielded without separators, including a trailing one."""
+        records = list(stream_command(python("print('a'); print(''); print('b', end='')")))
+
+        assert records == ["a", "", "b"]
+
+    def test_nul_records_as_bytes(self, tmp_path):
+        """Test NUL-separated records split across reads, without decoding."""
+        script = "import sys; sys.stdout.buffer.write(b'x' * 100000 + b'\\0\\n y\\0')"
+
+        records = list(stream_command(python(script), separator="\0", encoding=None, cwd=tmp_path))
+
+        assert records == [b"x" * 100000, b"\n y"]
+
+    def test_separator_must_be_one_character(self):
+        """Test that multi-character separators are rejected."""
+        with pytest.raises(ValueError, match="single character"):
+            next(stream_command(["true"], separator="\r\n"))
+
+    def test_failure(self):
+        """Test that a non-zero exit raises with the exit code and stderr."""
+        script = "import sys; print('out'); sys.stderr.write('bad\\n' * 20000); sys.exit(3)"
+
+        records = []
+        with pytest.raises(CommandError, match="bad") as excinfo:
+            records.extend(stream_command(python(script)))
+
+        assert records == ["out"]
+        assert excinfo.value.returncode == 3
+        assert len(excinfo.value.stderr) < 70000
+
+    def test_missing_executable(self):
+        """Test that a command that cannot start raises."""
+        with pytest.raises(CommandError):
+            list(stream_command(["no-such-command-xyz"]))
+
+    def test_max_bytes(self):
+        """Test that output beyond the cap stops the command."""
+        script = "import sys\nwhile True: sys.stdout.write('line\\n' * 1000)"
+
+        with pytest.raises(CommandError, match="exceeds 100000 bytes"):
+            for _ in stream_command(python(script), max_bytes=100_000):
+                pass
+
+    @needs_proc
+    def test_timeout_kills_process_group(self):
+        """Test that a timeout kills the children of the command too."""
+        command = ["sh", "-c", "sleep 30 & echo $!; wait"]
+
+        pids = []
+        start = time.monotonic()
+        with pytest.raises(CommandError, match="timed out"):
+            pids.extend(stream_command(command, timeout=0.5))
+
+        assert time.monotonic() - start < 10
+        assert has_exited(int(pids[0]))
+
+    @needs_proc
+    def test_close_kills_process_group(self):
+        """Test that closing the generator early kills the command and its children."""
+        records = stream_command(["sh", "-c", "sleep 30 & echo $!; yes"])
+        pid = int(next(records))
+
+        records.close()
+
+        assert has_exited(pid)
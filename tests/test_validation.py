@@ -0,0 +1,298 @@
+"""Tests for validation module."""
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pre_commit_jira_helper import validation
+from pre_commit_jira_helper.validation import (
+    CLOUD_SEARCH_PATH,
+    SEARCH_PATH,
+    IssueCache,
+    IssueValidator,
+    JiraClient,
+    JiraError,
+)
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    """Answer JQL key searches from the server's set of existing issues."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append(
+            {
+                "path": self.path,
+                "client": self.client_address,
+                "authorization": self.headers.get("Authorization"),
+                "keys": re.findall(r"[A-Z][A-Z0-9_]*-\d+", body["jql"]),
+            }
+        )
+        time.sleep(server.delay)
+        keys = server.requests[-1]["keys"]
+        status = server.status
+        if status != 200:
+            payload = {"errorMessages": ["nope"]}
+        elif self.path.endswith(CLOUD_SEARCH_PATH):
+            # Jira Cloud fails queries naming issues that do not exist
+            absent = [key for key in keys if key not in server.existing]
+            start = int(body.get("nextPageToken", 0))
+            page = keys[start : start + body["maxResults"]]
+            if absent:
+                status = 400
+                messages = [
+                    f"An issue with key '{key}' does not exist for field 'key'." for key in absent
+                ]
+                payload = {"errorMessages": messages}
+            elif start + len(page) < len(keys):
+                next_token = str(start + len(page))
+                payload = {"issues": [{"key": key} for key in page], "nextPageToken": next_token}
+            else:
+                payload = {"issues": [{"key": key} for key in page], "isLast": True}
+        else:
+            found = [key for key in keys if key in server.existing]
+            payload = {"issues": [{"key": key} for key in found], "total": len(found)}
+        payload = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        # The client may have run out of budget and closed the connection, as tests intend
+        with contextlib.suppress(BrokenPipeError):
+            self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def jira(monkeypatch):
+    """Local stand-in for a Jira site."""
+    monkeypatch.delenv(validation.TOKEN_ENV, raising=False)
+    monkeypatch.delenv(validation.USER_ENV, raising=False)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeJiraHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.existing = {"ABC-1", "ABC-2", "DEF-7"}
+    server.delay = 0
+    server.status = 200
+    server.url = f"http://127.0.0.1:{server.server_port}/jira"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    JiraClient.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Issue cache in a temporary directory."""
+    cache = IssueCache(tmp_path / "cache" / "issues.sqlite3")
+    yield cache
+    cache.close()
+
+
+class TestIssueValidator:
+    """Test IssueValidator class."""
+
+    def test_one_batched_search(self, jira, cache):
+        """Test that all unknown keys are checked in one request."""
+        validator = IssueValidator(jira.url, budget=5, cache=cache)
+
+        assert validator.find_missing(["ABC-1", "ABC-1234", "DEF-7", "XYZ-1"]) == [
+            "ABC-1234",
+            "XYZ-1",
+        ]
+        (request,) = jira.requests
+        assert request["path"] == "/jira" + SEARCH_PATH
+        assert request["keys"] == ["ABC-1", "ABC-1234", "DEF-7", "XYZ-1"]
+
+    def test_cached_answers(self, jira, cache):
+        """Test that cached answers, positive and negative, skip Jira."""
+        IssueValidator(jira.url, budget=5, cache=cache).find_missing(["ABC-1", "ABC-9"])
+
+        validator = IssueValidator(jira.url, budget=5, cache=IssueCache(cache.path))
+        assert validator.find_missing(["ABC-9", "ABC-1", "ABC-2"]) == ["ABC-9"]
+
+        assert [r["keys"] for r in jira.requests] == [["ABC-1", "ABC-9"], ["ABC-2"]]
+
+    def test_connection_is_kept_alive(self, jira, cache):
+        """Test that later searches reuse the connection."""
+        validator = IssueValidator(jira.url, budget=5, cache=cache)
+
+        validator.find_missing(["ABC-1"])
+        validator.find_missing(["ABC-2"])
+
+        assert len({r["client"] for r in jira.requests}) == 1
+
+    def test_reconnects_after_server_closed_connection(self, jira, cache):
+        """Test that a stale pooled connection is replaced transparently."""
+        validator = IssueValidator(jira.url, budget=5, cache=cache)
+        validator.find_missing(["ABC-1"])
+        for connections in JiraClient._idle.values():
+            for connection in connections:
+                connection.sock.close()
+
+        assert validator.find_missing(["ABC-404"]) == ["ABC-404"]
+
+    def test_late_answer_is_cached(self, jira, cache):
+        """Test that a search finishing after the budget still fills the cache."""
+        jira.delay = 0.5
+        validator = IssueValidator(jira.url, budget=0.05, cache=cache)
+
+        assert validator.find_missing(["ABC-1", "ABC-404"]) == []
+        deadline = time.monotonic() + 5
+        while not cache.get(jira.url, ["ABC-1", "ABC-404"]) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert validator.find_missing(["ABC-1", "ABC-404"]) == ["ABC-404"]
+        assert len(jira.requests) == 1
+
+    def test_budget(self, jira, cache):
+        """Test that a slow Jira is abandoned at the budget and unknown keys pass."""
+        jira.delay = 2
+        validator = IssueValidator(jira.url, budget=0.2, cache=cache)
+        cache.put(jira.url, {"ABC-9": False})
+
+        start = time.monotonic()
+        assert validator.find_missing(["ABC-9", "ABC-404"]) == ["ABC-9"]
+        assert time.monotonic() - start < 1.5
+
+    def test_errors_use_cache_only(self, jira, cache, mocker):
+        """Test that Jira errors are reported without failing validation."""
+        jira.status = 401
+        warning = mocker.patch("pre_commit_jira_helper.validation.logger.warning")
+
+        assert IssueValidator(jira.url, budget=5, cache=cache).find_missing(["ABC-404"]) == []
+        assert "credentials" in warning.call_args.args[0]
+        assert cache.get(jira.url, ["ABC-404"]) == {}
+
+    def test_unusual_keys_are_not_sent(self, jira, cache):
+        """Test that only plain keys end up in JQL."""
+        validator = IssueValidator(jira.url, budget=5, cache=cache)
+
+        assert validator.find_missing(['ABC-1") OR project = X', "abc-1"]) == []
+        assert jira.requests == []
+
+    def test_unreachable(self, cache):
+        """Test that a site that refuses connections is treated as unknown."""
+        validator = IssueValidator("http://127.0.0.1:9", budget=5, cache=cache)
+
+        assert validator.find_missing(["ABC-1"]) == []
+
+
+class TestJiraClient:
+    """Test JiraClient class."""
+
+    @pytest.mark.parametrize(
+        ("user", "expected"),
+        [
+            ("me@example.com", "Basic " + base64.b64encode(b"me@example.com:t0k").decode()),
+            (None, "Bearer t0k"),
+        ],
+    )
+    def test_credentials(self, jira, monkeypatch, user, expected):
+        """Test basic auth with an email and bearer auth with a token alone."""
+        # Only the credentials given to the client count
+        monkeypatch.setenv(validation.TOKEN_ENV, "ignored")
+
+        assert JiraClient(jira.url, user=user, token="t0k").search(["ABC-1"]) == {"ABC-1"}
+        assert jira.requests[0]["authorization"] == expected
+
+    def test_env_credentials(self, monkeypatch):
+        """Test reading the credentials from an environment."""
+        monkeypatch.setenv(validation.TOKEN_ENV, "t0k")
+        monkeypatch.setenv(validation.USER_ENV, "")
+
+        assert validation.env_credentials() == {"user": None, "token": "t0k"}
+        assert validation.env_credentials({validation.USER_ENV: "me"}) == {
+            "user": "me",
+            "token": None,
+        }
+
+    def test_cloud_search(self, jira):
+        """Test the token-paged search of Jira Cloud, which fails on absent keys."""
+        jira.existing = {f"ABC-{n}" for n in range(250)}
+        keys = [f"ABC-{n}" for n in range(240, 260)]
+        client = JiraClient(jira.url, cloud=True)
+
+        assert client.search(keys) == set(keys[:10])
+        assert {r["path"] for r in jira.requests} == {"/jira" + CLOUD_SEARCH_PATH}
+        assert [r["keys"] for r in jira.requests] == [keys, keys[:10]]
+
+    def test_cloud_pages(self, jira):
+        """Test that later pages are asked for with the token of the previous one."""
+        jira.existing = {"ABC-1", "ABC-2", "ABC-3"}
+        client = JiraClient(jira.url, cloud=True)
+
+        pages = list(client.iter_search("key in (ABC-1, ABC-2, ABC-3)", page_size=2))
+
+        assert pages == [["ABC-1", "ABC-2"], ["ABC-3"]]
+
+    @pytest.mark.parametrize(
+        ("url", "cloud"),
+        [("https://example.atlassian.net", True), ("https://jira.example.com", False)],
+    )
+    def test_cloud_detection(self, url, cloud):
+        """Test that Atlassian-hosted sites use the Cloud search."""
+        assert JiraClient(url).cloud is cloud
+
+    def test_bad_status(self, jira):
+        """Test that error statuses raise."""
+        jira.status = 500
+
+        with pytest.raises(JiraError, match="500"):
+            JiraClient(jira.url).search(["ABC-1"])
+
+    def test_invalid_url(self):
+        """Test that only http(s) URLs are accepted."""
+        with pytest.raises(ValueError):
+            JiraClient("ftp://jira.example.com")
+
+
+class TestIssueCache:
+    """Test IssueCache class."""
+
+    def test_ttls(self, cache, mocker):
+        """Test that missing keys expire sooner than existing ones."""
+        cache.put("site", {"ABC-1": True, "ABC-2": False})
+        assert cache.get("site", ["ABC-1", "ABC-2"]) == {"ABC-1": True, "ABC-2": False}
+        assert cache.get("other", ["ABC-1"]) == {}
+
+        later = time.time() + cache.negative_ttl + 1
+        mocker.patch("pre_commit_jira_helper.validation.time.time", return_value=later)
+
+        assert cache.get("site", ["ABC-1", "ABC-2"]) == {"ABC-1": True}
+
+    def test_eviction(self, tmp_path, mocker):
+        """Test that the least recently checked entries are evicted."""
+        cache = IssueCache(tmp_path / "issues.sqlite3", max_entries=2)
+        clock = mocker.patch("pre_commit_jira_helper.validation.time.time")
+        for i, key in enumerate(["ABC-1", "ABC-2", "ABC-3"]):
+            clock.return_value = 1000.0 + i
+            cache.put("site", {key: True})
+
+        assert cache.get("site", ["ABC-1", "ABC-2", "ABC-3"]) == {"ABC-2": True, "ABC-3": True}
+        cache.close()
+
+    def test_unusable_database(self, tmp_path):
+        """Test that a corrupt database behaves as an empty cache."""
+        path = tmp_path / "issues.sqlite3"
+        path.write_bytes(b"not a database" * 100)
+        cache = IssueCache(path)
+
+        cache.put("site", {"ABC-1": True})
+        assert cache.get("site", ["ABC-1"]) == {}
+        cache.close()